@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Agent Context Benchmark — request size per iteration, with and without a budget
+================================================================================
+A stubbed model asks for profile_data_source on a wide table every turn, as an
+agent exploring a schema does. The profiles are real, from a generated table.
+Unbounded, each request re-sends every earlier profile, so size (and the time
+to serialize it) grows with each iteration. With a ContextBudget it levels off
+under HISTORY_TOKENS.
+
+Usage: python benchmarks/bench_agent_context.py [--columns 120] [--rows 2000] [--iterations 15]
+"""
+import os, sys, json, time, random, shutil, tempfile, argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import storage
+from src.agents import agent_loop, context_budget, tool_handlers
+
+def run(iterations, budget):
+    serialize = []
+    def fake_claude(system, messages, tools):
+        t0 = time.perf_counter()
+        json.dumps(messages)
+        serialize.append(time.perf_counter() - t0)
+        n = len(serialize)
+        return {"content": [{"type": "tool_use", "id": f"toolu_{n:02d}", "name": "profile_data_source",
+                             "input": {"source_name": "silver", "table_name": "wide", "sample_size": 20 + n}}]}
+    agent_loop.call_claude = fake_claude
+    agent_loop.run_agent_loop("dq_engine", "Profile every column.", "profile silver.wide", [], iterations, context=budget)
+    return [(t["request_tokens"], s) for t, s in zip(budget.turns, serialize)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--columns", type=int, default=120)
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--iterations", type=int, default=15)
+    args = parser.parse_args()
+    root = tempfile.mkdtemp(prefix="bench_agent_context_")
+    os.environ["LAKEHOUSE_TOOL_CACHE"] = "off"
+    tool_handlers.DATA_DIR = root
+    try:
+        rng = random.Random(7)
+        os.makedirs(os.path.join(root, "silver"))
+        storage.write_rows(os.path.join(root, "silver", "wide.csv"),
+                           ({f"col_{c:03d}": rng.choice(["A", "B", "C", str(rng.random()), ""]) for c in range(args.columns)}
+                            for _ in range(args.rows)))
+        inf = float("inf")
+        unbounded = run(args.iterations, context_budget.ContextBudget(result_tokens=inf, history_tokens=inf))
+        budgeted = run(args.iterations, context_budget.ContextBudget())
+        print(f"\n{'iter':>4} {'unbounded tokens':>17} {'ms':>6} {'budgeted tokens':>16} {'ms':>6}")
+        for i, ((ut, us), (bt, bs)) in enumerate(zip(unbounded, budgeted)):
+            print(f"{i:>4} {ut:>17,} {us * 1000:>6.2f} {bt:>16,} {bs * 1000:>6.2f}")
+        print(f"\ntotal input tokens: {sum(t for t, _ in unbounded):,} unbounded vs {sum(t for t, _ in budgeted):,} budgeted\n")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Dashboard API Load Test — p50/p99 latency under concurrent dashboard users
+===========================================================================
+Starts src/dashboards/dashboard_api.py in its own process and drives it with
+simulated users. Each user keeps one HTTP/1.1 connection open and opens tabs at
+random. Three phases:
+  cold         every cache empty: the first requests for each tab scan the tables and
+               the rest coalesce onto those in-flight computations
+  warm         the same traffic, answered from the LRU
+  revalidate   users send If-None-Match with the ETag they already hold → 304
+Ends with the server's counters (scans, computations, coalesced requests).
+
+Without --data-dir, a scale-factor dataset is generated into a temp directory.
+
+Usage: python benchmarks/bench_dashboard_api.py [--data-dir data] [--users 50] [--requests 40] [--scale-factor 0.5]
+"""
+import os, sys, json, time, random, socket, shutil, asyncio, tempfile, argparse, subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.pipelines import dashboard_cubes as cubes
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+async def request(reader, writer, path, etag=None):
+    head = f"GET {path} HTTP/1.1\r\nHost: bench\r\n" + (f"If-None-Match: {etag}\r\n" if etag else "") + "\r\n"
+    writer.write(head.encode())
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        k, _, v = line.decode().partition(":")
+        headers[k.strip().lower()] = v.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers.get("etag"), body
+
+async def user(port, n, rng, etags, revalidate, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(n):
+        tab = rng.choice(list(cubes.TABS))
+        path = f"/api/{tab}" + ("?months=6" if rng.random() < 0.25 else "")
+        t0 = time.perf_counter()
+        status, etag, _ = await request(reader, writer, path, etags.get(path) if revalidate else None)
+        latencies.append(1000 * (time.perf_counter() - t0))
+        statuses[status] = statuses.get(status, 0) + 1
+        etags[path] = etag
+    writer.close()
+
+async def phase(port, users, n, seed, etags, revalidate=False):
+    latencies, statuses = [], {}
+    t0 = time.perf_counter()
+    await asyncio.gather(*[user(port, n, random.Random(seed + u), etags, revalidate, latencies, statuses) for u in range(users)])
+    return sorted(latencies), statuses, time.perf_counter() - t0
+
+def percentile(sorted_values, p): return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_for(port, proc, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None: sys.exit("dashboard_api exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError: time.sleep(0.05)
+    sys.exit("dashboard_api did not start")
+
+async def stats(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, _, body = await request(reader, writer, "/api/stats")
+    writer.close()
+    return json.loads(body)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=None, help="Lakehouse to serve (default: generate one into a temp dir)")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per user per phase")
+    parser.add_argument("--scale-factor", type=float, default=0.5)
+    args = parser.parse_args()
+    tmp = None
+    data = args.data_dir
+    if data is None:
+        tmp = data = tempfile.mkdtemp(prefix="bench_api_")
+        subprocess.run([sys.executable, os.path.join(ROOT, "src", "data_generation", "generate_all.py"), "--output-dir", data,
+                        "--scale-factor", str(args.scale_factor), "--as-of", "2025-06-30"], check=True, capture_output=True)
+    port = free_port()
+    # --cube-dir to an empty path: cold requests compute from the tables rather than read prebuilt payloads
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "src", "dashboards", "dashboard_api.py"), "--data-dir", data,
+                               "--port", str(port), "--cube-dir", os.path.join(tmp or tempfile.gettempdir(), "_no_cubes")],
+                              stdout=subprocess.DEVNULL)
+    try:
+        wait_for(port, server)
+        etags = {}
+        print(f"\n{args.users} users × {args.requests} requests per phase, {len(cubes.TABS)} tabs (25% with ?months=6)")
+        print(f"  {'phase':<11} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  statuses")
+        for name, revalidate in (("cold", False), ("warm", False), ("revalidate", True)):
+            lat, statuses, seconds = asyncio.run(phase(port, args.users, args.requests, len(name), etags, revalidate))
+            print(f"  {name:<11} {len(lat) / seconds:>8,.0f} {percentile(lat, 50):>8.2f} {percentile(lat, 99):>8.2f} "
+                  f"{lat[-1]:>8.1f}  {dict(sorted(statuses.items()))}")
+        s = asyncio.run(stats(port))
+        print(f"\n  server: {s['scans']} table scans, {s['computed']} tab computations, {s['coalesced']} coalesced, "
+              f"{s['hits']} LRU hits, {s['not_modified']} not modified\n")
+    finally:
+        server.terminate()
+        server.wait()
+        if tmp: shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Delta Small-File Benchmark — streaming appends, OPTIMIZE, Z-ORDER
+==================================================================
+Reproduces the small-file problem on a local Delta table: fact_transactions-like
+rows arrive as many tiny appends (one commit and a handful of files each), then the
+table is compacted and Z-ordered. For each stage it reports the file count, the
+time to load the snapshot from the log, a full scan, and a selective scan
+(amount range + one week) with the files that min/max stats could not skip.
+
+Usage: python benchmarks/bench_delta_compaction.py [--rows 100000] [--appends 400] [--target-file-rows 20000]
+"""
+import os, sys, time, random, shutil, tempfile, argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.pipelines import delta_table as dt
+
+WHERE = {"amount": (250.0, 300.0), "transaction_date": ("2025-03-01", "2025-03-07")}
+
+def rows(n, seed=11):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {"transaction_id": f"TXN-{i:08d}", "account_id": f"ACCT-{rng.randrange(50_000):06d}",
+               "transaction_date": f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}T{rng.randrange(24):02d}:00:00Z",
+               "amount": f"{rng.lognormvariate(3.5, 1.1):.2f}", "channel": rng.choice(("pos", "online", "atm", "ach"))}
+
+def measure(table, stage):
+    t0 = time.perf_counter()
+    snap = table.snapshot()
+    t1 = time.perf_counter()
+    total = sum(1 for _ in table.iter_rows())
+    t2 = time.perf_counter()
+    hits = sum(1 for _ in table.iter_rows(where=WHERE))
+    t3 = time.perf_counter()
+    print(f"{stage:<16} {len(snap.files):>7,} {snap.version:>8} {t1 - t0:>9.3f} {total:>9,} {t2 - t1:>7.2f} "
+          f"{len(table.files(where=WHERE)):>10,} {hits:>6,} {t3 - t2:>8.3f}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--appends", type=int, default=400)
+    parser.add_argument("--files-per-append", type=int, default=4)
+    parser.add_argument("--target-file-rows", type=int, default=20_000)
+    args = parser.parse_args()
+    root = tempfile.mkdtemp(prefix="bench_delta_")
+    try:
+        table = dt.DeltaTable(os.path.join(root, "fact_transactions"))
+        data = list(rows(args.rows))
+        per = -(-len(data) // args.appends)
+        t0 = time.perf_counter()
+        for lo in range(0, len(data), per):
+            table.write(data[lo:lo + per], file_rows=max(1, -(-per // args.files_per_append)))
+        print(f"\n{args.appends} appends of {per:,} rows in {time.perf_counter() - t0:.1f}s")
+        print(f"\n{'stage':<16} {'files':>7} {'version':>8} {'snapshot s':>9} {'rows':>9} {'scan s':>7} "
+              f"{'files read':>10} {'hits':>6} {'filter s':>8}")
+        measure(table, "small files")
+        m = table.optimize(target_file_rows=args.target_file_rows)["metrics"]
+        measure(table, "optimize")
+        z = table.optimize(zorder_by=["amount", "transaction_date"], target_file_rows=args.target_file_rows)["metrics"]
+        measure(table, "zorder")
+        print(f"\noptimize {m['executionTimeMs'] / 1000:.1f}s, zorder {z['executionTimeMs'] / 1000:.1f}s\n")
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Referential-Integrity Memory Benchmark — fraud_alerts → fact_transactions
+==========================================================================
+Peak key-structure memory of the three ways to check a small child table's FKs
+against a large parent: an exact Python set of every parent ID (the original
+test_data_quality.py), the engine's exact KeySet (sorted 64-bit hashes), and the
+Bloom semi-join (filter over the child's keys + the parent keys it admits).
+All three report the same orphan count.
+
+Usage: python benchmarks/bench_dq_ri.py [--max-parent 4000000] [--child 20000] [--fpr 0.001]
+"""
+import os, sys, time, random, argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.pipelines import dq_engine as dq
+
+CHUNK = 100_000
+
+def chunks(keys):
+    for lo in range(0, len(keys), CHUNK): yield keys[lo:lo + CHUNK]
+
+def python_set(parent, child):
+    s = set(parent)
+    return len(set(child) - s), sys.getsizeof(s) + sum(map(sys.getsizeof, s))
+
+def key_set(parent, child):
+    p, c = dq.KeySet(), dq.KeySet()
+    for part in chunks(parent): p.add(part)
+    c.add(child)
+    return c.missing_from(p), p.nbytes + c.nbytes
+
+def semi_join(parent, child, fpr):
+    bloom = dq.ScalableBloom(fpr)
+    bloom.add(child)
+    admitted = dq.KeySet()
+    for part in chunks(parent): admitted.add([k for k, hit in zip(part, bloom.contains(part)) if hit])
+    orphans = dq.KeySet()
+    orphans.add([k for k, hit in zip(child, admitted.contains(child)) if not hit])
+    return len(orphans), bloom.nbytes + admitted.nbytes + orphans.nbytes
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-parent", type=int, default=4_000_000)
+    parser.add_argument("--child", type=int, default=20_000)
+    parser.add_argument("--fpr", type=float, default=0.001)
+    parser.add_argument("--set-limit", type=int, default=2_000_000, help="Skip the Python set above this size")
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    print(f"\n{'parent rows':>12} {'orphans':>8} {'set MB':>8} {'keyset MB':>10} {'bloom MB':>9} {'set s':>7} {'keyset s':>9} {'bloom s':>8}")
+    n = 250_000
+    while n <= args.max_parent:
+        parent = [f"TXN-{i:010d}" for i in range(n)]
+        child = [f"TXN-{rng.randrange(int(n * 1.01)):010d}" for _ in range(args.child)]  # ~1% dangling
+        row = []
+        for fn in (python_set, key_set, lambda p, c: semi_join(p, c, args.fpr)):
+            if fn is python_set and n > args.set_limit:
+                row.append((None, None, None))
+                continue
+            t0 = time.perf_counter()
+            orphans, nbytes = fn(parent, child)
+            row.append((orphans, nbytes, time.perf_counter() - t0))
+        assert len({r[0] for r in row if r[0] is not None}) == 1
+        fmt = lambda v, w, f: f"{v:>{w}{f}}" if v is not None else f"{'—':>{w}}"
+        print(f"{n:>12,} {row[1][0]:>8,} " + " ".join(fmt(r[1] and r[1] / 2**20, w, ".1f") for r, w in zip(row, (8, 10, 9)))
+              + " " + " ".join(fmt(r[2], w, ".2f") for r, w in zip(row, (7, 9, 8))))
+        n *= 2
+    print()
+
+if __name__ == "__main__":
+    main()
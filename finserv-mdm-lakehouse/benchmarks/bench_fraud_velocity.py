@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Fraud Velocity Benchmark — streaming scorer throughput and state size
+======================================================================
+Builds an event-time-ordered card stream (skewed account activity, a few
+injected bursts) as CSV-style text rows, then times VelocityScorer (one event
+at a time) and, with NumPy, BatchScorer over BATCH_ROWS batches, each alone on
+one core. Both must raise the same alerts. Reports transactions/second, alerts
+by type, and the per-account state, which is fixed at 64 buckets however busy
+the account is.
+
+Usage: python benchmarks/bench_fraud_velocity.py [--transactions 1000000] [--accounts 50000] [--days 30] [--batch-size 262144]
+"""
+import os, sys, gc, time, random, argparse
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import generate_all as gen
+from src.pipelines import fraud_velocity as fv
+
+def stream(n, accounts, days, rng):
+    start, step = datetime(2025, 6, 1), days * 86_400 / n
+    weights = [1 / (i + 1) ** 0.3 for i in range(accounts)]  # a few accounts are far busier than most
+    ids = rng.choices(range(accounts), weights, k=n)
+    for i in range(n):
+        mcc = rng.choice(gen.MCC_CATEGORIES)
+        burst = i % 50_000 < 8  # every 50K events, one account fires 8 quick transactions
+        acct = ids[i - i % 50_000] if burst else ids[i]
+        yield {"transaction_id": f"TXN-{i + 1:08d}", "account_id": f"ACC-{acct:07d}", "customer_id": f"CUST-{acct:07d}",
+               "transaction_date": (start + timedelta(seconds=int(i * step))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+               "amount": str(round(abs(rng.gauss(mcc["avg_txn"], mcc["avg_txn"] * 0.4)) + 1, 2)), "mcc_code": mcc["mcc"],
+               "merchant_category": mcc["category"], "channel": rng.choices(*gen.TXN_CHANNELS)[0],
+               "is_international": str(rng.random() < 0.08), "fraud_flag": str(rng.random() < 0.008)}
+
+def state_bytes(scorer):
+    if not scorer.accounts: return 0
+    if isinstance(scorer, getattr(fv, "BatchScorer", ())):  # one row of every ring array per account
+        return scorer.last.itemsize + sum(a[0].nbytes if a.ndim == 2 else a.itemsize for ring in scorer.rings for a in ring.values())
+    state = next(iter(scorer.accounts.values()))
+    return sys.getsizeof(state) + sum(sys.getsizeof(r) + sum(sys.getsizeof(l) for l in (r.counts, r.totals, r.marked, r.masks))
+                                      for r in state[1:])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=fv.BATCH_ROWS)
+    args = parser.parse_args()
+    rows = list(stream(args.transactions, args.accounts, args.days, random.Random(11)))
+    gc.freeze()  # a real feed is not held in memory: keep the GC from rescanning this one
+    print(f"\n{len(rows):,} transactions, {args.accounts:,} accounts, {args.days} days")
+    runs = [("VelocityScorer", fv.VelocityScorer(), fv.score_stream)]
+    if fv.np is not None:
+        runs.append(("BatchScorer", fv.BatchScorer(), lambda rows, scorer: fv.score_batches(rows, scorer, args.batch_size)))
+    results = []
+    for name, scorer, score in runs:
+        t0 = time.perf_counter()
+        results.append(list(score(rows, scorer)))
+        seconds = time.perf_counter() - t0
+        print(f"  {name:<15} {seconds:>6.2f}s → {len(rows) / seconds:>9,.0f} txn/s on one core; "
+              f"state: {len(scorer.accounts):,} accounts × ~{state_bytes(scorer):,} bytes (64 buckets each)")
+    alerts = results[0]
+    assert all(r == alerts for r in results[1:]), "BatchScorer and VelocityScorer disagree"
+    print(f"  alerts: {len(alerts):,}")
+    for alert_type, n in Counter(a["alert_type"] for a in alerts).most_common():
+        print(f"    {alert_type:<28} {n:>7,}")
+    print()
+
+if __name__ == "__main__":
+    main()
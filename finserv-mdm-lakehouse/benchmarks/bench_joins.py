@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Join Scaling Benchmark — gen_accounts + gen_credit_risk_snapshot
+================================================================
+Times the customer→accounts join at doubling customer counts, against the
+old per-customer list scan. Indexed time per customer should stay flat
+(linear total); the scan grows with the account count (quadratic total).
+
+Usage: python benchmarks/bench_joins.py [--max-customers 64000] [--scan-limit 8000]
+"""
+import os, sys, time, random, argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import generate_all as gen
+
+NOW = datetime(2025, 6, 30, 12, 0, 0)
+
+def scan_join(customers, accounts):
+    """The pre-index join: one full scan of accounts per customer."""
+    return [[a for a in accounts if a["customer_id"] == c["customer_id"]] for c in customers if c["status"] != "closed"]
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-customers", type=int, default=64000)
+    parser.add_argument("--scan-limit", type=int, default=8000, help="Skip the O(n²) scan above this size")
+    args = parser.parse_args()
+
+    print(f"\n{'customers':>10} {'accounts':>9} {'accounts s':>11} {'risk s':>8} {'µs/cust':>8} {'scan join s':>12}")
+    n = 1000
+    while n <= args.max_customers:
+        customers = list(gen.gen_customers(n, random.Random(1), NOW))
+        accounts, t_acct = timed(lambda: list(gen.gen_accounts(customers, random.Random(2), NOW)))
+        _, t_risk = timed(lambda: sum(1 for _ in gen.gen_credit_risk_snapshot(customers, accounts, random.Random(3), NOW)))
+        t_scan = timed(scan_join, customers, accounts)[1] if n <= args.scan_limit else None
+        scan = f"{t_scan:12.3f}" if t_scan is not None else f"{'—':>12}"
+        print(f"{n:>10,} {len(accounts):>9,} {t_acct:>11.3f} {t_risk:>8.3f} {t_risk / n * 1e6:>8.1f} {scan}")
+        n *= 2
+    print()
+
+if __name__ == "__main__":
+    main()
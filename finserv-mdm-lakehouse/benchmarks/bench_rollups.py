@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Rollup Benchmark — real-time view by rescan vs incremental rollups
+===================================================================
+Writes a year of card transactions, then compares three ways of getting the
+2-week hourly view: rescanning the fact table, the first (full) rollup build,
+and a refresh after each micro-batch lands. Each micro-batch is a small
+append, 10% of it late by up to a month. Refresh cost tracks the batch, not
+the table, and the view itself is read from the hour buckets.
+
+Usage: python benchmarks/bench_rollups.py [--transactions 1000000] [--batches 5] [--batch-size 2000]
+"""
+import os, sys, time, random, shutil, tempfile, argparse
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import storage
+from src.pipelines import rollups
+
+NOW = datetime(2025, 6, 30, 12)
+
+def txns(n, rng, start, seconds, first):
+    for i in range(first, first + n):
+        ts = start + timedelta(seconds=rng.randrange(seconds))
+        yield {"transaction_id": f"TXN-{i:08d}", "transaction_date": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+               "amount": round(rng.uniform(1, 400), 2), "fraud_flag": rng.random() < 0.01}
+
+def rescan_view(path, hours):
+    """The same view computed the old way: one pass over the whole fact table."""
+    lo = rollups.hour_key(NOW - timedelta(hours=hours - 1))
+    n = Counter()
+    for r in storage.iter_rows(path, columns=["transaction_date"]):
+        if r["transaction_date"][:13] >= lo: n[r["transaction_date"][:13]] += 1
+    return n
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, 1000 * (time.perf_counter() - t0)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=2_000)
+    args = parser.parse_args()
+    root, rng = tempfile.mkdtemp(prefix="bench_rollups_"), random.Random(13)
+    try:
+        os.makedirs(os.path.join(root, "gold"))
+        path = os.path.join(root, "gold", "fact_transactions.csv")
+        storage.write_rows(path, txns(args.transactions, rng, NOW - timedelta(days=365), 365 * 86_400, 1))
+        _, scan_ms = timed(rescan_view, path, rollups.HOURS)
+        store = rollups.RollupStore(rollups.store_path(root))
+        _, build_ms = timed(rollups.refresh, store, root)
+        _, view_ms = timed(rollups.realtime_view, store, NOW)
+        print(f"\n{args.transactions:,} transactions over 365 days, {rollups.HOURS}-hour view")
+        print(f"  rescan facts for the view      {scan_ms:>10.1f} ms")
+        print(f"  full rollup build              {build_ms:>10.1f} ms")
+        print(f"  view from hour buckets         {view_ms:>10.1f} ms\n")
+        print(f"  {'batch':>5} {'rows':>7} {'late':>5} {'refresh ms':>11} {'view ms':>8}")
+        first = args.transactions + 1
+        for b in range(args.batches):
+            late = args.batch_size // 10
+            batch = list(txns(args.batch_size - late, rng, NOW - timedelta(hours=1), 3_600, first))
+            batch += txns(late, rng, NOW - timedelta(days=30), 30 * 86_400, first + len(batch))
+            first += len(batch)
+            storage.append_rows(path, batch)
+            stats, refresh_ms = timed(rollups.refresh, store, root)
+            _, view_ms = timed(rollups.realtime_view, store, NOW)
+            print(f"  {b:>5} {stats['transactions']['folded']:>7,} {late:>5} {refresh_ms:>11.1f} {view_ms:>8.2f}")
+        store.close()
+        print()
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+SCD2 Upsert Benchmark — hash-partitioned vs whole-dimension rewrite
+====================================================================
+Nightly dim_customer SCD2 batches against growing dimensions. With one bucket,
+every batch reads and rewrites the whole dimension, like the original
+overwrite-the-CSV load. With hash buckets, a batch rewrites only the buckets its
+customer_ids land in, so run time follows the change volume.
+
+Usage: python benchmarks/bench_scd2.py [--sizes 100000 400000] [--batches 10 100 1000] [--buckets N]
+"""
+import os, sys, time, random, shutil, tempfile, argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.pipelines import scd2_customer as scd2
+
+SEGMENTS = ["mass_market", "mass_affluent", "affluent", "high_net_worth", "ultra_hnw"]
+
+def customers(n, rng):
+    for i in range(1, n + 1):
+        yield {"customer_id": f"CUST-{i:08d}", "first_name": f"F{i}", "last_name": f"L{i}", "state": "NY",
+               "segment": rng.choice(SEGMENTS), "fico_score": str(rng.randrange(300, 851)),
+               "annual_income": str(rng.randrange(20_000, 500_000)), "_ingested_at": "2025-06-30T00:00:00Z"}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 400_000])
+    parser.add_argument("--batches", type=int, nargs="+", default=[10, 100, 1_000])
+    parser.add_argument("--buckets", type=int, help="Hash buckets (default: scd2_customer.default_buckets)")
+    args = parser.parse_args()
+    rng = random.Random(5)
+    root = tempfile.mkdtemp(prefix="bench_scd2_")
+    try:
+        print(f"\n{'dimension':>10} {'batch':>7} {'buckets':>8} {'touched':>8} {'rows read':>10} {'seconds':>8}")
+        for size in args.sizes:
+            for buckets in (1, args.buckets or scd2.default_buckets(size)):
+                table = os.path.join(root, f"dim_{size}_{buckets}")
+                scd2.upsert(table, customers(size, random.Random(size)), "2025-06-30T00:00:00Z", buckets)
+                for day, batch in enumerate(args.batches, 1):
+                    changes = [{"customer_id": f"CUST-{rng.randrange(1, size + 1):08d}", "fico_score": str(rng.randrange(300, 851))}
+                               for _ in range(batch)]
+                    t0 = time.perf_counter()
+                    out = scd2.upsert(table, changes, f"2025-07-{day:02d}T00:00:00Z")
+                    seconds = time.perf_counter() - t0
+                    read = out["table_rows"] * out["buckets_touched"] // buckets
+                    print(f"{size:>10,} {batch:>7,} {buckets:>8} {out['buckets_touched']:>8} {read:>10,} {seconds:>8.2f}")
+                shutil.rmtree(table)
+        print()
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,25 @@ Agentic Loop Pattern — Claude Opus 4.6 Tool Use
 =================================================
 Core pattern for AI agents that build the Horizon Bank Holdings MDM platform.
 Six specialized agents work in sequence: ETL → MDM → DQ → dbt → DAG → Docs
+
+The tool calls of one turn are independent, so they run concurrently on a
+bounded thread pool. Each tool also has its own concurrency cap, shared by
+every agent in the process, and a timeout. Results go back in tool_use order.
+
+A ContextBudget (context_budget.py) keeps the re-sent history flat: large tool
+results go out of band behind a ref, and old turns are compacted past a budget.
 """
-import json
+import time, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .context_budget import ContextBudget
+
+MAX_PARALLEL_TOOLS = 8
+TOOL_CONCURRENCY = {"profile_data_source": 4, "query_database": 4, "run_tests": 1,
+                    "write_pipeline_code": 1, "delta_lake_operation": 1}  # writers stay serial
+TOOL_TIMEOUTS = {"query_database": 60, "profile_data_source": 300, "run_tests": 900, "delta_lake_operation": 900}
+DEFAULT_TIMEOUT = 120
+_slots, _slots_lock = {}, threading.Lock()
 
 AGENT_ROSTER = [
     {"id": "etl_generator", "role": "ETL Pipeline Generator", "description": "Profiles source schemas, generates PySpark extraction code for Bronze layer"},
@@ -16,13 +33,20 @@ AGENT_ROSTER = [
     {"id": "doc_writer", "role": "Documentation Writer", "description": "Reads everything, generates data dictionaries, technical docs, runbooks"},
 ]
 
-def run_agent_loop(agent_id, system_prompt, user_message, tools, max_iterations=15):
-    """Core agentic loop: prompt → tool_use → tool_result → repeat until done."""
+def run_agent_loop(agent_id, system_prompt, user_message, tools, max_iterations=15, max_workers=MAX_PARALLEL_TOOLS,
+                   context=None):
+    """Core agentic loop: prompt → tool_use → tool_result → repeat until done.
+    max_workers=1 runs each turn's tool calls one at a time. Pass a ContextBudget
+    as `context` to tune the budget or to read its per-iteration `turns` afterwards."""
+    context = context or ContextBudget()
     messages = [{"role": "user", "content": user_message}]
     
     for iteration in range(max_iterations):
-        # Call Claude
+        # Call Claude on a history kept under the token budget
+        saved = context.compact(messages)
+        t0 = time.perf_counter()
         response = call_claude(system_prompt, messages, tools)
+        context.record(iteration, messages, time.perf_counter() - t0, saved)
         
         # Check for tool use
         tool_calls = [b for b in response["content"] if b["type"] == "tool_use"]
@@ -34,14 +58,8 @@ def run_agent_loop(agent_id, system_prompt, user_message, tools, max_iterations=
         # Execute tools and feed results back
         messages.append({"role": "assistant", "content": response["content"]})
         
-        tool_results = []
-        for tc in tool_calls:
-            result = execute_tool(tc["name"], tc["input"])
-            tool_results.append({
-                "type": "tool_result",
-                "tool_use_id": tc["id"],
-                "content": json.dumps(result),
-            })
+        tool_results = [context.tool_result(tc["id"], result)
+                        for tc, result in zip(tool_calls, execute_tools(tool_calls, max_workers))]
         messages.append({"role": "user", "content": tool_results})
     
     return "Max iterations reached"
@@ -52,12 +70,55 @@ def call_claude(system, messages, tools):
     raise NotImplementedError("Wire up Anthropic API client")
 
 def execute_tool(name, input_data):
-    """Route tool calls to handlers."""
-    from . import tool_handlers
+    """Route tool calls to handlers, through the tool-result cache."""
+    from . import tool_handlers, tool_cache
     handler = getattr(tool_handlers, f"handle_{name}", None)
     if handler:
-        return handler(input_data)
+        return tool_cache.call(name, input_data, handler, tool_handlers.DATA_DIR)
     return {"error": f"Unknown tool: {name}"}
 
+def tool_slot(name):
+    """Process-wide semaphore capping concurrent calls of one tool."""
+    with _slots_lock:
+        if name not in _slots: _slots[name] = threading.BoundedSemaphore(TOOL_CONCURRENCY.get(name, MAX_PARALLEL_TOOLS))
+        return _slots[name]
+
+def execute_tools(tool_calls, max_workers=MAX_PARALLEL_TOOLS, timeouts=None):
+    """Run one turn's tool calls concurrently; returns their results in call order.
+    A call's timeout counts from when it gets its tool slot. A call that overruns, or
+    raises, yields {"error": ...}. An overrunning call cannot be interrupted: it keeps
+    its slot until the handler returns, but the turn no longer waits for it."""
+    timeouts = {**TOOL_TIMEOUTS, **(timeouts or {})}
+    results, started = [None] * len(tool_calls), {}
+
+    def run(i, tc):
+        with tool_slot(tc["name"]):
+            started[i] = time.monotonic()
+            try:
+                return execute_tool(tc["name"], tc["input"])
+            except Exception as exc:
+                return {"error": f"{tc['name']} failed: {type(exc).__name__}: {exc}"}
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tool_calls))), thread_name_prefix="tool")
+    futures = {pool.submit(run, i, tc): i for i, tc in enumerate(tool_calls)}
+    pending = set(futures)
+    while pending:
+        # Sleep until the next completion or the nearest deadline; poll while calls wait for a slot
+        now = time.monotonic()
+        waits = [started[futures[f]] + timeouts.get(tool_calls[futures[f]]["name"], DEFAULT_TIMEOUT) - now
+                 for f in pending if futures[f] in started]
+        if len(waits) < len(pending): waits.append(0.05)
+        done, pending = wait(pending, timeout=max(0, min(waits)), return_when=FIRST_COMPLETED)
+        for f in done: results[futures[f]] = f.result()
+        now = time.monotonic()
+        for f in list(pending):
+            i = futures[f]
+            limit = timeouts.get(tool_calls[i]["name"], DEFAULT_TIMEOUT)
+            if i in started and now - started[i] >= limit:
+                results[i] = {"error": f"{tool_calls[i]['name']} timed out after {limit}s"}
+                pending.discard(f)
+    pool.shutdown(wait=False)
+    return results
+
 def extract_text(response):
     return " ".join(b["text"] for b in response["content"] if b["type"] == "text")
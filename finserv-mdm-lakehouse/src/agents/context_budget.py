@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Context Budget — bounded conversation history for run_agent_loop
+==================================================================
+Every turn of an agent run re-sends the whole history. A wide profile or a
+100-row query result therefore gets paid for again on every later call, and
+request size grows with each iteration. ContextBudget keeps it flat:
+
+  1. A tool result above RESULT_TOKENS is stored out of band (content-addressed
+     JSON under <data dir>/_tool_results, or LAKEHOUSE_TOOL_RESULTS). The model
+     sees a structural preview plus a `ref` it can page with read_tool_result.
+  2. Once the history passes HISTORY_TOKENS, the oldest tool results (all but
+     the last KEEP_TURNS turns) become one-line references, and long string
+     inputs of old tool calls (generated code) are clipped. This stops at
+     TARGET_TOKENS, so the rewritten prefix stays stable for several turns.
+
+tool_use / tool_result pairing is never changed; only contents shrink.
+Token counts are estimated at CHARS_PER_TOKEN characters per token.
+"""
+import os, json, hashlib
+
+CHARS_PER_TOKEN = 4
+RESULT_TOKENS = 2_000
+HISTORY_TOKENS = 30_000
+TARGET_TOKENS = 15_000
+KEEP_TURNS = 2
+PREVIEW_LEVELS = [(5, 3, 200), (2, 2, 80), (1, 1, 40)]  # (list items, depth, string chars), tried in order
+INPUT_CHARS = 400
+
+def tokens(obj):
+    """Estimated token count of a string, or of an object's JSON."""
+    return len(obj if isinstance(obj, str) else json.dumps(obj, default=str)) // CHARS_PER_TOKEN + 1
+
+def store_path(data_dir):
+    return os.environ.get("LAKEHOUSE_TOOL_RESULTS") or os.path.join(data_dir, "_tool_results")
+
+class ResultStore:
+    """Content-addressed JSON files; the ref is a prefix of the sha256 of the canonical JSON."""
+    def __init__(self, root):
+        self.root = root
+
+    def put(self, value):
+        text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+        ref = hashlib.sha256(text.encode()).hexdigest()[:16]
+        path = os.path.join(self.root, f"{ref}.json")
+        if not os.path.exists(path):
+            os.makedirs(self.root, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f: f.write(text)
+            os.replace(tmp, path)
+        return ref
+
+    def get(self, ref):
+        path = os.path.join(self.root, f"{os.path.basename(ref)}.json")
+        if not os.path.exists(path): return None
+        with open(path) as f: return json.load(f)
+
+# ─── Previews ───
+def preview(value, items=5, depth=3, chars=200):
+    """Same shape as `value`, with lists cut to `items`, strings to `chars` and nesting to `depth`."""
+    if isinstance(value, str):
+        return value if len(value) <= chars else value[:chars] + f"… (+{len(value) - chars} chars)"
+    if isinstance(value, (dict, list)) and depth == 0:
+        return f"<{type(value).__name__} of {len(value)}>"
+    if isinstance(value, dict):
+        return {k: preview(v, items, depth - 1, chars) for k, v in value.items()}
+    if isinstance(value, list):
+        head = [preview(v, items, depth - 1, chars) for v in value[:items]]
+        return head + [f"… {len(value) - items} more items"] if len(value) > items else head
+    return value
+
+def shrink(value, limit):
+    """The most detailed preview of `value` that fits in `limit` tokens."""
+    for items, depth, chars in PREVIEW_LEVELS:
+        out = preview(value, items, depth, chars)
+        if tokens(out) <= limit: return out
+    if isinstance(value, dict):
+        return {"keys": preview(list(value), limit // 4, 1, 40)}
+    return preview(value, 1, 1, limit * CHARS_PER_TOKEN // 2)
+
+# ─── Budget ───
+class ContextBudget:
+    """Shrinks tool results as they enter the history and compacts old turns
+    when it grows past the budget. `turns` records per-iteration request size."""
+    def __init__(self, store=None, result_tokens=RESULT_TOKENS, history_tokens=HISTORY_TOKENS,
+                 target_tokens=TARGET_TOKENS, keep_turns=KEEP_TURNS):
+        self._store, self.result_tokens = store, result_tokens
+        self.history_tokens, self.target_tokens, self.keep_turns = history_tokens, target_tokens, keep_turns
+        self.turns = []
+
+    @property
+    def store(self):
+        if self._store is None:
+            from . import tool_handlers
+            self._store = ResultStore(store_path(tool_handlers.DATA_DIR))
+        return self._store
+
+    def tool_result(self, tool_use_id, result):
+        """A tool_result block for `result`, stored out of band if it is over budget."""
+        content = json.dumps(result, default=str)
+        n = tokens(content)
+        if n > self.result_tokens:
+            ref = self.store.put(result)
+            content = json.dumps({"ref": ref, "tokens": n, "truncated": True,
+                                  "note": "Preview only; read_tool_result with this ref (and path/offset/limit) returns the rest.",
+                                  "preview": shrink(result, self.result_tokens - 100)}, default=str)
+        return {"type": "tool_result", "tool_use_id": tool_use_id, "content": content}
+
+    def elide(self, block):
+        """Replace a tool_result's content with a reference to its stored value. Returns tokens saved."""
+        before = tokens(block["content"])
+        try:
+            value = json.loads(block["content"])
+        except (TypeError, ValueError):
+            value = block["content"]
+        if isinstance(value, dict) and value.get("elided"): return 0
+        ref = value["ref"] if isinstance(value, dict) and value.get("truncated") else self.store.put(value)
+        size = value.get("tokens", before) if isinstance(value, dict) and value.get("truncated") else before
+        block["content"] = json.dumps({"ref": ref, "tokens": size, "elided": True})
+        return before - tokens(block["content"])
+
+    def compact(self, messages):
+        """Elide the oldest tool results (and clip old tool inputs) once the history
+        is over history_tokens, until it is under target_tokens. Returns tokens saved."""
+        total = tokens(messages)
+        if total <= self.history_tokens: return 0
+        result_turns = [i for i, m in enumerate(messages)
+                        if m["role"] == "user" and isinstance(m["content"], list)]
+        protected = set(result_turns[-self.keep_turns:]) if self.keep_turns else set()
+        saved = 0
+        for i, message in enumerate(messages):
+            if total - saved <= self.target_tokens: break
+            if i in protected or i + 1 in protected or not isinstance(message["content"], list): continue
+            for block in message["content"]:
+                if block.get("type") == "tool_result":
+                    saved += self.elide(block)
+                elif block.get("type") == "tool_use":
+                    for k, v in block["input"].items():
+                        if isinstance(v, str) and len(v) > INPUT_CHARS:
+                            block["input"][k] = v[:INPUT_CHARS] + f"… (+{len(v) - INPUT_CHARS} chars clipped)"
+                            saved += (len(v) - INPUT_CHARS) // CHARS_PER_TOKEN
+        return saved
+
+    def record(self, iteration, messages, seconds, saved):
+        self.turns.append({"iteration": iteration, "request_tokens": tokens(messages),
+                           "compacted_tokens": saved, "seconds": round(seconds, 4)})
+
+def read(store, ref, path=None, offset=0, limit=50):
+    """Part of a stored result: walk a dotted `path` (keys or list indexes), then
+    return `limit` list items or `limit` * 40 string chars from `offset`."""
+    value = store.get(ref)
+    if value is None: raise KeyError(f"Unknown result ref: {ref}")
+    for part in (path or "").split(".") if path else []:
+        value = value[int(part)] if isinstance(value, list) else value[part]
+    out = {"ref": ref, "path": path or ""}
+    if isinstance(value, list):
+        out.update(total=len(value), offset=offset, value=value[offset:offset + limit])
+    elif isinstance(value, str):
+        out.update(total=len(value), offset=offset, value=value[offset:offset + limit * 40])
+    elif isinstance(value, dict) and len(value) > limit:
+        keys = list(value)[offset:offset + limit]
+        out.update(total=len(value), offset=offset, value={k: value[k] for k in keys})
+    else:
+        out["value"] = value
+    return out
@@ -2,8 +2,32 @@
 """
 Meta-Agent Orchestrator — Horizon Bank Holdings
 =================================================
-Coordinates all 6 agents in sequence to build the complete MDM Lakehouse.
+Coordinates all 6 agents to build the complete MDM Lakehouse.
+
+ORCHESTRATION_PLAN runs as a DAG, not in phase order. A task (a phase, or one
+agent of a phase with `tasks`) depends on every task that produces one of its
+inputs. ARTIFACT_GROUPS expands umbrella inputs such as all_layer_tables.
+Ready tasks run on a worker pool, so phase 5 and both halves of phase 6 run
+side by side once the gold layer exists.
+
+Each finished task is checkpointed to <data dir>/_orchestration_state.json with
+a fingerprint of its input files and of its output files (ARTIFACT_PATHS).
+A rerun skips a task whose inputs and outputs are unchanged. After a failure
+it therefore resumes at the failed task, and the tasks downstream of a failure
+are left blocked until then.
+
+Usage: python src/agents/orchestrator.py [run [--workers 4] [--force] [--state PATH]]
 """
+import os, sys, glob, json, time, hashlib, argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timezone
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+ROOT = os.path.realpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+STATE_FILE = os.path.join("data", "_orchestration_state.json")
+MAX_WORKERS = 4
 
 ORCHESTRATION_PLAN = {
     "phase_1": {
@@ -47,14 +71,189 @@ ORCHESTRATION_PLAN = {
         "inputs": ["all_pipelines", "all_tables"],
         "outputs": ["step_functions_asl", "technical_docs", "data_dictionary"],
         "duration_estimate": "2 hours",
+        "tasks": {  # the two agents share no outputs, so they run side by side
+            "dag_builder": {"inputs": ["all_pipelines"], "outputs": ["step_functions_asl"]},
+            "doc_writer": {"inputs": ["all_pipelines", "all_tables"], "outputs": ["technical_docs", "data_dictionary"]},
+        },
     },
 }
 
-if __name__ == "__main__":
+# Inputs that name the outputs of several phases
+ARTIFACT_GROUPS = {
+    "bronze_schemas": ["bronze_pipelines"],
+    "silver_customer_tables": ["silver_pipelines"],
+    "silver_tables": ["silver_pipelines"],
+    "mdm_golden_records": ["golden_records"],
+    "all_pipelines": ["bronze_pipelines", "silver_pipelines", "dbt_models"],
+    "all_layer_tables": ["bronze_pipelines", "silver_pipelines", "match_pairs", "golden_records", "dimension_tables", "fact_tables"],
+    "all_tables": ["bronze_pipelines", "silver_pipelines", "match_pairs", "golden_records", "dimension_tables", "fact_tables"],
+}
+
+# Where each artifact lives, as globs under the repo root. Artifacts not listed
+# (transform_rules, extraction_schedules, ...) are not fingerprinted.
+ARTIFACT_PATHS = {
+    "source_system_configs": ["src/pipelines/mdm_matching.py"],
+    "bronze_pipelines": ["src/pipelines/bronze_*.py", "data/bronze/*"],
+    "silver_pipelines": ["src/pipelines/silver_*.py", "data/silver/*"],
+    "match_pairs": ["data/mdm/mdm_match_pairs.*"],
+    "golden_records": ["data/mdm/golden_records*"],
+    "survivorship_log": ["data/mdm/survivorship*"],
+    "dbt_models": ["src/pipelines/*.sql"],
+    "dimension_tables": ["data/gold/dim_*"],
+    "fact_tables": ["data/gold/fact_*"],
+    "dq_test_suites": ["tests/test_data_quality.py"],
+    "dq_reports": ["data/dq_results.json"],
+    "step_functions_asl": ["infra/step_functions/*"],
+    "technical_docs": ["docs/TECHNICAL_DOCUMENTATION.md", "docs/DEPLOYMENT_RUNBOOK.md"],
+    "data_dictionary": ["docs/DATA_MODEL.md"],
+}
+
+# ─── DAG ───
+def tasks(plan=ORCHESTRATION_PLAN):
+    """Schedulable units: each phase, or each agent of a phase that lists `tasks`."""
+    out = {}
+    for phase_id, phase in plan.items():
+        for agent, spec in (phase.get("tasks") or {phase["agent"]: phase}).items():
+            task_id = f"{phase_id}.{agent}" if "tasks" in phase else phase_id
+            out[task_id] = {"phase": phase_id, "name": phase["name"], "agent": agent,
+                            "inputs": list(spec["inputs"]), "outputs": list(spec["outputs"])}
+    return out
+
+def expand(artifact):
+    return ARTIFACT_GROUPS.get(artifact, [artifact])
+
+def dependencies(task_map):
+    """task id → sorted ids of the tasks producing any of its inputs."""
+    producers = {}
+    for task_id, task in task_map.items():
+        for artifact in task["outputs"]: producers.setdefault(artifact, set()).add(task_id)
+    return {task_id: sorted({p for a in task["inputs"] for x in expand(a) for p in producers.get(x, ()) if p != task_id})
+            for task_id, task in task_map.items()}
+
+def waves(deps):
+    """Topological levels: every task in a wave depends only on earlier waves."""
+    done, out = set(), []
+    while len(done) < len(deps):
+        wave = sorted(t for t, d in deps.items() if t not in done and done.issuperset(d))
+        if not wave: raise ValueError(f"Dependency cycle among {sorted(set(deps) - done)}")
+        out.append(wave)
+        done.update(wave)
+    return out
+
+# ─── Fingerprints & checkpoints ───
+def artifact_files(artifacts, root):
+    files = set()
+    for artifact in artifacts:
+        for pattern in ARTIFACT_PATHS.get(artifact, []):
+            for path in glob.glob(os.path.join(root, pattern)):
+                if os.path.isdir(path):
+                    files.update(os.path.join(d, n) for d, _, names in os.walk(path) for n in names)
+                else:
+                    files.add(path)
+    return sorted(files)
+
+def fingerprint(artifacts, root, extra=""):
+    """sha256 over (path, size, mtime) of the artifacts' files; no file is read."""
+    h = hashlib.sha256(extra.encode())
+    for path in artifact_files(artifacts, root):
+        st = os.stat(path)
+        h.update(f"{os.path.relpath(path, root)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+def input_fingerprint(task, root):
+    # The task definition is part of it, so editing the plan reruns the task
+    return fingerprint([x for a in task["inputs"] for x in expand(a)], root, json.dumps(task, sort_keys=True))
+
+def load_state(path):
+    if not os.path.exists(path): return {}
+    with open(path) as f: return json.load(f)
+
+def save_state(path, state):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f: json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+# ─── Execution ───
+def run_agent_task(task_id, task):
+    """Default runner: one agent loop with the plan's tools."""
+    from src.agents import agent_loop
+    from src.agents.tool_definitions import TOOLS
+    role = next(a for a in agent_loop.AGENT_ROSTER if a["id"] == task["agent"])
+    system = f"You are the {role['role']} agent building the Horizon Bank Holdings MDM Lakehouse. {role['description']}."
+    message = f"{task['name']} ({task_id}): read {', '.join(task['inputs'])}; produce {', '.join(task['outputs'])}."
+    text = agent_loop.run_agent_loop(task["agent"], system, message, TOOLS)
+    if text == "Max iterations reached": raise RuntimeError(text)
+    return text
+
+def run(plan=ORCHESTRATION_PLAN, runner=run_agent_task, root=ROOT, state_path=None, max_workers=MAX_WORKERS, force=False):
+    """Execute the plan as a DAG. runner(task_id, task) does the work and raises on failure.
+    Returns {task_id: "done" | "skipped" | "failed" | "blocked"}."""
+    state_path = state_path or os.path.join(root, STATE_FILE)
+    task_map = tasks(plan)
+    deps = dependencies(task_map)
+    waves(deps)  # reject cycles before starting anything
+    state, status = load_state(state_path), {}
+
+    def execute(task_id):
+        task, t0 = task_map[task_id], time.time()
+        inputs, prev = input_fingerprint(task, root), state.get(task_id, {})
+        if (not force and prev.get("status") == "done" and prev.get("inputs") == inputs
+                and prev.get("outputs") == fingerprint(task["outputs"], root)):
+            return "skipped", prev
+        entry = {"inputs": inputs, "started_at": datetime.now(timezone.utc).isoformat()}
+        try:
+            result = runner(task_id, task)
+        except Exception as exc:
+            return "failed", {**entry, "status": "failed", "error": f"{type(exc).__name__}: {exc}"}
+        return "done", {**entry, "status": "done", "outputs": fingerprint(task["outputs"], root),
+                        "seconds": round(time.time() - t0, 3), "result": None if result is None else str(result)[:500]}
+
+    pending, running = dict(deps), {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="phase") as pool:
+        while pending or running:
+            blocked = [t for t, d in pending.items() if any(status.get(x) in ("failed", "blocked") for x in d)]
+            for task_id in blocked:
+                status[task_id] = "blocked"
+                del pending[task_id]
+            if blocked: continue
+            for task_id in [t for t, d in pending.items() if all(status.get(x) in ("done", "skipped") for x in d)]:
+                running[pool.submit(execute, task_id)] = task_id
+                del pending[task_id]
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_id = running.pop(future)
+                status[task_id], state[task_id] = future.result()
+                save_state(state_path, state)  # checkpoint as each task finishes
+    return {t: status[t] for t in task_map}
+
+def print_plan(plan=ORCHESTRATION_PLAN):
     print("\nHorizon Bank Holdings — MDM Lakehouse Build Plan")
     print("=" * 55)
-    for phase_id, phase in ORCHESTRATION_PLAN.items():
+    for phase_id, phase in plan.items():
         print(f"\n{phase_id}: {phase['name']}")
         print(f"  Agent: {phase['agent']}")
         print(f"  Est: {phase['duration_estimate']}")
         print(f"  Outputs: {', '.join(phase['outputs'])}")
+    deps = dependencies(tasks(plan))
+    print("\nDAG (tasks in a wave run concurrently)")
+    for i, wave in enumerate(waves(deps), 1):
+        print(f"  wave {i}: " + "; ".join(f"{t} ← {', '.join(deps[t]) or 'sources'}" for t in wave))
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command")
+    p = sub.add_parser("run", help="Execute the plan, skipping tasks whose inputs are unchanged")
+    p.add_argument("--workers", type=int, default=MAX_WORKERS)
+    p.add_argument("--force", action="store_true", help="Rerun every task")
+    p.add_argument("--state", default=os.path.join(ROOT, STATE_FILE))
+    args = parser.parse_args()
+    if args.command != "run":
+        print_plan()
+        return
+    status = run(state_path=args.state, max_workers=args.workers, force=args.force)
+    for task_id, s in status.items(): print(f"  {task_id:<28} {s}")
+    sys.exit(0 if all(s in ("done", "skipped") for s in status.values()) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Tool-Result Cache — content-addressed, persistent, LRU
+=======================================================
+The agents in AGENT_ROSTER re-profile and re-query the same tables (etl_generator,
+dq_engine and dbt_modeler all inspect the silver customer tables), and every
+orchestrator run repeats the lot. agent_loop.execute_tool routes read-only tool
+calls through this cache. A result is keyed on:
+
+  tool name + canonical JSON input + fingerprint of the tables the call reads
+
+The fingerprint covers (path, size, mtime) of every file of every table, so any
+rewrite of the data is a miss without reading a byte. Entries live in SQLite
+(<data dir>/_tool_cache.sqlite, or LAKEHOUSE_TOOL_CACHE; "off" disables it) and
+survive across processes. Least-recently-used entries are evicted beyond
+MAX_ENTRIES / MAX_BYTES.
+
+Writes (write_pipeline_code to a layer, delta_lake_operation on a table) also
+drop the entries that read what they touched, so stale results do not sit in
+the budget.
+"""
+import os, json, time, hashlib, sqlite3, threading
+
+from src.data_generation import storage
+from src.pipelines import query_engine
+
+MAX_ENTRIES = 10_000
+MAX_BYTES = 64 << 20
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY, tool TEXT NOT NULL, value TEXT NOT NULL, size INTEGER NOT NULL,
+    created REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used);
+CREATE TABLE IF NOT EXISTS deps (dep TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (dep, key)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS deps_key ON deps (key);
+"""
+_stats, _stats_lock = {"hits": 0, "misses": 0, "uncacheable": 0, "invalidated": 0, "evicted": 0}, threading.Lock()
+
+def _count(name, n=1):
+    with _stats_lock: _stats[name] += n
+
+def stats():
+    with _stats_lock: return dict(_stats)
+
+def canonical(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+
+def table_id(path, data_dir):
+    """Stable name of a table (its extension-less path relative to the data dir), e.g. silver/customers."""
+    return os.path.relpath(storage.table_dir(path) if not os.path.isdir(path) else path, data_dir).replace(os.sep, "/")
+
+def table_files(path):
+    """Every file that makes up the table at `path`: single-file formats plus a partitioned or Delta directory."""
+    files = [storage.with_format(path, fmt) for fmt in storage.FORMATS if os.path.exists(storage.with_format(path, fmt))]
+    tdir = path if os.path.isdir(path) else storage.table_dir(path)
+    for dirpath, _, names in os.walk(tdir):
+        files += [os.path.join(dirpath, n) for n in names]
+    return sorted(files)
+
+def fingerprint(paths):
+    h = hashlib.sha256()
+    for path in paths:
+        for f in table_files(path):
+            st = os.stat(f)
+            h.update(f"{f}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+# ─── What each tool reads / writes ───
+def reads(name, input_data, data_dir):
+    """Table paths a read-only call depends on; None if the call must not be cached."""
+    from . import tool_handlers
+    if name == "profile_data_source":
+        path = tool_handlers.resolve_table(input_data["source_name"], input_data["table_name"], data_dir)
+        return [path] if path else None
+    if name == "query_database":
+        try: tokens = query_engine.tokenize(input_data["query"])
+        except query_engine.QueryError: return None
+        paths = [query_engine.resolve(data_dir, input_data.get("database", "gold"), layer, table)
+                 for _, layer, table, _ in query_engine.referenced_tables(tokens)]
+        return [p for p in paths if p] or None
+    return None
+
+def writes(name, input_data):
+    """Table ids (or layer prefixes) a write call may change; None for calls that write nothing."""
+    if name == "write_pipeline_code": return [input_data["layer"]]
+    if name == "delta_lake_operation" and input_data.get("operation") in ("merge", "optimize", "vacuum", "restore"):
+        return [os.path.normpath(input_data["table_path"]).replace(os.sep, "/")]
+    return None
+
+# ─── Store ───
+class ToolCache:
+    def __init__(self, path, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path, self.max_entries, self.max_bytes = path, max_entries, max_bytes
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+    def get(self, key):
+        row = self.db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None: return None
+        with self.db:
+            self.db.execute("UPDATE entries SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, tool, deps, value):
+        text, now = canonical(value), time.time()
+        if len(text) > self.max_bytes: return
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO entries (key, tool, value, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                            (key, tool, text, len(text), now, now))
+            self.db.executemany("INSERT OR IGNORE INTO deps VALUES (?, ?)", [(d, key) for d in deps])
+            self._evict()
+
+    def _evict(self):
+        n, size = self.db.execute("SELECT count(*), coalesce(sum(size), 0) FROM entries").fetchone()
+        evicted = 0
+        for key, entry_size in self.db.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+            if n <= self.max_entries and size <= self.max_bytes: break
+            self._delete([key])
+            n, size, evicted = n - 1, size - entry_size, evicted + 1
+        if evicted: _count("evicted", evicted)
+
+    def _delete(self, keys):
+        self.db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+        self.db.executemany("DELETE FROM deps WHERE key = ?", [(k,) for k in keys])
+
+    def invalidate(self, prefixes):
+        """Drop entries that read any table equal to, or under, one of `prefixes`. Returns how many."""
+        keys = set()
+        for p in prefixes:
+            p = p.strip("/")
+            keys.update(k for (k,) in self.db.execute("SELECT key FROM deps WHERE dep = ? OR (dep > ? AND dep < ?)",
+                                                      (p, p + "/", p + "0")))  # '0' sorts right after '/'
+        with self.db: self._delete(keys)
+        return len(keys)
+
+    def summary(self):
+        n, size, hits = self.db.execute("SELECT count(*), coalesce(sum(size), 0), coalesce(sum(hits), 0) FROM entries").fetchone()
+        return {"entries": n, "bytes": size, "hits": hits}
+
+def cache_path(data_dir):
+    env = os.environ.get("LAKEHOUSE_TOOL_CACHE")
+    if env: return None if env.lower() == "off" else env
+    return os.path.join(data_dir, "_tool_cache.sqlite")
+
+def call(name, input_data, handler, data_dir):
+    """Serve `handler(input_data)` from the cache when the call is a read of unchanged
+    tables; run it otherwise, caching successful reads and invalidating after writes."""
+    path = cache_path(data_dir)
+    if path is None or not os.path.isdir(os.path.dirname(os.path.abspath(path))): return handler(input_data)
+    try:
+        deps = reads(name, input_data, data_dir)
+    except (KeyError, TypeError, AttributeError):  # malformed input: let the handler report it
+        deps = None
+    if deps is None:
+        _count("uncacheable")
+        result = handler(input_data)
+        touched = writes(name, input_data) if "error" not in result else None
+        if touched:
+            with ToolCache(path) as cache: _count("invalidated", cache.invalidate(touched))
+        return result
+    key = hashlib.sha256(f"{name}\0{canonical(input_data)}\0{fingerprint(deps)}".encode()).hexdigest()
+    with ToolCache(path) as cache:
+        hit = cache.get(key)
+    if hit is not None:
+        _count("hits")
+        return hit
+    _count("misses")
+    result = handler(input_data)
+    if "error" not in result:
+        with ToolCache(path) as cache: cache.put(key, name, [table_id(p, data_dir) for p in deps], result)
+    return result
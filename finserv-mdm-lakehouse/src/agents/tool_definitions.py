@@ -71,4 +71,18 @@ TOOLS = [
             "required": ["operation", "table_path"],
         },
     },
+    {
+        "name": "read_tool_result",
+        "description": "Read part of an earlier tool result that was too large for the conversation and stored out of band under a ref.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ref": {"type": "string", "description": "The ref from the truncated or elided result"},
+                "path": {"type": "string", "description": "Dotted path into the result (e.g. 'columns.fico_score' or 'rows.40')"},
+                "offset": {"type": "integer", "default": 0},
+                "limit": {"type": "integer", "description": "List items (or keys) to return", "default": 50},
+            },
+            "required": ["ref"],
+        },
+    },
 ]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tool Handlers — local implementations of tool_definitions.TOOLS
+=================================================================
+agent_loop.execute_tool routes a tool call named X to handle_X(input_data)
+here. Handlers run against the local lakehouse under DATA_DIR (override with
+LAKEHOUSE_DATA_DIR) and return JSON-serializable dicts; a call that cannot be
+served returns {"error": ...}, the same shape as an unknown tool.
+"""
+import os
+
+from src.data_generation import storage
+from src.pipelines import delta_table, profiler, query_engine
+from src.pipelines.mdm_matching import SOURCES
+from src.agents import context_budget
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+DATA_DIR = os.environ.get("LAKEHOUSE_DATA_DIR", os.path.join(ROOT, "data"))
+LAYERS = query_engine.LAYERS
+SOURCE_EXTRACTS = {system: os.path.join("bronze", fname) for system, (fname, _) in SOURCES.items()}
+
+def resolve_table(source_name, table_name, data_dir=None):
+    """Path of the table a tool call names, by source system ("core_banking" + "customers")
+    or by layer ("gold" + "dim_customer"); a bare table name is looked up in every layer."""
+    data_dir = data_dir or DATA_DIR
+    name = table_name if table_name.endswith(tuple(storage.EXTENSIONS.values())) else f"{table_name}.csv"
+    candidates = []
+    if source_name in SOURCE_EXTRACTS:
+        candidates += [os.path.join("bronze", f"{source_name}_{name}"), SOURCE_EXTRACTS[source_name]]
+    if source_name in LAYERS: candidates.append(os.path.join(source_name, name))
+    candidates += [os.path.join(layer, name) for layer in LAYERS]
+    for rel in candidates:
+        path = os.path.join(data_dir, rel)
+        if storage.existing_format(path) or storage.read_manifest(path): return path
+    return None
+
+def handle_profile_data_source(input_data):
+    """Schema, volume, nullability, cardinality and distributions of one table, in one streaming pass."""
+    source, table = input_data["source_name"], input_data["table_name"]
+    path = resolve_table(source, table)
+    if path is None:
+        return {"error": f"No table {table!r} for source {source!r} under {DATA_DIR}"}
+    profile = profiler.profile_table(path, int(input_data.get("sample_size", 1000)))
+    profile.update(source_name=source, table_name=table, path=os.path.relpath(path, DATA_DIR))
+    return profile
+
+def handle_query_database(input_data):
+    """Run a SELECT against the lakehouse files in place (see query_engine for what is pushed down)."""
+    try:
+        out = query_engine.run_query(input_data["query"], DATA_DIR, input_data.get("database", "gold"),
+                                     int(input_data.get("limit", 100)))
+    except query_engine.QueryError as exc:
+        return {"error": str(exc)}
+    for stats in out["tables"].values(): stats["path"] = os.path.relpath(stats["path"], DATA_DIR)
+    return out
+
+def inside(base, rel):
+    """Absolute path of `rel` under `base`, refusing anything that resolves outside it."""
+    root = os.path.realpath(base)
+    path = os.path.realpath(os.path.join(root, rel))
+    if os.path.commonpath([root, path]) != root: raise ValueError(f"{rel!r} is outside {base}")
+    return path
+
+def lake_path(rel):
+    return inside(DATA_DIR, rel)
+
+def handle_delta_lake_operation(input_data):
+    """merge / optimize / vacuum / history / restore on a Delta table under DATA_DIR (see delta_table)."""
+    op, params = input_data["operation"], input_data.get("parameters") or {}
+    try:
+        table = delta_table.DeltaTable(lake_path(input_data["table_path"]))
+        if not table.exists(): return {"error": f"{input_data['table_path']!r} is not a Delta table"}
+        if op == "merge":
+            if "rows" in params: source = params["rows"]
+            else:
+                src = lake_path(params["source"])
+                source = delta_table.DeltaTable(src).iter_rows() if delta_table.DeltaTable(src).exists() \
+                    else storage.iter_rows(src, text=True)
+            out = table.merge(source, params["key"], params.get("matched", "update"), params.get("not_matched", "insert"))
+        elif op == "optimize":
+            out = table.optimize(params.get("zorder_by", ()), int(params.get("target_file_rows", delta_table.FILE_ROWS)))
+        elif op == "vacuum":
+            out = table.vacuum(float(params.get("retention_hours", delta_table.RETENTION_HOURS)), bool(params.get("dry_run", False)))
+        elif op == "history":
+            out = {"history": table.history(params.get("limit"))}
+        elif op == "restore":
+            out = table.restore(params.get("version"), params.get("timestamp"))
+        else:
+            return {"error": f"Unknown delta_lake_operation: {op}"}
+    except (delta_table.DeltaError, KeyError, ValueError) as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+    out["table"] = table.describe()
+    return out
+
+def handle_write_pipeline_code(input_data):
+    """Write generated pipeline code into the repository (never outside it)."""
+    try:
+        path = inside(ROOT, input_data["file_path"])
+    except ValueError as exc:
+        return {"error": str(exc)}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(input_data["code"])
+    return {"pipeline_name": input_data["pipeline_name"], "layer": input_data["layer"],
+            "path": os.path.relpath(path, os.path.realpath(ROOT)), "bytes": len(input_data["code"].encode())}
+
+def handle_read_tool_result(input_data):
+    """Page through a tool result that run_agent_loop stored out of band (see context_budget)."""
+    store = context_budget.ResultStore(context_budget.store_path(DATA_DIR))
+    try:
+        return context_budget.read(store, input_data["ref"], input_data.get("path"),
+                                   int(input_data.get("offset", 0)), int(input_data.get("limit", 50)))
+    except (KeyError, IndexError, ValueError, TypeError) as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
@@ -1,4 +1,4 @@
-import { useState, useMemo } from "react";
+import { useState, useMemo, useEffect } from "react";
 import { BarChart, Bar, LineChart, Line, PieChart, Pie, Cell, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer, AreaChart, Area, RadarChart, Radar, PolarGrid, PolarAngleAxis, PolarRadiusAxis, ComposedChart, Legend } from "recharts";
 
 // ─── Color System ───
@@ -114,6 +114,26 @@ const hourlyMetrics = Array.from({length:24},(_,h) => ({
   alerts: Math.round(3+Math.random()*8),
 }));
 
+// ─── Precomputed cubes ───
+// src/pipelines/dashboard_cubes.py writes one pre-aggregated payload per tab to
+// data/dashboards/<tab>.json. Each tab fetches its own; until it arrives (or when
+// the file is not served, as in an Artifact preview) the sample data above shows.
+// Point CUBE_BASE at src/dashboards/dashboard_api.py ("http://127.0.0.1:8050/api")
+// to compute them live from the lakehouse tables, with ETag revalidation.
+const CUBE_BASE = "data/dashboards";
+const useCube = (tab) => {
+  const [cube, setCube] = useState(null);
+  useEffect(() => {
+    let live = true;
+    fetch(`${CUBE_BASE}/${tab}.json`).then(r => r.ok ? r.json() : null).then(c => { if (live) setCube(c); }).catch(() => {});
+    return () => { live = false; };
+  }, [tab]);
+  return cube;
+};
+const withColors = (rows, sample) => rows.map((r,i) => ({...r, color: (sample[i] || sample[sample.length-1]).color}));
+const pctText = (v) => `${v}%`;
+const dollars = (v) => typeof v === "number" ? `$${v.toLocaleString("en-US",{maximumFractionDigits:0})}` : v;
+
 // ─── Components ───
 const KPI = ({label, value, sub, trend, color=C.blue}) => (
   <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
@@ -151,21 +171,23 @@ const fmt = (n, prefix="") => {
 };
 
 // ─── Tab Panels ───
-const ExecutivePulse = () => (
+const ExecutivePulse = () => {
+  const cube = useCube("exec"), k = cube?.kpis;
+  return (
   <div>
     <SectionTitle sub="Real-time operational snapshot — Horizon Bank Holdings">Executive Pulse</SectionTitle>
     <div className="grid grid-cols-5 gap-3 mb-6">
-      <KPI label="Assets Under Mgmt" value="$14.2B" trend={8.3} sub="vs last quarter" color={C.blue} />
-      <KPI label="Active Accounts" value="124.8K" trend={12.1} sub="vs last year" color={C.teal} />
-      <KPI label="Net Promoter Score" value="74" trend={3.2} sub="pts improvement" color={C.green} />
-      <KPI label="30+ DPD Rate" value="3.8%" trend={-0.4} sub="improving" color={C.amber} />
-      <KPI label="Digital Adoption" value="72.4%" trend={6.8} sub="mobile + web" color={C.purple} />
+      <KPI label="Assets Under Mgmt" value={k ? fmt(k.assetsUnderMgmt, "$") : "$14.2B"} trend={8.3} sub="vs last quarter" color={C.blue} />
+      <KPI label="Active Accounts" value={k ? fmt(k.activeAccounts) : "124.8K"} trend={12.1} sub="vs last year" color={C.teal} />
+      <KPI label="Net Promoter Score" value={k ? k.nps.toFixed(0) : "74"} trend={3.2} sub="pts improvement" color={C.green} />
+      <KPI label="30+ DPD Rate" value={k ? pctText(k.dpd30Rate) : "3.8%"} trend={-0.4} sub="improving" color={C.amber} />
+      <KPI label="Digital Adoption" value={k ? pctText(k.digitalAdoption) : "72.4%"} trend={6.8} sub="mobile + web" color={C.purple} />
     </div>
     <div className="grid grid-cols-2 gap-4">
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
-        <h3 className="text-sm font-semibold text-slate-700 mb-3">Revenue Trend ($M)</h3>
+        <h3 className="text-sm font-semibold text-slate-700 mb-3">Revenue Trend ($)</h3>
         <ResponsiveContainer width="100%" height={200}>
-          <AreaChart data={revenueData}>
+          <AreaChart data={cube?.revenueData ?? revenueData}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="month" tick={{fontSize:10}} stroke="#94A3B8" />
             <YAxis tick={{fontSize:10}} stroke="#94A3B8" />
@@ -179,7 +201,7 @@ const ExecutivePulse = () => (
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Today's Activity (Hourly)</h3>
         <ResponsiveContainer width="100%" height={200}>
-          <ComposedChart data={hourlyMetrics}>
+          <ComposedChart data={cube?.hourlyMetrics ?? hourlyMetrics}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="hour" tick={{fontSize:9}} interval={3} stroke="#94A3B8" />
             <YAxis yAxisId="left" tick={{fontSize:10}} stroke="#94A3B8" />
@@ -192,22 +214,26 @@ const ExecutivePulse = () => (
       </div>
     </div>
   </div>
-);
+  );
+};
 
-const RevenueTab = () => (
+const RevenueTab = () => {
+  const cube = useCube("revenue"), k = cube?.kpis;
+  const segments = cube ? withColors(cube.segmentData, segmentData) : segmentData;
+  return (
   <div>
     <SectionTitle sub="Interest income, fee income, net margin by product line">Revenue & Profitability</SectionTitle>
     <div className="grid grid-cols-4 gap-3 mb-6">
-      <KPI label="Total Revenue" value="$748M" trend={11.2} sub="YTD" color={C.blue} />
-      <KPI label="Interest Income" value="$512M" trend={8.7} sub="net interest margin 3.42%" color={C.teal} />
-      <KPI label="Fee Income" value="$148M" trend={15.3} sub="interchange + annual fees" color={C.amber} />
-      <KPI label="Net Income" value="$186M" trend={9.8} sub="24.9% net margin" color={C.green} />
+      <KPI label="Total Revenue" value={k ? fmt(k.totalRevenue, "$") : "$748M"} trend={11.2} sub={k ? "last 12 months" : "YTD"} color={C.blue} />
+      <KPI label="Interest Income" value={k ? fmt(k.interestIncome, "$") : "$512M"} trend={8.7} sub="net interest margin 3.42%" color={C.teal} />
+      <KPI label="Fee Income" value={k ? fmt(k.feeIncome, "$") : "$148M"} trend={15.3} sub="interchange + annual fees" color={C.amber} />
+      <KPI label="Net Income" value={k ? fmt(k.netIncome, "$") : "$186M"} trend={9.8} sub={k ? "after rewards & charge-offs" : "24.9% net margin"} color={C.green} />
     </div>
     <div className="grid grid-cols-2 gap-4">
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
-        <h3 className="text-sm font-semibold text-slate-700 mb-3">Monthly Revenue Mix ($M)</h3>
+        <h3 className="text-sm font-semibold text-slate-700 mb-3">Monthly Revenue Mix ($)</h3>
         <ResponsiveContainer width="100%" height={220}>
-          <BarChart data={revenueData}>
+          <BarChart data={cube?.revenueData ?? revenueData}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="month" tick={{fontSize:10}} stroke="#94A3B8" />
             <YAxis tick={{fontSize:10}} stroke="#94A3B8" />
@@ -222,29 +248,31 @@ const RevenueTab = () => (
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Revenue by Segment</h3>
         <ResponsiveContainer width="100%" height={220}>
-          <BarChart data={segmentData} layout="vertical">
+          <BarChart data={segments} layout="vertical">
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis type="number" tick={{fontSize:10}} stroke="#94A3B8" />
             <YAxis dataKey="name" type="category" tick={{fontSize:10}} width={85} stroke="#94A3B8" />
-            <Tooltip contentStyle={{fontSize:11}} formatter={(v)=>`$${v}M`} />
-            <Bar dataKey="revenue" fill={C.blue} name="Revenue ($M)">
-              {segmentData.map((s,i)=> <Cell key={i} fill={s.color} />)}
+            <Tooltip contentStyle={{fontSize:11}} formatter={(v)=>cube ? fmt(v, "$") : `$${v}M`} />
+            <Bar dataKey="revenue" fill={C.blue} name={cube ? "Revenue ($)" : "Revenue ($M)"}>
+              {segments.map((s,i)=> <Cell key={i} fill={s.color} />)}
             </Bar>
           </BarChart>
         </ResponsiveContainer>
       </div>
     </div>
   </div>
-);
+  );
+};
 
 const Customer360 = () => {
   const [selected, setSelected] = useState(0);
-  const cust = [
+  const cube = useCube("c360");
+  const cust = cube?.customers?.length ? cube.customers : [
     {id:"CUST-00042",name:"Sarah Johnson",seg:"Affluent",fico:782,products:4,ltv:"$12,400",risk:"Prime",since:"2019",digital:true},
     {id:"CUST-00187",name:"Michael Chen",seg:"HNW",fico:810,products:5,ltv:"$28,900",risk:"Super Prime",since:"2017",digital:true},
     {id:"CUST-00523",name:"Maria Garcia",seg:"Mass Affluent",fico:720,products:3,ltv:"$6,800",risk:"Prime",since:"2021",digital:true},
   ];
-  const c = cust[selected];
+  const c = cust[Math.min(selected, cust.length-1)];
   return (
     <div>
       <SectionTitle sub="Unified golden record view — product holdings, LTV, risk profile">Customer 360</SectionTitle>
@@ -269,7 +297,7 @@ const Customer360 = () => {
             <div className="flex justify-between"><span className="text-slate-500">FICO Score</span><span className="font-bold text-slate-800">{c.fico}</span></div>
             <div className="flex justify-between"><span className="text-slate-500">Risk Tier</span><Badge color={C.green}>{c.risk}</Badge></div>
             <div className="flex justify-between"><span className="text-slate-500">Products Held</span><span className="font-bold">{c.products}</span></div>
-            <div className="flex justify-between"><span className="text-slate-500">Lifetime Value</span><span className="font-bold text-emerald-600">{c.ltv}</span></div>
+            <div className="flex justify-between"><span className="text-slate-500">Lifetime Value</span><span className="font-bold text-emerald-600">{dollars(c.ltv)}</span></div>
             <div className="flex justify-between"><span className="text-slate-500">Customer Since</span><span>{c.since}</span></div>
             <div className="flex justify-between"><span className="text-slate-500">Digital</span><span>{c.digital?'✓ Enrolled':'—'}</span></div>
           </div>
@@ -277,19 +305,19 @@ const Customer360 = () => {
         <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100 col-span-2">
           <h3 className="text-sm font-semibold text-slate-700 mb-3">Product Holdings & Activity</h3>
           <div className="space-y-3">
-            {[
+            {(c.holdings ?? [
               {prod:"Venture Rewards Card",bal:"$4,280",limit:"$15,000",util:28.5,status:"Active"},
               {prod:"360 Performance Savings",bal:"$48,200",limit:"-",util:0,status:"Active"},
               {prod:"Auto Loan (2023 Tesla)",bal:"$32,100",limit:"$45,000",util:71.3,status:"Current"},
               {prod:"12-Month CD",bal:"$25,000",limit:"-",util:0,status:"Locked"},
-            ].slice(0, c.products).map((p,i) => (
+            ].slice(0, c.products)).map((p,i) => (
               <div key={i} className="flex items-center gap-4 p-2 rounded-lg bg-slate-50">
                 <div className="flex-1">
                   <div className="text-sm font-medium text-slate-800">{p.prod}</div>
-                  <div className="text-xs text-slate-500">Balance: {p.bal} {p.limit!=="-"?`/ Limit: ${p.limit}`:""}</div>
+                  <div className="text-xs text-slate-500">Balance: {dollars(p.bal)} {p.limit!=null&&p.limit!=="-"?`/ Limit: ${dollars(p.limit)}`:""}</div>
                 </div>
                 {p.util > 0 && <div className="w-24"><MiniBar value={p.util} color={p.util>80?C.red:p.util>50?C.amber:C.green} /></div>}
-                <Badge color={p.status==="Active"?C.green:p.status==="Current"?C.teal:C.blue}>{p.status}</Badge>
+                <Badge color={p.status==="Active"||p.status==="Open"?C.green:p.status==="Current"?C.teal:p.status==="Delinquent"?C.red:C.blue}>{p.status}</Badge>
               </div>
             ))}
           </div>
@@ -299,20 +327,22 @@ const Customer360 = () => {
   );
 };
 
-const AcquisitionTab = () => (
+const AcquisitionTab = () => {
+  const cube = useCube("acq"), k = cube?.kpis;
+  return (
   <div>
     <SectionTitle sub="CAC by channel, conversion funnel, campaign ROI">Customer Acquisition</SectionTitle>
     <div className="grid grid-cols-4 gap-3 mb-6">
-      <KPI label="New Accounts (MTD)" value="4,280" trend={14.2} color={C.blue} />
-      <KPI label="Avg CAC" value="$118" trend={-8.3} sub="improving" color={C.green} />
-      <KPI label="Conversion Rate" value="3.4%" trend={0.6} sub="app → funded" color={C.teal} />
-      <KPI label="Blended LTV:CAC" value="22.4x" trend={2.1} color={C.purple} />
+      <KPI label="New Accounts (MTD)" value={k ? k.newAccountsMtd.toLocaleString() : "4,280"} trend={14.2} color={C.blue} />
+      <KPI label="Avg CAC" value={k ? `$${k.avgCac}` : "$118"} trend={-8.3} sub="improving" color={C.green} />
+      <KPI label="Conversion Rate" value={k ? pctText(k.conversionRate) : "3.4%"} trend={0.6} sub={k ? "session → converted" : "app → funded"} color={C.teal} />
+      <KPI label="Blended LTV:CAC" value={k ? `${k.ltvCac}x` : "22.4x"} trend={2.1} color={C.purple} />
     </div>
     <div className="grid grid-cols-2 gap-4">
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Acquisition Funnel</h3>
         <div className="space-y-2">
-          {acquisitionFunnel.map((s,i) => (
+          {(cube?.acquisitionFunnel ?? acquisitionFunnel).map((s,i) => (
             <div key={i}>
               <div className="flex justify-between text-xs mb-1">
                 <span className="text-slate-600">{s.stage}</span>
@@ -326,7 +356,7 @@ const AcquisitionTab = () => (
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">CAC & ROI by Channel</h3>
         <ResponsiveContainer width="100%" height={220}>
-          <BarChart data={channelCAC}>
+          <BarChart data={cube?.channelCAC ?? channelCAC}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="channel" tick={{fontSize:9}} stroke="#94A3B8" />
             <YAxis tick={{fontSize:10}} stroke="#94A3B8" />
@@ -337,29 +367,33 @@ const AcquisitionTab = () => (
       </div>
     </div>
   </div>
-);
+  );
+};
 
-const CreditRiskTab = () => (
+const CreditRiskTab = () => {
+  const cube = useCube("risk"), k = cube?.kpis;
+  const tiers = cube ? withColors(cube.riskDistrib, riskDistrib) : riskDistrib;
+  return (
   <div>
     <SectionTitle sub="30/60/90 DPD rates, risk tier distribution, expected losses">Credit Risk & Delinquency</SectionTitle>
     <div className="grid grid-cols-5 gap-3 mb-6">
-      <KPI label="30+ DPD Rate" value="3.8%" trend={-0.4} sub="improving" color={C.amber} />
-      <KPI label="60+ DPD Rate" value="1.6%" trend={-0.2} color={C.amber} />
-      <KPI label="90+ DPD Rate" value="0.9%" trend={-0.1} color={C.red} />
-      <KPI label="Net Charge-Offs" value="$18.2M" trend={-5.3} sub="YTD" color={C.red} />
-      <KPI label="Loss Reserves" value="$124M" sub="1.8% of portfolio" color={C.blue} />
+      <KPI label="30+ DPD Rate" value={k ? pctText(k.dpd30Rate) : "3.8%"} trend={-0.4} sub="improving" color={C.amber} />
+      <KPI label="60+ DPD Rate" value={k ? pctText(k.dpd60Rate) : "1.6%"} trend={-0.2} color={C.amber} />
+      <KPI label="90+ DPD Rate" value={k ? pctText(k.dpd90Rate) : "0.9%"} trend={-0.1} color={C.red} />
+      <KPI label="Net Charge-Offs" value={k ? fmt(k.netChargeOffs, "$") : "$18.2M"} trend={-5.3} sub={k ? "last 12 months" : "YTD"} color={C.red} />
+      <KPI label="Loss Reserves" value={k ? fmt(k.lossReserves, "$") : "$124M"} sub={k ? "expected loss" : "1.8% of portfolio"} color={C.blue} />
     </div>
     <div className="grid grid-cols-2 gap-4">
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Risk Tier Distribution</h3>
         <ResponsiveContainer width="100%" height={220}>
-          <BarChart data={riskDistrib}>
+          <BarChart data={tiers}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="tier" tick={{fontSize:9}} stroke="#94A3B8" />
             <YAxis tick={{fontSize:10}} stroke="#94A3B8" />
             <Tooltip contentStyle={{fontSize:11}} />
             <Bar dataKey="count" name="Customers">
-              {riskDistrib.map((r,i) => <Cell key={i} fill={r.color} />)}
+              {tiers.map((r,i) => <Cell key={i} fill={r.color} />)}
             </Bar>
           </BarChart>
         </ResponsiveContainer>
@@ -367,7 +401,7 @@ const CreditRiskTab = () => (
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Delinquency by Risk Tier (%)</h3>
         <ResponsiveContainer width="100%" height={220}>
-          <BarChart data={riskDistrib}>
+          <BarChart data={tiers}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="tier" tick={{fontSize:9}} stroke="#94A3B8" />
             <YAxis tick={{fontSize:10}} stroke="#94A3B8" />
@@ -381,16 +415,19 @@ const CreditRiskTab = () => (
       </div>
     </div>
   </div>
-);
+  );
+};
 
-const ProductTab = () => (
+const ProductTab = () => {
+  const cube = useCube("product"), k = cube?.kpis;
+  return (
   <div>
     <SectionTitle sub="Card spend velocity, loan origination, deposit growth, rewards">Product Performance</SectionTitle>
     <div className="grid grid-cols-4 gap-3 mb-6">
-      <KPI label="Card Spend Vol" value="$2.8B" trend={14.5} sub="YTD" color={C.blue} />
-      <KPI label="Loan Origination" value="$890M" trend={8.2} color={C.teal} />
-      <KPI label="Total Deposits" value="$6.2B" trend={22.3} color={C.green} />
-      <KPI label="Rewards Redeemed" value="$42M" trend={18.1} color={C.amber} />
+      <KPI label="Card Spend Vol" value={k ? fmt(k.cardSpend, "$") : "$2.8B"} trend={14.5} sub={k ? "last 12 months" : "YTD"} color={C.blue} />
+      <KPI label="Loan Origination" value={k ? fmt(k.loanOrigination, "$") : "$890M"} trend={8.2} color={C.teal} />
+      <KPI label="Total Deposits" value={k ? fmt(k.totalDeposits, "$") : "$6.2B"} trend={22.3} color={C.green} />
+      <KPI label={k ? "Rewards Earned" : "Rewards Redeemed"} value={k ? fmt(k.rewards, "$") : "$42M"} trend={18.1} color={C.amber} />
     </div>
     <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
       <h3 className="text-sm font-semibold text-slate-700 mb-3">Product Leaderboard</h3>
@@ -399,18 +436,18 @@ const ProductTab = () => (
           <thead><tr className="border-b border-slate-200">
             <th className="text-left py-2 text-xs font-medium text-slate-500">Product</th>
             <th className="text-right py-2 text-xs font-medium text-slate-500">Accounts</th>
-            <th className="text-right py-2 text-xs font-medium text-slate-500">Spend/Bal ($M)</th>
+            <th className="text-right py-2 text-xs font-medium text-slate-500">Spend/Bal{cube ? "" : " ($M)"}</th>
             <th className="text-right py-2 text-xs font-medium text-slate-500">Growth %</th>
             <th className="text-right py-2 text-xs font-medium text-slate-500">NPS</th>
           </tr></thead>
           <tbody>
-            {productPerf.map((p,i) => (
+            {(cube?.productPerf ?? productPerf).map((p,i) => (
               <tr key={i} className="border-b border-slate-50 hover:bg-slate-50">
                 <td className="py-2 font-medium text-slate-800">{p.product}</td>
                 <td className="py-2 text-right text-slate-600">{fmt(p.accounts)}</td>
-                <td className="py-2 text-right text-slate-600">${p.spend || p.balance ? fmt(p.spend||p.balance/1000) : '—'}M</td>
+                <td className="py-2 text-right text-slate-600">{cube ? fmt(p.spend ?? p.balance, "$") : `$${p.spend || p.balance ? fmt(p.spend||p.balance/1000) : '—'}M`}</td>
                 <td className="py-2 text-right"><span className={`font-medium ${p.growth>15?'text-emerald-600':p.growth>10?'text-blue-600':'text-slate-600'}`}>+{p.growth}%</span></td>
-                <td className="py-2 text-right"><span className={`font-medium ${p.nps>=80?'text-emerald-600':p.nps>=70?'text-blue-600':'text-amber-600'}`}>{p.nps}</span></td>
+                <td className="py-2 text-right"><span className={`font-medium ${p.nps>=80?'text-emerald-600':p.nps>=70?'text-blue-600':'text-amber-600'}`}>{p.nps ?? '—'}</span></td>
               </tr>
             ))}
           </tbody>
@@ -418,22 +455,25 @@ const ProductTab = () => (
       </div>
     </div>
   </div>
-);
+  );
+};
 
-const DigitalTab = () => (
+const DigitalTab = () => {
+  const cube = useCube("digital"), k = cube?.kpis;
+  return (
   <div>
     <SectionTitle sub="App sessions, feature adoption, digital vs branch transactions">Digital & Mobile Analytics</SectionTitle>
     <div className="grid grid-cols-4 gap-3 mb-6">
-      <KPI label="Mobile MAU" value="68.2K" trend={24.5} color={C.blue} />
-      <KPI label="Web MAU" value="42.1K" trend={12.3} color={C.teal} />
-      <KPI label="Digital Txn Share" value="78.3%" trend={6.2} sub="vs branch" color={C.green} />
+      <KPI label="Mobile MAU" value={k ? fmt(k.mobileMau) : "68.2K"} trend={24.5} color={C.blue} />
+      <KPI label="Web MAU" value={k ? fmt(k.webMau) : "42.1K"} trend={12.3} color={C.teal} />
+      <KPI label="Digital Txn Share" value={k ? pctText(k.digitalTxnShare) : "78.3%"} trend={6.2} sub={k ? "online + mobile wallet" : "vs branch"} color={C.green} />
       <KPI label="App Rating" value="4.7★" trend={0.2} sub="App Store avg" color={C.amber} />
     </div>
     <div className="grid grid-cols-2 gap-4">
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Channel Migration (Monthly)</h3>
         <ResponsiveContainer width="100%" height={220}>
-          <AreaChart data={digitalData}>
+          <AreaChart data={cube?.digitalData ?? digitalData}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="month" tick={{fontSize:10}} stroke="#94A3B8" />
             <YAxis tick={{fontSize:10}} stroke="#94A3B8" />
@@ -448,14 +488,14 @@ const DigitalTab = () => (
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Top Features by Adoption</h3>
         <div className="space-y-3">
-          {[
+          {(cube?.features ?? [
             {feat:"Mobile Check Deposit",adopt:82,trend:"+12%"},
             {feat:"Bill Pay",adopt:74,trend:"+8%"},
             {feat:"Card Controls",adopt:68,trend:"+22%"},
             {feat:"Spend Insights",adopt:56,trend:"+31%"},
             {feat:"Savings Goals",adopt:42,trend:"+18%"},
             {feat:"Credit Score Check",adopt:71,trend:"+15%"},
-          ].map((f,i) => (
+          ]).map((f,i) => (
             <div key={i}>
               <div className="flex justify-between text-xs mb-1">
                 <span className="text-slate-700 font-medium">{f.feat}</span>
@@ -468,23 +508,26 @@ const DigitalTab = () => (
       </div>
     </div>
   </div>
-);
+  );
+};
 
-const FraudTab = () => (
+const FraudTab = () => {
+  const cube = useCube("fraud"), k = cube?.kpis;
+  return (
   <div>
     <SectionTitle sub="Alert volume, false positive rate, investigation pipeline, loss prevention">Fraud & AML Detection</SectionTitle>
     <div className="grid grid-cols-5 gap-3 mb-6">
-      <KPI label="Active Alerts" value="128" sub="open cases" color={C.red} />
-      <KPI label="False Positive Rate" value="42.3%" trend={-3.1} sub="improving" color={C.amber} />
-      <KPI label="Avg Resolution" value="4.2 days" trend={-12} sub="faster" color={C.teal} />
-      <KPI label="Prevented Losses" value="$8.4M" trend={22} sub="YTD" color={C.green} />
-      <KPI label="Actual Losses" value="$2.1M" trend={-15} sub="declining" color={C.red} />
+      <KPI label="Active Alerts" value={k ? k.activeAlerts.toLocaleString() : "128"} sub="open cases" color={C.red} />
+      <KPI label="False Positive Rate" value={k ? pctText(k.falsePositiveRate) : "42.3%"} trend={-3.1} sub="improving" color={C.amber} />
+      <KPI label="Avg Resolution" value={`${k ? k.avgResolutionDays : 4.2} days`} trend={-12} sub="faster" color={C.teal} />
+      <KPI label="Prevented Losses" value={k ? fmt(k.preventedLosses, "$") : "$8.4M"} trend={22} sub={k ? "confirmed fraud" : "YTD"} color={C.green} />
+      <KPI label="Actual Losses" value={k ? fmt(k.actualLosses, "$") : "$2.1M"} trend={-15} sub="declining" color={C.red} />
     </div>
     <div className="grid grid-cols-2 gap-4">
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Monthly Alert Volume</h3>
         <ResponsiveContainer width="100%" height={220}>
-          <ComposedChart data={fraudData}>
+          <ComposedChart data={cube?.fraudData ?? fraudData}>
             <CartesianGrid strokeDasharray="3 3" stroke="#E2E8F0" />
             <XAxis dataKey="month" tick={{fontSize:10}} stroke="#94A3B8" />
             <YAxis tick={{fontSize:10}} stroke="#94A3B8" />
@@ -500,7 +543,7 @@ const FraudTab = () => (
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Detection Methods</h3>
         <ResponsiveContainer width="100%" height={220}>
           <PieChart>
-            <Pie data={[
+            <Pie data={cube?.detectionMethods ?? [
               {name:"ML Model",value:45},{name:"Rules Engine",value:25},{name:"Velocity Check",value:15},{name:"Geo-Fence",value:10},{name:"Network",value:5}
             ]} cx="50%" cy="50%" outerRadius={80} dataKey="value" label={({name,percent})=>`${name} ${(percent*100).toFixed(0)}%`} labelLine={false}>
               {[C.blue,C.teal,C.amber,C.purple,C.green].map((c,i)=> <Cell key={i} fill={c} />)}
@@ -511,16 +554,19 @@ const FraudTab = () => (
       </div>
     </div>
   </div>
-);
+  );
+};
 
-const PartnerTab = () => (
+const PartnerTab = () => {
+  const cube = useCube("partner"), k = cube?.kpis;
+  return (
   <div>
     <SectionTitle sub="Co-brand performance, interchange revenue, merchant category spend">Partner & Merchant Analytics</SectionTitle>
     <div className="grid grid-cols-4 gap-3 mb-6">
-      <KPI label="Total Interchange" value="$148M" trend={12.5} sub="YTD" color={C.blue} />
-      <KPI label="Partner-Sourced Accts" value="18.2K" trend={22} color={C.teal} />
-      <KPI label="Avg Partner NPS" value="4.5" sub="out of 5.0" color={C.green} />
-      <KPI label="Revenue Share Paid" value="$22.4M" sub="to partners" color={C.amber} />
+      <KPI label="Total Interchange" value={k ? fmt(k.totalInterchange, "$") : "$148M"} trend={12.5} sub="YTD" color={C.blue} />
+      <KPI label="Partner-Sourced Accts" value={k ? fmt(k.partnerSourcedAccounts) : "18.2K"} trend={22} color={C.teal} />
+      <KPI label="Avg Partner NPS" value={k ? k.avgCsat.toFixed(1) : "4.5"} sub="out of 5.0" color={C.green} />
+      <KPI label="Revenue Share Paid" value={k ? fmt(k.revenueSharePaid, "$") : "$22.4M"} sub="to partners" color={C.amber} />
     </div>
     <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
       <h3 className="text-sm font-semibold text-slate-700 mb-3">Partner Leaderboard</h3>
@@ -528,17 +574,17 @@ const PartnerTab = () => (
         <thead><tr className="border-b border-slate-200">
           <th className="text-left py-2 text-xs font-medium text-slate-500">Partner</th>
           <th className="text-right py-2 text-xs font-medium text-slate-500">Transactions</th>
-          <th className="text-right py-2 text-xs font-medium text-slate-500">Spend ($M)</th>
-          <th className="text-right py-2 text-xs font-medium text-slate-500">Interchange ($K)</th>
+          <th className="text-right py-2 text-xs font-medium text-slate-500">Spend{cube ? "" : " ($M)"}</th>
+          <th className="text-right py-2 text-xs font-medium text-slate-500">Interchange{cube ? "" : " ($K)"}</th>
           <th className="text-right py-2 text-xs font-medium text-slate-500">CSAT</th>
         </tr></thead>
         <tbody>
-          {partnerData.map((p,i) => (
+          {(cube?.partnerData ?? partnerData).map((p,i) => (
             <tr key={i} className="border-b border-slate-50 hover:bg-slate-50">
               <td className="py-2 font-medium text-slate-800">{p.partner}</td>
               <td className="py-2 text-right text-slate-600">{fmt(p.txns)}</td>
-              <td className="py-2 text-right text-slate-600">${p.spend}M</td>
-              <td className="py-2 text-right text-slate-600">${p.interchange}K</td>
+              <td className="py-2 text-right text-slate-600">{cube ? fmt(p.spend, "$") : `$${p.spend}M`}</td>
+              <td className="py-2 text-right text-slate-600">{cube ? fmt(p.interchange, "$") : `$${p.interchange}K`}</td>
               <td className="py-2 text-right"><span className={`font-medium ${p.satisfaction>=4.5?'text-emerald-600':'text-blue-600'}`}>{p.satisfaction}</span></td>
             </tr>
           ))}
@@ -546,27 +592,32 @@ const PartnerTab = () => (
       </table>
     </div>
   </div>
-);
+  );
+};
 
-const MDMQualityTab = () => (
+const MDMQualityTab = () => {
+  const cube = useCube("dq");
+  const dq = cube ? {...dqMetrics, ...cube.dqMetrics} : dqMetrics;
+  const tiers = dq.matchTiers ?? {auto_merge:42, review:28, no_match:30};
+  return (
   <div>
     <SectionTitle sub="Match rates, golden record coverage, DQ scores, source system health">MDM & Data Quality Governance</SectionTitle>
     <div className="grid grid-cols-5 gap-3 mb-6">
-      <KPI label="Overall DQ Score" value={`${dqMetrics.overallScore}%`} trend={1.2} color={C.green} />
-      <KPI label="Match Rate" value={`${dqMetrics.matchRate}%`} trend={0.8} color={C.teal} />
-      <KPI label="Golden Coverage" value={`${dqMetrics.goldenCoverage}%`} trend={0.5} color={C.blue} />
-      <KPI label="Data Freshness" value={`${dqMetrics.freshnessHrs}hrs`} sub="avg lag" color={C.amber} />
-      <KPI label="DQ Tests" value="34/34" sub="all passing" color={C.green} />
+      <KPI label="Overall DQ Score" value={`${dq.overallScore}%`} trend={1.2} color={C.green} />
+      <KPI label="Match Rate" value={`${dq.matchRate}%`} trend={0.8} color={C.teal} />
+      <KPI label="Golden Coverage" value={`${dq.goldenCoverage}%`} trend={0.5} color={C.blue} />
+      <KPI label="Data Freshness" value={`${dq.freshnessHrs}hrs`} sub="avg lag" color={C.amber} />
+      <KPI label="DQ Tests" value={dq.tests ?? "34/34"} sub={dq.tests && dq.tests.split("/")[0] !== dq.tests.split("/")[1] ? "see dq_results.json" : "all passing"} color={C.green} />
     </div>
     <div className="grid grid-cols-2 gap-4">
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Quality Dimensions</h3>
         <ResponsiveContainer width="100%" height={220}>
           <RadarChart data={[
-            {dim:"Completeness",score:dqMetrics.completeness},
-            {dim:"Accuracy",score:dqMetrics.accuracy},
-            {dim:"Consistency",score:dqMetrics.consistency},
-            {dim:"Timeliness",score:dqMetrics.timeliness},
+            {dim:"Completeness",score:dq.completeness},
+            {dim:"Accuracy",score:dq.accuracy},
+            {dim:"Consistency",score:dq.consistency},
+            {dim:"Timeliness",score:dq.timeliness},
             {dim:"Uniqueness",score:96.2},
             {dim:"Validity",score:97.8},
           ]}>
@@ -580,7 +631,7 @@ const MDMQualityTab = () => (
       <div className="bg-white rounded-lg p-4 shadow-sm border border-slate-100">
         <h3 className="text-sm font-semibold text-slate-700 mb-3">Source System Health</h3>
         <div className="space-y-4">
-          {dqMetrics.sources.map((s,i) => (
+          {dq.sources.map((s,i) => (
             <div key={i}>
               <div className="flex justify-between text-sm mb-1">
                 <span className="font-medium text-slate-700">{s.name}</span>
@@ -593,15 +644,16 @@ const MDMQualityTab = () => (
         <div className="mt-4 p-3 rounded-lg bg-slate-50">
           <div className="text-xs font-medium text-slate-600 mb-2">MDM Match Tier Distribution</div>
           <div className="flex gap-4 text-xs">
-            <div><span className="inline-block w-2 h-2 rounded-full mr-1" style={{backgroundColor:C.green}}></span>Auto-Merge: 42%</div>
-            <div><span className="inline-block w-2 h-2 rounded-full mr-1" style={{backgroundColor:C.amber}}></span>Review: 28%</div>
-            <div><span className="inline-block w-2 h-2 rounded-full mr-1" style={{backgroundColor:C.red}}></span>No Match: 30%</div>
+            <div><span className="inline-block w-2 h-2 rounded-full mr-1" style={{backgroundColor:C.green}}></span>Auto-Merge: {tiers.auto_merge}%</div>
+            <div><span className="inline-block w-2 h-2 rounded-full mr-1" style={{backgroundColor:C.amber}}></span>Review: {tiers.review}%</div>
+            <div><span className="inline-block w-2 h-2 rounded-full mr-1" style={{backgroundColor:C.red}}></span>No Match: {tiers.no_match}%</div>
           </div>
         </div>
       </div>
     </div>
   </div>
-);
+  );
+};
 
 // ─── Main App ───
 const TABS = [
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Dashboard Data API — Horizon Bank Holdings
+===========================================
+A small local HTTP service behind FinServ_Dashboard.jsx. GET /api/<tab> returns
+the tab's aggregates (the same payload dashboard_cubes.py writes), computed from
+the lakehouse tables.
+
+The version of a tab is the digest of its input files (every partition:
+path, size and mtime). That version is the ETag:
+  - If-None-Match with the current ETag → 304, nothing computed or sent
+  - LRU of encoded responses keyed by tab + filter params, valid while the
+    version is unchanged
+  - folds are cached per table version, so tabs that read the same table share
+    one scan (exec, revenue, c360, ... all read fact_transactions)
+  - a fresh data/dashboards/<tab>.json (its manifest matches) is served as is
+
+Requests are handled on one asyncio loop. Table scans run on a thread pool,
+and so do the file digests (a day-partitioned table is thousands of stat calls).
+Concurrent requests for the same tab, params and version await one in-flight
+computation instead of each starting their own; requests that find a table's
+version expired await one in-flight digest of it.
+
+Filters trim the payload, they do not change the aggregates:
+  months=N         last N rows of every monthly series (rows with a "period")
+  from=, to=       YYYY-MM bounds on the same rows
+  fields=a,b       top-level keys to return
+
+Endpoints: /api/tabs (tab → ETag), /api/<tab>, /api/stats
+
+Usage: python src/dashboards/dashboard_api.py [--data-dir data] [--port 8050] [--cache-size 64]
+"""
+import os, re, sys, json, time, asyncio, hashlib, argparse, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.pipelines import dashboard_cubes as cubes
+
+CACHE_SIZE = 64      # encoded responses kept (tab × filter combinations)
+FOLD_CACHE = 32      # table folds kept, one per (table, version)
+VERSION_TTL = 1.0    # seconds a table's file digest is trusted before re-stat'ing its partitions
+WORKERS = 4
+PERIOD = re.compile(r"^\d{4}-\d{2}$")
+STATUS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+          500: "Internal Server Error"}
+
+class BadRequest(ValueError): pass
+
+# ─── Filters ───
+def parse_filters(query):
+    """Query string → canonical filter tuple (the cache-key half that is not the tab)."""
+    q = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=True).items()}
+    unknown = set(q) - {"months", "from", "to", "fields"}
+    if unknown: raise BadRequest(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+    if "months" in q and not q["months"].isdigit(): raise BadRequest("months must be a positive integer")
+    for k in ("from", "to"):
+        if k in q and not PERIOD.match(q[k]): raise BadRequest(f"{k} must be YYYY-MM")
+    if "fields" in q: q["fields"] = ",".join(sorted(f for f in q["fields"].split(",") if f))
+    return tuple(sorted(q.items()))
+
+def apply_filters(payload, filters):
+    f = dict(filters)
+    if not f: return payload
+    def trim(rows):
+        if not rows or not isinstance(rows, list) or not all(isinstance(r, dict) and "period" in r for r in rows): return rows
+        rows = [r for r in rows if f.get("from", "") <= r["period"] <= f.get("to", "9999-99")]
+        return rows[-int(f["months"]):] if "months" in f and int(f["months"]) else rows
+    def walk(v): return {k: walk(x) for k, x in v.items()} if isinstance(v, dict) else trim(v)
+    out = walk(payload)
+    if "fields" in f: out = {k: v for k, v in out.items() if k in f["fields"].split(",")}
+    return out
+
+def encode(payload): return json.dumps(payload, separators=(",", ":")).encode()
+
+# ─── Service ───
+class DashboardAPI:
+    def __init__(self, data_dir, cube_dir=None, cache_size=CACHE_SIZE, workers=WORKERS, version_ttl=VERSION_TTL):
+        self.data_dir, self.version_ttl = data_dir, version_ttl
+        self.cube_dir = cube_dir if cube_dir is not None else os.path.join(data_dir, "dashboards")
+        self.cache, self.cache_size = OrderedDict(), cache_size      # (tab, filters) → (etag, body)
+        self.folds, self.fold_lock = OrderedDict(), threading.Lock()  # (table, digest) → fold
+        self.table_locks = {name: threading.Lock() for name in cubes.TABLES}
+        self.versions, self.inflight, self.digests = {}, {}, {}       # table → (checked_at, digest); key → Future; table → Future
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cube")
+        self.stat_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="digest")  # never queued behind a scan
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "not_modified": 0, "coalesced": 0,
+                      "computed": 0, "from_cubes": 0, "scans": 0, "evicted": 0, "digests": 0}
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.stat_pool.shutdown(wait=True)
+
+    # versions (event loop; the digest itself runs on stat_pool)
+    async def table_version(self, name):
+        checked, d = self.versions.get(name, (None, None))
+        now = time.monotonic()
+        if checked is not None and now - checked <= self.version_ttl: return d
+        flight = self.digests.get(name)
+        if flight: return await asyncio.shield(flight)
+        self.stats["digests"] += 1
+        flight = self.digests[name] = asyncio.get_running_loop().run_in_executor(self.stat_pool, cubes.digest, self.data_dir, name)
+        try: d = await asyncio.shield(flight)
+        finally: self.digests.pop(name, None)
+        self.versions[name] = (now, d)
+        return d
+
+    async def tab_inputs(self, tab):
+        names = cubes.TABS[tab]
+        return dict(zip(names, await asyncio.gather(*(self.table_version(name) for name in names))))
+
+    def etag(self, tab, filters, inputs):
+        h = hashlib.sha256(f"{tab}\0{filters}\0{sorted(inputs.items())}".encode())
+        return f'"{h.hexdigest()[:20]}"'
+
+    # computation (pool threads)
+    def fold(self, name, version):
+        with self.table_locks[name]:  # two tabs needing the same table wait for one scan
+            with self.fold_lock:
+                if (name, version) in self.folds:
+                    self.folds.move_to_end((name, version))
+                    return self.folds[(name, version)]
+            fold = cubes.scan(self.data_dir, name)
+            with self.fold_lock:
+                self.stats["scans"] += 1
+                for key in [k for k in self.folds if k[0] == name]: del self.folds[key]  # older versions of this table
+                self.folds[(name, version)] = fold
+                while len(self.folds) > FOLD_CACHE: self.folds.popitem(last=False)
+            return fold
+
+    def cube_payload(self, tab, inputs):
+        """The prebuilt data/dashboards/<tab>.json, if its manifest says it was built from these inputs."""
+        entry = cubes.load_manifest(self.cube_dir).get(tab, {}) if os.path.isdir(self.cube_dir) else {}
+        path = os.path.join(self.cube_dir, f"{tab}.json")
+        if entry.get("inputs") != inputs or not os.path.exists(path): return None
+        with open(path) as f: return json.load(f)
+
+    def compute(self, tab, filters, inputs):
+        payload, counter = self.cube_payload(tab, inputs), "from_cubes"
+        if payload is None:
+            payload, counter = cubes.BUILDERS[tab]({name: self.fold(name, v) for name, v in inputs.items()}), "computed"
+        with self.fold_lock: self.stats[counter] += 1
+        return encode(apply_filters(payload, filters))
+
+    # request path (event loop)
+    async def get(self, tab, query="", if_none_match=None):
+        """→ (status, etag, body). body is None for 304."""
+        if tab not in cubes.TABS: raise KeyError(tab)
+        filters, inputs = parse_filters(query), await self.tab_inputs(tab)
+        etag = self.etag(tab, filters, inputs)
+        if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+            self.stats["not_modified"] += 1
+            return 304, etag, None
+        key = (tab, filters)
+        cached = self.cache.get(key)
+        if cached and cached[0] == etag:
+            self.cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return 200, etag, cached[1]
+        flight = self.inflight.get((key, etag))
+        if flight:
+            self.stats["coalesced"] += 1
+            return 200, etag, await asyncio.shield(flight)
+        self.stats["misses"] += 1
+        flight = asyncio.get_running_loop().run_in_executor(self.pool, self.compute, tab, filters, inputs)
+        self.inflight[(key, etag)] = flight
+        try: body = await asyncio.shield(flight)
+        finally: self.inflight.pop((key, etag), None)
+        self.cache[key] = (etag, body)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+            self.stats["evicted"] += 1
+        return 200, etag, body
+
+    async def respond(self, method, target, headers):
+        """One HTTP request → (status, extra headers, body bytes)."""
+        self.stats["requests"] += 1
+        if method not in ("GET", "HEAD"): return 405, {"Allow": "GET, HEAD"}, encode({"error": "method not allowed"})
+        url = urlsplit(target)
+        route = url.path.rstrip("/").split("/")
+        if route[:2] != ["", "api"] or len(route) != 3: return 404, {}, encode({"error": "not found"})
+        if route[2] == "tabs": return 200, {}, encode({tab: self.etag(tab, (), await self.tab_inputs(tab)) for tab in cubes.TABS})
+        if route[2] == "stats":
+            return 200, {}, encode(dict(self.stats, cached=len(self.cache), folds=[n for n, _ in self.folds]))
+        tab = route[2].removesuffix(".json")
+        try: status, etag, body = await self.get(tab, url.query, headers.get("if-none-match"))
+        except KeyError: return 404, {}, encode({"error": f"unknown tab {tab!r}", "tabs": list(cubes.TABS)})
+        except BadRequest as e: return 400, {}, encode({"error": str(e)})
+        return status, {"ETag": etag, "Cache-Control": "no-cache"}, body or b""
+
+# ─── HTTP/1.1 (keep-alive, GET/HEAD only) ───
+async def handle(api, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line.strip(): break
+            method, target, version = line.decode("latin-1").split()
+            headers = {}
+            while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                k, _, v = h.decode("latin-1").partition(":")
+                headers[k.strip().lower()] = v.strip()
+            try: status, extra, body = await api.respond(method, target, headers)
+            except Exception as e:  # a failing scan answers 500 instead of dropping the connection
+                status, extra, body = 500, {}, encode({"error": f"{type(e).__name__}: {e}"})
+            keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            head = [f"HTTP/1.1 {status} {STATUS[status]}", "Content-Type: application/json",
+                    f"Content-Length: {len(body) if status != 304 else 0}", "Access-Control-Allow-Origin: *",
+                    "Access-Control-Expose-Headers: ETag", f"Connection: {'keep-alive' if keep else 'close'}"]
+            head += [f"{k}: {v}" for k, v in extra.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + (body if method == "GET" and status != 304 else b""))
+            await writer.drain()
+            if not keep: break
+    except (ConnectionError, ValueError, asyncio.IncompleteReadError): pass
+    finally: writer.close()
+
+async def start(api, host="127.0.0.1", port=8050):
+    return await asyncio.start_server(lambda r, w: handle(api, r, w), host, port, backlog=1024)
+
+def main():
+    parser = argparse.ArgumentParser()
+    default_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
+    parser.add_argument("--data-dir", default=default_data)
+    parser.add_argument("--cube-dir", default=None, help="Prebuilt payloads (default: <data-dir>/dashboards)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+    api = DashboardAPI(args.data_dir, args.cube_dir, args.cache_size, args.workers)
+
+    async def run():
+        server = await start(api, args.host, args.port)
+        print(f"  serving {len(cubes.TABS)} tabs from {os.path.abspath(args.data_dir)} on "
+              f"http://{args.host}:{server.sockets[0].getsockname()[1]}/api/<tab>", flush=True)
+        async with server: await server.serve_forever()
+    try: asyncio.run(run())
+    except KeyboardInterrupt: pass
+    finally: api.close()
+
+if __name__ == "__main__":
+    main()
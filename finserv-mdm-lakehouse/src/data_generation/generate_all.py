@@ -5,17 +5,57 @@ Financial Services MDM Lakehouse — Master Data Generator
 Generates realistic sample data for a diversified financial services company.
 Products: Credit Cards, Personal/Auto Loans, Savings/CD, Digital Banking.
 
-Usage: python generate_all.py [--company "Your Company Name"]
+Usage: python generate_all.py [--company "Your Company Name"] [--scale-factor 1.0] [--output-dir DIR]
+                               [--workers N] [--seed 42] [--as-of 2025-06-30T12:00:00]
+                               [--backend python|numpy] [--format csv|parquet|both]
+                               [--compression snappy|zstd|none] [--row-group-size N]
+                               [--partition-grain none|day|month|year]
+
+Row counts scale linearly with --scale-factor (TPC-style). Dimension tables are
+materialized because facts sample foreign keys from them; every fact table is a
+generator that streams straight into its CSV writer, so peak memory does not grow
+with fact volume.
+
+Every table draws from its own random stream derived from (--seed, table, shard),
+so output never depends on call order. The large fact tables are cut into
+fixed-size shards by entity-ID range and generated across --workers processes;
+the stitched files are byte-identical for any worker count (pin --as-of to
+compare runs).
+
+--backend numpy builds transactions, digital events and hourly metrics as
+typed NumPy column batches (one batch per shard) instead of per-row dicts.
+Schemas, value formats and distributions match the row backend; the exact
+values differ because the random streams differ.
+
+--format picks the output writers (see storage.py): CSV text, typed Parquet
+with dictionary-encoded low-cardinality columns, or both side by side.
+
+--partition-grain lays the three fact tables out Hive-style by event date
+(fact_transactions/transaction_date=2025-03-01/part-00000.csv) with a
+_manifest.json per table, so readers can prune partitions by date range.
 """
-import csv, os, random, hashlib, argparse, math
+import csv, os, sys, random, hashlib, argparse, math
 from datetime import datetime, timedelta
+from itertools import islice
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+from src.pipelines import mdm_matching, golden_records, fraud_velocity, rollups, dashboard_cubes
+try:
+    import numpy as np
+except ImportError:  # optional — only the --backend numpy path needs it
+    np = None
 
 # ─── Config ───
-random.seed(42)
+SEED = 42
+random.seed(SEED)
 COMPANY = "Horizon Bank Holdings"  # Default, overridable
 BASE = os.path.dirname(os.path.abspath(__file__))
 DATA = os.path.join(BASE, "..", "..", "data")
+OUTPUT = {"formats": ("csv",)}  # storage writer options, set from the CLI
 
 # ─── Helpers ───
 def out(subdir, name):
@@ -24,20 +64,38 @@ def out(subdir, name):
     return os.path.join(d, name)
 
 def write_csv(path, rows):
-    if not rows: return
-    with open(path, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=rows[0].keys())
-        w.writeheader()
-        w.writerows(rows)
-    print(f"  ✓ {os.path.basename(path):40s} → {len(rows):>6,} rows")
+    """Stream any iterable of row dicts to CSV. Returns the number of rows written."""
+    n = storage.write_rows(path, rows)
+    if n: report(path, n)
+    return n
+
+def write_table(path, rows):
+    """Stream row dicts to every configured output format (--format)."""
+    n = storage.write_rows(path, rows, **OUTPUT)
+    if n: report(path, n, OUTPUT["formats"])
+    return n
+
+def write_table_columns(path, columns):
+    """Write one columnar batch to every configured output format."""
+    n = storage.write_columns(path, columns, **OUTPUT)
+    if n: report(path, n, OUTPUT["formats"])
+    return n
+
+def report(path, n, formats=("csv",)):
+    name = f"{os.path.splitext(os.path.basename(path))[0]}.{'+'.join(formats)}"
+    print(f"  ✓ {name:40s} → {n:>6,} rows")
+
+def scaled(n, scale_factor):
+    """Base row count for a scale-factor-1 table, scaled linearly (never below 1)."""
+    return max(1, int(round(n * scale_factor)))
 
 def uid(prefix, i): return f"{prefix}-{i:05d}"
-def rdate(start, end):
+def rdate(start, end, rng=random):
     d = (end - start).days
-    return start + timedelta(days=random.randint(0, max(d, 1)))
-def rts(start, end):
-    d = rdate(start, end)
-    return d.replace(hour=random.randint(0,23), minute=random.randint(0,59), second=random.randint(0,59))
+    return start + timedelta(days=rng.randint(0, max(d, 1)))
+def rts(start, end, rng=random):
+    d = rdate(start, end, rng)
+    return d.replace(hour=rng.randint(0,23), minute=rng.randint(0,59), second=rng.randint(0,59))
 
 STATES = ["CA","TX","NY","FL","IL","PA","OH","GA","NC","MI","NJ","VA","WA","AZ","MA","TN","IN","MO","MD","WI","CO","MN","SC","AL","LA","KY","OR","OK","CT","UT","IA","NV","AR","MS","KS","NM","NE","ID","WV","HI","NH","ME","MT","RI","DE","SD","ND","AK","VT","WY"]
 CITIES = {"CA":"San Francisco,Los Angeles,San Diego,Sacramento","TX":"Houston,Dallas,Austin,San Antonio","NY":"New York,Buffalo,Rochester,Albany","FL":"Miami,Tampa,Orlando,Jacksonville","IL":"Chicago,Springfield,Naperville","PA":"Philadelphia,Pittsburgh","OH":"Columbus,Cleveland","GA":"Atlanta,Savannah","NC":"Charlotte,Raleigh","MI":"Detroit,Grand Rapids","NJ":"Newark,Jersey City","VA":"Richmond,Virginia Beach","WA":"Seattle,Tacoma","AZ":"Phoenix,Tucson","MA":"Boston,Cambridge"}
@@ -77,6 +135,14 @@ SAVINGS_PRODUCTS = [
 ]
 ALL_PRODUCTS = CREDIT_CARDS + LOAN_PRODUCTS + SAVINGS_PRODUCTS
 
+def eligible_products(segment):
+    """Products a segment can be sold: affluent skips secured cards, mass tiers skip premium travel / jumbo loans."""
+    if segment in ["high_net_worth","ultra_hnw"]: return ALL_PRODUCTS
+    if segment == "affluent": return [p for p in ALL_PRODUCTS if p.get("category") != "secured"]
+    return [p for p in ALL_PRODUCTS if p.get("category") not in ["premium_travel","personal_jumbo"]]
+
+SEGMENT_PRODUCTS = {seg: eligible_products(seg) for seg in SEGMENTS}
+
 # ─── Merchant Categories (for card transactions) ───
 MCC_CATEGORIES = [
     {"mcc":"5411","category":"Grocery","avg_txn":67},
@@ -97,6 +163,15 @@ MCC_CATEGORIES = [
     {"mcc":"5999","category":"Online Shopping","avg_txn":64},
 ]
 
+# ─── Categorical distributions shared by the row and columnar backends: (values, weights) ───
+TXN_TYPES = (["purchase","payment","refund","fee","interest","cash_advance"], [70,15,5,4,4,2])
+TXN_CHANNELS = (["pos_chip","pos_contactless","online","mobile_wallet","atm"], [30,25,30,10,5])
+EVENT_TYPES = (["page_view","click","form_submit","api_call","error","feature_toggle"], [40,25,15,10,5,5])
+DEVICE_TYPES = (["ios","android","desktop","tablet"], [35,30,25,10])
+REFERRERS = (["direct","push_notification","email","search","social","partner_link"], [35,20,15,15,10,5])
+OS_VERSIONS = ["iOS 17","iOS 18","Android 14","Android 15","Windows 11","macOS 14"]
+APP_VERSIONS = ["8.1.0","8.2.0","8.3.0","8.4.0","9.0.0"]
+
 # ─── Partners ───
 PARTNERS = [
     {"partner_id":"PTR-001","name":"Costco Wholesale","type":"co_brand","category":"retail"},
@@ -115,29 +190,28 @@ PARTNERS = [
 # GENERATION
 # ═══════════════════════════════════════════════
 
-def gen_customers(n=2000):
-    """Generate 2000 customers across source systems with intentional duplicates for MDM."""
-    customers = []
-    now = datetime.now()
+def gen_customers(n=2000, rng=random, now=None):
+    """Generate n customers (2000 at scale factor 1) across source systems with intentional duplicates for MDM."""
+    now = now or datetime.now()
     start = datetime(2018, 1, 1)
     
     for i in range(1, n+1):
-        first = random.choice(FIRST_NAMES)
-        last = random.choice(LAST_NAMES)
-        st = random.choice(STATES[:20])  # Focus on top 20 states
-        city = random.choice(CITIES.get(st, "Springfield,Columbus,Madison").split(","))
-        seg = random.choices(SEGMENTS, weights=[40,30,15,10,5])[0]
-        risk = random.choices(RISK_TIERS, weights=[25,35,20,15,5])[0]
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        st = rng.choice(STATES[:20])  # Focus on top 20 states
+        city = rng.choice(CITIES.get(st, "Springfield,Columbus,Madison").split(","))
+        seg = rng.choices(SEGMENTS, weights=[40,30,15,10,5])[0]
+        risk = rng.choices(RISK_TIERS, weights=[25,35,20,15,5])[0]
         fico_lo, fico_hi = FICO_RANGES[risk]
-        fico = random.randint(fico_lo, fico_hi)
-        dob = rdate(datetime(1955,1,1), datetime(2002,12,31))
-        acq_date = rdate(start, now - timedelta(days=30))
-        income = {"mass_market":random.randint(30000,75000),"mass_affluent":random.randint(75000,150000),"affluent":random.randint(150000,300000),"high_net_worth":random.randint(300000,750000),"ultra_hnw":random.randint(750000,5000000)}[seg]
+        fico = rng.randint(fico_lo, fico_hi)
+        dob = rdate(datetime(1955,1,1), datetime(2002,12,31), rng)
+        acq_date = rdate(start, now - timedelta(days=30), rng)
+        income = {"mass_market":rng.randint(30000,75000),"mass_affluent":rng.randint(75000,150000),"affluent":rng.randint(150000,300000),"high_net_worth":rng.randint(300000,750000),"ultra_hnw":rng.randint(750000,5000000)}[seg]
         
-        email = f"{first.lower()}.{last.lower()}{random.randint(1,99)}@{random.choice(EMAILS)}"
-        phone = f"+1{random.randint(200,999)}{random.randint(1000000,9999999)}"
+        email = f"{first.lower()}.{last.lower()}{rng.randint(1,99)}@{rng.choice(EMAILS)}"
+        phone = f"+1{rng.randint(200,999)}{rng.randint(1000000,9999999)}"
         
-        customers.append({
+        yield {
             "customer_id": uid("CUST", i),
             "first_name": first,
             "last_name": last,
@@ -145,39 +219,44 @@ def gen_customers(n=2000):
             "phone": phone,
             "date_of_birth": dob.strftime("%Y-%m-%d"),
             "ssn_hash": hashlib.sha256(f"SSN-{i:09d}".encode()).hexdigest()[:16],
-            "address_line1": f"{random.randint(100,9999)} {random.choice(['Main','Oak','Elm','Maple','Pine','Cedar','Walnut','Park','Lake','River'])} {random.choice(['St','Ave','Blvd','Dr','Ln','Way','Ct'])}",
+            "address_line1": f"{rng.randint(100,9999)} {rng.choice(['Main','Oak','Elm','Maple','Pine','Cedar','Walnut','Park','Lake','River'])} {rng.choice(['St','Ave','Blvd','Dr','Ln','Way','Ct'])}",
             "city": city,
             "state": st,
-            "zip_code": f"{random.randint(10000,99999)}",
+            "zip_code": f"{rng.randint(10000,99999)}",
             "country": "US",
             "segment": seg,
             "risk_tier": risk,
             "fico_score": fico,
             "annual_income": income,
-            "employment_status": random.choices(["employed","self_employed","retired","student","unemployed"], weights=[65,15,10,5,5])[0],
-            "acquisition_channel": random.choice(CHANNELS),
+            "employment_status": rng.choices(["employed","self_employed","retired","student","unemployed"], weights=[65,15,10,5,5])[0],
+            "acquisition_channel": rng.choice(CHANNELS),
             "acquisition_date": acq_date.strftime("%Y-%m-%d"),
             "customer_since": acq_date.strftime("%Y-%m-%d"),
-            "status": random.choices(["active","inactive","closed","suspended"], weights=[80,10,8,2])[0],
-            "digital_enrolled": random.choices([True, False], weights=[75, 25])[0],
-            "mobile_app_user": random.choices([True, False], weights=[60, 40])[0],
-            "preferred_channel": random.choice(["mobile","web","branch","phone"]),
-            "opt_in_marketing": random.choices([True, False], weights=[65, 35])[0],
+            "status": rng.choices(["active","inactive","closed","suspended"], weights=[80,10,8,2])[0],
+            "digital_enrolled": rng.choices([True, False], weights=[75, 25])[0],
+            "mobile_app_user": rng.choices([True, False], weights=[60, 40])[0],
+            "preferred_channel": rng.choice(["mobile","web","branch","phone"]),
+            "opt_in_marketing": rng.choices([True, False], weights=[65, 35])[0],
             "kyc_verified": True,
-            "kyc_date": (acq_date + timedelta(days=random.randint(0,14))).strftime("%Y-%m-%d"),
-            "_source_system": random.choice(["core_banking","salesforce","fiserv"]),
+            "kyc_date": (acq_date + timedelta(days=rng.randint(0,14))).strftime("%Y-%m-%d"),
+            "_source_system": rng.choice(["core_banking","salesforce","fiserv"]),
             "_ingested_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        })
-    return customers
-
-def gen_bronze_sources(customers):
-    """Create bronze-layer source system replicas with intentional mismatches for MDM."""
-    core = []
-    sfdc = []
-    fiserv = []
-    
-    for c in customers[:800]:  # 800 in core banking
-        core.append({
+        }
+
+def gen_bronze_sources(customers, scale_factor=1.0, rng=random):
+    """Create bronze-layer source system replicas with intentional mismatches for MDM.
+
+    Returns three generators (core, sfdc, fiserv); consume them in that order to
+    keep the random stream identical to a sequential build.
+    """
+    n_core, n_sfdc = scaled(800, scale_factor), scaled(1200, scale_factor)
+    fsv_lo, fsv_hi = scaled(500, scale_factor), scaled(1500, scale_factor)
+    return (_bronze_core(customers[:n_core]), _bronze_sfdc(customers[:n_sfdc], rng),
+            _bronze_fiserv(customers[fsv_lo:fsv_hi], rng))
+
+def _bronze_core(customers):
+    for c in customers:  # 800 in core banking at scale factor 1
+        yield {
             "CIF_NUM": c["customer_id"].replace("CUST","CIF"),
             "CUST_NAME": f"{c['last_name']}, {c['first_name']}".upper(),
             "SSN_HASH": c["ssn_hash"],
@@ -191,18 +270,19 @@ def gen_bronze_sources(customers):
             "ACCT_OPEN_DT": c["acquisition_date"],
             "STATUS_CD": {"active":"A","inactive":"I","closed":"C","suspended":"S"}[c["status"]],
             "FICO": c["fico_score"],
-        })
-    
-    for c in customers[:1200]:  # 1200 in SFDC (overlap with core)
+        }
+
+def _bronze_sfdc(customers, rng):
+    for c in customers:  # 1200 in SFDC (overlap with core)
         # Introduce slight mismatches for MDM testing
         email = c["email"]
-        if random.random() < 0.15:
-            email = email.replace("@", f"{random.randint(1,9)}@")  # Slightly different email
+        if rng.random() < 0.15:
+            email = email.replace("@", f"{rng.randint(1,9)}@")  # Slightly different email
         phone = c["phone"]
-        if random.random() < 0.1:
-            phone = phone[:-1] + str(random.randint(0,9))  # Last digit different
+        if rng.random() < 0.1:
+            phone = phone[:-1] + str(rng.randint(0,9))  # Last digit different
             
-        sfdc.append({
+        yield {
             "AccountId": f"001{hashlib.md5(c['customer_id'].encode()).hexdigest()[:12]}",
             "FirstName": c["first_name"],
             "LastName": c["last_name"],
@@ -216,17 +296,18 @@ def gen_bronze_sources(customers):
             "Segment__c": c["segment"],
             "Lead_Source__c": c["acquisition_channel"],
             "CreatedDate": c["acquisition_date"],
-        })
-    
-    for c in customers[500:1500]:  # 1000 in Fiserv (overlap zone)
+        }
+
+def _bronze_fiserv(customers, rng):
+    for c in customers:  # 1000 in Fiserv (overlap zone)
         name = f"{c['first_name']} {c['last_name']}"
-        if random.random() < 0.08:
+        if rng.random() < 0.08:
             name = f"{c['first_name'][0]}. {c['last_name']}"  # Abbreviated
             
-        fiserv.append({
-            "PARTY_ID": f"FSV{random.randint(100000,999999)}",
+        yield {
+            "PARTY_ID": f"FSV{rng.randint(100000,999999)}",
             "FULL_NAME": name,
-            "EMAIL_ADDR": c["email"].upper() if random.random() < 0.2 else c["email"],
+            "EMAIL_ADDR": c["email"].upper() if rng.random() < 0.2 else c["email"],
             "PHONE_NUM": c["phone"],
             "STREET_ADDR": c["address_line1"],
             "CITY_NAME": c["city"],
@@ -235,255 +316,240 @@ def gen_bronze_sources(customers):
             "RISK_RATING": c["risk_tier"].upper(),
             "CREDIT_SCORE": c["fico_score"],
             "ONBOARD_DATE": c["acquisition_date"],
-        })
-    
-    return core, sfdc, fiserv
+        }
 
-def gen_accounts(customers):
+def gen_accounts(customers, rng=random, now=None):
     """Generate financial accounts — each customer gets 1-4 products."""
-    accounts = []
-    now = datetime.now()
+    now = now or datetime.now()
     acct_num = 10000
     
     for c in customers:
         if c["status"] == "closed": continue
-        n_products = random.choices([1,2,3,4], weights=[25,40,25,10])[0]
+        n_products = rng.choices([1,2,3,4], weights=[25,40,25,10])[0]
         held = set()
         
+        pool = SEGMENT_PRODUCTS[c["segment"]]
         for _ in range(n_products):
-            # Product selection weighted by segment
-            if c["segment"] in ["high_net_worth","ultra_hnw"]:
-                pool = ALL_PRODUCTS
-            elif c["segment"] == "affluent":
-                pool = [p for p in ALL_PRODUCTS if p.get("category") != "secured"]
-            else:
-                pool = [p for p in ALL_PRODUCTS if p.get("category") not in ["premium_travel","personal_jumbo"]]
-            
-            prod = random.choice(pool)
+            prod = rng.choice(pool)
             if prod["product_id"] in held: continue
             held.add(prod["product_id"])
             
             acct_num += 1
-            open_dt = rdate(datetime.strptime(c["acquisition_date"],"%Y-%m-%d"), now - timedelta(days=10))
+            open_dt = rdate(datetime.strptime(c["acquisition_date"],"%Y-%m-%d"), now - timedelta(days=10), rng)
             
             # Balance logic by product type
             if prod["product_id"].startswith("CC"):
-                credit_limit = random.choice([2000,5000,8000,10000,15000,20000,30000,50000])
-                balance = round(random.uniform(0, credit_limit * 0.7), 2)
-                apr = round(random.uniform(15, 28), 2)
+                credit_limit = rng.choice([2000,5000,8000,10000,15000,20000,30000,50000])
+                balance = round(rng.uniform(0, credit_limit * 0.7), 2)
+                apr = round(rng.uniform(15, 28), 2)
             elif prod["product_id"].startswith(("PL","AL")):
-                balance = round(random.uniform(float(prod.get("min_amount",1000)), float(prod.get("max_amount",50000))), 2)
+                balance = round(rng.uniform(float(prod.get("min_amount",1000)), float(prod.get("max_amount",50000))), 2)
                 credit_limit = balance
-                apr = round(random.uniform(4, 22), 2)
+                apr = round(rng.uniform(4, 22), 2)
             else:  # Savings/CD/MM
-                balance = round(random.uniform(500, {"mass_market":25000,"mass_affluent":100000,"affluent":500000,"high_net_worth":2000000,"ultra_hnw":10000000}[c["segment"]]), 2)
+                balance = round(rng.uniform(500, {"mass_market":25000,"mass_affluent":100000,"affluent":500000,"high_net_worth":2000000,"ultra_hnw":10000000}[c["segment"]]), 2)
                 credit_limit = 0
                 apr = round(float(prod.get("apy", "4.0")), 2)
             
-            accounts.append({
+            yield {
                 "account_id": uid("ACCT", acct_num),
                 "customer_id": c["customer_id"],
                 "product_id": prod["product_id"],
                 "product_name": prod["name"],
                 "product_category": prod.get("category",""),
-                "account_number": f"{''.join([str(random.randint(0,9)) for _ in range(16)])}",
+                "account_number": f"{''.join([str(rng.randint(0,9)) for _ in range(16)])}",
                 "open_date": open_dt.strftime("%Y-%m-%d"),
-                "status": random.choices(["open","closed","delinquent","frozen"], weights=[85,8,5,2])[0],
+                "status": rng.choices(["open","closed","delinquent","frozen"], weights=[85,8,5,2])[0],
                 "balance": balance,
                 "credit_limit": credit_limit,
                 "apr": apr,
                 "monthly_payment": round(balance * 0.025, 2) if prod["product_id"].startswith(("PL","AL")) else 0,
-                "autopay_enrolled": random.choices([True,False], weights=[55,45])[0],
-                "paperless": random.choices([True,False], weights=[70,30])[0],
-                "last_activity_date": rdate(now - timedelta(days=90), now).strftime("%Y-%m-%d"),
-            })
-    return accounts
-
-def gen_transactions(accounts, n=30000):
-    """Generate card/account transactions."""
-    txns = []
-    now = datetime.now()
-    cc_accounts = [a for a in accounts if a["product_id"].startswith("CC") and a["status"] == "open"]
-    
-    for _ in range(n):
-        acct = random.choice(cc_accounts)
-        mcc = random.choice(MCC_CATEGORIES)
-        amt = round(random.gauss(mcc["avg_txn"], mcc["avg_txn"]*0.4), 2)
-        if amt < 1: amt = round(random.uniform(1, 20), 2)
-        ts = rts(now - timedelta(days=365), now)
+                "autopay_enrolled": rng.choices([True,False], weights=[55,45])[0],
+                "paperless": rng.choices([True,False], weights=[70,30])[0],
+                "last_activity_date": rdate(now - timedelta(days=90), now, rng).strftime("%Y-%m-%d"),
+            }
+
+DIGITAL_PAGES = [
+    "/dashboard","/accounts","/transfer","/pay-bill","/rewards","/credit-score",
+    "/apply/credit-card","/apply/loan","/statements","/settings","/support",
+    "/invest","/auto-pay","/mobile-deposit","/card-controls","/alerts",
+    "/spend-insights","/budgets","/savings-goals","/offers"
+]
+
+# ─── Join index: one pass over accounts, then O(1) lookups per customer ───
+def accounts_by_customer(accounts):
+    """customer_id → that customer's account rows, in input order."""
+    index = defaultdict(list)
+    for a in accounts: index[a["customer_id"]].append(a)
+    return index
+
+# Compact FK pools for the fact generators — tuples, not row dicts, so they are
+# cheap to hand to worker processes.
+def card_pool(accounts):
+    return [(a["account_id"], a["customer_id"]) for a in accounts if a["product_id"].startswith("CC") and a["status"] == "open"]
+
+def loan_pool(accounts):
+    return [(a["account_id"], a["customer_id"], a["open_date"], a["monthly_payment"]) for a in accounts
+            if a["product_id"].startswith(("PL","AL")) and a["status"] != "closed" and a["monthly_payment"] > 0]
+
+def digital_pool(customers):
+    return [(c["customer_id"], c["mobile_app_user"]) for c in customers if c["digital_enrolled"] and c["status"] == "active"]
+
+def n_loan_payments(open_date, now):
+    """Number of monthly payments due between open_date and now (no randomness, so shard offsets are cheap)."""
+    elapsed = now - datetime.strptime(open_date, "%Y-%m-%d") - timedelta(microseconds=1)
+    return max(0, elapsed // timedelta(days=30))
+
+def gen_transactions(accounts, n=30000, rng=random, now=None):
+    """Generate card/account transactions (streamed, one row at a time)."""
+    yield from transaction_rows(card_pool(accounts), 0, n, 1, rng, now or datetime.now())
+
+def transaction_rows(cards, lo, hi, first_id, rng, now):
+    """Transactions for the row range [lo, hi), numbered from first_id."""
+    for i in range(first_id, first_id + hi - lo):
+        account_id, customer_id = rng.choice(cards)
+        mcc = rng.choice(MCC_CATEGORIES)
+        amt = round(rng.gauss(mcc["avg_txn"], mcc["avg_txn"]*0.4), 2)
+        if amt < 1: amt = round(rng.uniform(1, 20), 2)
+        ts = rts(now - timedelta(days=365), now, rng)
         
-        txns.append({
-            "transaction_id": uid("TXN", len(txns)+1),
-            "account_id": acct["account_id"],
-            "customer_id": acct["customer_id"],
+        yield {
+            "transaction_id": uid("TXN", i),
+            "account_id": account_id,
+            "customer_id": customer_id,
             "transaction_date": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "post_date": (ts + timedelta(days=random.randint(0,2))).strftime("%Y-%m-%d"),
+            "post_date": (ts + timedelta(days=rng.randint(0,2))).strftime("%Y-%m-%d"),
             "amount": abs(amt),
-            "transaction_type": random.choices(["purchase","payment","refund","fee","interest","cash_advance"], weights=[70,15,5,4,4,2])[0],
+            "transaction_type": rng.choices(*TXN_TYPES)[0],
             "mcc_code": mcc["mcc"],
             "merchant_category": mcc["category"],
-            "merchant_name": f"{mcc['category']} Store #{random.randint(100,999)}",
-            "channel": random.choices(["pos_chip","pos_contactless","online","mobile_wallet","atm"], weights=[30,25,30,10,5])[0],
+            "merchant_name": f"{mcc['category']} Store #{rng.randint(100,999)}",
+            "channel": rng.choices(*TXN_CHANNELS)[0],
             "currency": "USD",
-            "rewards_earned": round(abs(amt) * random.uniform(0.01, 0.05), 2),
-            "is_international": random.random() < 0.08,
-            "is_disputed": random.random() < 0.02,
-            "fraud_flag": random.random() < 0.008,
-        })
-    return txns
-
-def gen_loan_payments(accounts):
-    """Generate loan payment history."""
-    payments = []
-    now = datetime.now()
-    loan_accts = [a for a in accounts if a["product_id"].startswith(("PL","AL")) and a["status"] != "closed"]
-    
-    for acct in loan_accts:
-        open_dt = datetime.strptime(acct["open_date"], "%Y-%m-%d")
-        payment_amt = acct["monthly_payment"]
-        if payment_amt <= 0: continue
-        
-        d = open_dt + timedelta(days=30)
+            "rewards_earned": round(abs(amt) * rng.uniform(0.01, 0.05), 2),
+            "is_international": rng.random() < 0.08,
+            "is_disputed": rng.random() < 0.02,
+            "fraud_flag": rng.random() < 0.008,
+        }
+
+def gen_loan_payments(accounts, rng=random, now=None):
+    """Generate loan payment history (streamed)."""
+    loans = loan_pool(accounts)
+    yield from loan_payment_rows(loans, 0, len(loans), 1, rng, now or datetime.now())
+
+def loan_payment_rows(loans, lo, hi, first_id, rng, now):
+    """Payment history for loan accounts loans[lo:hi], numbered from first_id."""
+    n = first_id - 1
+    for account_id, customer_id, open_date, payment_amt in loans[lo:hi]:
+        d = datetime.strptime(open_date, "%Y-%m-%d") + timedelta(days=30)
         while d < now:
-            status = random.choices(["on_time","late_1_15","late_16_30","late_31_60","missed"], weights=[82,8,4,3,3])[0]
+            status = rng.choices(["on_time","late_1_15","late_16_30","late_31_60","missed"], weights=[82,8,4,3,3])[0]
             actual_amt = payment_amt if status != "missed" else 0
             if status.startswith("late"):
-                actual_amt = round(payment_amt * random.uniform(0.5, 1.0), 2)
+                actual_amt = round(payment_amt * rng.uniform(0.5, 1.0), 2)
             
-            payments.append({
-                "payment_id": uid("PMT", len(payments)+1),
-                "account_id": acct["account_id"],
-                "customer_id": acct["customer_id"],
+            n += 1
+            yield {
+                "payment_id": uid("PMT", n),
+                "account_id": account_id,
+                "customer_id": customer_id,
                 "due_date": d.strftime("%Y-%m-%d"),
-                "payment_date": (d + timedelta(days={"on_time":random.randint(-5,0),"late_1_15":random.randint(1,15),"late_16_30":random.randint(16,30),"late_31_60":random.randint(31,60),"missed":0}[status])).strftime("%Y-%m-%d") if status != "missed" else "",
+                "payment_date": (d + timedelta(days={"on_time":rng.randint(-5,0),"late_1_15":rng.randint(1,15),"late_16_30":rng.randint(16,30),"late_31_60":rng.randint(31,60),"missed":0}[status])).strftime("%Y-%m-%d") if status != "missed" else "",
                 "amount_due": round(payment_amt, 2),
                 "amount_paid": round(actual_amt, 2),
                 "payment_status": status,
-                "payment_method": random.choice(["ach","debit_card","check","auto_pay"]),
+                "payment_method": rng.choice(["ach","debit_card","check","auto_pay"]),
                 "principal_portion": round(actual_amt * 0.6, 2),
                 "interest_portion": round(actual_amt * 0.4, 2),
-            })
+            }
             d += timedelta(days=30)
-    return payments
 
-def gen_digital_events(customers, n=40000):
-    """Generate digital banking / mobile app events."""
-    events = []
-    now = datetime.now()
-    digital_custs = [c for c in customers if c["digital_enrolled"] and c["status"] == "active"]
-    
-    pages = [
-        "/dashboard","/accounts","/transfer","/pay-bill","/rewards","/credit-score",
-        "/apply/credit-card","/apply/loan","/statements","/settings","/support",
-        "/invest","/auto-pay","/mobile-deposit","/card-controls","/alerts",
-        "/spend-insights","/budgets","/savings-goals","/offers"
-    ]
-    
-    for _ in range(n):
-        cust = random.choice(digital_custs)
-        ts = rts(now - timedelta(days=180), now)
-        session = hashlib.md5(f"{cust['customer_id']}-{ts.strftime('%Y%m%d%H')}".encode()).hexdigest()[:12]
+def gen_digital_events(customers, n=40000, rng=random, now=None):
+    """Generate digital banking / mobile app events (streamed)."""
+    yield from digital_event_rows(digital_pool(customers), 0, n, 1, rng, now or datetime.now())
+
+def digital_event_rows(digital_custs, lo, hi, first_id, rng, now):
+    """Digital events for the row range [lo, hi), numbered from first_id."""
+    pages = DIGITAL_PAGES
+    for i in range(first_id, first_id + hi - lo):
+        customer_id, mobile_app_user = rng.choice(digital_custs)
+        ts = rts(now - timedelta(days=180), now, rng)
+        session = hashlib.md5(f"{customer_id}-{ts.strftime('%Y%m%d%H')}".encode()).hexdigest()[:12]
         
-        events.append({
-            "event_id": uid("EVT", len(events)+1),
-            "customer_id": cust["customer_id"],
+        yield {
+            "event_id": uid("EVT", i),
+            "customer_id": customer_id,
             "session_id": f"sess_{session}",
             "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "event_type": random.choices(["page_view","click","form_submit","api_call","error","feature_toggle"], weights=[40,25,15,10,5,5])[0],
-            "page_url": random.choice(pages),
-            "platform": "mobile_app" if cust["mobile_app_user"] and random.random() < 0.65 else "web",
-            "device_type": random.choices(["ios","android","desktop","tablet"], weights=[35,30,25,10])[0],
-            "os_version": random.choice(["iOS 17","iOS 18","Android 14","Android 15","Windows 11","macOS 14"]),
-            "app_version": random.choice(["8.1.0","8.2.0","8.3.0","8.4.0","9.0.0"]),
-            "screen_name": random.choice(pages).replace("/","").replace("-","_"),
-            "duration_seconds": random.randint(2, 180),
-            "referrer": random.choices(["direct","push_notification","email","search","social","partner_link"], weights=[35,20,15,15,10,5])[0],
-            "conversion_event": random.random() < 0.03,
-            "error_code": f"ERR_{random.randint(400,599)}" if random.random() < 0.02 else "",
-            "geo_lat": round(random.uniform(25, 48), 4),
-            "geo_lon": round(random.uniform(-122, -71), 4),
-        })
-    return events
-
-def gen_fraud_alerts(transactions):
-    """Generate fraud/AML alerts from transactions."""
-    alerts = []
-    flagged = [t for t in transactions if t["fraud_flag"] or t["amount"] > 500]
-    
-    for t in flagged[:800]:
-        severity = random.choices(["critical","high","medium","low"], weights=[10,25,40,25])[0]
-        alert_type = random.choices([
-            "velocity_spike","geographic_anomaly","large_purchase","card_not_present_high_risk",
-            "new_merchant_high_amount","international_unusual","multiple_declines","account_takeover_attempt",
-            "structuring_pattern","unusual_time_pattern"
-        ], weights=[15,12,15,12,10,8,8,8,6,6])[0]
-        
-        alerts.append({
-            "alert_id": uid("FRD", len(alerts)+1),
-            "transaction_id": t["transaction_id"],
-            "account_id": t["account_id"],
-            "customer_id": t["customer_id"],
-            "alert_timestamp": t["transaction_date"],
-            "alert_type": alert_type,
-            "severity": severity,
-            "risk_score": round(random.uniform(0.3, 1.0), 3),
-            "amount": t["amount"],
-            "merchant_category": t["merchant_category"],
-            "detection_method": random.choice(["ml_model","rules_engine","velocity_check","geo_fence","network_analysis"]),
-            "model_version": random.choice(["fraud_v3.2","fraud_v3.3","aml_v2.1"]),
-            "status": random.choices(["open","investigating","confirmed_fraud","false_positive","closed"], weights=[15,20,10,40,15])[0],
-            "assigned_to": f"analyst_{random.randint(1,20):03d}",
-            "resolution_date": (datetime.strptime(t["transaction_date"][:10],"%Y-%m-%d") + timedelta(days=random.randint(1,30))).strftime("%Y-%m-%d") if random.random() > 0.3 else "",
-            "loss_amount": round(t["amount"] * random.uniform(0, 1), 2) if random.random() < 0.1 else 0,
-        })
-    return alerts
-
-def gen_partner_performance():
+            "event_type": rng.choices(*EVENT_TYPES)[0],
+            "page_url": rng.choice(pages),
+            "platform": "mobile_app" if mobile_app_user and rng.random() < 0.65 else "web",
+            "device_type": rng.choices(*DEVICE_TYPES)[0],
+            "os_version": rng.choice(OS_VERSIONS),
+            "app_version": rng.choice(APP_VERSIONS),
+            "screen_name": rng.choice(pages).replace("/","").replace("-","_"),
+            "duration_seconds": rng.randint(2, 180),
+            "referrer": rng.choices(*REFERRERS)[0],
+            "conversion_event": rng.random() < 0.03,
+            "error_code": f"ERR_{rng.randint(400,599)}" if rng.random() < 0.02 else "",
+            "geo_lat": round(rng.uniform(25, 48), 4),
+            "geo_lon": round(rng.uniform(-122, -71), 4),
+        }
+
+def gen_fraud_alerts(transactions, cap=800, rng=random):
+    """Score event-time-ordered transactions with the velocity engine (fraud_velocity.py,
+    batched), then simulate case handling on the first `cap` alerts it raises."""
+    for a in islice(fraud_velocity.score_batches(transactions), cap):
+        a["status"] = rng.choices(["open","investigating","confirmed_fraud","false_positive","closed"], weights=[15,20,10,40,15])[0]
+        a["assigned_to"] = f"analyst_{rng.randint(1,20):03d}"
+        a["resolution_date"] = (datetime.strptime(a["alert_timestamp"][:10],"%Y-%m-%d") + timedelta(days=rng.randint(1,30))).strftime("%Y-%m-%d") if rng.random() > 0.3 else ""
+        a["loss_amount"] = round(a["amount"] * rng.uniform(0, 1), 2) if rng.random() < 0.1 else 0
+        yield a
+
+def gen_partner_performance(rng=random, now=None):
     """Generate partner/merchant performance data."""
-    rows = []
-    now = datetime.now()
+    now = now or datetime.now()
     for partner in PARTNERS:
         for month_offset in range(12):
             m = now - timedelta(days=30 * month_offset)
-            rows.append({
+            yield {
                 "partner_id": partner["partner_id"],
                 "partner_name": partner["name"],
                 "partner_type": partner["type"],
                 "partner_category": partner["category"],
                 "month": m.strftime("%Y-%m"),
-                "total_transactions": random.randint(5000, 150000),
-                "total_spend": round(random.uniform(500000, 25000000), 2),
-                "interchange_revenue": round(random.uniform(10000, 500000), 2),
-                "rewards_cost": round(random.uniform(5000, 200000), 2),
-                "new_accounts_sourced": random.randint(50, 2000),
-                "active_cardholders": random.randint(10000, 500000),
-                "avg_transaction_value": round(random.uniform(25, 200), 2),
-                "customer_satisfaction": round(random.uniform(3.5, 4.9), 1),
+                "total_transactions": rng.randint(5000, 150000),
+                "total_spend": round(rng.uniform(500000, 25000000), 2),
+                "interchange_revenue": round(rng.uniform(10000, 500000), 2),
+                "rewards_cost": round(rng.uniform(5000, 200000), 2),
+                "new_accounts_sourced": rng.randint(50, 2000),
+                "active_cardholders": rng.randint(10000, 500000),
+                "avg_transaction_value": round(rng.uniform(25, 200), 2),
+                "customer_satisfaction": round(rng.uniform(3.5, 4.9), 1),
                 "contract_status": "active",
-                "revenue_share_pct": round(random.uniform(0.5, 3.0), 2),
-            })
-    return rows
-
-def gen_credit_risk_snapshot(customers, accounts):
-    """Generate credit risk / delinquency snapshot."""
-    rows = []
-    now = datetime.now()
+                "revenue_share_pct": round(rng.uniform(0.5, 3.0), 2),
+            }
+
+def gen_credit_risk_snapshot(customers, accounts, rng=random, now=None):
+    """Generate credit risk / delinquency snapshot. `accounts` may be pre-indexed with accounts_by_customer()."""
+    now = now or datetime.now()
+    by_customer = accounts if isinstance(accounts, dict) else accounts_by_customer(accounts)
     
     for c in customers:
         if c["status"] == "closed": continue
-        cust_accts = [a for a in accounts if a["customer_id"] == c["customer_id"]]
+        cust_accts = by_customer.get(c["customer_id"], ())
         total_balance = sum(a["balance"] for a in cust_accts)
         total_credit = sum(a["credit_limit"] for a in cust_accts if a["credit_limit"] > 0)
         
         dpd = 0
         if c["risk_tier"] in ["subprime","deep_subprime"]:
-            dpd = random.choices([0,30,60,90,120,150], weights=[60,15,10,8,5,2])[0]
+            dpd = rng.choices([0,30,60,90,120,150], weights=[60,15,10,8,5,2])[0]
         elif c["risk_tier"] == "near_prime":
-            dpd = random.choices([0,30,60,90], weights=[80,12,5,3])[0]
+            dpd = rng.choices([0,30,60,90], weights=[80,12,5,3])[0]
         else:
-            dpd = random.choices([0,30,60], weights=[95,4,1])[0]
+            dpd = rng.choices([0,30,60], weights=[95,4,1])[0]
         
-        rows.append({
+        yield {
             "customer_id": c["customer_id"],
             "snapshot_date": now.strftime("%Y-%m-%d"),
             "fico_score": c["fico_score"],
@@ -495,93 +561,49 @@ def gen_credit_risk_snapshot(customers, accounts):
             "num_products": len(cust_accts),
             "days_past_due": dpd,
             "delinquency_status": {0:"current",30:"dpd_30",60:"dpd_60",90:"dpd_90"}.get(dpd, f"dpd_{dpd}"),
-            "probability_of_default": round(min(dpd / 500 + random.uniform(0, 0.05), 1.0), 4),
-            "loss_given_default": round(random.uniform(0.3, 0.8), 3),
-            "expected_loss": round(total_balance * min(dpd / 500, 0.5) * random.uniform(0.3, 0.8), 2),
-            "behavioral_score": random.randint(300, 850),
+            "probability_of_default": round(min(dpd / 500 + rng.uniform(0, 0.05), 1.0), 4),
+            "loss_given_default": round(rng.uniform(0.3, 0.8), 3),
+            "expected_loss": round(total_balance * min(dpd / 500, 0.5) * rng.uniform(0.3, 0.8), 2),
+            "behavioral_score": rng.randint(300, 850),
             "months_on_book": (now - datetime.strptime(c["acquisition_date"], "%Y-%m-%d")).days // 30,
-        })
-    return rows
+        }
 
-def gen_realtime_metrics(n_hours=336):
-    """Generate hourly real-time metrics (2 weeks)."""
-    rows = []
-    now = datetime.now()
+def gen_realtime_metrics(n_hours=336, rng=random, now=None, kpis=None):
+    """Generate hourly real-time metrics (2 weeks). `kpis` (rollups.realtime_view rows,
+    newest first) replaces the simulated fact-derived columns with the facts' own."""
+    now = now or datetime.now()
     for h in range(n_hours):
         ts = now - timedelta(hours=h)
         hour = ts.hour
         # Simulate daily patterns
         activity_mult = 0.3 + 0.7 * math.sin(math.pi * (hour - 6) / 12) if 6 <= hour <= 22 else 0.2
         
-        rows.append({
+        row = {
             "timestamp": ts.strftime("%Y-%m-%dT%H:00:00Z"),
-            "active_digital_users": int(random.gauss(45000 * activity_mult, 5000)),
-            "transactions_per_hour": int(random.gauss(12000 * activity_mult, 2000)),
-            "card_approvals_per_hour": int(random.gauss(800 * activity_mult, 150)),
-            "card_declines_per_hour": int(random.gauss(120 * activity_mult, 30)),
-            "loan_apps_per_hour": int(random.gauss(200 * activity_mult, 40)),
-            "fraud_alerts_per_hour": int(random.gauss(15, 5)),
-            "api_latency_ms": int(random.gauss(180, 40)),
-            "api_error_rate_pct": round(random.uniform(0.01, 0.5), 3),
-            "mobile_app_crashes": int(random.gauss(3, 2)),
-            "nps_score": round(random.gauss(72, 5), 1),
-            "avg_transaction_amount": round(random.gauss(67, 15), 2),
-            "total_deposits_hourly": round(random.gauss(2500000 * activity_mult, 500000), 2),
-            "total_withdrawals_hourly": round(random.gauss(1800000 * activity_mult, 400000), 2),
-            "rewards_redeemed_hourly": round(random.gauss(50000 * activity_mult, 10000), 2),
-        })
-    return rows
-
-def gen_mdm_match_pairs(customers):
-    """Generate MDM fuzzy match results."""
-    pairs = []
-    # Create candidate pairs from customers who might be duplicates
-    for i in range(400):
-        c1_idx = random.randint(0, len(customers)-1)
-        c2_idx = random.randint(0, len(customers)-1)
-        if c1_idx == c2_idx: continue
-        c1, c2 = customers[c1_idx], customers[c2_idx]
-        
-        # Simulate match scores
-        same_last = c1["last_name"] == c2["last_name"]
-        name_score = random.uniform(0.85, 0.99) if same_last else random.uniform(0.1, 0.6)
-        email_score = 1.0 if c1["email"] == c2["email"] else random.uniform(0.0, 0.3)
-        phone_score = random.uniform(0.7, 1.0) if c1["phone"][:8] == c2["phone"][:8] else random.uniform(0.0, 0.3)
-        addr_score = random.uniform(0.5, 0.95) if c1["state"] == c2["state"] else random.uniform(0.0, 0.4)
-        xsys_score = random.uniform(0.0, 0.2)
-        
-        composite = round(name_score * 0.30 + email_score * 0.25 + phone_score * 0.20 + addr_score * 0.15 + xsys_score * 0.10, 4)
-        
-        if composite < 0.3: continue  # Skip obvious non-matches
-        
-        tier = "auto_merge" if composite >= 0.92 else ("review" if composite >= 0.75 else "no_match")
-        
-        pairs.append({
-            "pair_id": uid("MPR", len(pairs)+1),
-            "customer_id_1": c1["customer_id"],
-            "source_system_1": c1["_source_system"],
-            "customer_id_2": c2["customer_id"],
-            "source_system_2": c2["_source_system"],
-            "name_score": round(name_score, 4),
-            "email_score": round(email_score, 4),
-            "phone_score": round(phone_score, 4),
-            "address_score": round(addr_score, 4),
-            "cross_system_score": round(xsys_score, 4),
-            "composite_score": composite,
-            "match_tier": tier,
-            "match_decision": random.choices(["merge","review","reject","pending"], weights=[40,25,25,10])[0] if tier != "no_match" else "reject",
-            "decided_by": "system" if tier == "auto_merge" else ("steward" if random.random() < 0.6 else "pending"),
-            "decided_at": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ") if random.random() > 0.2 else "",
-        })
-    return pairs
+            "active_digital_users": int(rng.gauss(45000 * activity_mult, 5000)),
+            "transactions_per_hour": int(rng.gauss(12000 * activity_mult, 2000)),
+            "card_approvals_per_hour": int(rng.gauss(800 * activity_mult, 150)),
+            "card_declines_per_hour": int(rng.gauss(120 * activity_mult, 30)),
+            "loan_apps_per_hour": int(rng.gauss(200 * activity_mult, 40)),
+            "fraud_alerts_per_hour": int(rng.gauss(15, 5)),
+            "api_latency_ms": int(rng.gauss(180, 40)),
+            "api_error_rate_pct": round(rng.uniform(0.01, 0.5), 3),
+            "mobile_app_crashes": int(rng.gauss(3, 2)),
+            "nps_score": round(rng.gauss(72, 5), 1),
+            "avg_transaction_amount": round(rng.gauss(67, 15), 2),
+            "total_deposits_hourly": round(rng.gauss(2500000 * activity_mult, 500000), 2),
+            "total_withdrawals_hourly": round(rng.gauss(1800000 * activity_mult, 400000), 2),
+            "rewards_redeemed_hourly": round(rng.gauss(50000 * activity_mult, 10000), 2),
+        }
+        if kpis: row.update((c, kpis[h][c]) for c in rollups.KPI_COLUMNS)
+        yield row
 
 def gen_dim_date():
     """Generate date dimension."""
-    rows = []
     start = datetime(2023, 1, 1)
     for i in range(1095):  # 3 years
         d = start + timedelta(days=i)
-        rows.append({
+        yield {
             "date_key": d.strftime("%Y-%m-%d"),
             "year": d.year,
             "quarter": (d.month - 1) // 3 + 1,
@@ -593,8 +615,227 @@ def gen_dim_date():
             "is_holiday": d.month == 12 and d.day == 25,
             "fiscal_year": d.year if d.month >= 10 else d.year - 1,
             "fiscal_quarter": ((d.month - 10) % 12) // 3 + 1,
-        })
-    return rows
+        }
+
+# ═══════════════════════════════════════════════
+# COLUMNAR (NUMPY) BACKEND
+# ═══════════════════════════════════════════════
+# Each function returns one batch as {column: array} in the same column order as
+# its row-backend twin. Timestamps are int64 epoch seconds until formatting.
+
+SCREEN_NAMES = [p.replace("/","").replace("-","_") for p in DIGITAL_PAGES]
+MCC_CODES = [m["mcc"] for m in MCC_CATEGORIES]
+MCC_NAMES = [m["category"] for m in MCC_CATEGORIES]
+MCC_AVG = [m["avg_txn"] for m in MCC_CATEGORIES]
+
+def np_pool(name):
+    """Columnar view of an FK pool (tuple of arrays), built once per process."""
+    key = f"{name}:np"
+    if key not in _POOLS:
+        _POOLS[key] = tuple(np.array(col) for col in zip(*_POOLS[name]))
+    return _POOLS[key]
+
+def np_choice(rng, spec, n):
+    """Weighted categorical draw from a (values, weights) spec."""
+    values, weights = spec
+    p = np.asarray(weights, dtype=float)
+    return np.asarray(values)[rng.choice(len(values), size=n, p=p / p.sum())]
+
+def np_timestamps(rng, now, days, n):
+    """Vectorized rts(): a random second on a random day in [now - days, now]."""
+    day0 = np.datetime64((now - timedelta(days=days)).date(), "s").astype(np.int64)
+    return day0 + rng.integers(0, days + 1, n) * 86400 + rng.integers(0, 86400, n)
+
+def np_iso(epoch_s, unit="s"): return epoch_s.astype(f"datetime64[{unit}]").astype(str)
+
+def np_ids(prefix, first_id, n):
+    return np.char.add(f"{prefix}-", np.char.zfill(np.arange(first_id, first_id + n).astype(str), 5))
+
+def transaction_columns(cards, lo, hi, first_id, rng, now):
+    """Columnar twin of transaction_rows()."""
+    n = hi - lo
+    acct_ids, cust_ids = np_pool("cards")
+    pick = rng.integers(0, len(acct_ids), n)
+    mcc = rng.integers(0, len(MCC_CATEGORIES), n)
+    avg = np.asarray(MCC_AVG, dtype=float)[mcc]
+    amt = np.round(rng.normal(avg, avg * 0.4), 2)
+    low = amt < 1
+    amt[low] = np.round(rng.uniform(1, 20, int(low.sum())), 2)
+    amt = np.abs(amt)
+    ts = np_timestamps(rng, now, 365, n)
+    category = np.asarray(MCC_NAMES)[mcc]
+    return {
+        "transaction_id": np_ids("TXN", first_id, n),
+        "account_id": acct_ids[pick],
+        "customer_id": cust_ids[pick],
+        "transaction_date": np.char.add(np_iso(ts), "Z"),
+        "post_date": np_iso(ts // 86400 + rng.integers(0, 3, n), "D"),
+        "amount": amt,
+        "transaction_type": np_choice(rng, TXN_TYPES, n),
+        "mcc_code": np.asarray(MCC_CODES)[mcc],
+        "merchant_category": category,
+        "merchant_name": np.char.add(np.char.add(category, " Store #"), rng.integers(100, 1000, n).astype(str)),
+        "channel": np_choice(rng, TXN_CHANNELS, n),
+        "currency": np.full(n, "USD"),
+        "rewards_earned": np.round(amt * rng.uniform(0.01, 0.05, n), 2),
+        "is_international": rng.random(n) < 0.08,
+        "is_disputed": rng.random(n) < 0.02,
+        "fraud_flag": rng.random(n) < 0.008,
+    }
+
+def digital_event_columns(digital_custs, lo, hi, first_id, rng, now):
+    """Columnar twin of digital_event_rows(). Session IDs still need one md5 per row."""
+    n = hi - lo
+    cust_ids, mobile = np_pool("digital")
+    pick = rng.integers(0, len(cust_ids), n)
+    cid = cust_ids[pick]
+    ts = np_timestamps(rng, now, 180, n)
+    hour_key = np.char.replace(np.char.replace(np_iso(ts, "h"), "-", ""), "T", "")
+    sessions = [f"sess_{hashlib.md5(f'{c}-{h}'.encode()).hexdigest()[:12]}" for c, h in zip(cid.tolist(), hour_key.tolist())]
+    err = rng.random(n) < 0.02
+    return {
+        "event_id": np_ids("EVT", first_id, n),
+        "customer_id": cid,
+        "session_id": sessions,
+        "timestamp": np.char.add(np_iso(ts), "Z"),
+        "event_type": np_choice(rng, EVENT_TYPES, n),
+        "page_url": np.asarray(DIGITAL_PAGES)[rng.integers(0, len(DIGITAL_PAGES), n)],
+        "platform": np.where(mobile[pick].astype(bool) & (rng.random(n) < 0.65), "mobile_app", "web"),
+        "device_type": np_choice(rng, DEVICE_TYPES, n),
+        "os_version": np.asarray(OS_VERSIONS)[rng.integers(0, len(OS_VERSIONS), n)],
+        "app_version": np.asarray(APP_VERSIONS)[rng.integers(0, len(APP_VERSIONS), n)],
+        "screen_name": np.asarray(SCREEN_NAMES)[rng.integers(0, len(SCREEN_NAMES), n)],
+        "duration_seconds": rng.integers(2, 181, n),
+        "referrer": np_choice(rng, REFERRERS, n),
+        "conversion_event": rng.random(n) < 0.03,
+        "error_code": np.where(err, np.char.add("ERR_", rng.integers(400, 600, n).astype(str)), ""),
+        "geo_lat": np.round(rng.uniform(25, 48, n), 4),
+        "geo_lon": np.round(rng.uniform(-122, -71, n), 4),
+    }
+
+def realtime_metric_columns(n_hours, rng, now, kpis=None):
+    """Columnar twin of gen_realtime_metrics()."""
+    hours = np.datetime64(now, "s") - np.arange(n_hours) * np.timedelta64(1, "h")
+    hour = (hours.astype("datetime64[h]").astype(np.int64) % 24)
+    activity_mult = np.where((6 <= hour) & (hour <= 22), 0.3 + 0.7 * np.sin(np.pi * (hour - 6) / 12), 0.2)
+    gauss_int = lambda mu, sd: np.trunc(rng.normal(mu, sd, n_hours)).astype(np.int64)
+    columns = {
+        "timestamp": np.char.add(np_iso(hours, "h"), ":00:00Z"),
+        "active_digital_users": gauss_int(45000 * activity_mult, 5000),
+        "transactions_per_hour": gauss_int(12000 * activity_mult, 2000),
+        "card_approvals_per_hour": gauss_int(800 * activity_mult, 150),
+        "card_declines_per_hour": gauss_int(120 * activity_mult, 30),
+        "loan_apps_per_hour": gauss_int(200 * activity_mult, 40),
+        "fraud_alerts_per_hour": gauss_int(15, 5),
+        "api_latency_ms": gauss_int(180, 40),
+        "api_error_rate_pct": np.round(rng.uniform(0.01, 0.5, n_hours), 3),
+        "mobile_app_crashes": gauss_int(3, 2),
+        "nps_score": np.round(rng.normal(72, 5, n_hours), 1),
+        "avg_transaction_amount": np.round(rng.normal(67, 15, n_hours), 2),
+        "total_deposits_hourly": np.round(rng.normal(2500000 * activity_mult, 500000), 2),
+        "total_withdrawals_hourly": np.round(rng.normal(1800000 * activity_mult, 400000), 2),
+        "rewards_redeemed_hourly": np.round(rng.normal(50000 * activity_mult, 10000), 2),
+    }
+    if kpis: columns.update((c, np.array([k[c] for k in kpis])) for c in rollups.KPI_COLUMNS)
+    return columns
+
+# ═══════════════════════════════════════════════
+# SHARDED FACT GENERATION
+# ═══════════════════════════════════════════════
+
+SHARD_ROWS = 50_000           # transactions / events per shard
+SHARD_LOAN_ACCOUNTS = 2_500   # loan accounts per payment shard
+
+# table → (row generator, FK pool it samples from)
+FACT_SHARDS = {
+    "fact_transactions": (transaction_rows, "cards"),
+    "fact_loan_payments": (loan_payment_rows, "loans"),
+    "digital_events": (digital_event_rows, "digital"),
+}
+# tables with a columnar twin; the rest fall back to the row backend
+COLUMNAR_SHARDS = {
+    "fact_transactions": (transaction_columns, "cards"),
+    "digital_events": (digital_event_columns, "digital"),
+}
+# table → (event-time column, partition key prefix) for --partition-grain
+PARTITIONS = {
+    "fact_transactions": ("transaction_date", "transaction"),
+    "fact_loan_payments": ("due_date", "due"),
+    "digital_events": ("timestamp", "event"),
+}
+_POOLS = {}
+
+def derive_seed(seed, table, shard=0):
+    """Stable 64-bit seed for one (table, shard) — independent of call order and worker count."""
+    return int.from_bytes(hashlib.sha256(f"{seed}/{table}/{shard}".encode()).digest()[:8], "big")
+
+def table_rng(seed, table): return random.Random(derive_seed(seed, table))
+
+def _init_pools(pools):
+    _POOLS.clear()  # also drops cached columnar views of the previous pools
+    _POOLS.update(pools)
+
+def _shard_writer(path, partition, output):
+    if partition is None: return storage.TableWriter(path, **output)
+    stem = os.path.splitext(path)[0]
+    return storage.PartitionedWriter(os.path.dirname(stem), part=os.path.basename(stem), **partition, **output)
+
+def _run_shard(task):
+    """Worker entry point: generate one shard into its own part file (or, when
+    partitioned, one part file per partition it touches)."""
+    table, lo, hi, first_id, seed, now, path, backend, output, partition = task
+    with _shard_writer(path, partition, output) as w:
+        if backend == "numpy" and table in COLUMNAR_SHARDS:
+            gen, pool = COLUMNAR_SHARDS[table]
+            w.write_columns(gen(_POOLS[pool], lo, hi, first_id, np.random.default_rng(seed), now))
+        else:
+            gen, pool = FACT_SHARDS[table]
+            w.write_rows(gen(_POOLS[pool], lo, hi, first_id, random.Random(seed), now))
+    return w.rows_written, getattr(w, "stats", None)
+
+def row_shards(n, size=SHARD_ROWS):
+    """(lo, hi, first_id) ranges for a table with a fixed row count."""
+    return [(lo, min(lo + size, n), lo + 1) for lo in range(0, n, size)]
+
+def loan_shards(loans, now, size=SHARD_LOAN_ACCOUNTS):
+    """(lo, hi, first_id) account ranges; payment IDs are offset by the deterministic payment counts."""
+    shards, first_id = [], 1
+    for lo in range(0, len(loans), size):
+        hi = min(lo + size, len(loans))
+        shards.append((lo, hi, first_id))
+        first_id += sum(n_loan_payments(l[2], now) for l in loans[lo:hi])
+    return shards
+
+def write_sharded(path, table, shards, seed, now, workers=1, backend="python", output=None, grain=None):
+    """Generate a fact table shard-by-shard (across processes if workers > 1), then
+    stitch the part files in shard order. With a partition grain the table becomes a
+    `<table>/<key>=<value>/part-00000.*` directory plus `_manifest.json`.
+    Returns the number of rows written."""
+    output = output or OUTPUT
+    partition = None
+    if grain not in (None, "none") and table in PARTITIONS:
+        column, base = PARTITIONS[table]
+        partition = {"column": column, "key": storage.partition_key(base, grain), "grain": grain}
+    storage.reset_table(path)
+    stem = storage.table_dir(path)
+    parts = [os.path.join(stem, f"shard-{k:05d}.csv") if partition else f"{stem}.part-{k:05d}.csv" for k in range(len(shards))]
+    tasks = [(table, lo, hi, first_id, derive_seed(seed, table, k), now, parts[k], backend, output, partition)
+             for k, (lo, hi, first_id) in enumerate(shards)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(min(workers, len(tasks)), initializer=_init_pools, initargs=(dict(_POOLS),)) as ex:
+            results = list(ex.map(_run_shard, tasks))
+    else:
+        results = [_run_shard(t) for t in tasks]
+    if partition:
+        stats = storage.merge_partition_stats(r[1] for r in results)
+        names = [os.path.splitext(os.path.basename(p))[0] for p in parts]
+        manifest = storage.finish_partitions(stem, stats=stats, parts=names, **partition, **output)
+        if manifest["rows"]: print(f"  ✓ {os.path.basename(stem) + '/' + partition['key'] + '=*':40s} → {manifest['rows']:>6,} rows in {len(stats)} partitions")
+    else:
+        storage.concat_parts(path, parts, **output)
+    n = sum(r[0] for r in results)
+    if n and not partition: report(path, n, output["formats"])
+    return n
 
 # ═══════════════════════════════════════════════
 # MAIN
@@ -603,89 +844,127 @@ def gen_dim_date():
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--company", default=COMPANY)
+    parser.add_argument("--scale-factor", type=float, default=1.0, help="Linear row-count multiplier (1.0 ≈ 103K records)")
+    parser.add_argument("--output-dir", default=None, help="Write the data/ layers here instead of the repo data/ folder")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for the sharded fact tables")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--as-of", default=None, help="Pin 'now' (YYYY-MM-DD[THH:MM:SS]) for reproducible runs")
+    parser.add_argument("--backend", choices=["python", "numpy"], default="python", help="Row-at-a-time or vectorized fact generators")
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default="csv", help="Output file format(s)")
+    parser.add_argument("--compression", choices=["snappy", "zstd", "none"], default="snappy", help="Parquet compression codec")
+    parser.add_argument("--row-group-size", type=int, default=storage.ROW_GROUP_SIZE, help="Rows per Parquet row group")
+    parser.add_argument("--partition-grain", choices=["none", *storage.GRAINS], default="none",
+                        help="Hive-partition the fact tables by event date at this grain")
     args = parser.parse_args()
+    sf, seed, workers = args.scale_factor, args.seed, max(1, args.workers)
+    if sf <= 0: parser.error("--scale-factor must be positive")
+    if args.backend == "numpy" and np is None: parser.error("--backend numpy requires numpy (pip install numpy)")
+    backend, grain = args.backend, args.partition_grain
+    formats = storage.FORMATS if args.format == "both" else (args.format,)
+    if "parquet" in formats and storage.pa is None: parser.error("--format parquet requires pyarrow (pip install pyarrow)")
+    OUTPUT["formats"] = formats
+    if "parquet" in formats: OUTPUT.update(compression=args.compression, row_group_size=args.row_group_size)
+    now = datetime.fromisoformat(args.as_of) if args.as_of else datetime.now()
+    global DATA
+    if args.output_dir: DATA = args.output_dir
     
     print(f"\n{'='*60}")
     print(f"  {args.company} — MDM Lakehouse Data Generator")
+    print(f"  Scale factor: {sf:g} | Workers: {workers} | Seed: {seed} | Backend: {backend} | Format: {'+'.join(formats)}")
     print(f"{'='*60}\n")
     
-    # 1. Customers
+    total = 0
+    # 1. Customers (materialized: bronze, accounts, events and risk all sample from them)
     print("▶ Generating customers...")
-    customers = gen_customers(2000)
-    write_csv(out("gold", "dim_customer.csv"), customers)
+    customers = list(gen_customers(scaled(2000, sf), table_rng(seed, "dim_customer"), now))
+    total += write_table(out("gold", "dim_customer.csv"), customers)
     
     # 2. Bronze sources
     print("\n▶ Generating bronze source systems...")
-    core, sfdc, fiserv = gen_bronze_sources(customers)
-    write_csv(out("bronze", "core_banking_customers.csv"), core)
-    write_csv(out("bronze", "salesforce_accounts.csv"), sfdc)
-    write_csv(out("bronze", "fiserv_parties.csv"), fiserv)
+    core, sfdc, fiserv = gen_bronze_sources(customers, sf, table_rng(seed, "bronze"))
+    total += write_table(out("bronze", "core_banking_customers.csv"), core)
+    total += write_table(out("bronze", "salesforce_accounts.csv"), sfdc)
+    total += write_table(out("bronze", "fiserv_parties.csv"), fiserv)
     
-    # 3. Accounts
+    # 3. Accounts (materialized: facts join back to them)
     print("\n▶ Generating financial accounts...")
-    accounts = gen_accounts(customers)
-    write_csv(out("gold", "dim_account.csv"), accounts)
+    accounts = list(gen_accounts(customers, table_rng(seed, "dim_account"), now))
+    total += write_table(out("gold", "dim_account.csv"), accounts)
     
     # 4. Products — normalize to common schema
     print("\n▶ Writing product catalog...")
     all_keys = set()
     for p in ALL_PRODUCTS: all_keys.update(p.keys())
     normalized = [{k: p.get(k, "") for k in sorted(all_keys)} for p in ALL_PRODUCTS]
-    write_csv(out("gold", "dim_product.csv"), normalized)
+    total += write_table(out("gold", "dim_product.csv"), normalized)
+    
+    _init_pools({"cards": card_pool(accounts), "loans": loan_pool(accounts), "digital": digital_pool(customers)})
     
-    # 5. Transactions
+    # 5. Transactions — sharded
     print("\n▶ Generating card transactions...")
-    txns = gen_transactions(accounts, 30000)
-    write_csv(out("gold", "fact_transactions.csv"), txns)
+    total += write_sharded(out("gold", "fact_transactions.csv"), "fact_transactions",
+                           row_shards(scaled(30000, sf)), seed, now, workers, backend=backend, grain=grain)
     
     # 6. Loan payments
     print("\n▶ Generating loan payment history...")
-    payments = gen_loan_payments(accounts)
-    write_csv(out("gold", "fact_loan_payments.csv"), payments)
+    total += write_sharded(out("gold", "fact_loan_payments.csv"), "fact_loan_payments",
+                           loan_shards(_POOLS["loans"], now), seed, now, workers, grain=grain)
     
     # 7. Digital events
     print("\n▶ Generating digital/mobile events...")
-    events = gen_digital_events(customers, 40000)
-    write_csv(out("clickstream", "digital_events.csv"), events)
+    total += write_sharded(out("clickstream", "digital_events.csv"), "digital_events",
+                           row_shards(scaled(40000, sf)), seed, now, workers, backend=backend, grain=grain)
     
-    # 8. Fraud alerts
-    print("\n▶ Generating fraud/AML alerts...")
-    alerts = gen_fraud_alerts(txns)
-    write_csv(out("fraud", "fraud_alerts.csv"), alerts)
+    # 8. Fraud alerts — the streaming velocity engine replays the transactions in event-time order
+    print("\n▶ Scoring transactions for fraud/AML alerts...")
+    txns = fraud_velocity.event_time_order(out("gold", "fact_transactions.csv"))
+    total += write_table(out("fraud", "fraud_alerts.csv"), gen_fraud_alerts(txns, scaled(800, sf), table_rng(seed, "fraud_alerts")))
     
     # 9. Partners
     print("\n▶ Generating partner performance...")
-    partners = gen_partner_performance()
-    write_csv(out("partners", "partner_performance.csv"), partners)
+    total += write_table(out("partners", "partner_performance.csv"), gen_partner_performance(table_rng(seed, "partner_performance"), now))
     
     # 10. Credit risk
     print("\n▶ Generating credit risk snapshot...")
-    risk = gen_credit_risk_snapshot(customers, accounts)
-    write_csv(out("gold", "fact_credit_risk.csv"), risk)
+    total += write_table(out("gold", "fact_credit_risk.csv"), gen_credit_risk_snapshot(customers, accounts, table_rng(seed, "fact_credit_risk"), now))
     
-    # 11. Real-time metrics
-    print("\n▶ Generating real-time metrics...")
-    metrics = gen_realtime_metrics(336)
-    write_csv(out("realtime", "hourly_metrics.csv"), metrics)
+    # 11. Real-time metrics — the fact-derived KPIs come from rollups of steps 5, 7 and 8
+    print("\n▶ Rolling up facts and generating real-time metrics...")
+    store = rollups.store_path(DATA)
+    if os.path.exists(store): os.remove(store)  # every fact table was just rewritten
+    with rollups.RollupStore(store) as rs:
+        rollups.refresh(rs, DATA)
+        kpis = rollups.realtime_view(rs, now, 336)
+    metrics_path = out("realtime", "hourly_metrics.csv")
+    if backend == "numpy":
+        total += write_table_columns(metrics_path, realtime_metric_columns(336, np.random.default_rng(derive_seed(seed, "hourly_metrics")), now, kpis))
+    else:
+        total += write_table(metrics_path, gen_realtime_metrics(336, table_rng(seed, "hourly_metrics"), now, kpis))
     
-    # 12. MDM match pairs
-    print("\n▶ Generating MDM match pairs...")
-    pairs = gen_mdm_match_pairs(customers)
-    write_csv(out("mdm", "mdm_match_pairs.csv"), pairs)
+    # 12. MDM match pairs — the real matcher, run over the bronze tables written above
+    print("\n▶ Matching bronze sources (MDM)...")
+    total += write_table(out("mdm", "mdm_match_pairs.csv"), mdm_matching.match_bronze(os.path.join(DATA, "bronze"), now=now))
+    n_golden, n_decisions = golden_records.write_golden_records(DATA, **OUTPUT)
+    report(out("mdm", "golden_records.csv"), n_golden, formats)
+    report(out("mdm", "survivorship_log.csv"), n_decisions, formats)
+    total += n_golden + n_decisions
     
     # 13. Date dimension
     print("\n▶ Generating date dimension...")
-    dates = gen_dim_date()
-    write_csv(out("gold", "dim_date.csv"), dates)
+    total += write_table(out("gold", "dim_date.csv"), gen_dim_date())
     
-    # Summary
-    total = len(customers) + len(core) + len(sfdc) + len(fiserv) + len(accounts) + len(ALL_PRODUCTS) + len(txns) + len(payments) + len(events) + len(alerts) + len(partners) + len(risk) + len(metrics) + len(pairs) + len(dates)
+    # 14. Dashboard cubes — one payload per FinServ_Dashboard.jsx tab
+    print("\n▶ Building dashboard cubes...")
+    cubes = dashboard_cubes.build(DATA, os.path.join(DATA, "dashboards"), force=True)
+    print(f"  ✓ {len(cubes['built'])} tabs, {sum(cubes['bytes'].values()) / 1024:.1f} KB → dashboards/")
     
+    # Summary
     print(f"\n{'='*60}")
     print(f"  GENERATION COMPLETE")
     print(f"  Company: {args.company}")
     print(f"  Total records: {total:,}")
-    print(f"  CSV files: {sum(1 for r,d,f in os.walk(DATA) for fi in f if fi.endswith('.csv'))}")
+    for fmt in formats:
+        print(f"  {fmt.upper()} files: {sum(1 for r,d,f in os.walk(DATA) for fi in f if fi.endswith(storage.EXTENSIONS[fmt]))}")
     print(f"{'='*60}\n")
 
 if __name__ == "__main__":
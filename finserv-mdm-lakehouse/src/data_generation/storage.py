@@ -0,0 +1,543 @@
+"""
+Lakehouse Table Storage — pluggable writers and readers
+=========================================================
+One output layer for every generated table. Writers accept either row dicts
+(streamed in chunks) or columnar batches ({column: numpy array | list}) and
+fan out to each requested format:
+
+  csv      csv.DictWriter text, identical to the original write_csv output
+  parquet  typed columns (int64/float64/bool/date32/timestamp[s, UTC]), row
+           groups of `row_group_size`, dictionary encoding for low-cardinality
+           string columns, optional zstd/snappy compression (needs pyarrow)
+
+Fact tables can also be written Hive-style — one `key=value` directory per
+day/month/year of their event-time column — with a `_manifest.json` listing
+each partition's row count and min/max, so readers prune instead of scanning.
+
+Readers (`iter_rows`) return the same rows from either format and either
+layout; pass text=True to get CSV-style strings from Parquet so existing
+string-based consumers keep working unchanged. `iter_columns` streams the same
+text as columnar batches for scans that work column by column.
+"""
+import csv, os, json, shutil, zlib
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:  # optional — only Parquet output/input needs it
+    pa = pc = pacsv = pq = None
+
+FORMATS = ("csv", "parquet")
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+ROW_GROUP_SIZE = 128_000
+CHUNK_ROWS = 10_000           # rows handed to each writer at a time
+DICT_MAX_RATIO = 0.2          # string columns with distinct/rows below this get dictionary pages
+WIDENED_KEY = b"widened_ints"  # Parquet schema metadata: JSON list of int64 columns stored as double
+
+DATE_RE = r"^\d{4}-\d{2}-\d{2}$"
+TIMESTAMP_RE = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$"
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet support requires pyarrow (pip install pyarrow)")
+
+def with_format(path, fmt):
+    """Swap the extension of `path` for the one belonging to `fmt`."""
+    return os.path.splitext(path)[0] + EXTENSIONS[fmt]
+
+def existing_format(path):
+    """First format in which `path` exists on disk (csv preferred), else None."""
+    for fmt in FORMATS:
+        if os.path.exists(with_format(path, fmt)): return fmt
+    return None
+
+def table_dir(path):
+    """Directory that holds the partitioned form of the table at `path`."""
+    return os.path.splitext(path)[0]
+
+def reset_table(path):
+    """Remove every stored form (single files and partitioned directory) of a table."""
+    for fmt in FORMATS:
+        if os.path.exists(with_format(path, fmt)): os.remove(with_format(path, fmt))
+    if os.path.isdir(table_dir(path)): shutil.rmtree(table_dir(path))
+
+# ═══════════════════════════════════════════════
+# WRITERS
+# ═══════════════════════════════════════════════
+
+def format_column(col):
+    """Render a typed column the way csv.DictWriter renders the equivalent Python values."""
+    if isinstance(col, list): return col
+    if col.dtype == bool: return ["True" if v else "False" for v in col.tolist()]
+    return col.astype(str).tolist()
+
+class CsvWriter:
+    """Streams rows/batches to CSV; the file is only created once a row arrives."""
+    def __init__(self, path):
+        self.path, self.rows_written = path, 0
+        self._f = self._raw = self._dict = None
+
+    def _open(self, fieldnames):
+        self._f = open(self.path, "w", newline="")
+        self._raw = csv.writer(self._f)
+        self._dict = csv.DictWriter(self._f, fieldnames=fieldnames)
+        self._raw.writerow(fieldnames)
+
+    def write_rows(self, rows):
+        if not rows: return
+        if self._f is None: self._open(list(rows[0].keys()))
+        self._dict.writerows(rows)
+        self.rows_written += len(rows)
+
+    def write_columns(self, columns):
+        n = len(next(iter(columns.values()), []))
+        if not n: return
+        if self._f is None: self._open(list(columns))
+        self._raw.writerows(zip(*(format_column(c) for c in columns.values())))
+        self.rows_written += n
+
+    def close(self):
+        if self._f: self._f.close()
+
+def to_arrow(columns):
+    """Build a pyarrow Table from {column: list | numpy array}, inferring typed columns.
+    Empty strings become nulls in non-string columns; list columns mixing ints and floats
+    are listed under WIDENED_KEY."""
+    arrays, widened = {}, []
+    for name, col in columns.items():
+        if not isinstance(col, list):
+            arr = pa.array(col)
+        else:
+            kinds = {type(v) for v in col if v != "" and v is not None}
+            if kinds == {bool}: typ = pa.bool_()
+            elif kinds and kinds <= {int}: typ = pa.int64()
+            elif kinds and kinds <= {int, float}: typ, widened = pa.float64(), widened + [name] * (int in kinds)
+            else: typ = None
+            if typ is None:
+                arr = pa.array(col if kinds <= {str} else [v if isinstance(v, str) or v is None else str(v) for v in col], pa.string())
+            else:
+                arr = pa.array([None if v == "" else v for v in col], typ)
+        if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+            arr = _sniff_temporal(arr)
+        arrays[name] = arr
+    return pa.table(arrays, metadata={WIDENED_KEY: json.dumps(widened)} if widened else None)
+
+def _sniff_temporal(arr):
+    """Promote ISO date / 'Z' timestamp string columns to date32 / timestamp[s, UTC]."""
+    values = pc.if_else(pc.equal(arr, ""), pa.scalar(None, arr.type), arr)
+    if values.null_count == len(values): return pa.nulls(len(arr))  # no evidence either way — defer to other chunks
+    for pattern, fmt, typ in ((DATE_RE, "%Y-%m-%d", pa.date32()), (TIMESTAMP_RE, "%Y-%m-%dT%H:%M:%SZ", pa.timestamp("s", tz="UTC"))):
+        if pc.all(pc.match_substring_regex(values, pattern)).as_py():
+            return pc.strptime(values, format=fmt, unit="s").cast(typ)
+    return arr
+
+def unify_schemas(schemas):
+    """Merge schemas column by column: null defers to the other type, int64+float64
+    widens to float64, anything else that disagrees becomes string."""
+    fields = {}
+    for schema in schemas:
+        for f in schema:
+            t = fields.get(f.name)
+            if t is None or pa.types.is_null(t): fields[f.name] = f.type
+            elif pa.types.is_null(f.type) or t == f.type: continue
+            elif {str(t), str(f.type)} == {"int64", "double"}: fields[f.name] = pa.float64()
+            else: fields[f.name] = pa.string()
+    return pa.schema(list(fields.items()))
+
+class ParquetWriter:
+    """Buffers rows/batches into fixed-size row groups and writes one Parquet file.
+    The schema and dictionary-encoded columns are fixed by the first row group, except
+    that an int64 column which later receives floats widens to double: the row groups
+    already written are rewritten once with the wider schema. Widened columns are listed
+    under WIDENED_KEY in the schema metadata so text readers print their whole values as ints."""
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE, compression="snappy", dictionary=None):
+        require_pyarrow()
+        self.path, self.row_group_size = path, row_group_size
+        self.compression, self.dictionary = compression or "none", dictionary
+        self.rows_written, self.schema, self._use_dictionary, self._widened = 0, None, None, set()
+        self._rows, self._tables, self._buffered, self._writer = [], [], 0, None
+
+    def write_rows(self, rows):
+        self._rows.extend(rows)
+        if len(self._rows) >= self.row_group_size: self._flush_rows()
+
+    def write_columns(self, columns):
+        self._flush_rows()
+        self._add(to_arrow(columns))
+
+    def write_table(self, table):
+        self._flush_rows()
+        self._add(table)
+
+    def _flush_rows(self):
+        if not self._rows: return
+        rows, self._rows = self._rows, []
+        self._add(to_arrow({k: [r[k] for r in rows] for k in rows[0]}))
+
+    def _add(self, table):
+        if not table.num_rows: return
+        self._tables.append(table)
+        self._buffered += table.num_rows
+        while self._buffered >= self.row_group_size: self._emit(self.row_group_size)
+
+    def _emit(self, limit):
+        sources = ([self.schema] if self.schema else []) + [t.schema for t in self._tables]
+        schema = unify_schemas(sources)
+        ints = {f.name for s in sources for f in s if str(f.type) == "int64"}
+        ints |= {c for s in sources if s.metadata and WIDENED_KEY in s.metadata for c in json.loads(s.metadata[WIDENED_KEY])}
+        self._widened |= {f.name for f in schema if f.name in ints and str(f.type) == "double"}
+        if self._widened: schema = schema.with_metadata({WIDENED_KEY: json.dumps(sorted(self._widened))})
+        if self.schema is None:  # columns still untyped after a whole row group are strings
+            schema = pa.schema([(f.name, pa.string() if pa.types.is_null(f.type) else f.type) for f in schema], schema.metadata)
+        elif schema != self.schema:
+            widened = [a.name for a, b in zip(self.schema, schema) if a.type != b.type]
+            if schema.names != self.schema.names or any(str(self.schema.field(c).type) != "int64" or str(schema.field(c).type) != "double"
+                                                        for c in widened):
+                raise ValueError(f"{self.path}: column types changed after the first row group ({self.schema} → {schema})")
+            self._widen(schema)
+        table = pa.concat_tables([t.cast(schema) for t in self._tables])
+        head, rest = table.slice(0, limit), table.slice(limit)
+        if self._writer is None:
+            self.schema, self._use_dictionary = schema, self._dictionary_columns(head)
+            self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression, use_dictionary=self._use_dictionary)
+        self._writer.write_table(head, row_group_size=limit)
+        self.rows_written += head.num_rows
+        self._tables, self._buffered = ([rest] if rest.num_rows else []), rest.num_rows
+
+    def _widen(self, schema):
+        """Rewrite the row groups written so far under `schema` (int64 columns as double)."""
+        self._writer.close()
+        old = self.path + ".narrow"
+        os.replace(self.path, old)
+        self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression, use_dictionary=self._use_dictionary)
+        written = pq.ParquetFile(old)
+        for i in range(written.num_row_groups): self._writer.write_table(written.read_row_group(i).cast(schema), row_group_size=self.row_group_size)
+        written.close()
+        os.remove(old)
+        self.schema = schema
+
+    def _dictionary_columns(self, table):
+        if self.dictionary is not None: return list(self.dictionary)
+        cols = []
+        for name in table.column_names:
+            col = table[name]
+            if pa.types.is_string(col.type) and pc.count_distinct(col).as_py() <= max(1, DICT_MAX_RATIO * len(col)):
+                cols.append(name)
+        return cols
+
+    def close(self):
+        self._flush_rows()
+        if self._buffered: self._emit(self._buffered)
+        if self._writer: self._writer.close()
+
+WRITERS = {"csv": CsvWriter, "parquet": ParquetWriter}
+
+class TableWriter:
+    """Fans one stream of rows or column batches out to a writer per format."""
+    def __init__(self, path, formats=("csv",), **parquet_opts):
+        self.writers = [WRITERS[fmt](with_format(path, fmt), **(parquet_opts if fmt == "parquet" else {}))
+                        for fmt in formats]
+
+    @property
+    def rows_written(self): return self.writers[0].rows_written if self.writers else 0
+
+    def write_rows(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, CHUNK_ROWS))
+            if not chunk: break
+            for w in self.writers: w.write_rows(chunk)
+
+    def write_columns(self, columns):
+        for w in self.writers: w.write_columns(columns)
+
+    def close(self):
+        for w in self.writers: w.close()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+def write_rows(path, rows, formats=("csv",), **parquet_opts):
+    """Stream an iterable of row dicts to every format. Returns the number of rows written."""
+    with TableWriter(path, formats, **parquet_opts) as w:
+        w.write_rows(rows)
+    return w.rows_written
+
+def write_columns(path, columns, formats=("csv",), **parquet_opts):
+    """Write one columnar batch to every format. Returns the number of rows written."""
+    with TableWriter(path, formats, **parquet_opts) as w:
+        w.write_columns(columns)
+    return w.rows_written
+
+def append_rows(path, rows, formats=("csv",), **parquet_opts):
+    """Append row dicts to an existing table (or create it). CSV appends in place under
+    the existing header; Parquet has no append, so the file is rewritten with the
+    new rows as a trailing part. Returns the number of rows appended."""
+    rows = list(rows)
+    if not rows: return 0
+    for fmt in formats:
+        dest = with_format(path, fmt)
+        if not os.path.exists(dest):
+            write_rows(path, rows, (fmt,), **parquet_opts)
+        elif fmt == "csv":
+            with open(dest, newline="") as f: header = next(csv.reader(f))
+            with open(dest, "a", newline="") as f: csv.DictWriter(f, fieldnames=header).writerows(rows)
+        else:
+            stem = os.path.splitext(dest)[0]
+            os.replace(dest, stem + ".part-00000.parquet")
+            write_rows(stem + ".part-00001.csv", rows, (fmt,), **parquet_opts)
+            concat_parts(path, [stem + ".part-00000.csv", stem + ".part-00001.csv"], (fmt,), **parquet_opts)
+    return len(rows)
+
+def concat_parts(path, parts, formats=("csv",), **parquet_opts):
+    """Stitch per-shard part files (given by their .csv names) into `path` for every
+    format, in part order, and delete the parts."""
+    for fmt in formats:
+        files = [p for p in (with_format(part, fmt) for part in parts) if os.path.exists(p)]
+        if not files: continue
+        dest = with_format(path, fmt)
+        if fmt == "csv":
+            with open(dest, "wb") as dst:
+                for k, part in enumerate(files):
+                    with open(part, "rb") as src:
+                        if k: src.readline()
+                        shutil.copyfileobj(src, dst, 1 << 20)
+        else:
+            schema = unify_schemas(pq.read_schema(p) for p in files)
+            w = ParquetWriter(dest, **parquet_opts)
+            for part in files:
+                for batch in pq.ParquetFile(part).iter_batches(batch_size=w.row_group_size):
+                    w.write_table(pa.Table.from_batches([batch]).cast(schema))
+            w.close()
+        for part in files: os.remove(part)
+
+# ═══════════════════════════════════════════════
+# PARTITIONED LAYOUT
+# ═══════════════════════════════════════════════
+
+MANIFEST = "_manifest.json"
+GRAINS = {"day": 10, "month": 7, "year": 4}  # ISO-8601 prefix length per grain
+
+def partition_key(base, grain):
+    """Partition column name: transaction + day → transaction_date, + month → transaction_month."""
+    return f"{base}_{'date' if grain == 'day' else grain}"
+
+class PartitionedWriter:
+    """Routes rows/batches into `<key>=<value>/` directories under table_dir by the
+    ISO prefix of `column`, one TableWriter per partition. `stats` tracks rows and
+    min/max of `column` per partition value."""
+    def __init__(self, table_dir, column, key, grain, formats=("csv",), part="part-00000", **parquet_opts):
+        self.table_dir, self.column, self.key, self.width = table_dir, column, key, GRAINS[grain]
+        self.formats, self.part, self.parquet_opts = formats, part, parquet_opts
+        self.writers, self.stats = {}, {}
+
+    @property
+    def rows_written(self): return sum(s[0] for s in self.stats.values())
+
+    def _writer(self, value):
+        if value not in self.writers:
+            d = os.path.join(self.table_dir, f"{self.key}={value}")
+            os.makedirs(d, exist_ok=True)
+            self.writers[value] = TableWriter(os.path.join(d, f"{self.part}.csv"), self.formats, **self.parquet_opts)
+        return self.writers[value]
+
+    def _track(self, value, n, lo, hi):
+        s = self.stats.get(value)
+        self.stats[value] = [n, lo, hi] if s is None else [s[0] + n, min(s[1], lo), max(s[2], hi)]
+
+    def write_rows(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, CHUNK_ROWS))
+            if not chunk: break
+            groups = defaultdict(list)
+            for r in chunk: groups[r[self.column][:self.width]].append(r)
+            for value, group in groups.items():
+                self._writer(value).write_rows(group)
+                ts = [r[self.column] for r in group]
+                self._track(value, len(group), min(ts), max(ts))
+
+    def write_columns(self, columns):
+        import numpy as np  # column batches only come from the NumPy backend
+        ts = np.asarray(columns[self.column])
+        values, inverse = np.unique(ts.astype(f"U{self.width}"), return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(values) + 1))
+        for k, value in enumerate(values.tolist()):
+            idx = order[bounds[k]:bounds[k + 1]]
+            self._writer(value).write_columns({name: ([col[i] for i in idx] if isinstance(col, list) else col[idx])
+                                               for name, col in columns.items()})
+            sub = ts[idx].tolist()
+            self._track(value, len(idx), min(sub), max(sub))
+
+    def close(self):
+        for w in self.writers.values(): w.close()
+        return self.stats
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+def merge_partition_stats(all_stats):
+    merged = {}
+    for stats in all_stats:
+        for value, (n, lo, hi) in stats.items():
+            m = merged.get(value)
+            merged[value] = [n, lo, hi] if m is None else [m[0] + n, min(m[1], lo), max(m[2], hi)]
+    return merged
+
+def finish_partitions(tdir, column, key, grain, stats, parts, formats=("csv",), **parquet_opts):
+    """Stitch each partition's per-shard part files into one `part-00000` file (in
+    part order) and write the table manifest."""
+    for value in stats:
+        d = os.path.join(tdir, f"{key}={value}")
+        concat_parts(os.path.join(d, "part-00000.csv"), [os.path.join(d, f"{p}.csv") for p in parts], formats, **parquet_opts)
+    manifest = {
+        "table": os.path.basename(tdir), "column": column, "partition_key": key, "grain": grain,
+        "formats": list(formats), "rows": sum(s[0] for s in stats.values()),
+        "partitions": [{"value": v, "path": f"{key}={v}", "rows": n, "min": lo, "max": hi}
+                       for v, (n, lo, hi) in sorted(stats.items())],
+    }
+    with open(os.path.join(tdir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+def read_manifest(path):
+    """Manifest of the partitioned table at `path` (file path or directory), else None."""
+    m = os.path.join(table_dir(path) if not os.path.isdir(path) else path, MANIFEST)
+    if not os.path.exists(m): return None
+    with open(m) as f: return json.load(f)
+
+def hash_bucket(value, buckets):
+    """Bucket of `value` in a hash-partitioned table (grain "hash"): stable across runs and processes."""
+    return zlib.crc32(value.encode()) % buckets
+
+def prune(manifest, start=None, end=None):
+    """Partitions whose [min, max] range on the manifest column overlaps [start, end].
+    Bounds are ISO strings compared lexically (a bare date as `end` covers that whole day).
+    On a hash-partitioned table, start == end selects that one key's bucket."""
+    if manifest["grain"] == "hash" and start is not None and start == end:
+        bucket = hash_bucket(start, manifest["buckets"])
+        return [p for p in manifest["partitions"] if p["bucket"] == bucket]
+    end = end + "\uffff" if end else None
+    return [p for p in manifest["partitions"]
+            if (start is None or p["max"] >= start) and (end is None or p["min"] <= end)]
+
+# ═══════════════════════════════════════════════
+# READERS
+# ═══════════════════════════════════════════════
+
+def as_text(v, widened=False):
+    """Render a typed Parquet value the way the CSV writer would have; `widened` marks a
+    column written as int64 and widened to double, whose whole values the CSV has as ints."""
+    if v is None: return ""
+    if isinstance(v, datetime): return v.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    if isinstance(v, date): return v.isoformat()
+    if widened and isinstance(v, float) and v.is_integer(): return str(int(v))  # "0", not "0.0"
+    return str(v)
+
+def widened_columns(parquet_file):
+    """Columns a ParquetWriter widened from int64 to double (see WIDENED_KEY)."""
+    meta = parquet_file.schema_arrow.metadata or {}
+    return set(json.loads(meta[WIDENED_KEY])) if WIDENED_KEY in meta else set()
+
+def iter_rows(path, columns=None, text=False, start=None, end=None, batch_size=65_536, partitions=None):
+    """Yield row dicts from a table written by this module, in whichever format and
+    layout exists (`path` may carry either extension). CSV values are strings;
+    Parquet values are typed unless text=True. For partitioned tables, `start`/`end`
+    prune partitions through the manifest and then filter rows on its column;
+    `partitions` limits the scan to those manifest partition paths."""
+    manifest = read_manifest(path)
+    if manifest is None:
+        yield from _iter_file(path, columns, text, batch_size)
+        return
+    col, tdir = manifest["column"], table_dir(path) if not os.path.isdir(path) else path
+    want = list(columns) + ([col] if col not in columns else []) if columns else None
+    hi = end + "\uffff" if end else None
+    for p in prune(manifest, start, end):
+        if partitions is not None and p["path"] not in partitions: continue
+        inside = (start is None or p["min"] >= start) and (hi is None or p["max"] <= hi)
+        pdir = os.path.join(tdir, p["path"])
+        for name in sorted(os.listdir(pdir)):
+            if not name.endswith(EXTENSIONS[manifest["formats"][0]]): continue
+            for row in _iter_file(os.path.join(pdir, name), want, text, batch_size):
+                if not inside:
+                    v = row[col] if isinstance(row[col], str) else as_text(row[col])
+                    if (start and v < start) or (hi and v > hi): continue
+                yield {k: row[k] for k in columns} if columns else row
+
+def _iter_file(path, columns, text, batch_size):
+    fmt = existing_format(path)
+    if fmt is None: return
+    path = with_format(path, fmt)
+    if fmt == "csv":
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield {k: row[k] for k in columns} if columns else row
+        return
+    require_pyarrow()
+    pf = pq.ParquetFile(path)
+    widened = widened_columns(pf)
+    for batch in pf.iter_batches(batch_size=batch_size, columns=columns):
+        for row in batch.to_pylist():
+            yield {k: as_text(v, k in widened) for k, v in row.items()} if text else row
+
+def table_columns(path):
+    """Column names of the table at `path` (header or schema only, no data read); [] if absent."""
+    manifest = read_manifest(path)
+    if manifest is not None:
+        tdir = table_dir(path) if not os.path.isdir(path) else path
+        for p in manifest["partitions"]:
+            pdir = os.path.join(tdir, p["path"])
+            for name in sorted(os.listdir(pdir)):
+                if name.endswith(EXTENSIONS[manifest["formats"][0]]): return table_columns(os.path.join(pdir, name))
+        return []
+    fmt = existing_format(path)
+    if fmt is None: return []
+    if fmt == "parquet":
+        require_pyarrow()
+        return pq.ParquetFile(with_format(path, fmt)).schema_arrow.names
+    with open(with_format(path, fmt), newline="") as f:
+        return next(csv.reader(f), [])
+
+def iter_columns(path, batch_size=65_536):
+    """Yield {column: [CSV-style strings]} batches of the table at `path`, any format or
+    layout. CSV is parsed by pyarrow's streaming reader when available (every column as
+    text, empty fields kept as ""), so memory stays at one block whatever the file size."""
+    manifest = read_manifest(path)
+    if manifest is not None:
+        tdir = table_dir(path) if not os.path.isdir(path) else path
+        for p in manifest["partitions"]:
+            pdir = os.path.join(tdir, p["path"])
+            for name in sorted(os.listdir(pdir)):
+                if name.endswith(EXTENSIONS[manifest["formats"][0]]):
+                    yield from iter_columns(os.path.join(pdir, name), batch_size)
+        return
+    fmt = existing_format(path)
+    if fmt is None: return
+    path = with_format(path, fmt)
+    if fmt == "parquet":
+        require_pyarrow()
+        pf = pq.ParquetFile(path)
+        widened = widened_columns(pf)
+        for batch in pf.iter_batches(batch_size=batch_size):
+            yield {name: [as_text(v, name in widened) for v in col.to_pylist()] for name, col in zip(batch.schema.names, batch.columns)}
+        return
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), None)
+        if header is None: return
+        if pacsv is None:
+            reader = csv.reader(f)
+            while True:
+                rows = list(islice(reader, batch_size))
+                if not rows: return
+                yield dict(zip(header, map(list, zip(*rows))))
+    convert = pacsv.ConvertOptions(column_types={c: pa.string() for c in header}, strings_can_be_null=False,
+                                   quoted_strings_can_be_null=False)
+    with pacsv.open_csv(path, parse_options=pacsv.ParseOptions(newlines_in_values=True), convert_options=convert) as reader:
+        for batch in reader:
+            yield {name: col.to_pylist() for name, col in zip(batch.schema.names, batch.columns)}
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Dashboard Cubes — Horizon Bank Holdings
+========================================
+Precomputes the aggregates behind the ten tabs of FinServ_Dashboard.jsx and
+writes one compact JSON payload per tab (data/dashboards/<tab>.json). The
+dashboard fetches a few KB of finished arrays, not the raw tables.
+
+Each table is read at most once per build. Its fold turns the rows into the
+small aggregates every tab needs from it: monthly series, per-customer and
+per-account sums, and group counts. Tab builders then join those folds with
+the dimensions. Nothing a fold keeps grows with fact volume.
+
+_manifest.json remembers a digest of each tab's input files (every partition,
+or the single file: size + mtime). A build only rebuilds tabs whose inputs
+changed, and only scans the tables those tabs read.
+
+Two figures are not in the lakehouse, so they are named constants below:
+channel acquisition cost, and the interchange rate on card purchases.
+
+Usage: python src/pipelines/dashboard_cubes.py [--data-dir data] [--out data/dashboards] [--force]
+"""
+import os, sys, json, time, hashlib, argparse
+from calendar import month_abbr
+from collections import Counter, defaultdict
+from datetime import date
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+from src.pipelines import rollups
+from src.pipelines.profiler import HyperLogLog
+
+MANIFEST = "_manifest.json"
+MONTHS = 12                # length of every monthly series
+TOP_CUSTOMERS = 3          # Customer 360 picks the highest-revenue golden customers
+TOP_FEATURES = 6
+INTERCHANGE_RATE = 0.018   # of card purchase volume
+CHANNEL_CAC = {"web": 145, "social_media": 89, "mail": 210, "partner_referral": 62, "branch": 180,
+               "mobile_app": 95, "phone": 160}  # $ per acquired customer, from marketing finance
+SEGMENTS = ["mass_market", "mass_affluent", "affluent", "high_net_worth", "ultra_hnw"]
+TIERS = ["super_prime", "prime", "near_prime", "subprime", "deep_subprime"]
+DEPOSITS, LOANS, CARDS = ("SA", "CD", "MM"), ("PL", "AL"), ("CC",)  # product_id prefixes
+
+TABLES = {
+    "transactions": ("gold", "fact_transactions"), "loan_payments": ("gold", "fact_loan_payments"),
+    "credit_risk": ("gold", "fact_credit_risk"), "digital_events": ("clickstream", "digital_events"),
+    "fraud_alerts": ("fraud", "fraud_alerts"), "partners": ("partners", "partner_performance"),
+    "hourly_metrics": ("realtime", "hourly_metrics"), "customers": ("gold", "dim_customer"),
+    "accounts": ("gold", "dim_account"), "match_pairs": ("mdm", "mdm_match_pairs"), "golden": ("mdm", "golden_records"),
+    "core_banking": ("bronze", "core_banking_customers"), "salesforce": ("bronze", "salesforce_accounts"),
+    "fiserv": ("bronze", "fiserv_parties"), "dq_results": ("dq_results.json",),
+}
+TABS = {  # JSX tab id → tables its payload reads, in the dashboard's tab order
+    "exec": ["transactions", "loan_payments", "credit_risk", "hourly_metrics", "customers", "accounts"],
+    "revenue": ["transactions", "loan_payments", "customers", "accounts"],
+    "c360": ["transactions", "loan_payments", "customers", "accounts"],
+    "acq": ["transactions", "loan_payments", "digital_events", "customers", "accounts"],
+    "risk": ["credit_risk", "loan_payments"],
+    "product": ["transactions", "accounts"],
+    "digital": ["digital_events", "transactions"],
+    "fraud": ["fraud_alerts"],
+    "partner": ["partners"],
+    "dq": ["match_pairs", "golden", "core_banking", "salesforce", "fiserv", "dq_results"],
+}
+
+def label(code): return code.replace("_", " ").title().replace("Hnw", "HNW")
+def pct(a, b): return round(100 * a / b, 1) if b else 0.0
+def money(x): return round(x, 2)
+def num(v):
+    try: return float(v)
+    except (TypeError, ValueError): return 0.0
+
+def last_months(*series):
+    """The MONTHS latest "YYYY-MM" keys across the given {month: ...} dicts, oldest first."""
+    return sorted(set().union(*series))[-MONTHS:]
+
+class Distinct:
+    """HyperLogLog fed in batches: distinct counts of unbounded keys (sessions) in fixed memory."""
+    def __init__(self): self.hll, self.batch = HyperLogLog(), []
+    def add(self, v):
+        self.batch.append(v)
+        if len(self.batch) >= 65_536: self.flush()
+    def flush(self): self.hll.add(self.batch); self.batch = []
+    def count(self): self.flush(); return self.hll.estimate()
+
+# ─── Folds: one pass per table ───
+def fold_transactions(rows):
+    months = defaultdict(lambda: [0.0] * 5)  # interest, fees, interchange, rewards, purchases
+    revenue, spend, n, digital = Counter(), Counter(), 0, 0
+    for r in rows:
+        amount, kind, m = num(r["amount"]), r["transaction_type"], months[r["transaction_date"][:7]]
+        n += 1
+        if r["channel"] in ("online", "mobile_wallet"): digital += 1
+        m[3] += num(r["rewards_earned"])
+        if kind == "interest": m[0] += amount; revenue[r["customer_id"]] += amount
+        elif kind == "fee": m[1] += amount; revenue[r["customer_id"]] += amount
+        elif kind == "purchase":
+            m[2] += amount * INTERCHANGE_RATE; m[4] += amount
+            revenue[r["customer_id"]] += amount * INTERCHANGE_RATE
+            spend[r["account_id"]] += amount
+    return {"months": dict(months), "revenue": revenue, "spend": spend, "rows": n, "digital": digital}
+
+def fold_loan_payments(rows):
+    months, revenue = defaultdict(lambda: [0.0, 0.0]), Counter()  # interest, charge-offs
+    for r in rows:
+        m, interest = months[r["due_date"][:7]], num(r["interest_portion"])
+        m[0] += interest
+        revenue[r["customer_id"]] += interest
+        if r["payment_status"] == "missed": m[1] += num(r["amount_due"]) - num(r["amount_paid"])
+    return {"months": dict(months), "revenue": revenue}
+
+def fold_credit_risk(rows):
+    tiers, expected_loss, n = defaultdict(lambda: [0, 0, 0, 0]), 0.0, 0  # customers, 30+, 60+, 90+ DPD
+    for r in rows:
+        t, dpd = tiers[r["risk_tier"]], num(r["days_past_due"])
+        n += 1
+        t[0] += 1; t[1] += dpd >= 30; t[2] += dpd >= 60; t[3] += dpd >= 90
+        expected_loss += num(r["expected_loss"])
+    return {"tiers": dict(tiers), "rows": n, "expected_loss": expected_loss}
+
+def fold_digital_events(rows):
+    months, pages, everyone = defaultdict(lambda: (set(), set())), defaultdict(set), set()  # (mobile, web) customers
+    funnel = [Distinct() for _ in range(3)]  # sessions: any, visited /apply, converted
+    for r in rows:
+        cid, session, page = r["customer_id"], r["session_id"], r["page_url"]
+        months[r["timestamp"][:7]][r["platform"] == "web"].add(cid)
+        pages[page].add(cid)
+        everyone.add(cid)
+        funnel[0].add(session)
+        if page.startswith("/apply"): funnel[1].add(session)
+        if r["conversion_event"] == "True": funnel[2].add(session)
+    return {"months": {m: (len(mobile), len(web)) for m, (mobile, web) in months.items()},
+            "pages": {p: len(ids) for p, ids in pages.items()}, "users": len(everyone), "funnel": [d.count() for d in funnel]}
+
+def fold_fraud_alerts(rows):
+    months, methods, status = defaultdict(lambda: [0, 0, 0, 0.0]), Counter(), Counter()  # alerts, confirmed, false +, loss
+    days, resolved, prevented, lost = 0, 0, 0.0, 0.0
+    for r in rows:
+        m, s = months[r["alert_timestamp"][:7]], r["status"]
+        m[0] += 1; m[1] += s == "confirmed_fraud"; m[2] += s == "false_positive"; m[3] += num(r["loss_amount"])
+        methods[r["detection_method"]] += 1
+        status[s] += 1
+        if s == "confirmed_fraud": prevented += num(r["amount"]) - num(r["loss_amount"])
+        lost += num(r["loss_amount"])
+        if r["resolution_date"]:
+            days += (date.fromisoformat(r["resolution_date"]) - date.fromisoformat(r["alert_timestamp"][:10])).days
+            resolved += 1
+    return {"months": dict(months), "methods": methods, "status": status, "resolution_days": days / resolved if resolved else 0.0,
+            "prevented": prevented, "lost": lost}
+
+def fold_partners(rows):
+    partners, totals = defaultdict(lambda: [0, 0.0, 0.0, 0.0, 0]), [0.0, 0, 0.0]  # interchange, new accounts, revenue share
+    for r in rows:
+        p, interchange = partners[r["partner_name"]], num(r["interchange_revenue"])
+        p[0] += int(num(r["total_transactions"])); p[1] += num(r["total_spend"]); p[2] += interchange
+        p[3] += num(r["customer_satisfaction"]); p[4] += 1
+        totals[0] += interchange; totals[1] += int(num(r["new_accounts_sourced"]))
+        totals[2] += interchange * num(r["revenue_share_pct"]) / 100
+    return {"partners": dict(partners), "totals": totals}
+
+def fold_hourly_metrics(rows):
+    hours = sorted(((r["timestamp"], int(num(r["active_digital_users"])), int(num(r["transactions_per_hour"])),
+                     int(num(r["fraud_alerts_per_hour"])), num(r["nps_score"])) for r in rows))
+    return {"hours": hours[-24:], "nps": sum(h[4] for h in hours) / len(hours) if hours else 0.0}
+
+def fold_customers(rows):
+    keep = ("first_name", "last_name", "segment", "risk_tier", "fico_score", "customer_since", "digital_enrolled", "acquisition_channel")
+    return {r["customer_id"]: {k: r[k] for k in keep} for r in rows}
+
+def fold_accounts(rows):
+    keep = ("customer_id", "product_id", "product_name", "open_date", "status", "balance", "credit_limit")
+    return {r["account_id"]: {k: r[k] for k in keep} for r in rows}
+
+def fold_match_pairs(rows): return Counter(r["match_tier"] for r in rows)
+
+def fold_golden(rows):
+    matched, n, filled, cells = Counter(), 0, 0, 0
+    for r in rows:
+        n += 1
+        values = [v for k, v in r.items() if k != "golden_id"]
+        filled, cells = filled + sum(1 for v in values if v), cells + len(values)
+        if int(num(r["member_count"])) > 1:
+            for system in r["source_systems"].split("|"): matched[system] += 1
+    return {"rows": n, "matched": matched, "completeness": pct(filled, cells)}
+
+def fold_bronze(rows):
+    n, filled, cells = 0, 0, 0
+    for r in rows:
+        n += 1
+        filled, cells = filled + sum(1 for v in r.values() if v), cells + len(r)
+    return {"rows": n, "quality": pct(filled, cells)}
+
+FOLDS = {"transactions": fold_transactions, "loan_payments": fold_loan_payments, "credit_risk": fold_credit_risk,
+         "digital_events": fold_digital_events, "fraud_alerts": fold_fraud_alerts, "partners": fold_partners,
+         "hourly_metrics": fold_hourly_metrics, "customers": fold_customers, "accounts": fold_accounts,
+         "match_pairs": fold_match_pairs, "golden": fold_golden,
+         "core_banking": fold_bronze, "salesforce": fold_bronze, "fiserv": fold_bronze}
+
+# ─── Tab builders: folds → payload ───
+def revenue_data(f):
+    txn, loans = f["transactions"]["months"], f["loan_payments"]["months"]
+    out = []
+    for m in last_months(txn, loans):
+        interest, fees, interchange, rewards, _ = txn.get(m, [0.0] * 5)
+        loan_interest, charge_offs = loans.get(m, [0.0, 0.0])
+        out.append({"month": month_abbr[int(m[5:])], "period": m, "interest": money(interest + loan_interest), "fees": money(fees),
+                    "interchange": money(interchange), "net": money(interest + loan_interest + fees + interchange - rewards - charge_offs)})
+    return out
+
+def customer_revenue(f): return f["transactions"]["revenue"] + f["loan_payments"]["revenue"]
+
+def products_per_customer(f):
+    return Counter(a["customer_id"] for a in f["accounts"].values() if a["status"] != "closed")
+
+def build_exec(f):
+    open_accounts = [a for a in f["accounts"].values() if a["status"] == "open"]
+    risk, customers = f["credit_risk"], f["customers"]
+    return {"kpis": {"assetsUnderMgmt": money(sum(num(a["balance"]) for a in open_accounts if a["product_id"].startswith(DEPOSITS))),
+                     "activeAccounts": len(open_accounts), "nps": round(f["hourly_metrics"]["nps"], 1),
+                     "dpd30Rate": pct(sum(t[1] for t in risk["tiers"].values()), risk["rows"]),
+                     "digitalAdoption": pct(sum(c["digital_enrolled"] == "True" for c in customers.values()), len(customers))},
+            "revenueData": revenue_data(f),
+            "hourlyMetrics": [{"hour": f"{int(ts[11:13])}:00", "users": users, "txns": txns, "alerts": alerts}
+                              for ts, users, txns, alerts, _ in f["hourly_metrics"]["hours"]]}
+
+def build_revenue(f):
+    series, revenue, held = revenue_data(f), customer_revenue(f), products_per_customer(f)
+    by_segment = defaultdict(lambda: [0, 0.0, 0])
+    for cid, c in f["customers"].items():
+        s = by_segment[c["segment"]]
+        s[0] += 1; s[1] += revenue[cid]; s[2] += held[cid]
+    interest, fees = sum(m["interest"] for m in series), sum(m["fees"] + m["interchange"] for m in series)
+    return {"kpis": {"totalRevenue": money(interest + fees), "interestIncome": money(interest), "feeIncome": money(fees),
+                     "netIncome": money(sum(m["net"] for m in series))},
+            "revenueData": series,
+            "segmentData": [{"name": label(s), "customers": by_segment[s][0], "revenue": money(by_segment[s][1]),
+                             "products": round(by_segment[s][2] / by_segment[s][0], 1) if by_segment[s][0] else 0} for s in SEGMENTS]}
+
+def build_c360(f):
+    revenue, customers, holdings = customer_revenue(f), f["customers"], defaultdict(list)
+    for a in f["accounts"].values(): holdings[a["customer_id"]].append(a)
+    out = []
+    for cid, ltv in sorted(revenue.items(), key=lambda kv: (-kv[1], kv[0])):  # ties by ID: payloads are reproducible
+        if len(out) == TOP_CUSTOMERS: break
+        c = customers.get(cid)
+        if c is None: continue
+        accounts = [a for a in holdings[cid] if a["status"] != "closed"]
+        out.append({"id": cid, "name": f"{c['first_name']} {c['last_name']}", "seg": label(c["segment"]), "fico": int(num(c["fico_score"])),
+                    "risk": label(c["risk_tier"]), "since": c["customer_since"][:4], "digital": c["digital_enrolled"] == "True",
+                    "products": len(accounts), "ltv": money(ltv),
+                    "holdings": [{"prod": a["product_name"], "bal": money(num(a["balance"])),
+                                  "limit": money(num(a["credit_limit"])) if a["product_id"].startswith(CARDS + LOANS) else None,
+                                  "util": pct(num(a["balance"]), num(a["credit_limit"])) if a["product_id"].startswith(CARDS) else 0,
+                                  "status": label(a["status"])} for a in accounts]})
+    return {"customers": out}
+
+def build_acq(f):
+    revenue, by_channel = customer_revenue(f), defaultdict(lambda: [0, 0.0])
+    for cid, c in f["customers"].items():
+        ch = by_channel[c["acquisition_channel"]]
+        ch[0] += 1; ch[1] += revenue[cid]
+    channels = [{"channel": label(ch), "cac": CHANNEL_CAC.get(ch, 0), "volume": n, "ltv": money(total / n),
+                 "roi": round(total / n / CHANNEL_CAC[ch], 1) if CHANNEL_CAC.get(ch) else 0.0}
+                for ch, (n, total) in sorted(by_channel.items(), key=lambda kv: (-kv[1][0], kv[0]))]
+    opened = sorted(a["open_date"][:7] for a in f["accounts"].values())
+    window = set(f["digital_events"]["months"])  # accounts opened while the clickstream was recorded
+    funnel = f["digital_events"]["funnel"] + [sum(m in window for m in opened)]
+    stages = ["Digital Sessions", "Visited Application", "Converted", "Accounts Opened"]
+    volume = sum(c["volume"] for c in channels)
+    avg_cac = sum(c["cac"] * c["volume"] for c in channels) / volume if volume else 0.0
+    avg_ltv = sum(c["ltv"] * c["volume"] for c in channels) / volume if volume else 0.0
+    return {"kpis": {"newAccountsMtd": opened.count(opened[-1]) if opened else 0, "avgCac": round(avg_cac),
+                     "conversionRate": pct(funnel[2], funnel[0]), "ltvCac": round(avg_ltv / avg_cac, 1) if avg_cac else 0.0},
+            "acquisitionFunnel": [{"stage": s, "count": n, "rate": pct(n, funnel[0])} for s, n in zip(stages, funnel)],
+            "channelCAC": channels}
+
+def build_risk(f):
+    risk, charge_offs = f["credit_risk"], f["loan_payments"]["months"]
+    tiers, n = risk["tiers"], risk["rows"]
+    total = [sum(t[i] for t in tiers.values()) for i in range(4)]
+    return {"kpis": {"dpd30Rate": pct(total[1], n), "dpd60Rate": pct(total[2], n), "dpd90Rate": pct(total[3], n),
+                     "netChargeOffs": money(sum(charge_offs[m][1] for m in last_months(charge_offs))),
+                     "lossReserves": money(risk["expected_loss"])},
+            "riskDistrib": [{"tier": label(t), "count": c[0], "pct": pct(c[0], n), "dpd30": pct(c[1], c[0]), "dpd60": pct(c[2], c[0]),
+                             "dpd90": pct(c[3], c[0])} for t in TIERS for c in [tiers.get(t, [0, 0, 0, 0])]]}
+
+def build_product(f):
+    spend, months, accounts = f["transactions"]["spend"], f["transactions"]["months"], f["accounts"]
+    recent = last_months(months)
+    latest = max((a["open_date"] for a in accounts.values()), default="")
+    year_ago = f"{int(latest[:4]) - 1}{latest[4:]}" if latest else ""
+    products = defaultdict(lambda: {"accounts": 0, "spend": 0.0, "balance": 0.0, "new": 0, "card": False})
+    for aid, a in accounts.items():
+        p = products[a["product_name"]]
+        if a["status"] != "closed":  # growth = new / (accounts - new), both over open accounts
+            p["accounts"] += 1
+            p["new"] += a["open_date"] > year_ago
+        p["card"] = a["product_id"].startswith(CARDS)
+        p["spend"] += spend[aid]; p["balance"] += num(a["balance"])
+    rows = []
+    for name, p in sorted(products.items(), key=lambda kv: (-kv[1]["accounts"], kv[0])):
+        row = {"product": name, "accounts": p["accounts"], "growth": pct(p["new"], p["accounts"] - p["new"])}
+        row["spend" if p["card"] else "balance"] = money(p["spend"] if p["card"] else p["balance"])
+        rows.append(row)
+    open_accounts = [a for a in accounts.values() if a["status"] != "closed"]
+    return {"kpis": {"cardSpend": money(sum(months[m][4] for m in recent)),
+                     "loanOrigination": money(sum(num(a["credit_limit"]) for a in accounts.values()
+                                                  if a["product_id"].startswith(LOANS) and a["open_date"] > year_ago)),
+                     "totalDeposits": money(sum(num(a["balance"]) for a in open_accounts if a["product_id"].startswith(DEPOSITS))),
+                     "rewards": money(sum(months[m][3] for m in recent))},
+            "productPerf": rows}
+
+def build_digital(f):
+    events, txns = f["digital_events"], f["transactions"]
+    months = last_months(events["months"])
+    mau = events["months"][months[-1]] if months else (0, 0)
+    top = sorted(events["pages"].items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_FEATURES]
+    return {"kpis": {"mobileMau": mau[0], "webMau": mau[1], "digitalTxnShare": pct(txns["digital"], txns["rows"])},
+            "digitalData": [{"month": month_abbr[int(m[5:])], "period": m, "mobileUsers": events["months"][m][0],
+                             "webUsers": events["months"][m][1]} for m in months],
+            "features": [{"feat": label(p.strip("/").replace("-", "_").replace("/", " ")), "adopt": pct(n, events["users"])} for p, n in top]}
+
+def build_fraud(f):
+    fraud = f["fraud_alerts"]
+    status, months = fraud["status"], fraud["months"]
+    return {"kpis": {"activeAlerts": status["open"] + status["investigating"],
+                     "falsePositiveRate": pct(status["false_positive"], status["false_positive"] + status["confirmed_fraud"]),
+                     "avgResolutionDays": round(fraud["resolution_days"], 1), "preventedLosses": money(fraud["prevented"]),
+                     "actualLosses": money(fraud["lost"])},
+            "fraudData": [{"month": month_abbr[int(m[5:])], "period": m, "alerts": months[m][0], "confirmed": months[m][1],
+                           "falsePositive": months[m][2], "lossAmount": money(months[m][3])} for m in last_months(months)],
+            "detectionMethods": [{"name": label(k), "value": v} for k, v in sorted(fraud["methods"].items(), key=lambda kv: (-kv[1], kv[0]))]}
+
+def build_partner(f):
+    partners, (interchange, sourced, share) = f["partners"]["partners"], f["partners"]["totals"]
+    rows = [{"partner": name, "txns": p[0], "spend": money(p[1]), "interchange": money(p[2]), "satisfaction": round(p[3] / p[4], 1)}
+            for name, p in sorted(partners.items(), key=lambda kv: (-kv[1][1], kv[0]))]
+    return {"kpis": {"totalInterchange": money(interchange), "partnerSourcedAccounts": sourced,
+                     "avgCsat": round(sum(r["satisfaction"] for r in rows) / len(rows), 1) if rows else 0.0, "revenueSharePaid": money(share)},
+            "partnerData": rows}
+
+def build_dq(f):
+    tiers, golden, results = f["match_pairs"], f["golden"], f["dq_results"]
+    sources = [{"name": label(s), "records": f[s]["rows"], "matched": golden["matched"][s], "quality": f[s]["quality"]}
+               for s in ("core_banking", "salesforce", "fiserv")]
+    records, pairs = sum(s["records"] for s in sources), sum(tiers.values())
+    tests = (results["passed"], results["passed"] + results["failed"]) if results else (0, 0)
+    return {"dqMetrics": {"overallScore": pct(*tests) if results else golden["completeness"],
+                          "matchRate": pct(sum(s["matched"] for s in sources), records),
+                          "goldenCoverage": pct(golden["rows"], records), "completeness": golden["completeness"],
+                          "tests": f"{tests[0]}/{tests[1]}" if results else None, "sources": sources,
+                          "matchTiers": {t: pct(tiers[t], pairs) for t in ("auto_merge", "review", "no_match")}}}
+
+BUILDERS = {"exec": build_exec, "revenue": build_revenue, "c360": build_c360, "acq": build_acq, "risk": build_risk,
+            "product": build_product, "digital": build_digital, "fraud": build_fraud, "partner": build_partner, "dq": build_dq}
+
+# ─── Incremental build ───
+def input_files(data_dir, name):
+    path = os.path.join(data_dir, *TABLES[name])
+    if path.endswith(".json"): return [path] if os.path.exists(path) else []
+    return sorted(rollups.table_segments(path + ".csv", data_dir).values())
+
+def digest(data_dir, name):
+    """Hash of (file, size, mtime) over every file (partition) of one input."""
+    h = hashlib.sha256()
+    for f in input_files(data_dir, name):
+        st = os.stat(f)
+        h.update(f"{os.path.relpath(f, data_dir)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()[:16]
+
+def scan(data_dir, name):
+    path = os.path.join(data_dir, *TABLES[name])
+    if name == "dq_results":
+        if not os.path.exists(path): return None
+        with open(path) as f: return json.load(f)
+    return FOLDS[name](storage.iter_rows(path + ".csv", text=True))
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path): return {}
+    with open(path) as f: return json.load(f)
+
+def build(data_dir, out_dir, force=False):
+    """Rebuild the tab payloads whose inputs changed. Returns {"built", "skipped", "scanned", "bytes"}."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest, digests = load_manifest(out_dir), {name: digest(data_dir, name) for name in TABLES}
+    stale = [tab for tab, inputs in TABS.items()
+             if force or not os.path.exists(os.path.join(out_dir, f"{tab}.json"))
+             or manifest.get(tab, {}).get("inputs") != {n: digests[n] for n in inputs}]
+    scanned = sorted({name for tab in stale for name in TABS[tab]}, key=list(TABLES).index)
+    folds = {name: scan(data_dir, name) for name in scanned}  # the one pass over each table
+    sizes = {}
+    for tab in stale:
+        text = json.dumps(BUILDERS[tab](folds), separators=(",", ":"))
+        with open(os.path.join(out_dir, f"{tab}.json"), "w") as f: f.write(text)
+        sizes[tab] = len(text)
+        manifest[tab] = {"inputs": {n: digests[n] for n in TABS[tab]}, "bytes": len(text),
+                         "built": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+    with open(os.path.join(out_dir, MANIFEST), "w") as f: json.dump(manifest, f, indent=1)
+    return {"built": stale, "skipped": [t for t in TABS if t not in stale], "scanned": scanned, "bytes": sizes}
+
+def main():
+    parser = argparse.ArgumentParser()
+    default_data = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
+    parser.add_argument("--data-dir", default=default_data)
+    parser.add_argument("--out", default=None, help="Payload directory (default: <data-dir>/dashboards)")
+    parser.add_argument("--force", action="store_true", help="Rebuild every tab")
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    result = build(args.data_dir, args.out or os.path.join(args.data_dir, "dashboards"), args.force)
+    print(f"  scanned: {', '.join(result['scanned']) or '(nothing changed)'}")
+    for tab, size in result["bytes"].items(): print(f"  ✓ {tab:<10} {size / 1024:>7.1f} KB")
+    if result["skipped"]: print(f"  unchanged: {', '.join(result['skipped'])}")
+    print(f"  {1000 * (time.perf_counter() - t0):.0f} ms")
+
+if __name__ == "__main__":
+    main()
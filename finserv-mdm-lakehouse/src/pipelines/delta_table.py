@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Delta Table — a local, file-based Delta Lake table format
+==========================================================
+Immutable data files plus an append-only JSON transaction log, laid out the way
+Delta Lake lays them out, so MERGE / OPTIMIZE / VACUUM / time-travel behaviour
+(and the small-file problems that come with it) can be reproduced offline:
+
+  <table>/part-00000-<id>.csv            data files, never modified in place
+  <table>/_delta_log/00000000000000000000.json
+                                         one commit per version: newline-delimited
+                                         protocol / metaData / add / remove /
+                                         commitInfo actions
+  <table>/_delta_log/<v>.checkpoint.json every CHECKPOINT_INTERVAL versions, the
+                                         replayed snapshot (so readers don't replay
+                                         the whole log), pointed to by _last_checkpoint
+
+Each `add` carries per-file stats (numRecords, per-column min/max/nullCount) used
+for data skipping. A commit is an exclusive create of the next version file, so a
+writer whose read version is stale fails with ConcurrentModification instead of
+overwriting a concurrent commit.
+
+  merge      copy-on-write upsert: only files whose key range and keys actually
+             match the source are rewritten; unmatched source rows become new files
+  optimize   bin-packs files smaller than target_file_rows; with zorder_by, sorts
+             all rows on the interleaved bits of the columns' ranks first
+  vacuum     deletes files no longer referenced by the current version once they
+             are older than the retention window
+  history    commitInfo of every version, newest first
+  restore    commits the file set of an earlier version as the new version
+
+Rows are CSV-style string dicts, as everywhere else in the lakehouse.
+
+Usage: python src/pipelines/delta_table.py convert data/gold/fact_transactions.csv /tmp/txn_delta [--file-rows 500]
+       python src/pipelines/delta_table.py {history,optimize,vacuum} /tmp/txn_delta [...]
+"""
+import os, sys, json, time, uuid, argparse
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timezone
+from itertools import chain, islice
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+from src.pipelines.query_engine import convert
+
+LOG_DIR = "_delta_log"
+CHECKPOINT_INTERVAL = 10
+FILE_ROWS = 100_000             # rows per data file written by write/merge/optimize
+RETENTION_HOURS = 168           # VACUUM default, as in Delta (7 days)
+ZORDER_BITS = 16                # rank bits per Z-order column
+PROTOCOL = {"minReaderVersion": 1, "minWriterVersion": 2}
+
+class DeltaError(Exception):
+    pass
+
+class ConcurrentModification(DeltaError):
+    pass
+
+Snapshot = namedtuple("Snapshot", "version timestamp metadata files tombstones")
+
+def now_ms():
+    return int(time.time() * 1000)
+
+def iso(ms):
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")[:-4] + "Z"
+
+def parse_ts(ts):
+    """Milliseconds for an ISO timestamp / date string or epoch-milliseconds number."""
+    if isinstance(ts, (int, float)): return int(ts)
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return int((dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp() * 1000)
+
+# ─── Stats & data skipping ───
+def typed(values):
+    """Comparable form of a column's non-null values: numbers if every one is numeric, else the strings."""
+    conv = [convert(v) for v in values]
+    return conv if all(isinstance(v, (int, float)) for v in conv) else list(values)
+
+def text_row(row):
+    """A row of Python values as the CSV-style strings csv.DictWriter would write (None → "")."""
+    return {c: v if isinstance(v, str) else "" if v is None else str(v) for c, v in row.items()}
+
+def file_stats(rows, columns):
+    stats = {"numRecords": len(rows), "minValues": {}, "maxValues": {}, "nullCount": {}}
+    for c in columns:
+        vals = [r[c] for r in rows if r.get(c, "") != ""]
+        stats["nullCount"][c] = len(rows) - len(vals)
+        if vals:
+            vals = typed(vals)
+            stats["minValues"][c], stats["maxValues"][c] = min(vals), max(vals)
+    return stats
+
+def _kind(v):
+    return "num" if isinstance(v, (int, float)) else "str"
+
+def row_matches(row, where):
+    """`where` is {column: (lo, hi)} with inclusive, optionally None bounds. A null, or a value
+    of the other kind (number vs text) than the bound, never matches."""
+    for col, (lo, hi) in where.items():
+        v = convert(row.get(col, ""))
+        if v is None: return False
+        for bound, ok in ((lo, lambda b: v >= b), (hi, lambda b: v <= b)):
+            if bound is not None and (_kind(v) != _kind(bound) or not ok(bound)): return False
+    return True
+
+def may_match(stats, where):
+    """False when the file's min/max stats prove no row can satisfy `where`."""
+    for col, (lo, hi) in where.items():
+        if col not in stats["minValues"]: return False  # all null
+        mn, mx = stats["minValues"][col], stats["maxValues"][col]
+        for bound in (lo, hi):
+            if bound is not None and _kind(bound) != _kind(mn): return False
+        if (lo is not None and mx < lo) or (hi is not None and mn > hi): return False
+    return True
+
+def any_key_in_range(keys, stats, column):
+    """Whether any of the sorted `keys` falls inside the file's [min, max] on `column`."""
+    if not keys or column not in stats["minValues"]: return False
+    mn, mx = stats["minValues"][column], stats["maxValues"][column]
+    if _kind(keys[0]) != _kind(mn): return False
+    i = bisect_left(keys, mn)
+    return i < len(keys) and keys[i] <= mx
+
+# ─── Z-order ───
+def _spread_table(k):
+    """Byte → its 8 bits spaced k apart."""
+    return [sum(((b >> i) & 1) << (i * k) for i in range(8)) for b in range(256)]
+
+def zorder_keys(rows, columns):
+    """Morton key per row: each column's value is replaced by its rank among the column's
+    distinct values (scaled to ZORDER_BITS) and the ranks' bits are interleaved."""
+    k, spread = len(columns), _spread_table(len(columns))
+    ranks = []
+    for c in columns:
+        raw = [r.get(c, "") for r in rows]
+        present = sorted({v for v in raw if v != ""})
+        order = sorted(zip(typed(present), present))
+        scale = ((1 << ZORDER_BITS) - 2) / max(len(order) - 1, 1)  # ranks 1..2^bits-1, 0 for null
+        rank = {v: int(i * scale) + 1 for i, (_, v) in enumerate(order)}
+        ranks.append([rank.get(v, 0) for v in raw])  # nulls sort first
+    keys = []
+    for vals in zip(*ranks):
+        z = 0
+        for d, r in enumerate(vals):
+            for byte in range((ZORDER_BITS + 7) // 8):
+                z |= spread[(r >> (8 * byte)) & 0xFF] << (8 * byte * k + d)
+        keys.append(z)
+    return keys
+
+# ═══════════════════════════════════════════════
+# TABLE
+# ═══════════════════════════════════════════════
+
+class DeltaTable:
+    def __init__(self, path):
+        self.path = path
+        self.log_dir = os.path.join(path, LOG_DIR)
+
+    def exists(self):
+        return os.path.exists(self._commit_path(0))
+
+    def _commit_path(self, version):
+        return os.path.join(self.log_dir, f"{version:020d}.json")
+
+    def _checkpoint_path(self, version):
+        return os.path.join(self.log_dir, f"{version:020d}.checkpoint.json")
+
+    def versions(self):
+        if not os.path.isdir(self.log_dir): return []
+        return sorted(int(n[:20]) for n in os.listdir(self.log_dir) if n.endswith(".json") and n[:20].isdigit() and len(n) == 25)
+
+    def latest_version(self):
+        v = self.versions()
+        return v[-1] if v else None
+
+    def _read_actions(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # ─── Snapshots ───
+    def snapshot(self, version=None, timestamp=None):
+        """State of the table at `version` (or the last version committed at or before
+        `timestamp`); the latest version by default."""
+        versions = self.versions()
+        if not versions: raise DeltaError(f"{self.path} is not a Delta table")
+        if timestamp is not None:
+            ms = parse_ts(timestamp)
+            eligible = [v for v in versions if self.commit_info(v)["timestamp"] <= ms]
+            if not eligible: raise DeltaError(f"No version of {self.path} at or before {timestamp}")
+            version = eligible[-1]
+        version = versions[-1] if version is None else version
+        if version not in versions: raise DeltaError(f"Version {version} of {self.path} does not exist (0..{versions[-1]})")
+
+        start, metadata, files, tombstones = 0, None, {}, {}
+        cps = [v for v in self._checkpoints() if v <= version]
+        if cps:
+            start = cps[-1] + 1
+            metadata, files, tombstones = self._apply(self._read_actions(self._checkpoint_path(cps[-1])), metadata, files, tombstones)
+        for v in range(start, version + 1):
+            metadata, files, tombstones = self._apply(self._read_actions(self._commit_path(v)), metadata, files, tombstones)
+        return Snapshot(version, self.commit_info(version)["timestamp"], metadata, files, tombstones)
+
+    def _checkpoints(self):
+        last = os.path.join(self.log_dir, "_last_checkpoint")
+        if not os.path.exists(last): return []
+        return sorted(int(n[:20]) for n in os.listdir(self.log_dir) if n.endswith(".checkpoint.json"))
+
+    @staticmethod
+    def _apply(actions, metadata, files, tombstones):
+        for a in actions:
+            if "metaData" in a: metadata = a["metaData"]
+            elif "add" in a:
+                files[a["add"]["path"]] = a["add"]
+                tombstones.pop(a["add"]["path"], None)
+            elif "remove" in a:
+                files.pop(a["remove"]["path"], None)
+                tombstones[a["remove"]["path"]] = a["remove"]
+        return metadata, files, tombstones
+
+    def commit_info(self, version):
+        with open(self._commit_path(version)) as f:
+            for line in f:
+                action = json.loads(line)
+                if "commitInfo" in action: return action["commitInfo"]
+        raise DeltaError(f"Version {version} has no commitInfo")
+
+    # ─── Commits ───
+    def _commit(self, read_version, operation, parameters, actions, metrics=None):
+        """Write version read_version + 1 atomically; fails if another writer got there first."""
+        version = 0 if read_version is None else read_version + 1
+        info = {"timestamp": now_ms(), "operation": operation, "operationParameters": parameters,
+                "readVersion": read_version, "isBlindAppend": operation == "WRITE" and parameters.get("mode") == "Append",
+                "operationMetrics": metrics or {}}
+        os.makedirs(self.log_dir, exist_ok=True)
+        tmp = os.path.join(self.log_dir, f".{version:020d}.{uuid.uuid4().hex}.tmp")
+        with open(tmp, "w") as f:
+            for a in [{"commitInfo": info}] + actions: f.write(json.dumps(a) + "\n")
+        try:
+            os.link(tmp, self._commit_path(version))  # exclusive: fails if the version exists
+        except FileExistsError:
+            raise ConcurrentModification(f"Version {version} of {self.path} was committed concurrently "
+                                         f"(read version {read_version}); re-read and retry") from None
+        finally:
+            os.remove(tmp)
+        if version and version % CHECKPOINT_INTERVAL == 0: self._write_checkpoint(version)
+        return version
+
+    def _write_checkpoint(self, version):
+        snap = self.snapshot(version)
+        actions = [{"protocol": PROTOCOL}, {"metaData": snap.metadata}] + \
+            [{"add": a} for a in snap.files.values()] + [{"remove": r} for r in snap.tombstones.values()]
+        with open(self._checkpoint_path(version), "w") as f:
+            for a in actions: f.write(json.dumps(a) + "\n")
+        with open(os.path.join(self.log_dir, "_last_checkpoint"), "w") as f:
+            json.dump({"version": version, "size": len(actions)}, f)
+
+    def _write_files(self, rows, columns, fmt, file_rows, data_change=True, check_schema=False):
+        """Write rows to new immutable data files of at most file_rows each; returns their add actions.
+        With check_schema, a chunk holding a column outside `columns` raises DeltaError (files
+        already written stay uncommitted until VACUUM removes them)."""
+        adds, rows = [], iter(rows)
+        os.makedirs(self.path, exist_ok=True)
+        while True:
+            raw = list(islice(rows, file_rows))
+            if not raw: break
+            if check_schema:
+                extra = {c for r in raw for c in r} - set(columns)
+                if extra: raise DeltaError(f"Columns {sorted(extra)} are not in the table schema")
+            chunk = [{c: r.get(c, "") for c in columns} for r in raw]
+            name = storage.with_format(f"part-{len(adds):05d}-{uuid.uuid4().hex}.csv", fmt)
+            storage.write_rows(os.path.join(self.path, name), chunk, formats=(fmt,))
+            adds.append({"path": name, "size": os.path.getsize(os.path.join(self.path, name)),
+                         "modificationTime": now_ms(), "dataChange": data_change, "stats": file_stats(chunk, columns)})
+        return adds
+
+    @staticmethod
+    def _remove(add, data_change=True):
+        return {"remove": {"path": add["path"], "deletionTimestamp": now_ms(), "dataChange": data_change,
+                           "size": add["size"]}}
+
+    # ─── Reads ───
+    def files(self, version=None, timestamp=None, where=None):
+        """Add actions of the files a read of `version` must open (data skipping on `where`)."""
+        snap = self.snapshot(version, timestamp)
+        return [a for a in snap.files.values() if not where or may_match(a["stats"], where)]
+
+    def iter_rows(self, version=None, timestamp=None, columns=None, where=None):
+        """Rows of the table as of `version` / `timestamp`; `where` is {column: (lo, hi)}."""
+        for add in self.files(version, timestamp, where):
+            path = os.path.join(self.path, add["path"])
+            if storage.existing_format(path) is None:
+                raise DeltaError(f"{add['path']} was removed by VACUUM; this version can no longer be read")
+            for row in storage.iter_rows(path, text=True):
+                if where and not row_matches(row, where): continue
+                yield {c: row[c] for c in columns} if columns else row
+
+    # ─── Writes ───
+    def write(self, rows, mode="append", file_rows=FILE_ROWS, fmt="csv"):
+        """Append rows (creating the table on first write) or overwrite its contents."""
+        rows = iter(rows)
+        first = next(rows, None)
+        read = self.latest_version()
+        actions = []
+        if read is None:
+            if first is None: raise DeltaError("Cannot create a table from no rows")
+            metadata = {"id": str(uuid.uuid4()), "format": fmt, "columns": list(first), "createdTime": now_ms()}
+            actions += [{"protocol": PROTOCOL}, {"metaData": metadata}]
+            files = {}
+        else:
+            snap = self.snapshot(read)
+            metadata, files = snap.metadata, snap.files
+        if first is not None: rows = chain([first], rows)  # streamed: one file's rows in memory at a time
+        adds = self._write_files(rows, metadata["columns"], metadata["format"], file_rows, check_schema=True)
+        if mode == "overwrite": actions += [self._remove(a) for a in files.values()]
+        actions += [{"add": a} for a in adds]
+        metrics = {"numFiles": len(adds), "numOutputRows": sum(a["stats"]["numRecords"] for a in adds)}
+        return self._commit(read, "WRITE" if read is not None else "CREATE TABLE AS SELECT",
+                            {"mode": mode.capitalize()}, actions, metrics)
+
+    def merge(self, source, key, matched="update", not_matched="insert", file_rows=FILE_ROWS):
+        """Upsert `source` rows on `key`. matched: "update" | "delete" | "ignore";
+        not_matched: "insert" | "ignore". Only target files holding a matched key are
+        rewritten (copy-on-write); files whose key range misses the source are not opened.
+        Source values may be Python values (e.g. JSON numbers); they are compared and
+        written as CSV-style strings."""
+        read = self.latest_version()
+        if read is None: raise DeltaError(f"{self.path} is not a Delta table")
+        snap = self.snapshot(read)
+        columns, fmt = snap.metadata["columns"], snap.metadata["format"]
+        if key not in columns: raise DeltaError(f"Merge key {key!r} is not a table column")
+        src = {}
+        for r in map(text_row, source):
+            extra = set(r) - set(columns)
+            if extra: raise DeltaError(f"Columns {sorted(extra)} are not in the table schema")
+            if r[key] in src: raise DeltaError(f"Multiple source rows for {key}={r[key]!r}")
+            src[r[key]] = r
+        t0 = time.perf_counter()
+        src_keys = sorted(typed([k for k in src if k != ""]))
+        m = dict.fromkeys(("numTargetFilesScanned", "numTargetFilesSkipped", "numTargetFilesRemoved", "numTargetFilesAdded",
+                           "numTargetRowsUpdated", "numTargetRowsDeleted", "numTargetRowsInserted", "numTargetRowsCopied"), 0)
+        m["numSourceRows"] = len(src)
+        seen, removes, rewritten = set(), [], []
+        for add in snap.files.values():
+            if not any_key_in_range(src_keys, add["stats"], key):
+                m["numTargetFilesSkipped"] += 1
+                continue
+            m["numTargetFilesScanned"] += 1
+            rows = list(storage.iter_rows(os.path.join(self.path, add["path"]), text=True))
+            hits = {r[key] for r in rows if r[key] in src}
+            seen |= hits
+            if not hits or matched == "ignore": continue  # nothing in this file changes: keep it as is
+            out = []
+            for r in rows:
+                s = src.get(r[key])
+                if s is None:
+                    out.append(r)
+                    m["numTargetRowsCopied"] += 1
+                    continue
+                if matched == "delete": m["numTargetRowsDeleted"] += 1
+                else:
+                    out.append({**r, **s})
+                    m["numTargetRowsUpdated"] += 1
+            removes.append(self._remove(add))
+            rewritten += out
+        inserts = [r for k, r in src.items() if k not in seen] if not_matched == "insert" else []
+        m["numTargetRowsInserted"] = len(inserts)
+        adds = self._write_files(rewritten + inserts, columns, fmt, file_rows)
+        m["numTargetFilesRemoved"], m["numTargetFilesAdded"] = len(removes), len(adds)
+        m["executionTimeMs"] = int((time.perf_counter() - t0) * 1000)
+        if not removes and not adds: return self._result(read, m)
+        params = {"predicate": f"target.{key} = source.{key}", "matched": matched, "notMatched": not_matched}
+        return self._result(self._commit(read, "MERGE", params, removes + [{"add": a} for a in adds], m), m)
+
+    def optimize(self, zorder_by=(), target_file_rows=FILE_ROWS):
+        """Compact files below target_file_rows into files of target_file_rows; with
+        zorder_by, rewrite every file with rows clustered on the Z-order of those columns."""
+        read = self.latest_version()
+        if read is None: raise DeltaError(f"{self.path} is not a Delta table")
+        snap = self.snapshot(read)
+        columns, fmt = snap.metadata["columns"], snap.metadata["format"]
+        missing = [c for c in zorder_by if c not in columns]
+        if missing: raise DeltaError(f"Z-order columns {missing} are not table columns")
+        t0 = time.perf_counter()
+        files = list(snap.files.values())
+        picked = files if zorder_by else [a for a in files if a["stats"]["numRecords"] < target_file_rows]
+        m = {"numFilesBefore": len(files), "numFilesRemoved": 0, "numFilesAdded": 0, "numRowsRewritten": 0}
+        if len(picked) < 2 and not (zorder_by and picked):
+            m["numFilesAfter"] = len(files)
+            return self._result(read, m)
+        rows = [r for a in picked for r in storage.iter_rows(os.path.join(self.path, a["path"]), text=True)]
+        if zorder_by:
+            keys = zorder_keys(rows, list(zorder_by))
+            rows = [rows[i] for i in sorted(range(len(rows)), key=keys.__getitem__)]
+        adds = self._write_files(rows, columns, fmt, target_file_rows, data_change=False)
+        m.update(numFilesRemoved=len(picked), numFilesAdded=len(adds), numRowsRewritten=len(rows),
+                 numFilesAfter=len(files) - len(picked) + len(adds), executionTimeMs=int((time.perf_counter() - t0) * 1000))
+        actions = [self._remove(a, data_change=False) for a in picked] + [{"add": a} for a in adds]
+        params = {"zOrderBy": list(zorder_by), "targetFileRows": target_file_rows}
+        return self._result(self._commit(read, "OPTIMIZE", params, actions, m), m)
+
+    def vacuum(self, retention_hours=RETENTION_HOURS, dry_run=False, check_retention=True):
+        """Delete data files the current version does not reference: removed files once
+        their deletion is older than the retention window, untracked files once their
+        mtime is. Older versions that used a deleted file can no longer be read."""
+        if check_retention and retention_hours < RETENTION_HOURS:
+            raise DeltaError(f"Retention {retention_hours}h is below the {RETENTION_HOURS}h safety threshold; "
+                             "pass check_retention=False to vacuum anyway")
+        read = self.latest_version()
+        if read is None: raise DeltaError(f"{self.path} is not a Delta table")
+        snap = self.snapshot(read)
+        cutoff = now_ms() - retention_hours * 3_600_000
+        doomed = []
+        for name in sorted(os.listdir(self.path)):
+            full = os.path.join(self.path, name)
+            if name.startswith(("_", ".")) or not os.path.isfile(full) or name in snap.files: continue
+            removed = snap.tombstones.get(name)
+            when = removed["deletionTimestamp"] if removed else os.path.getmtime(full) * 1000
+            if when <= cutoff: doomed.append(name)
+        m = {"numFilesToDelete": len(doomed), "sizeOfDataToDelete": sum(os.path.getsize(os.path.join(self.path, n)) for n in doomed),
+             "files": doomed if dry_run else []}
+        if dry_run or not doomed: return self._result(read, m)
+        for name in doomed: os.remove(os.path.join(self.path, name))
+        m.pop("files")
+        m["numDeletedFiles"] = m.pop("numFilesToDelete")
+        return self._result(self._commit(read, "VACUUM", {"retentionHours": retention_hours}, [], m), m)
+
+    def history(self, limit=None):
+        """commitInfo of each version, newest first."""
+        out = []
+        for v in reversed(self.versions()):
+            if limit is not None and len(out) >= limit: break
+            info = self.commit_info(v)
+            out.append({"version": v, "timestamp": iso(info["timestamp"]), **{k: info[k] for k in info if k != "timestamp"}})
+        return out
+
+    def restore(self, version=None, timestamp=None):
+        """Make an earlier version current again by committing its file set."""
+        read = self.latest_version()
+        if read is None: raise DeltaError(f"{self.path} is not a Delta table")
+        target, current = self.snapshot(version, timestamp), self.snapshot(read)
+        restore = [a for p, a in target.files.items() if p not in current.files]
+        gone = [a["path"] for a in restore if storage.existing_format(os.path.join(self.path, a["path"])) is None]
+        if gone: raise DeltaError(f"Cannot restore version {target.version}: {len(gone)} of its files were removed by VACUUM")
+        removes = [self._remove(a) for p, a in current.files.items() if p not in target.files]
+        actions = ([{"metaData": target.metadata}] if target.metadata != current.metadata else []) + removes + \
+            [{"add": {**a, "modificationTime": now_ms(), "dataChange": True}} for a in restore]
+        m = {"tableSizeAfterRestore": sum(a["size"] for a in target.files.values()),
+             "numOfFilesAfterRestore": len(target.files), "numRemovedFiles": len(removes), "numRestoredFiles": len(restore)}
+        return self._result(self._commit(read, "RESTORE", {"version": target.version}, actions, m), m)
+
+    @staticmethod
+    def _result(version, metrics):
+        return {"version": version, "metrics": metrics}
+
+    def describe(self, version=None):
+        snap = self.snapshot(version)
+        sizes = sorted(a["stats"]["numRecords"] for a in snap.files.values())
+        return {"version": snap.version, "timestamp": iso(snap.timestamp), "columns": snap.metadata["columns"],
+                "format": snap.metadata["format"], "numFiles": len(sizes), "numRecords": sum(sizes),
+                "sizeInBytes": sum(a["size"] for a in snap.files.values()),
+                "minFileRows": sizes[0] if sizes else 0, "maxFileRows": sizes[-1] if sizes else 0}
+
+def convert_table(src_path, dest, file_rows=FILE_ROWS, fmt="csv"):
+    """Copy an existing lakehouse table (any storage format / layout) into a new Delta
+    table at `dest`, one version, files of file_rows rows."""
+    table = DeltaTable(dest)
+    if table.exists(): raise DeltaError(f"{dest} is already a Delta table")
+    return table.write(storage.iter_rows(src_path, text=True), file_rows=file_rows, fmt=fmt)
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("convert")
+    p.add_argument("source")
+    p.add_argument("table")
+    p.add_argument("--file-rows", type=int, default=FILE_ROWS)
+    p.add_argument("--format", choices=storage.FORMATS, default="csv")
+    for name in ("describe", "history", "optimize", "vacuum"):
+        p = sub.add_parser(name)
+        p.add_argument("table")
+        if name == "optimize":
+            p.add_argument("--zorder-by", nargs="*", default=[])
+            p.add_argument("--target-file-rows", type=int, default=FILE_ROWS)
+        if name == "vacuum":
+            p.add_argument("--retention-hours", type=float, default=RETENTION_HOURS)
+            p.add_argument("--dry-run", action="store_true")
+            p.add_argument("--no-retention-check", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        out = {"version": convert_table(args.source, args.table, args.file_rows, args.format)}
+    else:
+        table = DeltaTable(args.table)
+        out = {"describe": table.describe, "history": table.history,
+               "optimize": lambda: table.optimize(args.zorder_by, args.target_file_rows),
+               "vacuum": lambda: table.vacuum(args.retention_hours, args.dry_run, not args.no_retention_check)}[args.command]()
+    print(json.dumps(out, indent=1))
+
+if __name__ == "__main__":
+    main()
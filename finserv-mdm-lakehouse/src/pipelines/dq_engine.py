@@ -0,0 +1,503 @@
+"""
+Streaming Data Quality Engine — Horizon Bank Holdings
+======================================================
+Checks are declared up front; the engine then reads every table exactly once,
+in chunks, and feeds each chunk to every check on that table. Nothing keeps a
+table's rows — only per-check state:
+
+  RowCount    running count
+  Unique      compact key set (sorted 64-bit key hashes with NumPy, else a set)
+  References  distinct child keys, diffed against the parent's key set at the end —
+              or, with fpr=, a Bloom semi-join that never holds the parent's keys
+  Rule        failing-row count + first failing rows (optionally reading a Lookup
+              dict built from a smaller table that is scanned first)
+  Aggregate   a predicate over the final row counts of several tables
+
+Check state is mergeable, so a table can also be split into scan units (runs of
+manifest partitions) scanned across a process pool; partial states and parent
+key sets from the workers are merged before any check is finished. Results
+match tests/test_data_quality.py's check-by-check pass/fail, and write_report()
+saves them — timings and failing-row samples included — as JSON.
+"""
+import os, sys, json, math, time
+from itertools import islice
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # optional: key sets fall back to exact Python sets
+    np = None
+
+from src.data_generation import storage
+
+CHUNK_ROWS = 50_000
+UNIT_ROWS = 1_000_000  # partitioned tables are split into scan units of about this many rows
+SAMPLES = 5  # failing rows kept per check
+
+Result = namedtuple("Result", "name section table passed detail seconds samples")
+
+# ─── Compact key sets ───
+FNV_OFFSET, FNV_PRIME = 0xcbf29ce484222325, 0x100000001b3
+
+def hash_keys(values):
+    """Stable 64-bit FNV-1a hashes of a list of strings (vectorized over code points)."""
+    codes = np.array(values, dtype=str)
+    n = len(codes)
+    if not n: return np.empty(0, dtype=np.uint64)
+    width = codes.dtype.itemsize // 4
+    mat = codes.view(np.uint32).reshape(n, max(width, 1)).astype(np.uint64)
+    lengths = np.char.str_len(codes)
+    h, prime = np.full(n, FNV_OFFSET, dtype=np.uint64), np.uint64(FNV_PRIME)
+    with np.errstate(over="ignore"):
+        for c in range(width):  # padding past a string's length leaves its hash untouched
+            h = np.where(c < lengths, (h ^ mat[:, c]) * prime, h)
+        h = (h ^ lengths.astype(np.uint64)) * prime
+    return h
+
+def mix64(h):
+    """murmur3's 64-bit finalizer: spreads FNV's weak high bits before they index anything."""
+    with np.errstate(over="ignore"):
+        for mult in (0xff51afd7ed558ccd, 0xc4ceb9fe1a85ec53):
+            h = (h ^ (h >> np.uint64(33))) * np.uint64(mult)
+        return h ^ (h >> np.uint64(33))
+
+class KeySet:
+    """Set of string keys for uniqueness and referential checks. With NumPy it holds
+    sorted unique 64-bit hashes (8 bytes/key; collisions are ~n²/2⁶⁵-unlikely),
+    otherwise the exact strings. With track_duplicates it also keeps the keys added
+    more than once (see duplicated()), which costs nothing extra while there are none."""
+    def __init__(self, track_duplicates=False):
+        self.added, self._parts, self._keys = 0, [], None if np else set()
+        self.track, self._dups = track_duplicates, [] if np else set()
+
+    def add(self, values):
+        self.added += len(values)
+        if np is None:
+            if not self.track: self._keys.update(values)
+            else:
+                for v in values:
+                    if v in self._keys: self._dups.add(v)
+                    else: self._keys.add(v)
+        else:
+            self._parts.append(self._unique(hash_keys(values)))
+            if len(self._parts) >= 16: self._compact()
+
+    def _unique(self, h):
+        if not self.track: return np.unique(h)
+        keys, counts = np.unique(h, return_counts=True)
+        if (counts > 1).any(): self._dups = [np.unique(np.concatenate(self._dups + [keys[counts > 1]]))]
+        return keys
+
+    def _compact(self):
+        if self._parts or self._keys is None:
+            parts = self._parts + ([self._keys] if self._keys is not None else [])
+            self._keys, self._parts = self._unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.uint64), []
+
+    def merge(self, other):
+        self.added += other.added
+        if np is None:
+            if self.track: self._dups |= other._dups | (self._keys & other._keys)
+            self._keys |= other._keys
+        else:
+            other._compact()
+            self._dups += other._dups
+            self._parts.append(other._keys)  # keys in both sets turn up as duplicates here
+            self._compact()
+        return self
+
+    def duplicated(self):
+        """The keys added more than once, as a KeySet (needs track_duplicates)."""
+        out = KeySet()
+        if np is None: out._keys = set(self._dups)
+        else:
+            self._compact()
+            out._keys = np.unique(np.concatenate(self._dups)) if self._dups else np.empty(0, dtype=np.uint64)
+        return out
+
+    def __len__(self):
+        if np is not None: self._compact()
+        return len(self._keys)
+
+    @property
+    def duplicates(self): return self.added - len(self)
+
+    def missing_from(self, other):
+        """Number of keys here that are absent from `other`."""
+        if np is None: return len(self._keys - other._keys)
+        self._compact(); other._compact()
+        return int((~np.isin(self._keys, other._keys, assume_unique=True)).sum())
+
+    def __contains__(self, key): return bool(self.contains([key])[0])
+
+    def contains(self, values):
+        """Boolean membership array for a list of keys."""
+        if np is None: return [v in self._keys for v in values]
+        self._compact()
+        h = hash_keys(values)
+        if not len(self._keys): return np.zeros(len(h), dtype=bool)
+        i = np.minimum(np.searchsorted(self._keys, h), len(self._keys) - 1)
+        return self._keys[i] == h
+
+    @property
+    def nbytes(self):
+        if np is None: return sum(map(sys.getsizeof, self._keys)) + sys.getsizeof(self._keys)
+        self._compact()
+        return self._keys.nbytes
+
+# ─── Bloom filters (approximate membership) ───
+class BloomFilter:
+    """Fixed-capacity Bloom filter over 64-bit key hashes: packed bit array, k probes by
+    double hashing. No false negatives; false positives at ≈ fpr up to `capacity` keys."""
+    def __init__(self, capacity, fpr):
+        self.capacity, self.fpr, self.count = capacity, fpr, 0
+        self.m = max(64, math.ceil(-capacity * math.log(fpr) / math.log(2) ** 2))
+        self.k = max(1, round(self.m / capacity * math.log(2)))
+        self.bits = np.zeros((self.m + 7) // 8, dtype=np.uint8)
+
+    def _probes(self, h):
+        h = mix64(h)
+        with np.errstate(over="ignore"):
+            h1, h2 = h & np.uint64(0xffffffff), (h >> np.uint64(32)) | np.uint64(1)
+            return (h1[:, None] + np.arange(self.k, dtype=np.uint64)[None, :] * h2[:, None]) % np.uint64(self.m)
+
+    def add_hashes(self, h):
+        pos = self._probes(h)
+        np.bitwise_or.at(self.bits, pos >> np.uint64(3), (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8)))
+        self.count += len(h)
+
+    def contains_hashes(self, h):
+        if not len(h): return np.zeros(0, dtype=bool)
+        pos = self._probes(h)
+        return ((self.bits[pos >> np.uint64(3)] >> (pos & np.uint64(7)).astype(np.uint8)) & 1).all(1)
+
+class ScalableBloom:
+    """Bloom filter that grows without knowing the key count up front: a series of
+    BloomFilters of doubling capacity and halving fpr, so the compound false-positive
+    rate stays under `fpr`. Merging concatenates the series (rates add per merged filter)."""
+    def __init__(self, fpr, initial=1 << 16):
+        self.fpr, self.initial, self.filters = fpr, initial, []
+
+    def add(self, values):
+        h = np.unique(hash_keys(values))
+        h = h[~self.contains_hashes(h)]  # only genuinely new keys use up capacity
+        while len(h):
+            if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+                n = len(self.filters)
+                self.filters.append(BloomFilter(self.initial << n, self.fpr / 2 ** (n + 1)))
+            f = self.filters[-1]
+            room = f.capacity - f.count
+            f.add_hashes(h[:room])
+            h = h[room:]
+
+    def contains_hashes(self, h):
+        hit = np.zeros(len(h), dtype=bool)
+        for f in self.filters: hit[~hit] = f.contains_hashes(h[~hit])
+        return hit
+
+    def contains(self, values): return self.contains_hashes(hash_keys(values))
+
+    def merge(self, other):
+        self.filters += other.filters
+        return self
+
+    @property
+    def nbytes(self): return sum(f.bits.nbytes for f in self.filters)
+
+# ─── Check declarations ───
+class Check:
+    """Base: one named check on one table. Subclasses keep only O(keys) state, and
+    states from separate scans of the same table combine with merge()."""
+    section, table = "", None
+    def start(self): return None
+    def update(self, state, rows): pass
+    def merge(self, state, other): return state
+    def finish(self, state, ctx): raise NotImplementedError
+
+class RowCount(Check):
+    def __init__(self, name, table, predicate, detail="Got {n}"):
+        self.name, self.table, self.predicate, self.detail = name, table, predicate, detail
+    def finish(self, state, ctx):
+        n = ctx.counts[self.table]
+        return self.predicate(n), self.detail.format(n=n), []
+
+class Unique(Check):
+    """No two rows share `column`. Samples are the first rows whose key is duplicated
+    (every copy, first one included), read by a second pass over the table."""
+    def __init__(self, name, table, column):
+        self.name, self.table, self.column = name, table, column
+    def start(self): return KeySet(track_duplicates=True)
+    def update(self, keys, rows): keys.add([r[self.column] for r in rows])
+    def merge(self, keys, other): return keys.merge(other)
+    def finish(self, keys, ctx):
+        return keys.duplicates == 0, f"{keys.duplicates} duplicates", ctx.samples.get(self, [])
+
+class References(Check):
+    """Every distinct child[column] value exists in parent[parent_column].
+
+    Exact mode diffs the child's distinct keys against all parent keys; when some are
+    missing, a second child pass keeps the first orphan rows as samples. With `fpr` it is a
+    three-pass Bloom semi-join, still exact but never holding the parent's key set:
+      1. child scan  → ScalableBloom of the child's distinct keys
+      2. parent scan → exact KeySet of parent keys the filter admits (matched keys plus
+                       ≈ fpr × parent false positives)
+      3. child scan  → values missing from that set are orphans, verified exactly,
+                       with the first failing rows kept as samples
+    Falls back to exact mode without NumPy."""
+    def __init__(self, name, table, column, parent, parent_column=None, fpr=None):
+        self.name, self.table, self.column = name, table, column
+        self.parent, self.parent_column = parent, parent_column or column
+        self.fpr = fpr if np is not None else None
+    def start(self): return ScalableBloom(self.fpr) if self.fpr else KeySet()
+    def update(self, keys, rows): keys.add([r[self.column] for r in rows])
+    def merge(self, keys, other): return keys.merge(other)
+    def finish(self, keys, ctx):
+        if self.fpr:
+            orphans, samples = ctx.orphans[self]
+            return not len(orphans), f"{len(orphans)} orphans", samples
+        orphans = keys.missing_from(ctx.keys[(self.parent, self.parent_column)])
+        return orphans == 0, f"{orphans} orphans", ctx.samples.get(self, [])
+
+# key_column → value_column dict of a (small) table, available to Rules on other tables
+Lookup = namedtuple("Lookup", "table key_column value_column")
+
+class Rule(Check):
+    """Every row (optionally only rows matching `where`) satisfies `predicate`. A row whose
+    predicate raises counts as failing. `lookups` maps keyword → Lookup passed to predicate."""
+    def __init__(self, name, table, predicate, where=None, detail=None, lookups=None):
+        self.name, self.table, self.predicate, self.where = name, table, predicate, where
+        self.detail, self.lookups = detail, lookups or {}
+        self._resolved = {}
+    def start(self): return {"failed": 0, "samples": []}
+    def update(self, state, rows):
+        pred, where, kw = self.predicate, self.where, self._resolved
+        for r in rows:
+            if where and not where(r): continue
+            try:
+                ok = pred(r, **kw)
+            except (ValueError, TypeError, KeyError):
+                ok = False
+            if not ok:
+                state["failed"] += 1
+                if len(state["samples"]) < SAMPLES: state["samples"].append(r)
+    def merge(self, state, other):
+        return {"failed": state["failed"] + other["failed"], "samples": (state["samples"] + other["samples"])[:SAMPLES]}
+    def finish(self, state, ctx):
+        failed, samples = state["failed"], state["samples"]
+        detail = (self.detail(samples[0]) if self.detail else f"{failed} failing rows") if failed else ""
+        return failed == 0, detail, samples
+
+class Aggregate(Check):
+    """Predicate over the final row counts of `tables` (dict table → n); `detail` formats the counts."""
+    def __init__(self, name, tables, predicate, detail=None):
+        self.name, self.tables, self.predicate, self.detail = name, tables, predicate, detail
+    def finish(self, state, ctx):
+        counts = {t: ctx.counts[t] for t in self.tables}
+        return self.predicate(counts), self.detail(counts) if self.detail else "", []
+
+def section(name, checks):
+    """Tag a group of checks with the report section they print under."""
+    for c in checks: c.section = name
+    return checks
+
+# ─── Engine ───
+class Context:
+    def __init__(self):
+        self.counts, self.keys, self.lookups, self.orphans, self.samples = {}, {}, {}, {}, {}
+
+def plan(checks):
+    """Tables to scan, in two phases: tables feeding a Lookup, then everything else."""
+    feeds = []
+    for c in checks:
+        for lk in getattr(c, "lookups", {}).values():
+            if lk.table not in feeds: feeds.append(lk.table)
+    rest = []
+    for c in checks:
+        for t in (c.table, getattr(c, "parent", None), *getattr(c, "tables", ())):
+            if t and t not in feeds and t not in rest: rest.append(t)
+    return feeds, rest
+
+def work_units(path, unit_rows=UNIT_ROWS):
+    """Partition-path tuples splitting a partitioned table into scan units of about
+    unit_rows rows; [None] (the whole table) for single-file tables."""
+    manifest = storage.read_manifest(path)
+    if manifest is None: return [None]
+    units, run, rows = [], [], 0
+    for p in manifest["partitions"]:
+        run.append(p["path"])
+        rows += p["rows"]
+        if rows >= unit_rows:
+            units.append(tuple(run))
+            run, rows = [], 0
+    return units + [tuple(run)] if run or not units else units
+
+def scan_table(path, checks, key_columns=(), lookups=(), chunk_rows=CHUNK_ROWS, partitions=None):
+    """One streaming pass over `path` (or just `partitions` of it): updates every check's
+    state and builds the table's parent key sets and lookups.
+    Returns ({check: state}, {check: seconds}, {column: KeySet}, {Lookup: dict}, rows)."""
+    states = {c: c.start() for c in checks}
+    seconds = dict.fromkeys(checks, 0.0)
+    keys = {col: KeySet() for col in key_columns}
+    maps = {lk: {} for lk in lookups}
+    n = 0
+    rows = storage.iter_rows(path, text=True, partitions=partitions)
+    while True:
+        t0 = time.perf_counter()
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk: break
+        n += len(chunk)
+        read = (time.perf_counter() - t0) / max(1, len(checks))  # reading is shared by the table's checks
+        for c in checks:
+            t0 = time.perf_counter()
+            c.update(states[c], chunk)
+            seconds[c] += read + time.perf_counter() - t0
+        for col, ks in keys.items(): ks.add([r[col] for r in chunk])
+        for lk, m in maps.items(): m.update((r[lk.key_column], r[lk.value_column]) for r in chunk)
+    return states, seconds, keys, maps, n
+
+# Worker processes rebuild the checks from the declaring function (lambdas don't pickle)
+_WORKER_CHECKS = None
+
+def _init_worker(declare):
+    global _WORKER_CHECKS
+    _WORKER_CHECKS = declare() if callable(declare) else declare
+
+def _scan_unit(task):
+    """Scan one unit in a worker; check states come back keyed by declaration index."""
+    base_dir, table, partitions, indexes, key_columns, lookups, resolved, chunk_rows = task
+    checks = [_WORKER_CHECKS[i] for i in indexes]
+    for c in checks:
+        if isinstance(c, Rule): c._resolved = {k: resolved[lk] for k, lk in c.lookups.items()}
+    t0 = time.perf_counter()
+    states, seconds, keys, maps, n = scan_table(os.path.join(base_dir, table), checks, key_columns, lookups, chunk_rows, partitions)
+    return ({i: states[c] for i, c in zip(indexes, checks)}, {i: seconds[c] for i, c in zip(indexes, checks)},
+            keys, maps, n, time.perf_counter() - t0)
+
+def _probe_unit(task):
+    """Second passes, in a worker. For approximate References, "parent": collect the
+    parent keys each check's child filter admits; "child": collect each check's orphans
+    (values missing from the admitted parent keys) and sample rows. "samples": the first
+    rows whose key is (probe (keys, True)) or is not (keys, False) in a key set."""
+    base_dir, table, partitions, mode, probes, chunk_rows = task
+    t0 = time.perf_counter()
+    out = {i: KeySet() if mode == "parent" else [] if mode == "samples" else (KeySet(), []) for i in probes}
+    rows = storage.iter_rows(os.path.join(base_dir, table), text=True, partitions=partitions)
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk: break
+        for i, probe in probes.items():
+            c = _WORKER_CHECKS[i]
+            if mode == "parent":
+                keys = [r[c.parent_column] for r in chunk]
+                out[i].add([k for k, hit in zip(keys, probe.contains(keys)) if hit])
+            elif mode == "samples":
+                keys, member = probe
+                if len(out[i]) < SAMPLES:
+                    hits = keys.contains([r[c.column] for r in chunk])
+                    out[i].extend([r for r, hit in zip(chunk, hits) if bool(hit) == member][:SAMPLES - len(out[i])])
+            else:
+                miss = ~probe.contains([r[c.column] for r in chunk])
+                orphans, samples = out[i]
+                bad = [r for r, m in zip(chunk, miss) if m]
+                if bad:
+                    orphans.add([r[c.column] for r in bad])
+                    samples.extend(bad[:SAMPLES - len(samples)])
+        if mode == "samples" and all(len(got) == SAMPLES for got in out.values()): break
+    return out, time.perf_counter() - t0
+
+def _probe_pass(checks, mode, probes, base_dir, pool, chunk_rows, unit_rows, seconds, units):
+    """Run one second pass ("parent" or "child" for the approximate References checks in
+    `probes` ({check index: filter or admitted KeySet}), or "samples"); returns merged
+    outputs by index. Units merge in table order, so pooled runs sample the same rows."""
+    table_of = (lambda c: c.parent) if mode == "parent" else (lambda c: c.table)
+    tasks = []
+    for table in dict.fromkeys(table_of(checks[i]) for i in probes):
+        mine = {i: p for i, p in probes.items() if table_of(checks[i]) == table}
+        tasks += [(base_dir, table, part, mode, mine, chunk_rows) for part in work_units(os.path.join(base_dir, table), unit_rows)]
+    merged = {i: KeySet() if mode == "parent" else [] if mode == "samples" else (KeySet(), []) for i in probes}
+    done = pool.map(_probe_unit, tasks) if pool else map(_probe_unit, tasks)
+    for task, (out, wall) in zip(tasks, done):
+        for i, got in out.items():
+            seconds[i] += wall / len(out)
+            if mode == "parent": merged[i].merge(got)
+            elif mode == "samples": merged[i] = (merged[i] + got)[:SAMPLES]
+            else: merged[i] = (merged[i][0].merge(got[0]), (merged[i][1] + got[1])[:SAMPLES])
+        if units is not None:
+            units.append({"table": task[1], "partitions": task[2], "pass": "samples" if mode == "samples" else f"semi-join {mode}",
+                          "seconds": round(wall, 4)})
+        if mode == "samples" and all(len(got) == SAMPLES for got in merged.values()): break  # later units can't add any
+    return merged
+
+def run(declare, base_dir, workers=1, chunk_rows=CHUNK_ROWS, unit_rows=UNIT_ROWS, units=None):
+    """Evaluate the checks returned by `declare()` (or a list of checks, single-process only);
+    tables are paths relative to base_dir. With workers > 1, scan units run in a process pool
+    and `declare` must be a module-level function. Returns Results in declaration order; if
+    `units` is a list, one {table, partitions, rows, seconds} entry per scan unit is appended."""
+    checks = declare() if callable(declare) else declare
+    if workers > 1 and not callable(declare):
+        raise ValueError("parallel DQ runs need the module-level function that declares the checks")
+    ctx = Context()
+    parent_keys = {}
+    for c in checks:
+        if isinstance(c, References) and not c.fpr: parent_keys.setdefault(c.parent, set()).add(c.parent_column)
+    approx = [i for i, c in enumerate(checks) if isinstance(c, References) and c.fpr]
+    all_lookups = {lk for c in checks for lk in getattr(c, "lookups", {}).values()}
+    states, seconds = {}, [0.0] * len(checks)
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(declare,)) if workers > 1 else None
+    if not pool: _init_worker(checks)
+    try:
+        for phase in plan(checks):
+            tasks = []
+            for table in phase:
+                indexes = [i for i, c in enumerate(checks) if c.table == table and not isinstance(c, (RowCount, Aggregate))]
+                lookups = [lk for lk in all_lookups if lk.table == table]
+                needs = {lk for i in indexes for lk in getattr(checks[i], "lookups", {}).values()}
+                resolved = {lk: ctx.lookups[lk] for lk in needs}
+                for part in work_units(os.path.join(base_dir, table), unit_rows):
+                    tasks.append((base_dir, table, part, indexes, tuple(parent_keys.get(table, ())), lookups, resolved, chunk_rows))
+            done = pool.map(_scan_unit, tasks) if pool else map(_scan_unit, tasks)
+            for task, (st, secs, keys, maps, n, wall) in zip(tasks, done):
+                table = task[1]
+                for i, state in st.items():
+                    states[i] = checks[i].merge(states[i], state) if i in states else state
+                    seconds[i] += secs[i]
+                ctx.counts[table] = ctx.counts.get(table, 0) + n
+                for col, ks in keys.items():
+                    k = (table, col)
+                    ctx.keys[k] = ctx.keys[k].merge(ks) if k in ctx.keys else ks
+                for lk, m in maps.items(): ctx.lookups.setdefault(lk, {}).update(m)
+                if units is not None: units.append({"table": table, "partitions": task[2], "pass": "scan", "rows": n, "seconds": round(wall, 4)})
+        if approx:
+            admitted = _probe_pass(checks, "parent", {i: states[i] for i in approx}, base_dir, pool, chunk_rows, unit_rows, seconds, units)
+            found = _probe_pass(checks, "child", admitted, base_dir, pool, chunk_rows, unit_rows, seconds, units)
+            ctx.orphans.update({checks[i]: found[i] for i in approx})
+        # failing Unique / exact References checks: a second pass for their first failing rows
+        probes = {i: (states[i].duplicated(), True) for i, c in enumerate(checks) if isinstance(c, Unique) and states[i].duplicates}
+        for i, c in enumerate(checks):
+            if isinstance(c, References) and not c.fpr:
+                parent = ctx.keys[(c.parent, c.parent_column)]
+                if states[i].missing_from(parent): probes[i] = (parent, False)
+        if probes:
+            found = _probe_pass(checks, "samples", probes, base_dir, pool, chunk_rows, unit_rows, seconds, units)
+            ctx.samples.update({checks[i]: found[i] for i in probes})
+    finally:
+        if pool: pool.shutdown()
+    results = []
+    for i, c in enumerate(checks):
+        t0 = time.perf_counter()
+        passed, detail, samples = c.finish(states.get(i), ctx)
+        results.append(Result(c.name, c.section, c.table, bool(passed), detail, seconds[i] + time.perf_counter() - t0, samples))
+    return results
+
+def write_report(path, results, units=(), seconds=None, workers=1):
+    """Machine-readable run summary: per-check status, timing and failing-row samples, per-unit scan times."""
+    report = {
+        "passed": sum(r.passed for r in results), "failed": sum(not r.passed for r in results),
+        "seconds": round(seconds, 3) if seconds is not None else None, "workers": workers,
+        "checks": [{"name": r.name, "section": r.section, "table": r.table, "passed": r.passed, "detail": r.detail,
+                    "seconds": round(r.seconds, 4), "samples": r.samples} for r in results],
+        "units": list(units),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f: json.dump(report, f, indent=1)
+    return report
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Golden Record Builder — Horizon Bank Holdings
+==============================================
+Turns auto_merge pairs from mdm_match_pairs into one golden customer record per
+cluster of bronze source records:
+
+  1. union-find over integer record IDs clusters auto_merge pairs transitively
+     (only records that appear in a pair are ever held in memory)
+  2. one streaming pass over the bronze sources: unlinked records become
+     single-source golden records immediately; linked records are grouped by
+     cluster root — in memory, or spilled to hash-bucketed files on disk once
+     there are more than --max-in-memory of them
+  3. each cluster is resolved in a single pass with the per-field survivorship
+     priorities in TECHNICAL_DOCUMENTATION.md (within a source, the most recently
+     dated record wins), and every cross-source decision is logged
+
+Writes mdm/golden_records.csv and mdm/survivorship_log.csv.
+
+Usage: python src/pipelines/golden_records.py [--data-dir data] [--max-in-memory 1000000] [--format csv|parquet|both]
+"""
+import os, sys, json, hashlib, argparse, tempfile
+from array import array
+from collections import defaultdict
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+from src.pipelines import mdm_matching as mdm
+
+MAX_IN_MEMORY = 1_000_000  # linked records grouped in memory before spilling to disk buckets
+
+# ─── Survivorship rules (TECHNICAL_DOCUMENTATION.md § Survivorship Rules) ───
+# field → (source priority, rule, golden columns)
+SURVIVORSHIP = {
+    "legal_name": (("core_banking", "fiserv", "salesforce"), "finance_verified", ("first_name", "last_name")),
+    "email": (("salesforce", "core_banking", "fiserv"), "crm_owner_most_recent", ("email",)),
+    "phone": (("salesforce", "core_banking", "fiserv"), "most_recent_e164", ("phone",)),
+    "billing_address": (("core_banking", "fiserv", "salesforce"), "finance_verified", ("address_line1", "city", "state", "zip_code")),
+    "fico_score": (("core_banking", "fiserv"), "authoritative_credit", ("fico_score",)),
+    "annual_income": (("core_banking", "salesforce"), "underwriting_verified", ("annual_income",)),
+}
+
+# ─── Bronze source → survivorship fields ───
+def _core(r):
+    last, _, first = r["CUST_NAME"].partition(",")
+    return {"record_id": r["CIF_NUM"], "updated": r["ACCT_OPEN_DT"], "first_name": first.strip().title(), "last_name": last.strip().title(),
+            "email": mdm.norm_email(r["EMAIL"]), "phone": mdm.norm_phone(r["PHONE"]), "address_line1": r["ADDR1"].title(),
+            "city": r["CITY"].title(), "state": r["STATE"], "zip_code": r["ZIP"], "fico_score": r["FICO"], "annual_income": ""}
+
+def _sfdc(r):
+    return {"record_id": r["AccountId"], "updated": r["CreatedDate"], "first_name": r["FirstName"], "last_name": r["LastName"],
+            "email": mdm.norm_email(r["PersonEmail"]), "phone": mdm.norm_phone(r["Phone"]), "address_line1": r["MailingStreet"],
+            "city": r["MailingCity"], "state": r["MailingState"], "zip_code": r["MailingPostalCode"], "fico_score": "",
+            "annual_income": r["Annual_Revenue__c"]}
+
+def _fiserv(r):
+    first, _, last = r["FULL_NAME"].rpartition(" ")
+    return {"record_id": r["PARTY_ID"], "updated": r["ONBOARD_DATE"], "first_name": first, "last_name": last,
+            "email": mdm.norm_email(r["EMAIL_ADDR"]), "phone": mdm.norm_phone(r["PHONE_NUM"]), "address_line1": r["STREET_ADDR"],
+            "city": r["CITY_NAME"], "state": r["STATE_CODE"], "zip_code": r["POSTAL_CODE"], "fico_score": r["CREDIT_SCORE"],
+            "annual_income": ""}
+
+SOURCES = {system: (fname, adapt) for (system, (fname, _)), adapt in zip(mdm.SOURCES.items(), (_core, _sfdc, _fiserv))}
+
+def golden_id(members):
+    """Stable ID for a cluster: hash of its smallest (source_system, record_id) member."""
+    anchor = "|".join(min(members))
+    return f"GLD-{hashlib.sha1(anchor.encode()).hexdigest()[:12].upper()}"
+
+# ─── Union-find over integer record IDs ───
+class UnionFind:
+    """Disjoint sets over dense integer IDs (path halving, union by size), grown on demand."""
+    def __init__(self):
+        self.parent, self.size = array("q"), array("q")
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb: return ra
+        if self.size[ra] < self.size[rb]: ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+def link_pairs(pairs):
+    """Cluster auto_merge pairs. Returns ({(source_system, record_id): int ID}, UnionFind)."""
+    ids, uf = {}, UnionFind()
+    def rid(key):
+        if key not in ids: ids[key] = uf.add()
+        return ids[key]
+    for p in pairs:
+        if p["match_tier"] != "auto_merge": continue
+        uf.union(rid((p["source_system_1"], p["customer_id_1"])), rid((p["source_system_2"], p["customer_id_2"])))
+    return ids, uf
+
+# ─── Survivorship ───
+def survive(members):
+    """Resolve one cluster of (source_system, fields) members in a single pass.
+    Returns (golden row, log rows for fields where more than one source offered a value)."""
+    best, offered = {}, defaultdict(set)
+    for system, rec in members:
+        for field, (priority, _, cols) in SURVIVORSHIP.items():
+            if system not in priority or not any(rec[c] for c in cols): continue
+            offered[field].add(system)
+            rank = (-priority.index(system), rec["updated"], rec["record_id"])  # priority, then most recent
+            if field not in best or rank > best[field][0]: best[field] = (rank, system, rec)
+    keys = [(system, rec["record_id"]) for system, rec in members]
+    gid = golden_id(keys)
+    row = {"golden_id": gid}
+    log = []
+    for field, (priority, rule, cols) in SURVIVORSHIP.items():
+        _, system, rec = best.get(field, (None, "", None))
+        for c in cols: row[c] = rec[c] if rec else ""
+        if len(offered[field]) > 1:
+            log.append({"golden_id": gid, "field": field, "value": " ".join(str(rec[c]) for c in cols), "source_system": system,
+                        "source_record_id": rec["record_id"], "rule": rule, "candidates": "|".join(sorted(offered[field]))})
+    keys.sort()
+    row.update(member_count=len(keys), source_systems="|".join(sorted({s for s, _ in keys})),
+               source_record_ids="|".join(r for _, r in keys))
+    return row, log
+
+# ─── Cluster grouping with spill ───
+class ClusterGroups:
+    """Groups linked records by cluster root; past `max_in_memory` records, spills every
+    group to hash-bucketed JSON-lines files so only one bucket is ever resident."""
+    def __init__(self, n_linked, max_in_memory=MAX_IN_MEMORY, spill_dir=None):
+        self.n_buckets = max(1, -(-n_linked // max_in_memory)) if n_linked > max_in_memory else 0
+        self.groups = defaultdict(list)
+        if self.n_buckets:
+            self._tmp = tempfile.TemporaryDirectory(dir=spill_dir, prefix="golden-spill-")
+            self.files = [open(os.path.join(self._tmp.name, f"bucket-{b:05d}.jsonl"), "w") for b in range(self.n_buckets)]
+
+    def add(self, root, system, rec):
+        if not self.n_buckets:
+            self.groups[root].append((system, rec))
+        else:
+            self.files[root % self.n_buckets].write(json.dumps([root, system, rec]) + "\n")
+
+    def clusters(self):
+        """Yield each cluster's member list (bucket by bucket when spilled)."""
+        if not self.n_buckets:
+            yield from self.groups.values()
+            return
+        for f in self.files: f.close()
+        try:
+            for f in self.files:
+                groups = defaultdict(list)
+                with open(f.name) as src:
+                    for line in src:
+                        root, system, rec = json.loads(line)
+                        groups[root].append((system, rec))
+                yield from groups.values()
+        finally:
+            self._tmp.cleanup()
+
+def build_golden_records(bronze_dir, pairs, max_in_memory=MAX_IN_MEMORY, spill_dir=None):
+    """Yield (golden row, log rows) for every cluster, singletons included."""
+    ids, uf = link_pairs(pairs)
+    groups = ClusterGroups(len(ids), max_in_memory, spill_dir)
+    for system, (fname, adapt) in SOURCES.items():
+        for row in storage.iter_rows(os.path.join(bronze_dir, fname), text=True):
+            rec = adapt(row)
+            x = ids.get((system, rec["record_id"]))
+            if x is None:
+                yield survive([(system, rec)])
+            else:
+                groups.add(uf.find(x), system, rec)
+    for members in groups.clusters():
+        yield survive(members)
+
+def write_golden_records(data_dir, formats=("csv",), max_in_memory=MAX_IN_MEMORY, **parquet_opts):
+    """Build golden records from <data_dir>/bronze + mdm_match_pairs. Returns (golden rows, log rows)."""
+    mdm_dir = os.path.join(data_dir, "mdm")
+    pairs = storage.iter_rows(os.path.join(mdm_dir, "mdm_match_pairs.csv"), text=True)
+    log_path, golden_path = os.path.join(mdm_dir, "survivorship_log.csv"), os.path.join(mdm_dir, "golden_records.csv")
+    for path in (log_path, golden_path): storage.reset_table(path)
+    n_log = 0
+    with storage.TableWriter(log_path, formats, **parquet_opts) as log:
+        def golden():
+            nonlocal n_log
+            for row, entries in build_golden_records(os.path.join(data_dir, "bronze"), pairs, max_in_memory, mdm_dir):
+                if entries:
+                    log.write_rows(entries)
+                    n_log += len(entries)
+                yield row
+        n = storage.write_rows(golden_path, golden(), formats, **parquet_opts)
+    return n, n_log
+
+def main():
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=os.path.join(root, "data"))
+    parser.add_argument("--max-in-memory", type=int, default=MAX_IN_MEMORY, help="Linked records grouped in memory before spilling")
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default="csv")
+    args = parser.parse_args()
+    formats = storage.FORMATS if args.format == "both" else (args.format,)
+    n, n_log = write_golden_records(args.data_dir, formats, args.max_in_memory)
+    print(f"\n▶ Survivorship")
+    print(f"  ✓ golden_records.csv    → {n:,} golden records")
+    print(f"  ✓ survivorship_log.csv  → {n_log:,} field decisions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+MDM Matching Engine — Horizon Bank Holdings
+============================================
+Fuzzy-matches customer records across the three bronze sources (Core Banking,
+Salesforce, Fiserv) and writes scored candidate pairs in the mdm_match_pairs
+schema.
+
+Candidates come from blocking, never from all N² pairs:
+  • soundex(last_name) + zip
+  • phone prefix (E.164 country code + area code + exchange)
+  • sorted neighbourhood: a sliding window over records sorted by name
+
+Each candidate is scored on the weighted composite in TECHNICAL_DOCUMENTATION.md
+(name 30%, email 25%, phone 20%, address 15%, cross-system 10%) and tiered
+AUTO_MERGE ≥ 0.92 / REVIEW ≥ 0.75 / NO_MATCH.
+
+Usage: python src/pipelines/mdm_matching.py [--data-dir data] [--output data/mdm/mdm_match_pairs.csv]
+                                            [--window 5] [--max-block 200] [--min-score 0.5]
+"""
+import os, re, sys, argparse
+from datetime import datetime
+from functools import lru_cache
+from collections import defaultdict
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+from src.pipelines import similarity
+
+# ─── Scoring config (TECHNICAL_DOCUMENTATION.md § MDM Matching Engine) ───
+WEIGHTS = {"name": 0.30, "email": 0.25, "phone": 0.20, "address": 0.15, "cross_system": 0.10}
+AUTO_MERGE, REVIEW = 0.92, 0.75
+PHONE_PREFIX = 7         # national digits shared by a "prefix match"
+WINDOW = 5               # sorted-neighbourhood window
+MAX_BLOCK = 200          # key blocks larger than this are too unselective to pair out
+MIN_SCORE = 0.5          # candidates scoring below this are not written
+
+# ─── Bronze source adapters: source row → common record ───
+def _core(r):
+    last, _, first = r["CUST_NAME"].partition(",")
+    return {"record_id": r["CIF_NUM"], "first": first, "last": last, "email": r["EMAIL"], "phone": r["PHONE"],
+            "street": r["ADDR1"], "city": r["CITY"], "state": r["STATE"], "zip": r["ZIP"]}
+
+def _sfdc(r):
+    return {"record_id": r["AccountId"], "first": r["FirstName"], "last": r["LastName"], "email": r["PersonEmail"],
+            "phone": r["Phone"], "street": r["MailingStreet"], "city": r["MailingCity"],
+            "state": r["MailingState"], "zip": r["MailingPostalCode"]}
+
+def _fiserv(r):
+    first, _, last = r["FULL_NAME"].rpartition(" ")
+    return {"record_id": r["PARTY_ID"], "first": first, "last": last, "email": r["EMAIL_ADDR"], "phone": r["PHONE_NUM"],
+            "street": r["STREET_ADDR"], "city": r["CITY_NAME"], "state": r["STATE_CODE"], "zip": r["POSTAL_CODE"]}
+
+SOURCES = {
+    "core_banking": ("core_banking_customers.csv", _core),
+    "salesforce": ("salesforce_accounts.csv", _sfdc),
+    "fiserv": ("fiserv_parties.csv", _fiserv),
+}
+
+# ─── Normalization (names repeat heavily across records, so the pure helpers are memoized) ───
+@lru_cache(maxsize=1 << 16)
+def norm_name(s):
+    return " ".join(re.sub(r"[^a-z ]", " ", s.lower()).split())
+
+def norm_email(s):
+    return s.strip().lower()
+
+def norm_phone(s):
+    """E.164: +1 and ten national digits for US numbers; other digit strings get a bare +."""
+    digits = re.sub(r"\D", "", s)
+    if len(digits) == 10: digits = "1" + digits
+    return "+" + digits if digits else ""
+
+def address_tokens(r):
+    return frozenset(norm_name(f"{r['street']} {r['city']}").split() + [r["state"].strip().lower(), r["zip"].strip()[:5]])
+
+@lru_cache(maxsize=1 << 16)
+def soundex(s):
+    """American Soundex (R163 for Robert/Rupert)."""
+    s = re.sub(r"[^A-Z]", "", s.upper())
+    if not s: return ""
+    codes = {c: str(d) for d, letters in enumerate(["AEIOUYHW", "BFPV", "CGJKQSXZ", "DT", "L", "MN", "R"]) for c in letters}
+    out, prev = s[0], codes[s[0]]
+    for c in s[1:]:
+        code = codes[c]
+        if code != "0" and code != prev: out += code
+        if c not in "HW": prev = code
+    return (out + "000")[:4]
+
+def normalize(r, source_system):
+    """Common record plus the normalized fields scoring and blocking read (computed once per record)."""
+    first, last = norm_name(r["first"]), norm_name(r["last"])
+    return dict(r, source_system=source_system, name=f"{first} {last}".strip(), first_n=first, last_n=last,
+                email_n=norm_email(r["email"]), phone_n=norm_phone(r["phone"]), addr=address_tokens(r))
+
+def load_records(bronze_dir):
+    """All bronze customer records, normalized, in source order (core → salesforce → fiserv)."""
+    records = []
+    for system, (fname, adapt) in SOURCES.items():
+        records.extend(normalize(adapt(row), system) for row in storage.iter_rows(os.path.join(bronze_dir, fname), text=True))
+    return records
+
+# ─── Similarity ───
+def jaro_winkler(a, b, p=0.1):
+    if a == b: return 1.0 if a else 0.0
+    la, lb = len(a), len(b)
+    if not la or not lb: return 0.0
+    reach = max(la, lb) // 2 - 1
+    used = [False] * lb
+    ma = []
+    for i, ch in enumerate(a):
+        for j in range(max(0, i - reach), min(lb, i + reach + 1)):
+            if not used[j] and b[j] == ch:
+                used[j] = True
+                ma.append(ch)
+                break
+    m = len(ma)
+    if not m: return 0.0
+    mb = [b[j] for j in range(lb) if used[j]]
+    t = sum(x != y for x, y in zip(ma, mb)) / 2
+    jaro = (m / la + m / lb + (m - t) / m) / 3
+    prefix = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y: break
+        prefix += 1
+    return jaro + prefix * p * (1 - jaro)
+
+def name_score(r1, r2):
+    score = jaro_winkler(r1["name"], r2["name"])
+    # "J. Smith" vs "John Smith": an initial that agrees counts as the full first name
+    f1, f2 = r1["first_n"], r2["first_n"]
+    if r1["last_n"] == r2["last_n"] and f1 and f2 and (len(f1) == 1 or len(f2) == 1) and f1[0] == f2[0]:
+        score = max(score, jaro_winkler(r1["last_n"], r2["last_n"]) * 0.95)
+    return score
+
+def email_score(r1, r2):
+    return 1.0 if r1["email_n"] and r1["email_n"] == r2["email_n"] else 0.0
+
+def phone_score(r1, r2):
+    """1.0 exact; ≥0.8 when the first PHONE_PREFIX national digits agree; else the shared-prefix share."""
+    a, b = r1["phone_n"], r2["phone_n"]
+    if not a or not b: return 0.0
+    if a == b: return 1.0
+    shared = 0
+    for x, y in zip(a[2:], b[2:]):
+        if x != y: break
+        shared += 1
+    n = max(len(a), len(b)) - 2
+    if shared >= PHONE_PREFIX: return 0.8 + 0.2 * (shared - PHONE_PREFIX) / max(1, n - PHONE_PREFIX)
+    return shared / n * 0.5 if n > 0 else 0.0
+
+def address_score(r1, r2):
+    a, b = r1["addr"], r2["addr"]
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def score_pair(r1, r2):
+    """Per-dimension scores and the weighted composite for one candidate pair."""
+    scores = {"name": name_score(r1, r2), "email": email_score(r1, r2), "phone": phone_score(r1, r2),
+              "address": address_score(r1, r2), "cross_system": 1.0 if r1["source_system"] != r2["source_system"] else 0.0}
+    scores["composite"] = sum(scores[k] * w for k, w in WEIGHTS.items())
+    return scores
+
+def tier(composite):
+    return "auto_merge" if composite >= AUTO_MERGE else ("review" if composite >= REVIEW else "no_match")
+
+# ─── Blocking ───
+BLOCK_KEYS = {
+    "soundex_zip": lambda r: f"{soundex(r['last_n'])}|{r['zip'].strip()[:5]}" if r["last_n"] else None,
+    "phone_prefix": lambda r: r["phone_n"][:2 + PHONE_PREFIX] if len(r["phone_n"]) >= 2 + PHONE_PREFIX else None,
+}
+
+def key_blocks(records, key, max_block=MAX_BLOCK):
+    """Candidate (i, j) index pairs, i < j, sharing a blocking key value."""
+    blocks = defaultdict(list)
+    for i, r in enumerate(records):
+        k = key(r)
+        if k: blocks[k].append(i)
+    for members in blocks.values():
+        if len(members) > max_block: continue
+        for x, i in enumerate(members):
+            for j in members[x + 1:]: yield i, j
+
+def sorted_neighbourhood(records, window=WINDOW):
+    """Candidate pairs within `window` positions of each other when sorted by (last, first, zip)."""
+    order = sorted(range(len(records)), key=lambda i: (records[i]["last_n"], records[i]["first_n"], records[i]["zip"], i))
+    for pos, i in enumerate(order):
+        for j in order[pos + 1:pos + window]:
+            yield (i, j) if i < j else (j, i)
+
+def candidate_pairs(records, window=WINDOW, max_block=MAX_BLOCK):
+    """Union of all blocking strategies, deduplicated and in index order."""
+    pairs = set(sorted_neighbourhood(records, window))
+    for key in BLOCK_KEYS.values(): pairs.update(key_blocks(records, key, max_block))
+    return sorted(pairs)
+
+# ─── Matching ───
+def scored_pairs(records, pairs, min_score=MIN_SCORE, vectorized=None):
+    """(i, j, scores) for candidate pairs whose composite may reach min_score, in pair order.
+    Uses the batch kernel in similarity.py when NumPy is available, else score_pair()."""
+    if vectorized is None: vectorized = similarity.np is not None
+    if not vectorized:
+        for i, j in pairs: yield i, j, score_pair(records[i], records[j])
+        return
+    scorer = similarity.PairScorer(records, PHONE_PREFIX)
+    for i, j, s in similarity.score_batches(scorer, pairs, WEIGHTS):
+        for k in similarity.np.flatnonzero(s["composite"] >= min_score - 1e-4).tolist():  # exact cut happens after rounding
+            yield int(i[k]), int(j[k]), {dim: float(v[k]) for dim, v in s.items()}
+
+def match_records(records, window=WINDOW, max_block=MAX_BLOCK, min_score=MIN_SCORE, now=None, vectorized=None):
+    """Score every blocked candidate pair; yield mdm_match_pairs rows at or above min_score."""
+    decided_at = (now or datetime.now()).strftime("%Y-%m-%dT%H:%M:%SZ")
+    n_pairs = 0
+    for i, j, s in scored_pairs(records, candidate_pairs(records, window, max_block), min_score, vectorized):
+        if round(s["composite"], 4) < min_score: continue
+        n_pairs += 1
+        yield pair_row(n_pairs, records[i], records[j], s, decided_at)
+
+def pair_row(n, r1, r2, s, decided_at):
+    """One mdm_match_pairs row for scored records r1, r2 (pair number n)."""
+    composite = round(s["composite"], 4)
+    t = tier(composite)
+    return {
+        "pair_id": f"MPR-{n:05d}",
+        "customer_id_1": r1["record_id"],
+        "source_system_1": r1["source_system"],
+        "customer_id_2": r2["record_id"],
+        "source_system_2": r2["source_system"],
+        "name_score": round(s["name"], 4),
+        "email_score": round(s["email"], 4),
+        "phone_score": round(s["phone"], 4),
+        "address_score": round(s["address"], 4),
+        "cross_system_score": round(s["cross_system"], 4),
+        "composite_score": composite,
+        "match_tier": t,
+        "match_decision": {"auto_merge": "merge", "review": "pending", "no_match": "reject"}[t],
+        "decided_by": "pending" if t == "review" else "system",
+        "decided_at": "" if t == "review" else decided_at,
+    }
+
+def match_bronze(bronze_dir, **opts):
+    """Match the three bronze source tables under bronze_dir."""
+    return match_records(load_records(bronze_dir), **opts)
+
+def main():
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-dir", default=os.path.join(root, "data"))
+    parser.add_argument("--output", default=None, help="Defaults to <data-dir>/mdm/mdm_match_pairs.csv")
+    parser.add_argument("--window", type=int, default=WINDOW, help="Sorted-neighbourhood window")
+    parser.add_argument("--max-block", type=int, default=MAX_BLOCK, help="Skip key blocks larger than this")
+    parser.add_argument("--min-score", type=float, default=MIN_SCORE, help="Drop candidates below this composite")
+    parser.add_argument("--format", choices=["csv", "parquet", "both"], default="csv")
+    args = parser.parse_args()
+    output = args.output or os.path.join(args.data_dir, "mdm", "mdm_match_pairs.csv")
+    formats = storage.FORMATS if args.format == "both" else (args.format,)
+
+    records = load_records(os.path.join(args.data_dir, "bronze"))
+    n_candidates = len(candidate_pairs(records, args.window, args.max_block))
+    print(f"\n▶ Matching {len(records):,} bronze records ({n_candidates:,} blocked candidates vs {len(records) * (len(records) - 1) // 2:,} all-pairs)")
+    tiers = defaultdict(int)
+    def counted(rows):
+        for row in rows:
+            tiers[row["match_tier"]] += 1
+            yield row
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    n = storage.write_rows(output, counted(match_records(records, args.window, args.max_block, args.min_score)), formats)
+    print(f"  ✓ {os.path.basename(output)} → {n:,} pairs ({', '.join(f'{t}: {tiers[t]:,}' for t in ('auto_merge', 'review', 'no_match'))})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Streaming Table Profiler — Horizon Bank Holdings
+=================================================
+Profiles any lakehouse table — schema, volume, nullability, cardinality and
+distributions — in one pass over columnar batches (storage.iter_columns).
+Memory is bounded by the sketch sizes, never by the table:
+
+  HyperLogLog   distinct count per column (2^14 registers, ~0.8% standard error)
+  KLL           quantiles of numeric columns (~1% rank error at k=200)
+  Top values    exact counts for categorical columns (dropped past 4·TOP_K distinct)
+  Reservoir     uniform sample of `sample_size` rows (Algorithm L)
+
+Each value is typed as boolean / integer / decimal / date / timestamp / string;
+a column gets the narrowest type that all of its non-null values fit.
+
+Usage: python src/pipelines/profiler.py data/bronze/core_banking_customers.csv [--sample-size 1000]
+"""
+import os, re, sys, json, math, time, random, hashlib, argparse
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # optional: HyperLogLog falls back to per-value hashing
+    np = None
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+from src.pipelines.dq_engine import hash_keys, mix64
+
+HLL_PRECISION = 14
+KLL_K = 200
+TOP_K = 10
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+BATCH_ROWS = 65_536
+NULL_TOKENS = frozenset({"", "NULL", "null", "None", "N/A"})
+
+# ─── Type inference ───
+TYPES = {  # narrowest first; a value takes the first pattern it fully matches
+    "boolean": r"True|False|true|false",
+    "integer": r"[+-]?\d+",
+    "decimal": r"[+-]?(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?",
+    "date": r"\d{4}-\d{2}-\d{2}",
+    "timestamp": r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?",
+}
+VALUE_RE = re.compile("|".join(f"(?P<{kind}>{pattern})" for kind, pattern in TYPES.items()))
+# Batch paths scan the newline-joined values once instead of calling a regex per value:
+# a uniform batch fully matches one BATCH_RE; otherwise LINE_RE finds just the typed lines
+BATCH_RE = {kind: re.compile(rf"(?:(?:{pattern})\n)*") for kind, pattern in TYPES.items()}
+LINE_RE = re.compile("^(?:" + "|".join(f"({pattern})" for pattern in TYPES.values()) + ")$", re.M)
+NUMERIC = ("integer", "decimal")
+
+def value_types(values):
+    """Counter of inferred types for a list of non-null strings."""
+    joined = "\n".join(values) + "\n"
+    if joined.count("\n") != len(values):  # embedded newlines: lines no longer align with values
+        return Counter(m.lastgroup if m else "string" for m in map(VALUE_RE.fullmatch, values))
+    for kind, batch_re in BATCH_RE.items():
+        if batch_re.fullmatch(joined): return Counter({kind: len(values)})
+    typed = LINE_RE.findall(joined)
+    kinds = Counter(next(kind for kind, g in zip(TYPES, groups) if g) for groups in typed)
+    if len(typed) < len(values): kinds["string"] = len(values) - len(typed)
+    return kinds
+
+def column_type(kinds):
+    """Narrowest type covering every observed value type."""
+    if not kinds: return "null"
+    if len(kinds) == 1: return next(iter(kinds))
+    if kinds <= set(NUMERIC): return "decimal"
+    if kinds <= {"date", "timestamp"}: return "timestamp"
+    return "string"
+
+# ─── Sketches ───
+def _bit_length(x):
+    """Vectorized int.bit_length for a uint64 array."""
+    n = np.zeros(len(x), dtype=np.int64)
+    for s in (32, 16, 8, 4, 2, 1):
+        big = x >= np.uint64(1 << s)
+        n += big * s
+        x = np.where(big, x >> np.uint64(s), x)
+    return n + (x > 0)
+
+class HyperLogLog:
+    """Distinct-count sketch: 2^p one-byte registers holding the max leading-zero rank per bucket."""
+    def __init__(self, p=HLL_PRECISION):
+        self.p, self.m = p, 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8) if np is not None else bytearray(self.m)
+
+    def add(self, values):
+        if not values: return
+        p, cap = self.p, 65 - self.p
+        if np is None:
+            for v in values:
+                h = int.from_bytes(hashlib.blake2b(v.encode(), digest_size=8).digest(), "big")
+                rank = min(65 - ((h << p) & 0xffffffffffffffff).bit_length(), cap)
+                i = h >> (64 - p)
+                if rank > self.registers[i]: self.registers[i] = rank
+            return
+        h = mix64(hash_keys(values))
+        rank = np.minimum(65 - _bit_length(h << np.uint64(p)), cap).astype(np.uint8)
+        np.maximum.at(self.registers, (h >> np.uint64(64 - p)).astype(np.intp), rank)
+
+    def merge(self, other):
+        if np is None: self.registers = bytearray(map(max, self.registers, other.registers))
+        else: np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = self.m
+        z = sum(2.0 ** -r for r in self.registers) if np is None else float(np.ldexp(1.0, -self.registers.astype(np.int64)).sum())
+        e = 0.7213 / (1 + 1.079 / m) * m * m / z
+        zeros = m - (np.count_nonzero(self.registers) if np is not None else sum(map(bool, self.registers)))
+        if e <= 2.5 * m and zeros: e = m * math.log(m / zeros)  # small-range (linear counting) correction
+        return round(e)
+
+class KLL:
+    """Mergeable quantile sketch: levels of compactors whose capacity shrinks by 2/3 per level
+    below the top. A full level is sorted and every other item (random offset) moves up a
+    level with double weight, so memory stays O(k log(n/k))."""
+    def __init__(self, k=KLL_K, seed=0):
+        self.k, self.levels, self.n, self.rng = k, [[]], 0, random.Random(seed)
+
+    def _capacity(self, h):
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - h)))
+
+    def update(self, values):
+        self.levels[0].extend(values)
+        self.n += len(values)
+        self._compress()
+
+    def _compress(self):
+        while True:
+            full = [h for h, level in enumerate(self.levels) if len(level) > self._capacity(h)]
+            if not full: return
+            h = full[0]
+            if h + 1 == len(self.levels): self.levels.append([])
+            level = sorted(self.levels[h])
+            self.levels[h] = [level.pop()] if len(level) % 2 else []
+            self.levels[h + 1].extend(level[self.rng.randint(0, 1)::2])
+
+    def merge(self, other):
+        for h, level in enumerate(other.levels):
+            if h == len(self.levels): self.levels.append([])
+            self.levels[h].extend(level)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs=QUANTILES):
+        items = sorted((v, 1 << h) for h, level in enumerate(self.levels) for v in level)
+        if not items: return {}
+        total, out, cum, i = sum(w for _, w in items), {}, 0, 0
+        for q in sorted(qs):
+            while i < len(items) - 1 and cum + items[i][1] < q * total:
+                cum += items[i][1]
+                i += 1
+            out[q] = items[i][0]
+        return out
+
+class TopValues:
+    """Exact value counts, capped: once a column shows more than `capacity` distinct values
+    it is not categorical, the counts are dropped and later updates are no-ops."""
+    def __init__(self, capacity=4 * TOP_K):
+        self.capacity, self.counts, self.exact = capacity, Counter(), True
+
+    def update(self, values):
+        if not self.exact: return
+        self.counts.update(values)
+        if len(self.counts) > self.capacity: self.counts, self.exact = Counter(), False
+
+    def top(self, k=TOP_K): return self.counts.most_common(k)
+
+class Reservoir:
+    """Uniform sample of k rows from a stream of unknown length (Algorithm L): once full it
+    jumps straight to the next row that gets in, so the cost is O(k log(n/k)), not O(n)."""
+    def __init__(self, k, seed=0):
+        self.k, self.rng, self.items, self.seen = k, random.Random(seed), [], 0
+        self.w = self._draw()
+        self.next = k + self._skip()
+
+    def _u(self): return self.rng.random() or 1e-300
+
+    def _draw(self): return math.exp(math.log(self._u()) / self.k) if self.k else 1.0
+
+    def _skip(self): return int(math.log(self._u()) / math.log(1 - self.w)) if 0 < self.w < 1 else 0
+
+    def offer(self, n):
+        """Advance by a batch of n rows; returns the (slot, row offset) placements in order."""
+        lo, picks = self.seen, []
+        while self.seen < lo + n and self.seen < self.k:
+            picks.append((self.seen, self.seen - lo))
+            self.seen += 1
+        self.seen = lo + n
+        while self.k and self.next < self.seen:
+            picks.append((self.rng.randrange(self.k), self.next - lo))
+            self.w *= self._draw()
+            self.next += self._skip() + 1
+        return picks
+
+    def place(self, slot, row):
+        if slot == len(self.items): self.items.append(row)
+        else: self.items[slot] = row
+
+# ─── Column + table profiles ───
+class ColumnProfile:
+    def __init__(self, name, seed=0):
+        self.name, self.rows, self.nulls = name, 0, 0
+        self.types, self.hll, self.kll, self.top = Counter(), HyperLogLog(), KLL(seed=seed), TopValues()
+        self.num_min = self.num_max = self.lo = self.hi = self.min_len = self.max_len = None
+        self.num_sum = 0.0
+
+    def update(self, values):
+        self.rows += len(values)
+        present = [v for v in values if v not in NULL_TOKENS]
+        self.nulls += len(values) - len(present)
+        if not present: return
+        kinds = value_types(present)
+        self.types.update(kinds)
+        if set(kinds) <= set(NUMERIC):
+            nums = list(map(float, present))
+        elif not kinds.keys() & set(NUMERIC):
+            nums = []
+        else:
+            nums = [float(v) for v, m in zip(present, map(VALUE_RE.fullmatch, present)) if m and m.lastgroup in NUMERIC]
+        if nums:
+            self.kll.update(nums)
+            self.num_sum += math.fsum(nums)
+            lo, hi = min(nums), max(nums)
+            self.num_min = lo if self.num_min is None else min(self.num_min, lo)
+            self.num_max = hi if self.num_max is None else max(self.num_max, hi)
+        lengths = list(map(len, present))
+        lo, hi = min(present), max(present)
+        self.lo = lo if self.lo is None else min(self.lo, lo)
+        self.hi = hi if self.hi is None else max(self.hi, hi)
+        self.min_len = min(lengths) if self.min_len is None else min(self.min_len, min(lengths))
+        self.max_len = max(lengths) if self.max_len is None else max(self.max_len, max(lengths))
+        self.hll.add(present)
+        self.top.update(present)
+
+    def summary(self):
+        present = self.rows - self.nulls
+        kind = column_type(set(self.types))
+        out = {"name": self.name, "type": kind, "nulls": self.nulls,
+               "null_fraction": round(self.nulls / self.rows, 4) if self.rows else 0.0,
+               "distinct_estimate": min(self.hll.estimate(), present)}
+        if len(self.types) > 1: out["type_counts"] = dict(self.types.most_common())
+        if kind in NUMERIC and self.kll.n:
+            out.update(min=self.num_min, max=self.num_max, mean=round(self.num_sum / self.kll.n, 4),
+                       quantiles={f"p{round(q * 100):02d}": v for q, v in self.kll.quantiles().items()})
+        elif present:
+            out.update(min=self.lo, max=self.hi, min_length=self.min_len, max_length=self.max_len)
+        if present and self.top.exact:  # categorical column: counts are exact
+            out["top_values"] = [[v, c] for v, c in self.top.top()]
+        return out
+
+def profile_table(path, sample_size=1000, seed=0, batch_rows=BATCH_ROWS):
+    """Profile the table at `path` (any format/layout storage reads) in one streaming pass."""
+    t0 = time.perf_counter()
+    columns, sample, rows = {}, Reservoir(sample_size, seed), 0
+    for batch in storage.iter_columns(path, batch_rows):
+        n = len(next(iter(batch.values()), ()))
+        for name, values in batch.items():
+            if name not in columns: columns[name] = ColumnProfile(name, seed)
+            columns[name].update(values)
+        for slot, i in sample.offer(n):
+            sample.place(slot, {name: values[i] for name, values in batch.items()})
+        rows += n
+    manifest = storage.read_manifest(path)
+    return {
+        "path": path, "format": manifest["formats"][0] if manifest else storage.existing_format(path),
+        "layout": "partitioned" if manifest else "file", "rows": rows,
+        "columns": [c.summary() for c in columns.values()],
+        "sample_size": len(sample.items), "sample": sample.items,
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="Table path (.csv/.parquet, or a partitioned table directory)")
+    parser.add_argument("--sample-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    profile = profile_table(args.path, args.sample_size, args.seed)
+    profile.pop("sample")
+    print(json.dumps(profile, indent=1, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Local SQL Engine — query the lakehouse files in place
+======================================================
+Runs SQLite-dialect SELECTs against the tables under data/<layer>/ without a
+load step: each table a query names is registered at query time as a transient
+in-memory table holding only what the query can see.
+
+  • projection    only the columns the query mentions are read (all for `*`)
+  • predicates    top-level WHERE conjuncts of the form col <op> literal,
+                  BETWEEN, IN, IS [NOT] NULL are applied while streaming
+  • pruning       range predicates on a partitioned table's manifest column
+                  skip whole partitions (storage.iter_rows start/end)
+  • limit         single-table filter/project queries stop reading once
+                  enough rows qualify; the table is only read further if the
+                  full WHERE rejects some of them
+
+SQLite still evaluates the full query over the loaded rows, so pushdown only
+ever narrows what is read, never the answer. Tables resolve in the requested
+layer first, then any layer; `layer.table` names a layer explicitly.
+
+Usage: python src/pipelines/query_engine.py "SELECT ... FROM dim_customer ..." [--database gold] [--limit 100]
+"""
+import os, re, sys, json, time, sqlite3, argparse
+from collections import Counter
+from itertools import islice
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+
+LAYERS = ("bronze", "silver", "mdm", "gold", "clickstream", "fraud", "partners", "realtime", "pipeline")
+LOAD_ROWS = 10_000  # rows inserted per batch
+
+TOKEN_RE = re.compile(r"""\s+|--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'|"(?:[^"]|"")*"|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?|[A-Za-z_][A-Za-z0-9_$]*|<=|>=|<>|!=|==|<<|>>|\|\||[(),.*=<>+\-/;%&|~]""", re.S)
+IDENT_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_$]*|"(?:[^"]|"")*"')
+INT_RE, DEC_RE = re.compile(r"-?(?:0|[1-9]\d*)"), re.compile(r"-?(?:0|[1-9]\d*)?\.\d+(?:[eE][+-]?\d+)?")
+CLAUSE_END = {"group", "order", "limit", "having", "window", "union", "intersect", "except"}
+NOT_STREAMABLE = {"group", "order", "distinct", "having", "union", "intersect", "except", "join", "over",
+                  "count", "sum", "avg", "min", "max", "total", "group_concat"}
+OPS = {"=": "=", "==": "=", "!=": "!=", "<>": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+FLIP = {"=": "=", "!=": "!=", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+
+class QueryError(Exception):
+    pass
+
+def tokenize(sql):
+    tokens, pos = [], 0
+    while pos < len(sql):
+        m = TOKEN_RE.match(sql, pos)
+        if not m: raise QueryError(f"Unexpected character {sql[pos]!r} at {pos}")
+        if not (m.group().isspace() or m.group().startswith(("--", "/*"))): tokens.append(m.group())
+        pos = m.end()
+    return tokens
+
+def convert(v):
+    """CSV text → the value SQLite should see: '' is NULL, canonical numbers are numbers, the
+    rest stays text (so zero-padded codes like ZIP '02134' keep their zeros)."""
+    if v == "": return None
+    if INT_RE.fullmatch(v): return int(v)
+    if DEC_RE.fullmatch(v): return float(v)
+    return v
+
+def literal(tok, neg=False):
+    if tok.startswith("'"): return None if neg else tok[1:-1].replace("''", "'")
+    if tok.isdigit(): return -int(tok) if neg else int(tok)
+    if tok[0].isdigit() or tok[0] == ".": return -float(tok) if neg else float(tok)
+    return None
+
+def unquote(tok):
+    return tok[1:-1].replace('""', '"') if tok.startswith('"') else tok
+
+# ─── Query analysis ───
+def referenced_tables(tokens):
+    """[(token index, layer or None, table, alias or None)] for the names after FROM, JOIN
+    and the commas of a FROM list; CTE names are left out."""
+    ctes = {unquote(tokens[k - 1]).lower() for k in range(1, len(tokens) - 1)
+            if tokens[k].lower() == "as" and tokens[k + 1] == "(" and tokens[0].lower() == "with"}
+    stop = CLAUSE_END | {"where", "join", "on", "using", "left", "right", "inner", "outer", "cross", "natural", "full", "limit"}
+    refs, in_from = [], False
+    for i, tok in enumerate(tokens):
+        t = tok.lower()
+        if t == "from": in_from = True
+        elif t in CLAUSE_END or t in ("where", "on", ")", "select"): in_from = False
+        if not (t in ("from", "join") or (t == "," and in_from)): continue
+        j = i + 1
+        if j >= len(tokens) or not IDENT_RE.fullmatch(tokens[j]) or tokens[j].lower() in ("select", "lateral"): continue
+        layer, name, end = None, unquote(tokens[j]), j + 1
+        if end + 1 < len(tokens) and tokens[end] == "." and name.lower() in LAYERS:
+            layer, name, end = name.lower(), unquote(tokens[end + 1]), end + 2
+        if layer is None and name.lower() in ctes: continue
+        if end < len(tokens) and tokens[end].lower() == "as": end += 1
+        alias = unquote(tokens[end]) if end < len(tokens) and IDENT_RE.fullmatch(tokens[end]) and tokens[end].lower() not in stop else None
+        refs.append((j, layer, name, alias))
+    return refs
+
+def split_top(tokens, word):
+    """Split a token list on a keyword at paren depth 0."""
+    parts, depth = [[]], 0
+    for t in tokens:
+        depth += (t == "(") - (t == ")")
+        if depth == 0 and t.lower() == word: parts.append([])
+        else: parts[-1].append(t)
+    return parts
+
+def where_clause(tokens):
+    """Tokens of the top-level WHERE of a single-SELECT query, or None."""
+    if sum(t.lower() == "select" for t in tokens) != 1: return None
+    depth, start = 0, None
+    for i, t in enumerate(tokens):
+        depth += (t == "(") - (t == ")")
+        if depth: continue
+        if t.lower() == "where": start = i + 1
+        elif start is not None and (t.lower() in CLAUSE_END or t == ";"): return tokens[start:i]
+    return tokens[start:] if start is not None else None
+
+def limit_clause(tokens):
+    """(count, offset) of the top-level LIMIT n [OFFSET m | , m] when both are integers, else None."""
+    parts = split_top(tokens, "limit")
+    if len(parts) < 2: return None
+    tail = parts[-1]
+    if len(tail) == 1: tail = tail + ["offset", "0"]
+    if len(tail) != 3 or tail[1].lower() not in (",", "offset") or not all(INT_RE.fullmatch(t) for t in tail[::2]): return None
+    n, m = int(tail[0]), int(tail[2])
+    if tail[1] == ",": n, m = m, n  # LIMIT offset, count
+    return (n, max(m, 0)) if n >= 0 else None
+
+def conjuncts(where):
+    """Top-level AND terms (BETWEEN's AND kept with its term); None when a top-level OR makes splitting unsafe."""
+    if where is None: return []
+    if len(split_top(where, "or")) > 1: return None
+    terms, cur, depth, between = [], [], 0, False
+    for t in where:
+        depth += (t == "(") - (t == ")")
+        low = t.lower()
+        if depth == 0 and low == "and" and not between:
+            terms.append(cur)
+            cur = []
+            continue
+        if depth == 0 and low == "and": between = False
+        if depth == 0 and low == "between": between = True
+        cur.append(t)
+    return terms + [cur]
+
+def parse_predicate(term):
+    """((qualifier, column), op, value) for a pushable conjunct, else None."""
+    def column(ts):
+        if len(ts) == 1 and IDENT_RE.fullmatch(ts[0]): return (None, unquote(ts[0]).lower())
+        if len(ts) == 3 and ts[1] == "." and IDENT_RE.fullmatch(ts[0]) and IDENT_RE.fullmatch(ts[2]):
+            return (unquote(ts[0]).lower(), unquote(ts[2]).lower())
+        return None
+    def value(ts):
+        if len(ts) == 1: return literal(ts[0])
+        if len(ts) == 2 and ts[0] == "-" and not ts[1].startswith("'"): return literal(ts[1], neg=True)
+        return None
+    low = [t.lower() for t in term]
+    for k, t in enumerate(term):
+        if t in OPS:
+            left, right = term[:k], term[k + 1:]
+            if (col := column(left)) and (v := value(right)) is not None: return col, OPS[t], v
+            if (col := column(right)) and (v := value(left)) is not None: return col, FLIP[OPS[t]], v
+            return None
+    if "between" in low and low.count("between") == 1 and "not" not in low:
+        b = low.index("between")
+        rest = split_top(term[b + 1:], "and")
+        if len(rest) == 2 and (col := column(term[:b])):
+            lo, hi = value(rest[0]), value(rest[1])
+            if lo is not None and hi is not None: return col, "between", (lo, hi)
+    if len(low) >= 3 and low[-2:] == ["is", "null"] and (col := column(term[:-2])): return col, "is null", None
+    if len(low) >= 4 and low[-3:] == ["is", "not", "null"] and (col := column(term[:-3])): return col, "is not null", None
+    if "in" in low and term[-1] == ")" and "not" not in low:
+        k = low.index("in")
+        if (col := column(term[:k])) and term[k + 1] == "(":
+            vals = [value(part) for part in split_top(term[k + 2:-1], ",")]
+            if vals and all(v is not None for v in vals): return col, "in", vals
+    return None
+
+def _comparable(a, b):
+    return (isinstance(a, str) and isinstance(b, str)) or (isinstance(a, (int, float)) and isinstance(b, (int, float)))
+
+def keep(v, op, arg):
+    """Conservative row filter: False only when SQLite's WHERE would reject the row too."""
+    if op == "is null": return v is None
+    if op == "is not null": return v is not None
+    if v is None: return False
+    if op == "in": return any(v == a for a in arg if _comparable(v, a)) or not all(_comparable(v, a) for a in arg)
+    if op == "between": return not (_comparable(v, arg[0]) and _comparable(v, arg[1])) or arg[0] <= v <= arg[1]
+    if not _comparable(v, arg): return True
+    return {"=": v == arg, "!=": v != arg, "<": v < arg, "<=": v <= arg, ">": v > arg, ">=": v >= arg}[op]
+
+def partition_bounds(preds, column):
+    """(start, end) ISO bounds on the manifest column implied by string-literal predicates."""
+    start = end = None
+    for (_, col), op, arg in preds:
+        if col != column.lower(): continue
+        lo = hi = None
+        if op == "=" and isinstance(arg, str): lo = hi = arg
+        elif op in (">", ">=") and isinstance(arg, str): lo = arg
+        elif op in ("<", "<=") and isinstance(arg, str): hi = arg
+        elif op == "between" and all(isinstance(a, str) for a in arg): lo, hi = arg
+        if lo is not None: start = lo if start is None else max(start, lo)
+        if hi is not None: end = hi if end is None else min(end, hi)
+    return start, end
+
+# ─── Engine ───
+def resolve(data_dir, database, layer, name):
+    """Path of table `name`: the explicit layer, else the requested database, else any layer."""
+    for lyr in ([layer] if layer else [database] + [l for l in LAYERS if l != database]):
+        path = os.path.join(data_dir, lyr, f"{name}.csv")
+        if storage.existing_format(path) or storage.read_manifest(path): return path
+    return None
+
+class TableScan:
+    """A registered table: a filtered, projected row stream that loads into SQLite on demand."""
+    def __init__(self, db, sql_name, path, columns, preds):
+        self.db, self.sql_name, self.path, self.columns, self.preds = db, sql_name, path, columns, preds
+        manifest = storage.read_manifest(path)
+        start = end = None
+        self.partitions_total = len(manifest["partitions"]) if manifest else None
+        self.partitions_scanned = None
+        if manifest:
+            start, end = partition_bounds(preds, manifest["column"])
+            self.partitions_scanned = len(storage.prune(manifest, start, end))
+        self.rows_scanned = self.rows_loaded = 0
+        self.exhausted = False
+        rows = storage.iter_rows(path, columns=columns, text=True, start=start, end=end)
+        self._rows = self._filter(rows)
+        cols = ", ".join('"' + c.replace('"', '""') + '"' for c in columns)
+        db.execute(f'CREATE TEMP TABLE "{sql_name}" ({cols})')
+        self._insert = f'INSERT INTO "{sql_name}" VALUES ({", ".join("?" * len(columns))})'
+
+    def _filter(self, rows):
+        idx = {c.lower(): k for k, c in enumerate(self.columns)}
+        checks = [(idx[col], op, arg) for (_, col), op, arg in self.preds if col in idx]
+        for row in rows:
+            self.rows_scanned += 1
+            vals = [convert(row[c]) for c in self.columns]
+            if all(keep(vals[k], op, arg) for k, op, arg in checks): yield vals
+
+    def load(self, n=None):
+        """Insert up to n more qualifying rows (all when n is None); returns rows inserted."""
+        total = 0
+        while n is None or total < n:
+            batch = list(islice(self._rows, LOAD_ROWS if n is None else min(LOAD_ROWS, n - total)))
+            if not batch:
+                self.exhausted = True
+                break
+            self.db.executemany(self._insert, batch)
+            total += len(batch)
+        self.rows_loaded += total
+        return total
+
+    def stats(self):
+        out = {"path": self.path, "rows_scanned": self.rows_scanned, "rows_loaded": self.rows_loaded,
+               "columns": len(self.columns), "pushed_predicates": len(self.preds)}
+        if self.partitions_total is not None:
+            out.update(partitions_scanned=self.partitions_scanned, partitions_total=self.partitions_total)
+        return out
+
+def _read_only(action, *args):
+    allowed = (sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE)
+    return sqlite3.SQLITE_OK if action in allowed else sqlite3.SQLITE_DENY
+
+def run_query(sql, data_dir, database="gold", limit=100):
+    """Execute a SELECT over the lakehouse tables it names. Returns {columns, rows, row_count,
+    truncated, tables: per-table scan stats, seconds}; raises QueryError for unusable SQL."""
+    t0 = time.perf_counter()
+    tokens = tokenize(sql.strip().rstrip(";"))
+    if not tokens or tokens[0].lower() not in ("select", "with"): raise QueryError("Only SELECT / WITH queries are supported")
+    refs = referenced_tables(tokens)
+    idents = {unquote(t).lower() for t in tokens if IDENT_RE.fullmatch(t)}
+    star = any(t == "*" and k and tokens[k - 1].lower() in ("select", ",", ".", "distinct") for k, t in enumerate(tokens))
+    uses = Counter((layer, name.lower()) for _, layer, name, _ in refs)
+    n_tables = len(refs)
+    preds = [p for p in map(parse_predicate, conjuncts(where_clause(tokens)) or []) if p]
+    if n_tables > 1:  # under an outer join, IS NULL on the inner side is not a per-table filter
+        preds = [p for p in preds if p[1] != "is null"]
+
+    db = sqlite3.connect(":memory:")
+    scans, rewritten, seen = {}, list(tokens), {}
+    try:
+        for j, layer, name, alias in sorted(refs, reverse=True):  # back to front keeps indices valid
+            path = resolve(data_dir, database, layer, name)
+            if path is None:
+                if layer: raise QueryError(f"No table {layer}.{name}")
+                continue  # a subquery alias or table function, not a lakehouse table
+            sql_name = f"{layer}__{name}" if layer else name
+            rewritten[j:j + (3 if layer else 1)] = [f'"{sql_name}"'] + (["AS", f'"{name}"'] if layer and alias is None else [])
+            key = (layer, name.lower())
+            if key in seen: continue
+            header = storage.table_columns(path)
+            columns = header if star else [c for c in header if c.lower() in idents]
+            names = {name.lower(), (alias or name).lower()} | ({None} if n_tables == 1 else set())
+            mine = [p for p in preds if p[0][0] in names] if uses[key] == 1 else []  # self-joins share one scan
+            seen[key] = scans[sql_name] = TableScan(db, sql_name, path, columns or header[:1], mine)
+        query = " ".join(rewritten)
+
+        # Single-table filter/project queries only need the first `limit` qualifying rows
+        streamable = n_tables == 1 and len(scans) == 1 and \
+            not any(t.lower() in NOT_STREAMABLE for t in tokens) and sum(t.lower() == "select" for t in tokens) == 1
+        want = limit + 1
+        if streamable:
+            (scan,) = scans.values()
+            capped = limit_clause(tokens)  # the query's own LIMIT can return fewer rows than we want
+            enough = want if capped is None else min(capped[0], want)
+            step = enough + (capped[1] if capped else 0)
+            while True:
+                scan.load(step)
+                db.set_authorizer(_read_only)
+                cur = db.execute(query)
+                rows = cur.fetchmany(want)
+                db.set_authorizer(None)
+                if len(rows) >= enough or scan.exhausted: break
+                step *= 4
+        else:
+            for scan in scans.values(): scan.load()
+            db.set_authorizer(_read_only)
+            cur = db.execute(query)
+            rows = cur.fetchmany(want)
+        columns = [d[0] for d in cur.description]
+    except sqlite3.Error as exc:
+        raise QueryError(str(exc)) from exc
+    finally:
+        db.close()
+    return {"columns": columns, "rows": [list(r) for r in rows[:limit]], "row_count": min(len(rows), limit),
+            "truncated": len(rows) > limit, "tables": {name: s.stats() for name, s in scans.items()},
+            "seconds": round(time.perf_counter() - t0, 4)}
+
+def main():
+    root = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query")
+    parser.add_argument("--data-dir", default=os.path.join(root, "data"))
+    parser.add_argument("--database", choices=LAYERS, default="gold")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(run_query(args.query, args.data_dir, args.database, args.limit), indent=1, default=str))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+SCD2 Customer Dimension — hash-partitioned MERGE INTO upsert
+=============================================================
+Keeps gold/dim_customer_scd2/ as a Type-2 slowly changing dimension: every
+attribute change closes the customer's current version (valid_to = batch time,
+is_current = False) and opens a new one (valid_from = batch time, valid_to =
+HIGH_DATE, is_current = True).
+
+The table is hash-partitioned on customer_id (customer_bucket=NNN/ directories,
+storage's _manifest.json with grain "hash"), so a batch reads and rewrites only
+the buckets its keys hash to. Nightly run time tracks the number of changed
+customers, not the size of the dimension. Every storage reader (query_engine,
+profiler, DQ) reads the layout unchanged, and an equality lookup on customer_id
+prunes to one bucket.
+
+MERGE semantics, per batch:
+  • dedup       the last row per customer_id in the batch wins
+  • partial     columns a change row leaves out keep their current values
+  • no-op       a row whose tracked attributes equal the current version's is
+                skipped, so replaying a batch changes nothing (idempotent)
+  • stale       a row older than the current version's valid_from is skipped
+
+Usage: python src/pipelines/scd2_customer.py build [--source data/gold/dim_customer.csv] [--table DIR] [--buckets N] [--as-of TS]
+       python src/pipelines/scd2_customer.py apply --changes FILE [--table DIR] [--as-of TS]
+"""
+import os, sys, json, math, time, shutil, argparse
+from collections import defaultdict
+from datetime import datetime, timezone
+
+if __package__ in (None, ""):  # run as a script: make the `src` package importable
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from src.data_generation import storage
+
+KEY = "customer_id"
+PARTITION_KEY = "customer_bucket"
+BUCKET_ROWS = 1_000             # target rows per bucket when the table is created
+MIN_BUCKETS = 16
+HIGH_DATE = "9999-12-31T23:59:59Z"
+SCD_COLUMNS = ("valid_from", "valid_to", "is_current")
+UNTRACKED = {"_ingested_at"}  # changes here alone don't open a new version
+STAGING = "_staging"
+
+def utc_now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def new_manifest(table_dir, buckets, formats):
+    return {"table": os.path.basename(os.path.normpath(table_dir)), "column": KEY, "partition_key": PARTITION_KEY,
+            "grain": "hash", "buckets": buckets, "formats": list(formats), "rows": 0, "partitions": [],
+            "scd2": {"batches": 0, "as_of": None}}
+
+def bucket_dir(manifest, bucket):
+    return f"{PARTITION_KEY}={bucket:0{len(str(manifest['buckets'] - 1))}d}"
+
+def dedup(changes):
+    """(last row per customer_id in first-seen order, rows read)."""
+    latest, n = {}, 0
+    for n, row in enumerate(changes, 1): latest[row[KEY]] = row
+    return list(latest.values()), n
+
+class Bucket:
+    """One hash partition's rows, with its customers' current versions indexed."""
+    def __init__(self, table_dir, manifest, bucket):
+        self.bucket, self.path = bucket, os.path.join(table_dir, bucket_dir(manifest, bucket), "part-00000.csv")
+        self.rows = list(storage.iter_rows(self.path, text=True)) if storage.existing_format(self.path) else []
+        self.current = {r[KEY]: r for r in self.rows if r["is_current"] == "True"}
+        self.dirty = False
+
+    def merge(self, change, columns, as_of, counts):
+        cur = self.current.get(change[KEY])
+        if cur is None:
+            row = {c: change.get(c, "") for c in columns}
+            counts["inserted"] += 1
+        else:
+            row = {**cur, **change}
+            if all(row[c] == cur[c] for c in columns if c not in UNTRACKED and c not in SCD_COLUMNS):
+                counts["unchanged"] += 1
+                return
+            if as_of <= cur["valid_from"]:
+                counts["stale"] += 1
+                return
+            cur.update(valid_to=as_of, is_current="False")
+            counts["versioned"] += 1
+        row.update(valid_from=as_of, valid_to=HIGH_DATE, is_current="True")
+        self.rows.append(row)
+        self.current[row[KEY]] = row
+        self.dirty = True
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=1)
+    os.replace(tmp, path)
+
+def default_buckets(rows):
+    """Power of two giving ~BUCKET_ROWS rows per bucket: a batch of k changes then reads ~k × BUCKET_ROWS rows."""
+    return max(MIN_BUCKETS, 1 << max(0, math.ceil(math.log2(max(rows, 1) / BUCKET_ROWS))))
+
+def upsert(table_dir, changes, as_of=None, buckets=None, formats=("csv",)):
+    """MERGE a batch of changed customer rows into the SCD2 table at table_dir (created on
+    first use with `buckets` hash partitions, default_buckets() if None). Returns the
+    batch's counts and timings."""
+    t0 = time.perf_counter()
+    as_of = as_of or utc_now()
+    batch, n = dedup(changes)
+    manifest = storage.read_manifest(table_dir) or new_manifest(table_dir, buckets or default_buckets(len(batch)), formats)
+    counts = dict.fromkeys(("inserted", "versioned", "unchanged", "stale"), 0)
+    counts["batch_rows"], counts["distinct_keys"] = n, len(batch)
+    if not batch: return {**counts, "buckets_touched": 0, "buckets_rewritten": 0, "as_of": as_of, "seconds": 0.0}
+
+    columns = storage.table_columns(table_dir) if manifest["partitions"] else \
+        [c for c in batch[0] if c not in SCD_COLUMNS] + list(SCD_COLUMNS)
+    extra = {c for row in batch for c in row} - set(columns)
+    if extra: raise ValueError(f"Columns {sorted(extra)} are not in the {manifest['table']} schema")
+
+    groups = defaultdict(list)
+    for row in batch: groups[storage.hash_bucket(row[KEY], manifest["buckets"])].append(row)
+    staging = os.path.join(table_dir, STAGING)
+    parts = {p["bucket"]: p for p in manifest["partitions"]}
+    rewritten = []
+    for b, rows in sorted(groups.items()):
+        bucket = Bucket(table_dir, manifest, b)
+        for row in rows: bucket.merge(row, columns, as_of, counts)
+        if not bucket.rows: continue
+        # Stats come from the bucket as read, so replaying a batch after a crash also repairs the manifest
+        keys = [r[KEY] for r in bucket.rows]
+        parts[b] = {"value": b, "bucket": b, "path": bucket_dir(manifest, b), "rows": len(keys), "min": min(keys), "max": max(keys)}
+        if not bucket.dirty: continue
+        # New files land in _staging/ and are renamed into place: no partition is ever half-written
+        os.makedirs(os.path.join(staging, parts[b]["path"]), exist_ok=True)
+        storage.write_rows(os.path.join(staging, parts[b]["path"], "part-00000.csv"), bucket.rows, formats)
+        rewritten.append(b)
+    for b in rewritten:
+        os.makedirs(os.path.join(table_dir, parts[b]["path"]), exist_ok=True)
+        for fmt in formats:
+            name = storage.with_format("part-00000.csv", fmt)
+            os.replace(os.path.join(staging, parts[b]["path"], name), os.path.join(table_dir, parts[b]["path"], name))
+    if os.path.isdir(staging): shutil.rmtree(staging)
+
+    manifest["partitions"] = [parts[b] for b in sorted(parts)]
+    manifest["rows"] = sum(p["rows"] for p in manifest["partitions"])
+    manifest["scd2"] = {"batches": manifest["scd2"]["batches"] + 1, "as_of": max(as_of, manifest["scd2"]["as_of"] or as_of)}
+    _write_json(os.path.join(table_dir, storage.MANIFEST), manifest)
+    return {**counts, "buckets_touched": len(groups), "buckets_rewritten": len(rewritten), "buckets": manifest["buckets"],
+            "table_rows": manifest["rows"], "as_of": as_of, "seconds": round(time.perf_counter() - t0, 4)}
+
+def as_of_version(table_dir, ts):
+    """Each customer's version in effect at `ts` (point-in-time join helper)."""
+    for row in storage.iter_rows(table_dir, text=True):
+        if row["valid_from"] <= ts < row["valid_to"]: yield row
+
+def main():
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("build", "apply"):
+        p = sub.add_parser(name)
+        p.add_argument("--table", default=os.path.join(root, "gold", "dim_customer_scd2"))
+        p.add_argument("--as-of", help="Batch effective time (ISO, default now)")
+        if name == "build":
+            p.add_argument("--source", default=os.path.join(root, "gold", "dim_customer.csv"))
+            p.add_argument("--buckets", type=int, help=f"Hash buckets (default: ~{BUCKET_ROWS:,} rows each)")
+        else:
+            p.add_argument("--changes", required=True, help="Table of changed customer rows")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if storage.read_manifest(args.table): parser.error(f"{args.table} already exists; use apply")
+        out = upsert(args.table, storage.iter_rows(args.source, text=True), args.as_of, args.buckets)
+    else:
+        if not storage.read_manifest(args.table): parser.error(f"{args.table} does not exist; run build first")
+        out = upsert(args.table, storage.iter_rows(args.changes, text=True), args.as_of)
+    print(json.dumps(out, indent=1))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Shared fixtures — a generated lakehouse for the dashboard tests
+================================================================
+"""
+import os, sys, subprocess
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+@pytest.fixture(scope="module")
+def data(tmp_path_factory):
+    """A scale-factor 0.1 lakehouse, generated once per test module (tests may touch its files)."""
+    out = str(tmp_path_factory.mktemp("lakehouse"))
+    subprocess.run([sys.executable, os.path.join(ROOT, "src", "data_generation", "generate_all.py"), "--output-dir", out,
+                    "--scale-factor", "0.1", "--as-of", "2025-06-30"], check=True, capture_output=True)
+    return out
@@ -0,0 +1,63 @@
+"""
+Agent Loop Tests — concurrent tool execution with a stubbed model
+==================================================================
+Run with: python -m pytest tests/test_agent_loop.py
+"""
+import os, sys, json, time, threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.agents import agent_loop, tool_handlers
+
+def tool_use(i, name, **inp):
+    return {"type": "tool_use", "id": f"toolu_{i:02d}", "name": name, "input": inp}
+
+class Recorder:
+    """Slow fake handlers that track how many calls of each tool overlap."""
+    def __init__(self):
+        self.lock, self.active, self.peak = threading.Lock(), {}, {}
+
+    def handler(self, name):
+        def handle(inp):
+            with self.lock:
+                self.active[name] = self.active.get(name, 0) + 1
+                self.peak[name] = max(self.peak.get(name, 0), self.active[name])
+            time.sleep(inp["sleep"])
+            with self.lock: self.active[name] -= 1
+            return {"tool": name, "n": inp["n"]}
+        return handle
+
+def test_turn_runs_tools_concurrently_in_order(monkeypatch):
+    monkeypatch.setenv("LAKEHOUSE_TOOL_CACHE", "off")
+    rec = Recorder()
+    monkeypatch.setattr(tool_handlers, "handle_query_database", rec.handler("query_database"), raising=False)
+    monkeypatch.setattr(tool_handlers, "handle_delta_lake_operation", rec.handler("delta_lake_operation"), raising=False)
+    calls = [tool_use(i, "query_database" if i % 3 else "delta_lake_operation", sleep=0.2 - i * 0.01, n=i) for i in range(9)]
+    turns = [{"content": [{"type": "text", "text": "checking"}] + calls}, {"content": [{"type": "text", "text": "all done"}]}]
+    seen = []
+    def fake_claude(system, messages, tools):
+        seen.append(json.loads(json.dumps(messages)))
+        return turns[len(seen) - 1]
+    monkeypatch.setattr(agent_loop, "call_claude", fake_claude)
+
+    t0 = time.perf_counter()
+    assert agent_loop.run_agent_loop("dq_engine", "sys", "profile", []) == "all done"
+    elapsed = time.perf_counter() - t0
+    results = seen[1][-1]["content"]
+    assert [r["tool_use_id"] for r in results] == [c["id"] for c in calls]
+    assert [json.loads(r["content"])["n"] for r in results] == list(range(9))
+    assert rec.peak == {"query_database": 4, "delta_lake_operation": 1}
+    assert elapsed < 0.2 * 9 * 0.6  # serial would take the sum of the sleeps
+
+def test_timeouts_and_failures_become_error_results(monkeypatch):
+    monkeypatch.setenv("LAKEHOUSE_TOOL_CACHE", "off")
+    def boom(inp): raise RuntimeError("no table")
+    monkeypatch.setattr(tool_handlers, "handle_profile_data_source", lambda inp: time.sleep(inp["sleep"]) or {"ok": True})
+    monkeypatch.setattr(tool_handlers, "handle_run_tests", boom, raising=False)
+    calls = [tool_use(0, "profile_data_source", sleep=1.0), tool_use(1, "run_tests"),
+             tool_use(2, "profile_data_source", sleep=0.0), tool_use(3, "no_such_tool")]
+    t0 = time.perf_counter()
+    out = agent_loop.execute_tools(calls, timeouts={"profile_data_source": 0.2})
+    assert time.perf_counter() - t0 < 0.8
+    assert "timed out" in out[0]["error"] and "RuntimeError: no table" in out[1]["error"]
+    assert out[2] == {"ok": True} and "Unknown tool" in out[3]["error"]
+    assert agent_loop.execute_tools([tool_use(0, "profile_data_source", sleep=0.0)], max_workers=1) == [{"ok": True}]
@@ -0,0 +1,57 @@
+"""
+Context Budget Tests — out-of-band tool results and history compaction
+=======================================================================
+Run with: python -m pytest tests/test_context_budget.py
+"""
+import os, sys, json
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.agents import agent_loop, context_budget, tool_handlers
+
+def wide_profile(n):
+    return {"table": "silver/wide", "rows": 10_000, "columns": {f"col_{i:03d}": {"type": "decimal", "nulls": i, "top": [["x" * 30, 5]] * 20}
+                                                               for i in range(n)}}
+
+def test_large_result_is_previewed_and_readable(tmp_path, monkeypatch):
+    monkeypatch.delenv("LAKEHOUSE_TOOL_RESULTS", raising=False)
+    monkeypatch.setattr(tool_handlers, "DATA_DIR", str(tmp_path))
+    budget = context_budget.ContextBudget(result_tokens=1_000)
+    small = budget.tool_result("toolu_01", {"rows": [[1]]})
+    assert json.loads(small["content"]) == {"rows": [[1]]}
+
+    result = wide_profile(300)
+    block = budget.tool_result("toolu_02", result)
+    stub = json.loads(block["content"])
+    assert context_budget.tokens(block["content"]) <= 1_000 < stub["tokens"] and stub["truncated"]
+    assert os.path.exists(tmp_path / "_tool_results" / f"{stub['ref']}.json")
+    page = agent_loop.execute_tool("read_tool_result", {"ref": stub["ref"], "path": "columns.col_007"})
+    assert page["value"] == result["columns"]["col_007"]
+    page = agent_loop.execute_tool("read_tool_result", {"ref": stub["ref"], "path": "columns", "offset": 290, "limit": 20})
+    assert list(page["value"]) == [f"col_{i}" for i in range(290, 300)] and page["total"] == 300
+    assert "error" in agent_loop.execute_tool("read_tool_result", {"ref": stub["ref"], "path": "columns.nope"})
+    assert "error" in agent_loop.execute_tool("read_tool_result", {"ref": "0" * 16})
+
+def test_long_runs_stay_under_budget(tmp_path, monkeypatch):
+    monkeypatch.setenv("LAKEHOUSE_TOOL_CACHE", "off")
+    monkeypatch.setattr(tool_handlers, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(tool_handlers, "handle_profile_data_source", lambda inp: wide_profile(40), raising=False)
+    seen = []
+    def fake_claude(system, messages, tools):
+        seen.append(json.loads(json.dumps(messages)))
+        call = {"type": "tool_use", "id": f"toolu_{len(seen):02d}", "name": "profile_data_source",
+                "input": {"source_name": "silver", "table_name": "wide", "notes": "n" * 2_000}}
+        return {"content": [{"type": "text", "text": "again"}, call]}
+    monkeypatch.setattr(agent_loop, "call_claude", fake_claude)
+
+    budget = context_budget.ContextBudget(result_tokens=1_500, history_tokens=8_000, target_tokens=5_000)
+    assert agent_loop.run_agent_loop("dq_engine", "sys", "profile", [], max_iterations=15, context=budget) == "Max iterations reached"
+    sizes = [t["request_tokens"] for t in budget.turns]
+    assert len(sizes) == 15 and max(sizes) <= 8_000 < 14 * (sizes[1] - sizes[0])  # unbounded, turn 15 would be ~20K
+    assert any(t["compacted_tokens"] for t in budget.turns)
+    last = seen[-1]
+    uses = [b["id"] for m in last if m["role"] == "assistant" for b in m["content"] if b["type"] == "tool_use"]
+    results = [b for m in last[1:] if m["role"] == "user" for b in m["content"]]
+    assert [b["tool_use_id"] for b in results] == uses  # pairing survives compaction
+    elided = json.loads(results[0]["content"])
+    assert elided["elided"] and agent_loop.execute_tool("read_tool_result", {"ref": elided["ref"], "path": "table"})["value"] == "silver/wide"
+    assert "preview" in json.loads(results[-1]["content"])  # recent turns keep their preview
@@ -0,0 +1,91 @@
+"""
+Dashboard API Tests — ETags, LRU, request coalescing, HTTP
+===========================================================
+Run with: python -m pytest tests/test_dashboard_api.py
+"""
+import os, sys, json, time, asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.dashboards import dashboard_api as api_mod
+from src.pipelines import dashboard_cubes as cubes
+
+@pytest.fixture
+def api(data, tmp_path):
+    service = api_mod.DashboardAPI(data, cube_dir=str(tmp_path / "none"), cache_size=4, version_ttl=0)
+    yield service
+    service.close()
+
+def test_concurrent_cold_requests_share_one_computation_and_one_scan_per_table(api):
+    async def burst(): return await asyncio.gather(*[api.get(tab) for tab in cubes.TABS for _ in range(8)])
+    responses = asyncio.run(burst())
+    assert api.stats["computed"] == len(cubes.TABS) and api.stats["coalesced"] == 7 * len(cubes.TABS)
+    assert api.stats["scans"] == len(cubes.TABLES)
+    assert {r[0] for r in responses} == {200} and len({r[1] for r in responses}) == len(cubes.TABS)
+    fraud = json.loads(responses[list(cubes.TABS).index("fraud") * 8][2])
+    assert fraud == json.loads(api_mod.encode(cubes.BUILDERS["fraud"]({"fraud_alerts": cubes.scan(api.data_dir, "fraud_alerts")})))
+
+def test_table_digests_run_off_the_event_loop_once_per_table(data, tmp_path, monkeypatch):
+    digest = cubes.digest
+    monkeypatch.setattr(cubes, "digest", lambda *args: (time.sleep(0.3), digest(*args))[1])  # slow stat calls
+    api = api_mod.DashboardAPI(data, cube_dir=str(tmp_path / "none"), version_ttl=60)
+    async def burst():
+        gaps, last = [], time.perf_counter()
+        async def tick():
+            nonlocal last
+            while True:
+                await asyncio.sleep(0.01)
+                gaps.append(time.perf_counter() - last)
+                last = time.perf_counter()
+        ticker = asyncio.create_task(tick())
+        await asyncio.gather(*[api.get(tab) for tab in cubes.TABS for _ in range(3)])
+        ticker.cancel()
+        return max(gaps)
+    try: longest = asyncio.run(burst())
+    finally: api.close()
+    assert api.stats["digests"] == len(cubes.TABLES) and api.stats["computed"] == len(cubes.TABS)
+    assert longest < 0.2  # the loop kept serving while the tables were stat'ed
+
+def test_etag_follows_data_files_and_filters_key_the_lru(api, data):
+    run = asyncio.run
+    status, etag, body = run(api.get("revenue"))
+    assert status == 200 and len(json.loads(body)["revenueData"]) == cubes.MONTHS
+    assert run(api.get("revenue", if_none_match=etag)) == (304, etag, None)
+    assert run(api.get("revenue"))[2] == body and api.stats["hits"] == 1
+    status, trimmed_etag, trimmed = run(api.get("revenue", "fields=revenueData&months=3"))
+    assert trimmed_etag != etag and list(json.loads(trimmed)) == ["revenueData"] and len(json.loads(trimmed)["revenueData"]) == 3
+    assert run(api.get("revenue", "months=3&fields=revenueData"))[1] == trimmed_etag  # parameter order does not matter
+    with pytest.raises(api_mod.BadRequest): run(api.get("revenue", "months=three"))
+    fraud_etag = run(api.get("fraud"))[1]
+    alerts = cubes.input_files(data, "fraud_alerts")[0]
+    os.utime(alerts, ns=(os.stat(alerts).st_atime_ns, os.stat(alerts).st_mtime_ns + 1_000_000_000))
+    assert run(api.get("fraud", if_none_match=fraud_etag))[0] == 200  # new data → new version, full response
+    assert run(api.get("revenue", if_none_match=etag))[0] == 304      # revenue does not read fraud_alerts
+    for tab in ("exec", "risk", "acq", "dq"): run(api.get(tab))
+    assert len(api.cache) == 4 and api.stats["evicted"] > 0
+
+def test_http_keep_alive_etag_and_errors(api):
+    async def session():
+        server = await api_mod.start(api, port=0)
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+        async def get(path, etag=None):
+            revalidate = f"If-None-Match: {etag}\r\n" if etag else ""
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: t\r\n{revalidate}\r\n".encode())
+            status, headers = int((await reader.readline()).split()[1]), {}
+            while (line := await reader.readline()) != b"\r\n":
+                k, _, v = line.decode().partition(":")
+                headers[k.strip().lower()] = v.strip()
+            return status, headers, await reader.readexactly(int(headers["content-length"]))
+        results = [await get("/api/risk")]
+        results += [await get("/api/risk.json", results[0][1]["etag"]), await get("/api/nope"), await get("/api/risk?x=1"),
+                    await get("/api/tabs")]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return results
+    ok, not_modified, missing, bad, tabs = asyncio.run(session())
+    assert ok[0] == 200 and ok[1]["cache-control"] == "no-cache" and "riskDistrib" in json.loads(ok[2])
+    assert not_modified[0] == 304 and not_modified[2] == b"" and not_modified[1]["etag"] == ok[1]["etag"]
+    assert missing[0] == 404 and bad[0] == 400
+    assert json.loads(tabs[2])["risk"] == ok[1]["etag"]
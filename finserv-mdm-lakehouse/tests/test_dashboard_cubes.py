@@ -0,0 +1,56 @@
+"""
+Dashboard Cube Tests — per-tab payloads, shared scans, incremental rebuilds
+============================================================================
+Run with: python -m pytest tests/test_dashboard_cubes.py
+"""
+import os, sys, json
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import storage
+from src.pipelines import dashboard_cubes as cubes
+
+def payload(out_dir, tab):
+    with open(os.path.join(out_dir, f"{tab}.json")) as f: return json.load(f)
+
+def test_every_tab_gets_a_small_payload_from_one_scan_per_table(data, tmp_path):
+    out = str(tmp_path)
+    result = cubes.build(data, out)
+    assert result["built"] == list(cubes.TABS) and result["skipped"] == []
+    assert result["scanned"] == list(cubes.TABLES)  # each table once, shared by every tab that reads it
+    assert all(0 < size < 8_192 for size in result["bytes"].values())
+    risk, rows = payload(out, "risk"), sum(1 for _ in storage.iter_rows(os.path.join(data, "gold", "fact_credit_risk.csv")))
+    assert sum(t["count"] for t in risk["riskDistrib"]) == rows
+    funnel = [s["count"] for s in payload(out, "acq")["acquisitionFunnel"]]
+    assert funnel == sorted(funnel, reverse=True)
+    exec_, revenue = payload(out, "exec"), payload(out, "revenue")
+    assert len(revenue["revenueData"]) == cubes.MONTHS and exec_["revenueData"] == revenue["revenueData"]
+    assert payload(out, "dq")["dqMetrics"]["tests"] is None
+
+def test_only_tabs_with_changed_inputs_rebuild(data, tmp_path):
+    out = str(tmp_path)
+    cubes.build(data, out)
+    again = cubes.build(data, out)
+    assert again["built"] == [] and again["scanned"] == []
+    alerts = cubes.input_files(data, "fraud_alerts")[0]
+    os.utime(alerts, ns=(os.stat(alerts).st_atime_ns, os.stat(alerts).st_mtime_ns + 1_000_000_000))
+    touched = cubes.build(data, out)
+    assert touched["built"] == ["fraud"] and touched["scanned"] == ["fraud_alerts"]
+    with open(os.path.join(data, "dq_results.json"), "w") as f: json.dump({"passed": 30, "failed": 4}, f)
+    dq = cubes.build(data, out)
+    assert dq["built"] == ["dq"] and payload(out, "dq")["dqMetrics"]["tests"] == "30/34"
+    os.remove(os.path.join(data, "dq_results.json"))
+
+def test_ties_sort_by_name_and_growth_counts_only_open_accounts():
+    account = lambda name, opened, status="active": {"product_name": name, "product_id": "DEP-1", "status": status,
+                                                     "open_date": opened, "balance": "100", "credit_limit": "0"}
+    accounts = {"A1": account("Savings", "2025-06-01"), "A2": account("Savings", "2024-01-01"),
+                "A3": account("Savings", "2025-05-01", "closed"), "A4": account("Checking", "2024-02-01"),
+                "A5": account("Checking", "2024-03-01")}
+    product = cubes.build_product({"accounts": accounts, "transactions": {"spend": defaultdict(float), "months": {}}})
+    assert [(r["product"], r["accounts"]) for r in product["productPerf"]] == [("Checking", 2), ("Savings", 2)]
+    assert product["productPerf"][1]["growth"] == cubes.pct(1, 1)  # the closed new account is in neither count
+    events = {"months": {"2025-06": (3, 2)}, "pages": {"/b": 5, "/c": 9, "/a": 5}, "users": 10}
+    digital = cubes.build_digital({"digital_events": events, "transactions": {"digital": 1, "rows": 2}})
+    assert [f["adopt"] for f in digital["features"]] == [cubes.pct(9, 10), cubes.pct(5, 10), cubes.pct(5, 10)]
+    assert [f["feat"] for f in digital["features"]] == [cubes.label(p) for p in ("c", "a", "b")]
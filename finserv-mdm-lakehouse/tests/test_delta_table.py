@@ -0,0 +1,110 @@
+"""
+Delta Table Tests — transaction log, merge, optimize, vacuum, time travel
+==========================================================================
+Run with: python -m pytest tests/test_delta_table.py
+"""
+import os, sys, json
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.pipelines import delta_table as dt
+from src.agents import agent_loop, tool_handlers
+
+def accounts(lo, hi, balance="100.00"):
+    return [{"account_id": f"ACCT-{i:05d}", "balance": balance, "opened": f"2024-{1 + i % 12:02d}-01"} for i in range(lo, hi)]
+
+def rows_by_key(table, **kw):
+    return {r["account_id"]: r for r in table.iter_rows(**kw)}
+
+def test_merge_rewrites_only_matching_files_and_time_travels(tmp_path):
+    table = dt.DeltaTable(str(tmp_path / "accounts"))
+    assert table.write(accounts(0, 1000), file_rows=100) == 0
+    before = set(table.snapshot().files)
+    out = table.merge([{"account_id": "ACCT-00150", "balance": "5.00"}, {"account_id": "ACCT-00151", "balance": "6.00"},
+                       {"account_id": "ACCT-09999", "balance": "7.00", "opened": "2025-01-01"}], "account_id")
+    m = out["metrics"]
+    assert out["version"] == 1 and m["numTargetFilesRemoved"] == 1 and m["numTargetFilesSkipped"] == 9
+    assert m["numTargetRowsUpdated"] == 2 and m["numTargetRowsInserted"] == 1 and m["numTargetRowsCopied"] == 98
+    assert len(before - set(table.snapshot().files)) == 1
+    now, then = rows_by_key(table), rows_by_key(table, version=0)
+    assert len(now) == 1001 and now["ACCT-00150"] == {"account_id": "ACCT-00150", "balance": "5.00", "opened": "2024-07-01"}
+    assert len(then) == 1000 and then["ACCT-00150"]["balance"] == "100.00"
+    table.merge([{"account_id": "ACCT-00150"}], "account_id", matched="delete")
+    assert "ACCT-00150" not in rows_by_key(table) and [h["operation"] for h in table.history()] == ["MERGE", "MERGE", "CREATE TABLE AS SELECT"]
+    with pytest.raises(dt.DeltaError):
+        table.merge([{"account_id": "ACCT-00001"}, {"account_id": "ACCT-00001"}], "account_id")
+    version, files = table.latest_version(), set(table.snapshot().files)
+    out = table.merge([{"account_id": "ACCT-00151", "balance": "0.00"}], "account_id", matched="ignore")
+    assert out["version"] == version and set(table.snapshot().files) == files  # nothing changed: no rewrite, no commit
+    assert out["metrics"]["numTargetFilesRemoved"] == out["metrics"]["numTargetRowsInserted"] == 0
+
+def test_write_streams_files_and_checks_every_chunk(tmp_path):
+    table = dt.DeltaTable(str(tmp_path / "accounts"))
+    out = table.write(iter(accounts(0, 250)), file_rows=100)
+    assert out == 0 and table.history()[0]["operationMetrics"] == {"numFiles": 3, "numOutputRows": 250}
+    late = accounts(0, 150) + [{"account_id": "ACCT-99999", "nickname": "x"}]
+    with pytest.raises(dt.DeltaError, match="nickname"): table.write(iter(late), file_rows=100)
+    assert table.latest_version() == 0 and len(rows_by_key(table)) == 250
+
+def test_optimize_compacts_and_zorders(tmp_path):
+    table = dt.DeltaTable(str(tmp_path / "accounts"))
+    rows = [{"account_id": f"ACCT-{i:05d}", "balance": str((i * 7919) % 1000), "opened": f"2024-{1 + (i * 31) % 12:02d}-01"}
+            for i in range(2000)]
+    for lo in range(0, 2000, 100): table.write(rows[lo:lo + 100], file_rows=10)
+    assert table.describe()["numFiles"] == 200 and table.latest_version() == 19
+    assert os.path.exists(os.path.join(table.log_dir, "_last_checkpoint"))
+    where = {"balance": (100, 150), "opened": ("2024-03-01", "2024-04-01")}
+    expected = sorted(r["account_id"] for r in table.iter_rows(where=where))
+    out = table.optimize(target_file_rows=250)
+    assert out["metrics"]["numFilesRemoved"] == 200 and table.describe()["numFiles"] == 8
+    scanned = len(table.files(where=where))
+    table.optimize(zorder_by=["balance", "opened"], target_file_rows=250)
+    assert len(table.files(where=where)) < scanned
+    assert sorted(r["account_id"] for r in table.iter_rows(where=where)) == expected
+    assert len(rows_by_key(table)) == 2000 and len(rows_by_key(table, version=5)) == 600
+
+def test_vacuum_and_restore(tmp_path):
+    table = dt.DeltaTable(str(tmp_path / "accounts"))
+    table.write(accounts(0, 100), file_rows=10)
+    table.write(accounts(0, 100, balance="0.00"), mode="overwrite", file_rows=50)
+    assert table.restore(version=0)["metrics"]["numRestoredFiles"] == 10
+    assert {r["balance"] for r in table.iter_rows()} == {"100.00"}
+    with pytest.raises(dt.DeltaError):
+        table.vacuum(retention_hours=0)
+    assert table.vacuum(retention_hours=0, check_retention=False)["metrics"]["numDeletedFiles"] == 2
+    assert len(os.listdir(table.path)) == 11  # 10 data files + _delta_log
+    with pytest.raises(dt.DeltaError, match="VACUUM"):
+        list(table.iter_rows(version=1))
+
+def test_concurrent_commit_is_rejected(tmp_path):
+    a, b = dt.DeltaTable(str(tmp_path / "t")), dt.DeltaTable(str(tmp_path / "t"))
+    a.write(accounts(0, 10))
+    read = b.latest_version()
+    a.write(accounts(10, 20))
+    with pytest.raises(dt.ConcurrentModification):
+        b._commit(read, "WRITE", {"mode": "Append"}, [])
+
+def test_delta_lake_operation_tool(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_handlers, "DATA_DIR", str(tmp_path))
+    dt.DeltaTable(str(tmp_path / "gold" / "accounts")).write(accounts(0, 50), file_rows=5)
+    call = lambda op, **params: agent_loop.execute_tool("delta_lake_operation", {"operation": op, "table_path": "gold/accounts", "parameters": params})
+    out = call("merge", rows=[{"account_id": "ACCT-00003", "balance": "1.00"}], key="account_id")
+    json.dumps(out)
+    assert out["metrics"]["numTargetRowsUpdated"] == 1 and out["table"]["numFiles"] == 10
+    assert call("optimize", zorder_by=["balance"])["table"]["numFiles"] == 1
+    assert [h["operation"] for h in call("history", limit=2)["history"]] == ["OPTIMIZE", "MERGE"]
+    assert call("restore", version=0)["table"]["numFiles"] == 10
+    assert "error" in call("vacuum", retention_hours=1)
+    assert "error" in agent_loop.execute_tool("delta_lake_operation", {"operation": "history", "table_path": "../etc"})
+
+def test_delta_lake_operation_tool_merges_json_numbers(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_handlers, "DATA_DIR", str(tmp_path))
+    table = dt.DeltaTable(str(tmp_path / "gold" / "scores"))
+    table.write([{"id": str(i), "score": f"{i}.5", "flag": ""} for i in range(1, 21)], file_rows=5)
+    out = agent_loop.execute_tool("delta_lake_operation", {"operation": "merge", "table_path": "gold/scores", "parameters": {
+        "key": "id", "rows": [{"id": 7, "score": 70.25, "flag": None}, {"id": 21, "score": 3, "flag": True}]}})
+    assert out["metrics"]["numTargetRowsUpdated"] == 1 and out["metrics"]["numTargetRowsInserted"] == 1
+    rows = {r["id"]: r for r in table.iter_rows()}
+    assert len(rows) == 21 and rows["7"] == {"id": "7", "score": "70.25", "flag": ""}
+    assert rows["21"] == {"id": "21", "score": "3", "flag": "True"}
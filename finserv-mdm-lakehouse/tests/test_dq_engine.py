@@ -0,0 +1,107 @@
+"""
+DQ Engine Tests — key sets, single-pass checks, seeded failures
+================================================================
+Run with: python -m pytest tests/test_dq_engine.py
+"""
+import os, sys, random
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import generate_all as gen, storage
+from src.pipelines import dq_engine as dq
+
+NOW = datetime(2025, 6, 30, 12, 0, 0)
+
+def test_key_hashes_are_stable_and_padding_free():
+    h = dq.hash_keys(["C1", "C10", "C1"])
+    assert h[0] == h[2] and h[0] != h[1]
+    assert dq.hash_keys(["C1"])[0] == h[0]  # same key, different batch width
+    assert len(set(dq.hash_keys([f"TXN-{i:08d}" for i in range(100_000)]).tolist())) == 100_000
+
+def test_key_set_counts_duplicates_and_orphans():
+    parent, child = dq.KeySet(), dq.KeySet()
+    parent.add(["A", "B", "C"])
+    parent.add(["C", "D"])
+    child.add(["A", "E", "E", "F"])
+    assert len(parent) == 4 and parent.duplicates == 1
+    assert child.missing_from(parent) == 2
+    assert "D" in parent and "E" not in parent
+    assert len(dq.KeySet().merge(parent).merge(child)) == 6
+    left, right = dq.KeySet(track_duplicates=True), dq.KeySet(track_duplicates=True)
+    left.add(["A", "B", "B"])
+    right.add(["C", "A"])
+    both = left.merge(right).duplicated()
+    assert left.duplicates == 2 and len(both) == 2 and "A" in both and "B" in both and "C" not in both
+
+def test_engine_reports_seeded_failures(tmp_path):
+    storage.write_rows(str(tmp_path / "customers.csv"), [
+        {"customer_id": "C1", "since": "2020-01-01"}, {"customer_id": "C2", "since": "2021-01-01"},
+        {"customer_id": "C2", "since": "2021-01-01"}])
+    storage.write_rows(str(tmp_path / "accounts.csv"), [
+        {"account_id": f"A{i}", "customer_id": c, "opened": d, "apr": apr}
+        for i, (c, d, apr) in enumerate([("C1", "2020-06-01", "9.5"), ("C2", "2020-06-01", "12"), ("C9", "2022-01-01", "x")])])
+    since = dq.Lookup("customers.csv", "customer_id", "since")
+    checks = [
+        dq.RowCount("three accounts", "accounts.csv", lambda n: n == 3),
+        dq.Unique("customer ids unique", "customers.csv", "customer_id"),
+        dq.References("accounts → customers", "accounts.csv", "customer_id", "customers.csv"),
+        dq.Rule("apr numeric", "accounts.csv", lambda a: float(a["apr"]) >= 0, detail=lambda a: a["account_id"]),
+        dq.Rule("opened after since", "accounts.csv", lambda a, since: a["opened"] >= since.get(a["customer_id"], "2000-01-01"),
+                lookups={"since": since}),
+        dq.Aggregate("more accounts than customers", ("accounts.csv", "customers.csv"), lambda n: n["accounts.csv"] > n["customers.csv"]),
+    ]
+    results = {r.name: r for r in dq.run(checks, str(tmp_path), chunk_rows=2)}
+    assert results["three accounts"].passed
+    assert results["customer ids unique"].detail == "1 duplicates"
+    assert results["customer ids unique"].samples == [{"customer_id": "C2", "since": "2021-01-01"}] * 2
+    assert results["accounts → customers"].detail == "1 orphans"
+    assert [s["account_id"] for s in results["accounts → customers"].samples] == ["A2"]
+    assert not results["apr numeric"].passed and results["apr numeric"].detail == "A2"
+    assert [s["account_id"] for s in results["opened after since"].samples] == ["A1"]
+    assert not results["more accounts than customers"].passed
+
+def _txn_checks():
+    return [
+        dq.Unique("transaction ids unique", "fact_transactions.csv", "transaction_id"),
+        dq.Rule("amounts positive", "fact_transactions.csv", lambda t: float(t["amount"]) > 0),
+        dq.Rule("no pending", "fact_transactions.csv", lambda t: t["status"] != "pending"),
+        dq.References("transactions → accounts", "fact_transactions.csv", "account_id", "accounts.csv"),
+    ]
+
+def test_parallel_partition_scan_matches_serial(tmp_path):
+    customers = list(gen.gen_customers(300, random.Random(1), NOW))
+    accounts = list(gen.gen_accounts(customers, random.Random(2), NOW))
+    gen._init_pools({"cards": gen.card_pool(accounts), "loans": gen.loan_pool(accounts), "digital": gen.digital_pool(customers)})
+    gen.write_sharded(str(tmp_path / "fact_transactions.csv"), "fact_transactions", gen.row_shards(3000, size=800), 42, NOW, grain="month")
+    storage.write_rows(str(tmp_path / "accounts.csv"), [{"account_id": a["account_id"]} for a in accounts[::2]])
+
+    serial = dq.run(_txn_checks, str(tmp_path))
+    units = []
+    parallel = dq.run(_txn_checks, str(tmp_path), workers=2, unit_rows=500, units=units)
+    assert len(units) > 2 and sum(u["rows"] for u in units if u["table"] == "fact_transactions.csv" and u["pass"] == "scan") == 3000
+    assert [(r.passed, r.detail, r.samples) for r in parallel] == [(r.passed, r.detail, r.samples) for r in serial]
+    assert serial[0].passed and serial[1].passed and not serial[2].passed and not serial[3].passed
+    assert serial[0].samples == [] and len(serial[3].samples) == dq.SAMPLES
+    assert not {s["account_id"] for s in serial[3].samples} & {a["account_id"] for a in accounts[::2]}
+    report = dq.write_report(str(tmp_path / "dq_results.json"), parallel, units)
+    assert report["failed"] == sum(not r.passed for r in serial) and len(report["checks"][2]["samples"]) == dq.SAMPLES
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_fpr():
+    bloom = dq.ScalableBloom(0.01, initial=1000)
+    keys = [f"ACCT-{i:08d}" for i in range(20_000)]
+    for lo in range(0, len(keys), 3000): bloom.add(keys[lo:lo + 3000])
+    assert len(bloom.filters) > 1 and bloom.contains(keys).all()
+    assert bloom.contains([f"TXN-{i:08d}" for i in range(50_000)]).mean() < 0.015
+    assert bloom.nbytes < dq.KeySet().nbytes + 8 * len(keys)
+
+def _ri_checks(fpr):
+    return [dq.References("accounts → customers", "accounts.csv", "customer_id", "customers.csv", fpr=fpr)]
+
+def test_bloom_semi_join_is_exact_even_at_high_fpr(tmp_path):
+    storage.write_rows(str(tmp_path / "customers.csv"), [{"customer_id": f"C{i}"} for i in range(0, 4000, 2)])
+    storage.write_rows(str(tmp_path / "accounts.csv"), [{"account_id": f"A{i}", "customer_id": f"C{i % 3000}"} for i in range(9000)])
+    exact = dq.run(_ri_checks(None), str(tmp_path))[0]
+    for fpr in (0.001, 0.5):
+        approx = dq.run(_ri_checks(fpr), str(tmp_path), chunk_rows=1000)[0]
+        assert (approx.passed, approx.detail) == (exact.passed, exact.detail) == (False, "1500 orphans")
+        assert [r["account_id"] for r in approx.samples] == ["A1", "A3", "A5", "A7", "A9"]
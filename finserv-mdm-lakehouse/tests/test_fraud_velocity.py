@@ -0,0 +1,87 @@
+"""
+Fraud Velocity Tests — windows, rules, bounded state, batch scoring, merge sort, wiring
+=======================================================================================
+Run with: python -m pytest tests/test_fraud_velocity.py
+"""
+import os, sys, random
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import generate_all as gen, storage
+from src.pipelines import fraud_velocity as fv
+
+START = datetime(2025, 6, 1)
+
+def txn(i, minutes, account="ACC-1", amount=40.0, mcc="5411", **extra):
+    return {"transaction_id": f"TXN-{i:05d}", "account_id": account, "customer_id": "CUST-1",
+            "transaction_date": (START + timedelta(minutes=minutes)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "amount": amount, "mcc_code": mcc, "merchant_category": "Grocery", "channel": "pos_chip",
+            "is_international": False, "fraud_flag": False, **extra}
+
+def test_windows_slide_and_expire():
+    ring = fv.Ring(300, 12)  # 1h of 5-minute buckets
+    for minute in (0, 10, 20, 50): assert ring.push(minute * 60, 10.0, 0, 1 << (minute // 10))
+    assert (ring.count, ring.total, ring.mask.bit_count()) == (4, 40.0, 4)
+    ring.slide(65 * 60)  # the minute-0 bucket leaves the hour
+    assert (ring.count, ring.total, ring.mask.bit_count()) == (3, 30.0, 3)
+    assert ring.push(30 * 60, 5.0, 1, 0) and ring.marks == 1  # late but inside the window
+    assert not ring.push(0, 5.0, 0, 0)  # older than the window
+    ring.slide(10 * 3600)
+    assert (ring.count, ring.total, ring.mask, ring.occupied) == (0, 0.0, 0, 0)
+
+def test_rules_fire_on_their_patterns():
+    scorer = fv.VelocityScorer()
+    spaced = [scorer.score(txn(i, i * 30)) for i in range(8)]  # one every 30 minutes: never 5 in an hour
+    assert spaced == [None] * 8
+    burst = [scorer.score(txn(100 + i, 600 + i, account="ACC-2")) for i in range(6)]
+    assert [a and a["alert_type"] for a in burst] == [None] * 4 + ["velocity_spike"] * 2
+    structuring = [scorer.score(txn(200 + i, 700 + i * 120, account="ACC-3", amount=9_500.0)) for i in range(3)]
+    assert structuring[-1]["alert_type"] == "structuring_pattern" and structuring[-1]["severity"] == "high"
+    declines = [scorer.score(txn(300 + i, 800 + i, account="ACC-4", is_declined="True")) for i in range(3)]
+    assert declines[-1]["alert_type"] == "multiple_declines"
+    large = scorer.score(txn(400, 900, amount=900.0))  # 10x ACC-1's 7d average
+    assert large["alert_type"] == "large_purchase" and large["detection_method"] == "rules_engine"
+    new_mcc = scorer.score(txn(401, 901, amount=300.0, mcc="7011"))
+    assert new_mcc["alert_type"] == "new_merchant_high_amount"
+    flagged = scorer.score(txn(402, 902, fraud_flag="True", channel="online"))
+    assert flagged["alert_type"] == "card_not_present_high_risk" and flagged["detection_method"] == "ml_model"
+    assert list(flagged) == fv.ALERT_COLUMNS and 0 <= flagged["risk_score"] <= 1
+
+def test_state_stays_bounded():
+    scorer = fv.VelocityScorer()
+    rng = random.Random(3)
+    for i in range(5_000):  # one busy account for three weeks, plus a stream of one-off accounts
+        scorer.score(txn(i, i * 6, account="ACC-BUSY" if i % 2 else f"ACC-{i}", mcc=str(rng.randrange(40))))
+    busy = scorer.accounts["ACC-BUSY"]
+    assert [len(r.counts) for r in busy[1:]] == [12, 24, 28] and busy[1].count <= 12 * 5 // 2 + 1
+    assert len(scorer.accounts) < 1 + 2 * fv.IDLE_SECONDS // 720  # accounts idle for 7d+ are swept
+
+def test_generator_scores_its_transactions(tmp_path):
+    customers = list(gen.gen_customers(300, random.Random(1), START))
+    accounts = list(gen.gen_accounts(customers, random.Random(2), START))
+    path = str(tmp_path / "fact_transactions.csv")
+    storage.write_rows(path, gen.gen_transactions(accounts, 4_000, random.Random(3), START))
+    txns = list(fv.event_time_order(path, run_rows=700))  # six spilled runs, merged
+    assert txns == sorted(storage.iter_rows(path, columns=fv.TXN_COLUMNS, text=True), key=lambda t: t["transaction_date"])
+    alerts = list(gen.gen_fraud_alerts(iter(txns), rng=random.Random(4)))
+    assert len(list(gen.gen_fraud_alerts(iter(txns), cap=5, rng=random.Random(4)))) == 5 < len(alerts)
+    assert alerts and all(list(a) == fv.ALERT_COLUMNS for a in alerts)
+    by_id = {t["transaction_id"]: t for t in txns}
+    assert all(by_id[a["transaction_id"]]["account_id"] == a["account_id"] for a in alerts)
+    assert any(a["status"] != "open" for a in alerts)
+
+@pytest.mark.skipif(fv.np is None, reason="numpy not installed")
+def test_batches_raise_the_same_alerts_as_the_stream():
+    rng = random.Random(5)
+    txns = [txn(i, i // 3 + rng.randrange(3), account=f"ACC-{rng.randrange(60)}", amount=rng.choice([20.0, 80.0, 600.0, 9_500.0]),
+                mcc=str(rng.randrange(12)), is_international=rng.random() < 0.1, fraud_flag=rng.random() < 0.01,
+                is_declined=rng.random() < 0.1) for i in range(6_000)]
+    txns.sort(key=lambda t: t["transaction_date"])
+    stream = list(fv.score_stream(txns))
+    assert len({a["alert_type"] for a in stream}) >= 5
+    for batch_size in (7, 997, 10_000):
+        assert list(fv.score_batches(txns, fv.BatchScorer(capacity=4), batch_size)) == stream
+    with pytest.raises(ValueError, match="event-time order"):
+        list(fv.score_batches(txns[::-1], batch_size=100))
@@ -0,0 +1,144 @@
+"""
+Generator Tests — sharding, determinism, streaming and output formats
+======================================================================
+Run with: python -m pytest tests/test_generation.py
+"""
+import csv, os, sys, random
+from datetime import datetime
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import generate_all as gen, storage
+
+NOW = datetime(2025, 6, 30, 12, 0, 0)
+
+def _dims(n_customers=300):
+    customers = list(gen.gen_customers(n_customers, random.Random(1), NOW))
+    accounts = list(gen.gen_accounts(customers, random.Random(2), NOW))
+    gen._init_pools({"cards": gen.card_pool(accounts), "loans": gen.loan_pool(accounts), "digital": gen.digital_pool(customers)})
+    return customers, accounts
+
+def _ids(path, col):
+    with open(path) as f: return [int(r[col].split("-")[1]) for r in csv.DictReader(f)]
+
+def test_sharded_output_is_identical_for_any_worker_count(tmp_path):
+    _dims()
+    outputs = []
+    for workers in (1, 3):
+        path = str(tmp_path / f"txns_w{workers}.csv")
+        assert gen.write_sharded(path, "fact_transactions", gen.row_shards(5000, size=700), 42, NOW, workers) == 5000
+        with open(path, "rb") as f: outputs.append(f.read())
+    assert outputs[0] == outputs[1]
+    assert _ids(str(tmp_path / "txns_w1.csv"), "transaction_id") == list(range(1, 5001))
+
+def test_loan_payment_shards_number_ids_contiguously(tmp_path):
+    _dims()
+    path = str(tmp_path / "payments.csv")
+    n = gen.write_sharded(path, "fact_loan_payments", gen.loan_shards(gen._POOLS["loans"], NOW, size=17), 42, NOW, workers=2)
+    assert _ids(path, "payment_id") == list(range(1, n + 1))
+
+def test_write_csv_streams_generators(tmp_path):
+    path = str(tmp_path / "events.csv")
+    customers, _ = _dims()
+    assert gen.write_csv(path, gen.gen_digital_events(customers, 1234, random.Random(3), NOW)) == 1234
+    assert gen.write_csv(str(tmp_path / "empty.csv"), iter([])) == 0
+    assert not os.path.exists(str(tmp_path / "empty.csv"))
+
+def test_numpy_backend_matches_row_schema_and_formats(tmp_path):
+    pytest.importorskip("numpy")
+    _dims()
+    for table in ("fact_transactions", "digital_events"):
+        paths = {}
+        for backend in ("python", "numpy"):
+            paths[backend] = str(tmp_path / f"{table}_{backend}.csv")
+            gen.write_sharded(paths[backend], table, gen.row_shards(2000, size=900), 42, NOW, backend=backend)
+        with open(paths["python"]) as a, open(paths["numpy"]) as b:
+            rows_py, rows_np = list(csv.DictReader(a)), list(csv.DictReader(b))
+        assert len(rows_np) == len(rows_py) == 2000
+        assert list(rows_np[0]) == list(rows_py[0])
+        for col in rows_py[0]:
+            fmt = lambda v: "".join("9" if ch.isdigit() else ch for ch in v)[:4]
+            assert {fmt(r[col]) for r in rows_np} <= {fmt(r[col]) for r in rows_py} | {""}, col
+
+def test_parquet_round_trips_to_the_csv_text(tmp_path):
+    pytest.importorskip("pyarrow")
+    customers, accounts = _dims(200)
+    rows = list(gen.gen_loan_payments(accounts, random.Random(4), NOW))
+    base = str(tmp_path / "fact_loan_payments.csv")
+    n = storage.write_rows(base, rows, formats=storage.FORMATS, row_group_size=500, compression="zstd")
+    assert n == len(rows)
+    pf = storage.pq.ParquetFile(storage.with_format(base, "parquet"))
+    assert pf.metadata.num_row_groups == -(-n // 500)
+    assert str(pf.schema_arrow.field("due_date").type) == "date32[day]"
+    assert str(pf.schema_arrow.field("amount_paid").type) == "double"
+    os.remove(base)
+    back = list(storage.iter_rows(base, text=True))
+    assert [r["payment_id"] for r in back] == [r["payment_id"] for r in rows]
+    assert [r["payment_date"] for r in back] == [r["payment_date"] for r in rows]
+    assert [float(r["amount_paid"]) for r in back] == [float(r["amount_paid"]) for r in rows]
+
+def test_parquet_int_column_widens_to_double_after_the_first_row_group(tmp_path):
+    pytest.importorskip("pyarrow")
+    base = str(tmp_path / "fees.csv")
+    with storage.TableWriter(base, storage.FORMATS, row_group_size=500) as w:
+        w.write_rows({"fee_id": i, "fee": 0} for i in range(1_200))  # two int64 row groups written
+        w.write_rows([{"fee_id": 1_200, "fee": 12.5}])
+    assert w.rows_written == 1_201
+    pf = storage.pq.ParquetFile(storage.with_format(base, "parquet"))
+    assert str(pf.schema_arrow.field("fee").type) == "double" and str(pf.schema_arrow.field("fee_id").type) == "int64"
+    assert pf.metadata.num_row_groups == 3 and not os.path.exists(storage.with_format(base, "parquet") + ".narrow")
+    with open(base) as f: csv_rows = list(csv.DictReader(f))
+    os.remove(base)
+    assert list(storage.iter_rows(base, text=True)) == csv_rows  # "0" as in the CSV, not "0.0"
+    assert storage.widened_columns(pf) == {"fee"}
+    with storage.TableWriter(base, storage.FORMATS) as w: w.write_rows([{"fee": 0}, {"fee": 12.5}])  # mixed from the start
+    with open(base) as f: csv_rows = list(csv.DictReader(f))
+    os.remove(base)
+    assert list(storage.iter_rows(base, text=True)) == csv_rows == [{"fee": "0"}, {"fee": "12.5"}]
+    with pytest.raises(ValueError, match="column types changed"), storage.TableWriter(str(tmp_path / "bad.csv"), ("parquet",), row_group_size=500) as w:
+        w.write_rows([{"k": 1}] * 600)
+        w.write_rows([{"k": "x"}])
+
+def test_parquet_float_column_with_whole_values_round_trips_as_text(tmp_path):
+    pytest.importorskip("pyarrow")
+    base = str(tmp_path / "rates.csv")
+    with storage.TableWriter(base, storage.FORMATS, row_group_size=500) as w:
+        w.write_rows({"rate_id": i, "rate": [20.0, 100.0, 2.5][i % 3]} for i in range(1_200))
+    with open(base) as f: csv_rows = list(csv.DictReader(f))
+    assert csv_rows[0]["rate"] == "20.0" and csv_rows[1]["rate"] == "100.0"
+    os.remove(base)
+    assert not storage.widened_columns(storage.pq.ParquetFile(storage.with_format(base, "parquet")))
+    assert list(storage.iter_rows(base, text=True)) == csv_rows
+    assert [v for batch in storage.iter_columns(base) for v in batch["rate"]] == [r["rate"] for r in csv_rows]
+
+def test_partitioned_layout_manifest_and_pruning(tmp_path):
+    _dims()
+    trees = []
+    for workers in (1, 2):
+        path = str(tmp_path / f"w{workers}" / "fact_transactions.csv")
+        os.makedirs(os.path.dirname(path))
+        n = gen.write_sharded(path, "fact_transactions", gen.row_shards(3000, size=800), 42, NOW, workers, grain="month")
+        root = storage.table_dir(path)
+        trees.append({os.path.relpath(os.path.join(d, f), root): open(os.path.join(d, f), "rb").read()
+                      for d, _, files in os.walk(root) for f in files})
+    assert trees[0] == trees[1]
+    assert not any(name.startswith("shard-") for name in map(os.path.basename, trees[0]))
+    manifest = storage.read_manifest(path)
+    assert manifest["partition_key"] == "transaction_month" and manifest["rows"] == n == 3000
+    assert all(p["min"][:7] == p["max"][:7] == p["value"] for p in manifest["partitions"])
+    assert len(list(storage.iter_rows(path))) == 3000
+    start, end = "2025-02-10", "2025-03-05"
+    assert [p["value"] for p in storage.prune(manifest, start, end)] == ["2025-02", "2025-03"]
+    pruned = [r["transaction_id"] for r in storage.iter_rows(path, columns=["transaction_id"], start=start, end=end)]
+    scanned = [r["transaction_id"] for r in storage.iter_rows(path) if start <= r["transaction_date"][:10] <= end]
+    assert pruned == scanned and pruned
+
+def test_join_indexes_match_full_scans():
+    customers, accounts = _dims(400)
+    risk = {r["customer_id"]: r for r in gen.gen_credit_risk_snapshot(customers, accounts, random.Random(5), NOW)}
+    for c in customers:
+        if c["status"] == "closed": continue
+        held = [a for a in accounts if a["customer_id"] == c["customer_id"]]
+        assert risk[c["customer_id"]]["num_products"] == len(held)
+        assert risk[c["customer_id"]]["total_balance"] == round(sum(a["balance"] for a in held), 2)
+    assert all(p in gen.ALL_PRODUCTS for pool in gen.SEGMENT_PRODUCTS.values() for p in pool)
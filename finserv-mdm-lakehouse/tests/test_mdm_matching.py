@@ -0,0 +1,153 @@
+"""
+MDM Matching Tests — normalization, similarity, blocking recall
+================================================================
+Run with: python -m pytest tests/test_mdm_matching.py
+"""
+import os, sys, random
+from datetime import datetime
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import generate_all as gen, storage
+from src.pipelines import mdm_matching as mdm, similarity
+
+NOW = datetime(2025, 6, 30, 12, 0, 0)
+
+def _records(n_customers=1500, sf=0.5):
+    customers = list(gen.gen_customers(n_customers, random.Random(1), NOW))
+    tables = gen.gen_bronze_sources(customers, sf, random.Random(2))
+    return [mdm.normalize(adapt(row), system)
+            for (system, (_, adapt)), rows in zip(mdm.SOURCES.items(), tables) for row in rows]
+
+def test_soundex_and_jaro_winkler_reference_values():
+    assert [mdm.soundex(s) for s in ("Robert", "Rupert", "Ashcraft", "Tymczak", "Pfister")] == ["R163", "R163", "A261", "T522", "P236"]
+    assert round(mdm.jaro_winkler("martha", "marhta"), 4) == 0.9611
+    assert round(mdm.jaro_winkler("dwayne", "duane"), 4) == 0.84
+    assert mdm.jaro_winkler("", "") == 0.0 and mdm.jaro_winkler("abc", "abc") == 1.0
+
+def test_normalization_reconciles_source_formats():
+    core = mdm.normalize(mdm._core({"CIF_NUM": "CIF-1", "CUST_NAME": "SMITH, JOHN", "EMAIL": "John.Smith@X.com", "PHONE": "2125550123",
+                                     "ADDR1": "12 MAIN ST", "CITY": "NEW YORK", "STATE": "NY", "ZIP": "10001"}), "core_banking")
+    fsv = mdm.normalize(mdm._fiserv({"PARTY_ID": "FSV1", "FULL_NAME": "J. Smith", "EMAIL_ADDR": "JOHN.SMITH@X.COM", "PHONE_NUM": "+12125550123",
+                                      "STREET_ADDR": "12 Main St", "CITY_NAME": "New York", "STATE_CODE": "NY", "POSTAL_CODE": "10001"}), "fiserv")
+    s = mdm.score_pair(core, fsv)
+    assert s["email"] == s["phone"] == s["address"] == s["cross_system"] == 1.0
+    assert s["name"] >= 0.85 and mdm.tier(s["composite"]) == "auto_merge"
+
+def test_blocking_keeps_every_email_linked_match():
+    records = _records()
+    blocked = set(mdm.candidate_pairs(records))
+    n = len(records)
+    assert len(blocked) < n * (n - 1) // 2 // 50
+    matches = {(i, j) for i in range(n) for j in range(i + 1, n)
+               if records[i]["email_n"] == records[j]["email_n"] and mdm.score_pair(records[i], records[j])["composite"] >= mdm.REVIEW}
+    assert matches and matches <= blocked
+
+def test_match_rows_follow_the_pair_schema_and_tiers():
+    rows = list(mdm.match_records(_records(600, 0.2), now=NOW))
+    assert rows and [r["pair_id"] for r in rows] == [f"MPR-{k:05d}" for k in range(1, len(rows) + 1)]
+    for r in rows:
+        assert r["match_tier"] == mdm.tier(r["composite_score"])
+        assert (r["decided_by"], r["match_decision"]) == {"auto_merge": ("system", "merge"), "review": ("pending", "pending"),
+                                                          "no_match": ("system", "reject")}[r["match_tier"]]
+
+def test_batch_kernel_matches_scalar_scores_exactly():
+    pytest.importorskip("numpy")
+    records = _records(900, 0.3)
+    rng = random.Random(7)
+    pairs = mdm.candidate_pairs(records) + [(rng.randrange(len(records)), rng.randrange(len(records))) for _ in range(3000)]
+    scorer = similarity.PairScorer(records, mdm.PHONE_PREFIX)
+    for i, j, s in similarity.score_batches(scorer, pairs, mdm.WEIGHTS, batch=1000):
+        for k in range(len(i)):
+            ref = mdm.score_pair(records[i[k]], records[j[k]])
+            assert {dim: float(v[k]) for dim, v in s.items()} == ref, (records[i[k]]["name"], records[j[k]]["name"])
+    assert list(mdm.match_records(records, now=NOW, vectorized=True)) == list(mdm.match_records(records, now=NOW, vectorized=False))
+
+def test_incremental_delta_matches_like_a_full_run(tmp_path):
+    from src.pipelines import mdm_incremental as inc
+    records = _records(900, 0.3)
+    delta_ids = {r["record_id"] for r in records[-40:]} | {r["record_id"] for r in records[:20]}
+    base = [r for r in records if r["record_id"] not in delta_ids]
+    delta = [r for r in records if r["record_id"] in delta_ids]
+    link = lambda row: frozenset([(row["source_system_1"], row["customer_id_1"]), (row["source_system_2"], row["customer_id_2"])])
+    full = {link(r) for r in mdm.match_records(records, now=NOW) if r["match_tier"] == "auto_merge"}
+
+    with inc.BlockingIndex(str(tmp_path / inc.INDEX)) as index:
+        built, _ = inc.match_delta(index, base, now=NOW)
+    with inc.BlockingIndex(str(tmp_path / inc.INDEX)) as index:
+        rows, updates = inc.match_delta(index, delta, now=NOW)
+        assert len(index) == len(records)
+    assert all(link(r) & {(d["source_system"], d["record_id"]) for d in delta} for r in rows)
+    assert [r["pair_id"] for r in rows][:1] == [f"MPR-{len(built) + 1:05d}"]
+    assert {link(r) for r in built + rows if r["match_tier"] == "auto_merge"} == full
+    assert {(u["source_system"], u["record_id"]) for u in updates} >= {(d["source_system"], d["record_id"]) for d in delta}
+    assert {u["action"] for u in updates} <= {"new", "joined", "merged", "updated"}
+
+def test_incremental_update_leaves_its_cluster_unless_it_still_matches(tmp_path):
+    from src.pipelines import mdm_incremental as inc
+    records = _records(900, 0.3)
+    with inc.BlockingIndex(str(tmp_path / inc.INDEX)) as index:
+        inc.match_delta(index, records, now=NOW)
+        clusters = {}
+        for rid in range(1, len(index) + 1): clusters.setdefault(index.cluster(rid), []).append(rid)
+        members = max(clusters.values(), key=len)
+        assert len(members) >= 2
+        rid = members[-1]
+        before = index.load([rid])[rid]
+        raw = {k: before[k] for k in ("record_id", "first", "last", "email", "phone", "street", "city", "state", "zip")}
+        moved = mdm.normalize(dict(raw, first="Zebulon", last="Quxworth", email="zq@example.net", phone="555-010-9999",
+                                   street="1 Nowhere Rd", city="Elsewhere", zip="99999"), before["source_system"])
+        _, updates = inc.match_delta(index, [moved], now=NOW)
+        assert index.members(index.cluster(rid)) == [rid]
+        others = {u["record_id"]: u for u in updates if u["record_id"] != before["record_id"]}
+        assert {u["action"] for u in others.values()} == {"split"} and len(others) == len(members) - 1
+        _, updates = inc.match_delta(index, [mdm.normalize(raw, before["source_system"])], now=NOW)  # changed back: rejoins
+        assert index.cluster(rid) == index.cluster(members[0])
+        assert {u["action"] for u in updates if u["record_id"] == before["record_id"]} == {"joined"}
+
+def test_incremental_apply_needs_a_built_index(tmp_path, monkeypatch):
+    from src.pipelines import mdm_incremental as inc
+    records = _records(300, 0.3)
+    os.makedirs(tmp_path / "mdm")
+    pairs = str(tmp_path / "mdm" / "mdm_match_pairs.csv")
+    assert inc.last_pair_number(pairs) == 0
+    n = storage.write_rows(pairs, mdm.match_records(records, now=NOW))  # the batch matcher's output
+    assert n and inc.last_pair_number(pairs) == n
+    monkeypatch.setattr(sys, "argv", ["mdm_incremental.py", "apply", "--data-dir", str(tmp_path), "--delta-dir", str(tmp_path / "none")])
+    with pytest.raises(SystemExit, match="run `build` first"): inc.main()
+
+def test_union_find_clusters_transitively():
+    from src.pipelines.golden_records import link_pairs
+    pair = lambda a, b, t="auto_merge": {"source_system_1": "x", "customer_id_1": a, "source_system_2": "y", "customer_id_2": b, "match_tier": t}
+    ids, uf = link_pairs([pair("1", "2"), pair("3", "2"), pair("4", "5"), pair("6", "7", "review")])
+    root = lambda k: uf.find(ids[k])
+    assert root(("x", "1")) == root(("y", "2")) == root(("x", "3")) != root(("x", "4"))
+    assert ("x", "6") not in ids
+
+def test_survivorship_follows_field_priorities():
+    from src.pipelines.golden_records import survive
+    rec = lambda rid, updated, **kw: dict({"record_id": rid, "updated": updated, "first_name": "", "last_name": "", "email": "", "phone": "",
+                                           "address_line1": "", "city": "", "state": "", "zip_code": "", "fico_score": "", "annual_income": ""}, **kw)
+    members = [
+        ("salesforce", rec("001a", "2024-01-01", first_name="Jon", last_name="Smith", email="crm@x.com", phone="+12125550100", annual_income="90000")),
+        ("salesforce", rec("001b", "2025-01-01", email="newer@x.com")),
+        ("fiserv", rec("FSV1", "2023-01-01", first_name="J.", last_name="Smith", fico_score="700", city="Austin")),
+        ("core_banking", rec("CIF-1", "2022-01-01", first_name="John", last_name="Smith", email="core@x.com", fico_score="710", city="Dallas")),
+    ]
+    golden, log = survive(members)
+    assert (golden["first_name"], golden["email"], golden["fico_score"], golden["city"], golden["annual_income"]) == ("John", "newer@x.com", "710", "Dallas", "90000")
+    assert golden["phone"] == "+12125550100" and golden["member_count"] == 4
+    assert {e["field"]: e["source_system"] for e in log} == {"legal_name": "core_banking", "email": "salesforce", "billing_address": "core_banking", "fico_score": "core_banking"}
+    assert survive(list(reversed(members)))[0] == golden
+
+def test_golden_records_spill_to_disk_gives_the_same_clusters(tmp_path):
+    from src.pipelines import golden_records as gr
+    from src.data_generation import storage
+    customers = list(gen.gen_customers(600, random.Random(1), NOW))
+    for (fname, _), rows in zip(mdm.SOURCES.values(), gen.gen_bronze_sources(customers, 0.2, random.Random(2))):
+        storage.write_rows(str(tmp_path / fname), rows)
+    pairs = list(mdm.match_bronze(str(tmp_path), now=NOW))
+    in_memory = sorted(row["golden_id"] for row, _ in gr.build_golden_records(str(tmp_path), pairs))
+    spilled = sorted(row["golden_id"] for row, _ in gr.build_golden_records(str(tmp_path), pairs, max_in_memory=25, spill_dir=str(tmp_path)))
+    assert in_memory == spilled and len(set(in_memory)) == len(in_memory)
+    assert not [p for p in os.listdir(tmp_path) if p.startswith("golden-spill-")]
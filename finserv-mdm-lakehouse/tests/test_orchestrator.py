@@ -0,0 +1,61 @@
+"""
+Orchestrator Tests — DAG derivation, parallel phases, checkpoint/resume, skips
+===============================================================================
+Run with: python -m pytest tests/test_orchestrator.py
+"""
+import os, sys, threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.agents import orchestrator as orch
+
+class FakeAgents:
+    """Runner that writes one file per output artifact; `fail` names tasks that raise."""
+    def __init__(self, root, fail=()):
+        self.root, self.fail, self.ran = root, set(fail), []
+        self.last_wave = threading.Barrier(3, timeout=5)
+
+    def __call__(self, task_id, task):
+        self.ran.append(task_id)
+        if task_id in self.fail: raise RuntimeError(f"{task_id} broke")
+        if task["phase"] in ("phase_5", "phase_6"): self.last_wave.wait()  # only passes if all three run at once
+        for artifact in task["outputs"]:
+            for pattern in orch.ARTIFACT_PATHS.get(artifact, []):
+                path = os.path.join(self.root, pattern.replace("*", "x"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "a") as f: f.write(task_id + "\n")
+        return f"{task_id} ok"
+
+def test_dependencies_come_from_inputs_and_outputs():
+    deps = orch.dependencies(orch.tasks())
+    assert deps["phase_1"] == [] and deps["phase_3"] == ["phase_2"] and deps["phase_4"] == ["phase_2", "phase_3"]
+    assert deps["phase_6.dag_builder"] == ["phase_1", "phase_2", "phase_4"]
+    assert orch.waves(deps)[-1] == ["phase_5", "phase_6.dag_builder", "phase_6.doc_writer"]
+    cyclic = {"a": {"name": "A", "agent": "x", "inputs": ["b_out"], "outputs": ["a_out"]},
+              "b": {"name": "B", "agent": "x", "inputs": ["a_out"], "outputs": ["b_out"]}}
+    with pytest.raises(ValueError, match="cycle"):
+        orch.run(cyclic, runner=lambda *a: None, root="/nonexistent")
+
+def test_resume_after_failure_and_skip_unchanged(tmp_path):
+    root = str(tmp_path)
+    agents = FakeAgents(root, fail={"phase_3"})
+    status = orch.run(runner=agents, root=root)
+    assert status == {"phase_1": "done", "phase_2": "done", "phase_3": "failed", "phase_4": "blocked",
+                      "phase_5": "blocked", "phase_6.dag_builder": "blocked", "phase_6.doc_writer": "blocked"}
+    state = orch.load_state(os.path.join(root, orch.STATE_FILE))
+    assert "phase_3 broke" in state["phase_3"]["error"]
+
+    agents = FakeAgents(root)
+    status = orch.run(runner=agents, root=root)
+    assert agents.ran[:2] == ["phase_3", "phase_4"] and sorted(agents.ran[2:]) == ["phase_5", "phase_6.dag_builder", "phase_6.doc_writer"]
+    assert status["phase_1"] == status["phase_2"] == "skipped" and status["phase_6.doc_writer"] == "done"
+
+    agents = FakeAgents(root)
+    assert set(orch.run(runner=agents, root=root).values()) == {"skipped"} and agents.ran == []
+
+    with open(os.path.join(root, "data", "gold", "dim_x"), "a") as f: f.write("edited\n")  # a phase_4 output changed
+    agents = FakeAgents(root)
+    status = orch.run(runner=agents, root=root)
+    assert sorted(agents.ran) == ["phase_4", "phase_5", "phase_6.dag_builder", "phase_6.doc_writer"]
+    assert orch.run(runner=FakeAgents(root), root=root, force=True)["phase_1"] == "done"
@@ -0,0 +1,61 @@
+"""
+Profiler Tests — sketches, type inference, profile_data_source tool
+====================================================================
+Run with: python -m pytest tests/test_profiler.py
+"""
+import os, sys, json, random
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import storage
+from src.pipelines import profiler
+from src.agents import agent_loop, tool_handlers
+
+def test_hyperloglog_and_kll_accuracy():
+    hll, kll = profiler.HyperLogLog(), profiler.KLL()
+    rng = random.Random(3)
+    values = [rng.gauss(100, 15) for _ in range(200_000)]
+    for lo in range(0, len(values), 50_000):
+        hll.add([f"ACCT-{i:08d}" for i in range(lo, lo + 50_000)])
+        kll.update(values[lo:lo + 50_000])
+    assert abs(hll.estimate() - 200_000) / 200_000 < 0.03
+    assert sum(map(len, kll.levels)) < 2_000
+    exact = sorted(values)
+    for q, v in kll.quantiles().items():
+        rank = sum(x <= v for x in exact) / len(exact)
+        assert abs(rank - q) < 0.02
+
+def test_reservoir_is_uniform_and_bounded():
+    hits = Counter()
+    for seed in range(400):
+        res = profiler.Reservoir(10, seed)
+        for lo in range(0, 1000, 137):
+            n = min(137, 1000 - lo)
+            for slot, i in res.offer(n): res.place(slot, lo + i)
+        assert len(res.items) == len(set(res.items)) == 10
+        hits.update(x // 100 for x in res.items)
+    assert all(300 < hits[d] < 500 for d in range(10))  # 400 per decile expected
+
+def test_type_inference():
+    assert profiler.value_types(["1", "-2", "30"]) == Counter(integer=3)
+    assert profiler.value_types(["1", "2.5", "x", "2025-01-01", "2025-01-01T10:00:00Z", "True"]) == \
+        Counter(integer=1, decimal=1, string=1, date=1, timestamp=1, boolean=1)
+    assert profiler.column_type({"integer", "decimal"}) == "decimal"
+    assert profiler.column_type({"integer", "string"}) == "string"
+
+def test_profile_data_source_tool(tmp_path, monkeypatch):
+    rows = [{"CIF_NUM": f"CIF-{i:05d}", "FICO": "" if i % 10 == 0 else str(600 + i % 200),
+             "STATE": "NY" if i % 3 else "CA", "ACCT_OPEN_DT": f"2024-01-{1 + i % 28:02d}"} for i in range(5000)]
+    os.makedirs(tmp_path / "bronze")
+    storage.write_rows(str(tmp_path / "bronze" / "core_banking_customers.csv"), rows)
+    monkeypatch.setattr(tool_handlers, "DATA_DIR", str(tmp_path))
+
+    out = agent_loop.execute_tool("profile_data_source", {"source_name": "core_banking", "table_name": "customers", "sample_size": 50})
+    json.dumps(out)
+    cols = {c["name"]: c for c in out["columns"]}
+    assert out["rows"] == 5000 and out["sample_size"] == 50 and out["path"] == os.path.join("bronze", "core_banking_customers.csv")
+    assert cols["FICO"]["type"] == "integer" and cols["FICO"]["nulls"] == 500 and cols["FICO"]["min"] == 601.0
+    assert cols["STATE"]["top_values"] == [["NY", 3333], ["CA", 1667]] and cols["STATE"]["distinct_estimate"] == 2
+    assert cols["ACCT_OPEN_DT"]["type"] == "date" and cols["CIF_NUM"]["distinct_estimate"] > 4900
+    assert "top_values" not in cols["CIF_NUM"] and "top_values" not in cols["FICO"]  # 200 distinct: not categorical
+    assert "error" in agent_loop.execute_tool("profile_data_source", {"source_name": "gold", "table_name": "nope"})
@@ -0,0 +1,78 @@
+"""
+Query Engine Tests — pushdown, partition pruning, limit, query_database tool
+==============================================================================
+Run with: python -m pytest tests/test_query_engine.py
+"""
+import os, sys, json
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import storage
+from src.pipelines import query_engine as qe
+from src.agents import agent_loop, tool_handlers
+
+@pytest.fixture
+def lake(tmp_path):
+    os.makedirs(tmp_path / "gold")
+    storage.write_rows(str(tmp_path / "gold" / "dim_account.csv"),
+                       [{"account_id": f"ACCT-{i:03d}", "zip_code": f"{i:05d}", "segment": "retail" if i % 2 else "private"}
+                        for i in range(50)])
+    tdir = str(tmp_path / "gold" / "fact_transactions")
+    with storage.PartitionedWriter(tdir, "transaction_date", "transaction_date", "day", part="shard-0") as w:
+        w.write_rows([{"transaction_id": f"TXN-{i:05d}", "account_id": f"ACCT-{i % 50:03d}",
+                       "transaction_date": f"2025-06-{1 + i % 30:02d}T10:00:00Z", "amount": f"{i % 1000}.50",
+                       "memo": "" if i % 7 else "refund"} for i in range(3000)])
+    storage.finish_partitions(tdir, "transaction_date", "transaction_date", "day", w.stats, ["shard-0"])
+    return str(tmp_path)
+
+def test_sql_analysis():
+    tokens = qe.tokenize("SELECT a.x FROM gold.fact_transactions t JOIN dim_account a ON a.id = t.id WHERE t.amount >= 10 AND t.d BETWEEN 'a' AND 'b'")
+    assert qe.referenced_tables(tokens) == [(5, "gold", "fact_transactions", "t"), (10, None, "dim_account", "a")]
+    terms = qe.conjuncts(qe.where_clause(tokens))
+    assert [qe.parse_predicate(t) for t in terms] == [(("t", "amount"), ">=", 10), (("t", "d"), "between", ("a", "b"))]
+    assert qe.conjuncts(qe.tokenize("x = 1 OR y = 2")) is None
+    assert qe.parse_predicate(qe.tokenize("5 < x")) == ((None, "x"), ">", 5)
+    assert qe.parse_predicate(qe.tokenize("lower(x) = 'a'")) is None
+    assert [qe.convert(v) for v in ("", "02134", "7", "-1.5", "1e3")] == [None, "02134", 7, -1.5, "1e3"]
+
+def test_pushdown_and_pruning_match_full_scan(lake, monkeypatch):
+    queries = ["SELECT transaction_id, amount FROM fact_transactions WHERE transaction_date >= '2025-06-10' AND transaction_date < '2025-06-12' AND amount > 500",
+               "SELECT a.segment, count(*), sum(t.amount) FROM fact_transactions t JOIN dim_account a ON a.account_id = t.account_id "
+               "WHERE t.transaction_date BETWEEN '2025-06-01' AND '2025-06-05' AND a.segment IN ('retail') GROUP BY 1",
+               "SELECT a.account_id FROM dim_account a LEFT JOIN fact_transactions t ON t.account_id = a.account_id AND t.amount > 990 "
+               "WHERE t.transaction_id IS NULL ORDER BY 1",
+               "SELECT count(*) FROM fact_transactions WHERE memo IS NOT NULL OR amount < 1"]
+    pushed = [qe.run_query(q, lake, limit=10_000) for q in queries]
+    assert pushed[0]["tables"]["fact_transactions"]["partitions_scanned"] == 3
+    assert pushed[0]["tables"]["fact_transactions"]["rows_loaded"] < 150
+    assert pushed[1]["tables"]["dim_account"]["rows_loaded"] == 25
+    monkeypatch.setattr(qe, "parse_predicate", lambda term: None)  # same queries, nothing pushed
+    for q, out in zip(queries, pushed):
+        assert out["rows"] == qe.run_query(q, lake, limit=10_000)["rows"]
+
+def test_limit_stops_reading(lake):
+    out = qe.run_query("SELECT * FROM gold.fact_transactions WHERE memo = 'refund'", lake, limit=5)
+    assert out["row_count"] == 5 and out["truncated"]
+    assert out["tables"]["gold__fact_transactions"]["rows_scanned"] < 3000
+    out = qe.run_query("SELECT zip_code FROM dim_account WHERE account_id LIKE '%9'", lake, limit=100)
+    assert out["rows"] == [["00009"], ["00019"], ["00029"], ["00039"], ["00049"]] and not out["truncated"]
+    assert [qe.limit_clause(qe.tokenize(f"SELECT x FROM t {tail}")) for tail in ("LIMIT 3", "LIMIT 3 OFFSET 4", "LIMIT 4, 3", "LIMIT -1", "")] == \
+        [(3, 0), (3, 4), (3, 4), None, None]
+
+def test_sql_limit_below_tool_limit_stops_reading(lake):
+    out = qe.run_query("SELECT transaction_id FROM fact_transactions LIMIT 3", lake)
+    assert out["row_count"] == 3 and not out["truncated"]
+    assert out["tables"]["fact_transactions"]["rows_scanned"] < 10
+    out = qe.run_query("SELECT transaction_id FROM fact_transactions WHERE memo = 'refund' LIMIT 2 OFFSET 3", lake)
+    full = qe.run_query("SELECT transaction_id FROM fact_transactions WHERE memo = 'refund'", lake, limit=5000)
+    assert out["rows"] == full["rows"][3:5] and out["tables"]["fact_transactions"]["rows_scanned"] < 3000
+
+def test_query_database_tool(lake, monkeypatch):
+    monkeypatch.setattr(tool_handlers, "DATA_DIR", lake)
+    out = agent_loop.execute_tool("query_database", {"query": "SELECT count(*) AS n FROM dim_account", "database": "gold"})
+    json.dumps(out)
+    assert out["rows"] == [[50]] and out["tables"]["dim_account"]["path"] == os.path.join("gold", "dim_account.csv")
+    assert "error" in agent_loop.execute_tool("query_database", {"query": "DROP TABLE dim_account", "database": "gold"})
+    assert "error" in agent_loop.execute_tool("query_database", {"query": "SELECT 1 FROM silver.nope", "database": "gold"})
+    assert "error" in agent_loop.execute_tool("query_database", {"query": "SELECT * FROM dim_account; ATTACH 'x' AS y", "database": "gold"})
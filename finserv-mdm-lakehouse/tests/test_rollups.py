@@ -0,0 +1,92 @@
+"""
+Rollup Tests — incremental folds, late data, rewritten partitions, real-time view
+==================================================================================
+Run with: python -m pytest tests/test_rollups.py
+"""
+import os, sys, random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import generate_all as gen, storage
+from src.pipelines import rollups
+
+NOW = datetime(2025, 6, 30, 12, 30)
+
+def txns(n, rng, days=40, first=1):
+    for i in range(first, first + n):
+        ts = NOW - timedelta(seconds=rng.randrange(days * 86_400))
+        yield {"transaction_id": f"TXN-{i:06d}", "transaction_date": ts.strftime("%Y-%m-%dT%H:%M:%SZ"),
+               "amount": round(rng.uniform(1, 300), 2), "fraud_flag": rng.random() < 0.05}
+
+def write_sources(data, rng, n=3_000):
+    for layer in ("gold", "clickstream"): os.makedirs(os.path.join(data, layer))
+    path = os.path.join(data, "gold", "fact_transactions.csv")
+    storage.write_rows(path, txns(n, rng))
+    customers = list(gen.gen_customers(200, random.Random(1), NOW))
+    storage.write_rows(os.path.join(data, "clickstream", "digital_events.csv"),
+                       gen.gen_digital_events(customers, 2_000, random.Random(2), NOW))
+    return path
+
+def brute_force(path, grain):
+    width = {"hour": 13, "day": 10, "month": 7}[grain]
+    n, total = Counter(), Counter()
+    for r in storage.iter_rows(path):
+        n[r["transaction_date"][:width]] += 1
+        total[r["transaction_date"][:width]] += float(r["amount"])
+    return {b: (n[b], round(total[b], 6)) for b in n}
+
+def rolled(store, grain):
+    return {r["bucket"]: (r["rows"], round(r["amount"], 6)) for r in rollups.rollup(store, grain, source="transactions")}
+
+def test_appends_fold_only_new_rows_and_late_data_rerolls_its_buckets(tmp_path):
+    data, rng = str(tmp_path), random.Random(5)
+    path = write_sources(data, rng)
+    with rollups.RollupStore(rollups.store_path(data)) as store:
+        first = rollups.refresh(store, data)
+        assert first["transactions"] == {"folded": 3_000, "rescanned": 0} and first["digital_events"]["folded"] == 2_000
+        assert rollups.refresh(store, data)["transactions"] == {"folded": 0, "rescanned": 0}
+        late = list(txns(50, rng, days=90, first=3_001))  # up to three months late
+        storage.append_rows(path, late)
+        assert rollups.refresh(store, data)["transactions"] == {"folded": 50, "rescanned": 0}
+        for grain in ("hour", "day", "month"):
+            assert rolled(store, grain) == brute_force(path, grain)
+        hours = rollups.fold(store, "transactions", [dict(late[0], transaction_id="TXN-STREAM", amount="10.0")])
+        assert hours == [late[0]["transaction_date"][:13]]
+        month = next(r for r in rollups.rollup(store, "month", source="transactions") if r["bucket"] == hours[0][:7])
+        assert month["rows"] == brute_force(path, "month")[hours[0][:7]][0] + 1
+
+def test_rewritten_partition_rescans_only_its_range(tmp_path):
+    data, rng = str(tmp_path), random.Random(6)
+    path = os.path.join(data, "gold", "fact_transactions.csv")
+    tdir, key = storage.table_dir(path), storage.partition_key("transaction", "day")
+    rows = list(txns(3_000, rng))
+    with storage.PartitionedWriter(tdir, "transaction_date", key, "day", part="shard-0") as w: w.write_rows(rows)
+    storage.finish_partitions(tdir, "transaction_date", key, "day", w.stats, ["shard-0"])
+    with rollups.RollupStore(rollups.store_path(data)) as store:
+        assert rollups.refresh(store, data)["transactions"]["folded"] == 3_000
+        day = sorted(w.stats)[10]
+        kept = [dict(r, amount=1.0) for r in rows if r["transaction_date"].startswith(day)][:-1]  # corrected and one dropped
+        storage.write_rows(os.path.join(tdir, f"{key}={day}", "part-00000.csv"), kept)
+        assert rollups.refresh(store, data)["transactions"] == {"folded": len(kept), "rescanned": 0}
+        assert rolled(store, "day")[day] == (len(kept), float(len(kept)))
+        for grain in ("hour", "day", "month"):
+            assert rolled(store, grain) == brute_force(path, grain)
+
+def test_realtime_view_feeds_hourly_metrics(tmp_path):
+    data = str(tmp_path)
+    path = write_sources(data, random.Random(7))
+    with rollups.RollupStore(rollups.store_path(data)) as store:
+        rollups.refresh(store, data)
+        view = rollups.realtime_view(store, NOW)
+    assert len(view) == rollups.HOURS and view[0]["timestamp"] == "2025-06-30T12:00:00Z"
+    hourly = brute_force(path, "hour")
+    for row in view:
+        n, total = hourly.get(row["timestamp"][:13], (0, 0.0))
+        assert row["transactions_per_hour"] == n and row["avg_transaction_amount"] == pytest.approx(total / n if n else 0, abs=0.006)
+    assert sum(r["active_digital_users"] for r in view) > 0
+    metrics = list(gen.gen_realtime_metrics(rollups.HOURS, random.Random(8), NOW, view))
+    assert [m["transactions_per_hour"] for m in metrics] == [r["transactions_per_hour"] for r in view]
+    assert metrics[0]["timestamp"] == view[0]["timestamp"] and metrics[5]["api_latency_ms"] > 0
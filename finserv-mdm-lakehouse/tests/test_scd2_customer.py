@@ -0,0 +1,55 @@
+"""
+SCD2 Customer Tests — versioning, dedup, idempotency, hash-bucket pruning
+==========================================================================
+Run with: python -m pytest tests/test_scd2_customer.py
+"""
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import storage
+from src.pipelines import scd2_customer as scd2
+
+def customers(n):
+    return [{"customer_id": f"CUST-{i:05d}", "segment": "mass_market", "fico_score": str(600 + i % 200),
+             "_ingested_at": "2025-06-30T00:00:00Z"} for i in range(1, n + 1)]
+
+def versions(table, cid):
+    rows = storage.iter_rows(table, text=True, start=cid, end=cid)
+    return sorted(((r["valid_from"], r["valid_to"], r["is_current"], r["fico_score"]) for r in rows if r["customer_id"] == cid))
+
+def test_changes_close_and_open_versions(tmp_path):
+    table = str(tmp_path / "dim_customer_scd2")
+    out = scd2.upsert(table, customers(500), "2025-06-30T00:00:00Z", buckets=16)
+    assert out["inserted"] == 500 and storage.read_manifest(table)["rows"] == 500
+    batch = [{"customer_id": "CUST-00007", "fico_score": "700"}, {"customer_id": "CUST-00007", "fico_score": "710"},
+             {"customer_id": "CUST-00008", "_ingested_at": "2025-07-01T00:00:00Z"},
+             {"customer_id": "CUST-00999", "segment": "affluent", "fico_score": "800"}]
+    out = scd2.upsert(table, batch, "2025-07-01T00:00:00Z")
+    assert (out["distinct_keys"], out["versioned"], out["unchanged"], out["inserted"]) == (3, 1, 1, 1)
+    assert out["buckets_touched"] <= 3 and out["table_rows"] == 502
+    assert versions(table, "CUST-00007") == [("2025-06-30T00:00:00Z", "2025-07-01T00:00:00Z", "False", "607"),
+                                             ("2025-07-01T00:00:00Z", scd2.HIGH_DATE, "True", "710")]
+    current = [r for r in storage.iter_rows(table, text=True) if r["is_current"] == "True"]
+    assert len(current) == len({r["customer_id"] for r in current}) == 501
+    assert {r["customer_id"] for r in scd2.as_of_version(table, "2025-06-30T12:00:00Z")} == {c["customer_id"] for c in customers(500)}
+
+def test_replay_and_stale_batches_change_nothing(tmp_path):
+    table = str(tmp_path / "dim_customer_scd2")
+    scd2.upsert(table, customers(200), "2025-06-30T00:00:00Z", buckets=8)
+    batch = [{"customer_id": "CUST-00042", "segment": "affluent"}]
+    scd2.upsert(table, batch, "2025-07-02T00:00:00Z")
+    before = sorted(map(sorted, (r.items() for r in storage.iter_rows(table, text=True))))
+    assert scd2.upsert(table, batch, "2025-07-03T00:00:00Z")["buckets_rewritten"] == 0
+    assert scd2.upsert(table, [{"customer_id": "CUST-00042", "segment": "ultra_hnw"}], "2025-07-01T00:00:00Z")["stale"] == 1
+    assert sorted(map(sorted, (r.items() for r in storage.iter_rows(table, text=True)))) == before
+
+def test_batch_touches_only_its_buckets(tmp_path):
+    table = str(tmp_path / "dim_customer_scd2")
+    scd2.upsert(table, customers(2000), "2025-06-30T00:00:00Z", buckets=64)
+    inodes = {p["path"]: os.stat(os.path.join(table, p["path"], "part-00000.csv")).st_ino for p in storage.read_manifest(table)["partitions"]}
+    ids = ["CUST-00010", "CUST-01500"]
+    scd2.upsert(table, [{"customer_id": c, "fico_score": "1"} for c in ids], "2025-07-01T00:00:00Z")
+    hit = {scd2.bucket_dir(storage.read_manifest(table), storage.hash_bucket(c, 64)) for c in ids}
+    changed = {p for p, ino in inodes.items() if os.stat(os.path.join(table, p, "part-00000.csv")).st_ino != ino}
+    assert changed == hit and not os.path.exists(os.path.join(table, scd2.STAGING))
+    assert len(storage.prune(storage.read_manifest(table), "CUST-00010", "CUST-00010")) == 1
@@ -0,0 +1,67 @@
+"""
+Tool Cache Tests — content-addressed hits, data fingerprints, invalidation, LRU
+================================================================================
+Run with: python -m pytest tests/test_tool_cache.py
+"""
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from src.data_generation import storage
+from src.pipelines import profiler
+from src.agents import agent_loop, tool_cache, tool_handlers
+
+@pytest.fixture
+def lake(tmp_path, monkeypatch):
+    monkeypatch.delenv("LAKEHOUSE_TOOL_CACHE", raising=False)
+    monkeypatch.setattr(tool_handlers, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(tool_handlers, "ROOT", str(tmp_path / "repo"))
+    for layer in ("silver", "gold"): os.makedirs(tmp_path / layer)
+    storage.write_rows(str(tmp_path / "silver" / "customers.csv"), [{"customer_id": f"C{i}", "state": "NY"} for i in range(100)])
+    storage.write_rows(str(tmp_path / "gold" / "dim_account.csv"), [{"account_id": f"A{i}", "customer_id": f"C{i}"} for i in range(50)])
+    scans = []
+    real = profiler.profile_table
+    monkeypatch.setattr(profiler, "profile_table", lambda *a, **kw: scans.append(a[0]) or real(*a, **kw))
+    return tmp_path, scans
+
+def test_repeat_calls_hit_until_the_data_changes(lake):
+    tmp_path, scans = lake
+    call = {"source_name": "silver", "table_name": "customers", "sample_size": 10}
+    first = agent_loop.execute_tool("profile_data_source", call)
+    before = tool_cache.stats()
+    assert agent_loop.execute_tool("profile_data_source", dict(reversed(list(call.items())))) == first  # key order is irrelevant
+    assert len(scans) == 1 and tool_cache.stats()["hits"] == before["hits"] + 1
+    agent_loop.execute_tool("profile_data_source", {**call, "sample_size": 20})
+    assert len(scans) == 2
+
+    q = {"query": "SELECT count(*) FROM dim_account", "database": "gold"}
+    assert agent_loop.execute_tool("query_database", q)["rows"] == [[50]]
+    storage.write_rows(str(tmp_path / "gold" / "dim_account.csv"), [{"account_id": "A0", "customer_id": "C0"}])
+    assert agent_loop.execute_tool("query_database", q)["rows"] == [[1]]
+    assert "error" in agent_loop.execute_tool("query_database", {"query": "SELECT * FROM nowhere", "database": "gold"})
+
+def test_writes_invalidate_what_they_touch(lake):
+    tmp_path, scans = lake
+    agent_loop.execute_tool("profile_data_source", {"source_name": "silver", "table_name": "customers"})
+    agent_loop.execute_tool("query_database", {"query": "SELECT * FROM dim_account a JOIN silver.customers c USING (customer_id)", "database": "gold"})
+    agent_loop.execute_tool("query_database", {"query": "SELECT * FROM dim_account", "database": "gold"})
+    path = tool_cache.cache_path(str(tmp_path))
+    with tool_cache.ToolCache(path) as cache: assert cache.summary()["entries"] == 3
+    out = agent_loop.execute_tool("write_pipeline_code", {"pipeline_name": "silver_customers", "layer": "silver",
+                                                         "code": "print('hi')\n", "file_path": "src/pipelines/silver_customers.py"})
+    assert out["bytes"] == 12 and os.path.exists(tmp_path / "repo" / "src" / "pipelines" / "silver_customers.py")
+    with tool_cache.ToolCache(path) as cache:
+        assert cache.summary()["entries"] == 1
+        assert cache.invalidate(["gold/dim"]) == 0 and cache.invalidate(["gold/dim_account"]) == 1
+    assert "error" in agent_loop.execute_tool("write_pipeline_code", {"pipeline_name": "x", "layer": "gold", "code": "", "file_path": "../x.py"})
+
+def test_lru_eviction(tmp_path):
+    with tool_cache.ToolCache(str(tmp_path / "c.sqlite"), max_entries=3) as cache:
+        for k in "abc": cache.put(k, "t", ["gold/x"], {"v": k})
+        assert cache.get("a") == {"v": "a"}
+        cache.put("d", "t", ["gold/x"], {"v": "d"})
+        assert cache.get("b") is None and cache.get("a") and cache.summary()["entries"] == 3
+    with tool_cache.ToolCache(str(tmp_path / "c.sqlite"), max_bytes=30) as cache:
+        cache.put("e", "t", [], {"v": "x" * 20})
+        assert [cache.get(k) is not None for k in "acde"] == [False, False, False, True]